@@ -0,0 +1,106 @@
+-- =====================================================
+-- MÉTRICAS AGREGADAS POR EMPRESA (ADMIN SAAS)
+-- Uma chamada para a página inteira de GET /api/admin-saas/empresas,
+-- em vez de ~8 consultas por empresa
+-- =====================================================
+
+-- 1. Índices usados pelas agregações
+CREATE INDEX IF NOT EXISTS idx_usuarios_empresa_id ON usuarios(empresa_id);
+CREATE INDEX IF NOT EXISTS idx_produtos_servicos_empresa_tipo ON produtos_servicos(empresa_id, tipo);
+CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_id ON ordens_servico(empresa_id);
+CREATE INDEX IF NOT EXISTS idx_assinaturas_empresa_created ON assinaturas(empresa_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_pagamentos_empresa_created ON pagamentos(empresa_id, created_at DESC);
+
+-- 2. Função agregada
+-- Retorna uma linha por empresa de p_empresa_ids:
+--   metricas: usuarios, produtos, servicos, ordens, uso_bytes (bucket produtos/{empresa_id}/)
+--   assinatura: assinatura mais recente com o nome do plano
+--   ultimo_pagamento: pagamento mais recente
+CREATE OR REPLACE FUNCTION admin_saas_metricas_empresas(p_empresa_ids UUID[])
+RETURNS TABLE (
+  empresa_id UUID,
+  metricas JSONB,
+  assinatura JSONB,
+  ultimo_pagamento JSONB
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, storage
+AS $$
+  SELECT
+    e.id,
+    jsonb_build_object(
+      'usuarios', COALESCE(u.total, 0),
+      'produtos', COALESCE(p.produtos, 0),
+      'servicos', COALESCE(p.servicos, 0),
+      'ordens', COALESCE(o.total, 0),
+      'uso_bytes', COALESCE(s.bytes, 0)
+    ),
+    a.assinatura,
+    pg.pagamento
+  FROM unnest(p_empresa_ids) AS e(id)
+  LEFT JOIN (
+    SELECT usuarios.empresa_id, count(*) AS total
+    FROM usuarios
+    WHERE usuarios.empresa_id = ANY(p_empresa_ids)
+    GROUP BY usuarios.empresa_id
+  ) u ON u.empresa_id = e.id
+  LEFT JOIN (
+    SELECT
+      produtos_servicos.empresa_id,
+      count(*) FILTER (WHERE tipo = 'produto') AS produtos,
+      count(*) FILTER (WHERE tipo = 'servico') AS servicos
+    FROM produtos_servicos
+    WHERE produtos_servicos.empresa_id = ANY(p_empresa_ids)
+    GROUP BY produtos_servicos.empresa_id
+  ) p ON p.empresa_id = e.id
+  LEFT JOIN (
+    SELECT ordens_servico.empresa_id, count(*) AS total
+    FROM ordens_servico
+    WHERE ordens_servico.empresa_id = ANY(p_empresa_ids)
+    GROUP BY ordens_servico.empresa_id
+  ) o ON o.empresa_id = e.id
+  LEFT JOIN (
+    -- Soma no banco em vez de trazer cada objeto para o Node
+    SELECT split_part(name, '/', 2) AS empresa, sum((metadata->>'size')::BIGINT) AS bytes
+    FROM storage.objects
+    WHERE bucket_id = 'produtos'
+      AND name LIKE 'produtos/%'
+      AND split_part(name, '/', 2) = ANY(p_empresa_ids::TEXT[])
+    GROUP BY split_part(name, '/', 2)
+  ) s ON s.empresa = e.id::TEXT
+  LEFT JOIN LATERAL (
+    SELECT jsonb_build_object(
+      'id', asn.id,
+      'status', asn.status,
+      'proxima_cobranca', asn.proxima_cobranca,
+      'plano_id', asn.plano_id,
+      'plano_nome', pl.nome,
+      'created_at', asn.created_at
+    ) AS assinatura
+    FROM assinaturas asn
+    LEFT JOIN planos pl ON pl.id = asn.plano_id
+    WHERE asn.empresa_id = e.id
+    ORDER BY asn.created_at DESC
+    LIMIT 1
+  ) a ON true
+  LEFT JOIN LATERAL (
+    SELECT jsonb_build_object(
+      'status', pag.status,
+      'paid_at', pag.paid_at,
+      'created_at', pag.created_at,
+      'valor', pag.valor
+    ) AS pagamento
+    FROM pagamentos pag
+    WHERE pag.empresa_id = e.id
+    ORDER BY pag.created_at DESC
+    LIMIT 1
+  ) pg ON true;
+$$;
+
+-- 3. Apenas o backend (service role) pode chamar
+REVOKE EXECUTE ON FUNCTION admin_saas_metricas_empresas(UUID[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION admin_saas_metricas_empresas(UUID[]) TO service_role;
+
+COMMENT ON FUNCTION admin_saas_metricas_empresas IS 'Contadores, assinatura e último pagamento de várias empresas em uma única consulta (admin SaaS)';
@@ -0,0 +1,235 @@
+-- =====================================================
+-- TURNO DE CAIXA EM UMA CONSULTA
+-- Saldo corrente em turnos_caixa.saldo_atual (e saldo após cada movimentação)
+-- mantido pelo trigger de movimentacoes_caixa, no lugar de somar no cliente e
+-- gravar valor_vendas/valor_sangrias/valor_suprimentos com leitura-e-escrita.
+-- O estado completo do turno sai de caixa_turno_estado() (GET /api/caixa/turno).
+-- =====================================================
+
+-- 1. Saldo corrente
+ALTER TABLE turnos_caixa
+  ADD COLUMN IF NOT EXISTS saldo_atual DECIMAL(10,2),
+  ADD COLUMN IF NOT EXISTS valor_diferenca DECIMAL(10,2) DEFAULT 0;
+
+ALTER TABLE movimentacoes_caixa
+  ADD COLUMN IF NOT EXISTS saldo_apos DECIMAL(10,2);
+
+UPDATE turnos_caixa
+SET saldo_atual = COALESCE(valor_abertura, 0) + COALESCE(valor_vendas, 0)
+                + COALESCE(valor_suprimentos, 0) - COALESCE(valor_sangrias, 0)
+WHERE saldo_atual IS NULL;
+
+-- 2. Índices
+CREATE INDEX IF NOT EXISTS idx_movimentacoes_caixa_turno_data
+  ON movimentacoes_caixa (turno_id, data_movimentacao DESC);
+
+CREATE INDEX IF NOT EXISTS idx_turnos_caixa_empresa_fechamento
+  ON turnos_caixa (empresa_id, data_fechamento DESC)
+  WHERE status = 'fechado';
+
+CREATE INDEX IF NOT EXISTS idx_vendas_turno_forma
+  ON vendas (turno_id, forma_pagamento);
+
+-- Um turno aberto por empresa, quando os dados atuais permitem
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM turnos_caixa WHERE status = 'aberto' GROUP BY empresa_id HAVING count(*) > 1
+  ) THEN
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_turnos_caixa_aberto ON turnos_caixa (empresa_id) WHERE status = 'aberto';
+  ELSE
+    RAISE NOTICE 'turnos_caixa tem mais de um turno aberto na mesma empresa: índice único não criado';
+  END IF;
+END $$;
+
+-- 3. Turno novo começa com o saldo da abertura
+CREATE OR REPLACE FUNCTION turnos_caixa_saldo_inicial()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.saldo_atual := COALESCE(NEW.valor_abertura, 0) + COALESCE(NEW.valor_vendas, 0)
+                   + COALESCE(NEW.valor_suprimentos, 0) - COALESCE(NEW.valor_sangrias, 0);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_turnos_caixa_saldo_inicial ON turnos_caixa;
+CREATE TRIGGER trg_turnos_caixa_saldo_inicial
+  BEFORE INSERT ON turnos_caixa
+  FOR EACH ROW EXECUTE FUNCTION turnos_caixa_saldo_inicial();
+
+-- 4. Cada movimentação atualiza os totais do turno de forma atômica (UPDATE com
+-- incremento trava a linha do turno: movimentações simultâneas não se perdem).
+-- Excluir uma movimentação de turno aberto (ex.: sangria lançada errada) desfaz o efeito.
+CREATE OR REPLACE FUNCTION movimentacoes_caixa_saldo()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_mov movimentacoes_caixa%ROWTYPE;
+  v_fator INTEGER := CASE WHEN TG_OP = 'DELETE' THEN -1 ELSE 1 END;
+  v_saldo DECIMAL(10,2);
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    v_mov := OLD;
+  ELSE
+    v_mov := NEW;
+  END IF;
+
+  IF v_mov.tipo NOT IN ('venda', 'sangria', 'suprimento') THEN
+    RAISE EXCEPTION 'Tipo de movimentação inválido: %', v_mov.tipo;
+  END IF;
+
+  UPDATE turnos_caixa SET
+    valor_vendas = COALESCE(valor_vendas, 0) + v_fator * CASE WHEN v_mov.tipo = 'venda' THEN v_mov.valor ELSE 0 END,
+    valor_sangrias = COALESCE(valor_sangrias, 0) + v_fator * CASE WHEN v_mov.tipo = 'sangria' THEN v_mov.valor ELSE 0 END,
+    valor_suprimentos = COALESCE(valor_suprimentos, 0) + v_fator * CASE WHEN v_mov.tipo = 'suprimento' THEN v_mov.valor ELSE 0 END,
+    saldo_atual = COALESCE(saldo_atual, 0)
+                + v_fator * CASE WHEN v_mov.tipo = 'sangria' THEN -v_mov.valor ELSE v_mov.valor END,
+    updated_at = NOW()
+  WHERE id = v_mov.turno_id AND status = 'aberto'
+  RETURNING saldo_atual INTO v_saldo;
+
+  IF TG_OP = 'DELETE' THEN
+    RETURN OLD;
+  END IF;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Turno de caixa não está aberto' USING ERRCODE = 'P0002';
+  END IF;
+  NEW.saldo_apos := v_saldo;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_movimentacoes_caixa_saldo ON movimentacoes_caixa;
+CREATE TRIGGER trg_movimentacoes_caixa_saldo
+  BEFORE INSERT OR DELETE ON movimentacoes_caixa
+  FOR EACH ROW EXECUTE FUNCTION movimentacoes_caixa_saldo();
+
+-- 5. Estado do turno: turno (com operador e caixa), últimas movimentações (com
+-- operador), vendas por forma de pagamento e último fechamento da empresa
+-- p_turno_id NULL = turno aberto da empresa (turno: null se não houver)
+CREATE OR REPLACE FUNCTION caixa_turno_estado(
+  p_empresa_id UUID,
+  p_turno_id UUID DEFAULT NULL,
+  p_limite_movimentacoes INTEGER DEFAULT 500
+) RETURNS JSONB AS $$
+DECLARE
+  v_turno turnos_caixa%ROWTYPE;
+BEGIN
+  IF p_turno_id IS NULL THEN
+    SELECT * INTO v_turno FROM turnos_caixa
+    WHERE empresa_id = p_empresa_id AND status = 'aberto'
+    ORDER BY data_abertura DESC LIMIT 1;
+  ELSE
+    SELECT * INTO v_turno FROM turnos_caixa
+    WHERE id = p_turno_id AND empresa_id = p_empresa_id;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'turno', CASE WHEN v_turno.id IS NULL THEN NULL ELSE (
+      SELECT to_jsonb(v_turno) || jsonb_build_object(
+        'usuario', jsonb_build_object('nome', u.nome),
+        'caixa', jsonb_build_object('nome', c.nome)
+      )
+      FROM (SELECT 1) x
+      LEFT JOIN usuarios u ON u.id = v_turno.usuario_id
+      LEFT JOIN caixas c ON c.id = v_turno.caixa_id
+    ) END,
+    'movimentacoes', COALESCE((
+      SELECT jsonb_agg(to_jsonb(m) || jsonb_build_object('usuario', jsonb_build_object('nome', u.nome))
+                       ORDER BY m.data_movimentacao DESC, m.created_at DESC)
+      FROM (
+        SELECT * FROM movimentacoes_caixa
+        WHERE turno_id = v_turno.id
+        ORDER BY data_movimentacao DESC, created_at DESC
+        LIMIT p_limite_movimentacoes
+      ) m
+      LEFT JOIN usuarios u ON u.id = m.usuario_id
+    ), '[]'::JSONB),
+    'vendas_por_forma', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('forma_pagamento', forma, 'quantidade', quantidade, 'total', total)
+                       ORDER BY total DESC)
+      FROM (
+        SELECT COALESCE(forma_pagamento, 'outros') AS forma, count(*) AS quantidade, sum(total) AS total
+        FROM vendas
+        WHERE turno_id = v_turno.id
+        GROUP BY 1
+      ) v
+    ), '[]'::JSONB),
+    'ultimo_fechamento', (
+      SELECT jsonb_build_object(
+        'data_fechamento', t.data_fechamento,
+        'valor_troco', t.valor_troco,
+        'usuario', jsonb_build_object('nome', u.nome)
+      )
+      FROM turnos_caixa t
+      LEFT JOIN usuarios u ON u.id = t.usuario_id
+      WHERE t.empresa_id = p_empresa_id AND t.status = 'fechado'
+      ORDER BY t.data_fechamento DESC NULLS LAST LIMIT 1
+    )
+  );
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER SET search_path = public;
+
+-- 6. Abertura: cria o "Caixa Principal" se preciso e o turno, em uma transação
+CREATE OR REPLACE FUNCTION caixa_abrir_turno(
+  p_empresa_id UUID,
+  p_usuario_id UUID,
+  p_valor_abertura DECIMAL,
+  p_observacoes TEXT DEFAULT NULL
+) RETURNS UUID AS $$
+DECLARE
+  v_caixa_id UUID;
+  v_turno_id UUID;
+BEGIN
+  -- Serializa aberturas da mesma empresa
+  PERFORM pg_advisory_xact_lock(hashtext('caixa_abrir_turno'), hashtext(p_empresa_id::TEXT));
+
+  IF EXISTS (SELECT 1 FROM turnos_caixa WHERE empresa_id = p_empresa_id AND status = 'aberto') THEN
+    RAISE EXCEPTION 'Já existe um turno aberto' USING ERRCODE = 'P0001';
+  END IF;
+
+  SELECT id INTO v_caixa_id FROM caixas
+  WHERE empresa_id = p_empresa_id AND nome = 'Caixa Principal'
+  LIMIT 1;
+  IF v_caixa_id IS NULL THEN
+    INSERT INTO caixas (nome, empresa_id) VALUES ('Caixa Principal', p_empresa_id)
+    RETURNING id INTO v_caixa_id;
+  END IF;
+
+  INSERT INTO turnos_caixa (caixa_id, usuario_id, valor_abertura, observacoes, empresa_id)
+  VALUES (v_caixa_id, p_usuario_id, COALESCE(p_valor_abertura, 0), p_observacoes, p_empresa_id)
+  RETURNING id INTO v_turno_id;
+
+  RETURN v_turno_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- 7. Fechamento: diferença calculada com o saldo corrente, sem somar movimentações
+CREATE OR REPLACE FUNCTION caixa_fechar_turno(
+  p_empresa_id UUID,
+  p_turno_id UUID,
+  p_valor_fechamento DECIMAL,
+  p_valor_troco DECIMAL DEFAULT 0,
+  p_observacoes TEXT DEFAULT NULL
+) RETURNS UUID AS $$
+BEGIN
+  UPDATE turnos_caixa SET
+    data_fechamento = NOW(),
+    valor_fechamento = p_valor_fechamento,
+    valor_troco = COALESCE(p_valor_troco, 0),
+    valor_diferenca = p_valor_fechamento - COALESCE(saldo_atual, 0),
+    status = 'fechado',
+    observacoes = COALESCE(p_observacoes, observacoes),
+    updated_at = NOW()
+  WHERE id = p_turno_id AND empresa_id = p_empresa_id AND status = 'aberto';
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Turno de caixa não está aberto' USING ERRCODE = 'P0002';
+  END IF;
+  RETURN p_turno_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Apenas o service role (rota /api/caixa/turno, que resolve empresa e usuário da sessão)
+REVOKE EXECUTE ON FUNCTION caixa_turno_estado(UUID, UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION caixa_abrir_turno(UUID, UUID, DECIMAL, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION caixa_fechar_turno(UUID, UUID, DECIMAL, DECIMAL, TEXT) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,82 @@
+-- =====================================================
+-- BUSCA INDEXADA DE CLIENTES COM PAGINAÇÃO POR CURSOR
+-- Usada por GET /api/clientes (search, limit, cursor)
+-- =====================================================
+
+-- 1. Extensões: trigramas para LIKE '%termo%', unaccent para ignorar acentos,
+--    btree_gin para combinar empresa_id (uuid) no mesmo índice GIN
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+-- 2. Normalização do texto de busca (minúsculas e sem acentos)
+-- unaccent() é STABLE; o wrapper com dicionário explícito pode ser IMMUTABLE
+-- e assim ser usado em coluna gerada e índice
+CREATE OR REPLACE FUNCTION normalizar_busca(texto TEXT)
+RETURNS TEXT AS $$
+  SELECT lower(unaccent('unaccent', COALESCE(texto, '')));
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Apenas dígitos, para telefone/celular/documento com ou sem máscara
+CREATE OR REPLACE FUNCTION somente_digitos(texto TEXT)
+RETURNS TEXT AS $$
+  SELECT regexp_replace(COALESCE(texto, ''), '\D', '', 'g');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- 3. Coluna com o texto pesquisável já normalizado
+ALTER TABLE clientes
+ADD COLUMN IF NOT EXISTS busca_normalizada TEXT
+GENERATED ALWAYS AS (
+  normalizar_busca(nome) || ' ' ||
+  somente_digitos(telefone) || ' ' ||
+  somente_digitos(celular) || ' ' ||
+  somente_digitos(documento)
+) STORED;
+
+-- 4. Índices
+-- Busca por trecho dentro da empresa (apenas clientes ativos)
+CREATE INDEX IF NOT EXISTS idx_clientes_busca_trgm
+ON clientes USING gin (empresa_id, busca_normalizada gin_trgm_ops)
+WHERE status = 'ativo';
+
+-- Listagem ordenada por nome com keyset (nome, id); nome NULL ordena como ''
+-- para que clientes sem nome também entrem na paginação
+DROP INDEX IF EXISTS idx_clientes_empresa_nome_id;
+CREATE INDEX IF NOT EXISTS idx_clientes_empresa_nome_ordem_id
+ON clientes (empresa_id, COALESCE(nome, ''), id)
+WHERE status = 'ativo';
+
+-- 5. Função de busca paginada
+-- p_apos_nome/p_apos_id: último cliente da página anterior (cursor)
+CREATE OR REPLACE FUNCTION buscar_clientes(
+  p_empresa_id UUID,
+  p_busca TEXT DEFAULT NULL,
+  p_limite INTEGER DEFAULT 50,
+  p_apos_nome TEXT DEFAULT NULL,
+  p_apos_id UUID DEFAULT NULL
+)
+RETURNS SETOF clientes AS $$
+  WITH termo AS (
+    SELECT
+      -- Escapar curingas do LIKE digitados pelo usuário
+      NULLIF(replace(replace(replace(normalizar_busca(trim(p_busca)), '\', '\\'), '%', '\%'), '_', '\_'), '') AS texto,
+      NULLIF(somente_digitos(p_busca), '') AS digitos
+  )
+  SELECT c.*
+  FROM clientes c, termo t
+  WHERE c.empresa_id = p_empresa_id
+    AND c.status = 'ativo'
+    AND (
+      t.texto IS NULL
+      OR c.busca_normalizada LIKE '%' || t.texto || '%'
+      OR (t.digitos IS NOT NULL AND c.busca_normalizada LIKE '%' || t.digitos || '%')
+    )
+    AND (p_apos_nome IS NULL OR (COALESCE(c.nome, ''), c.id) > (p_apos_nome, p_apos_id))
+  ORDER BY COALESCE(c.nome, ''), c.id
+  LIMIT LEAST(GREATEST(COALESCE(p_limite, 50), 1), 201);
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION buscar_clientes IS 'Busca clientes ativos da empresa por nome/telefone/celular/documento, paginada por (nome, id)';
+
+-- 6. Verificar o plano com uma empresa grande
+-- EXPLAIN ANALYZE SELECT * FROM buscar_clientes('<empresa_id>', 'silva', 51);
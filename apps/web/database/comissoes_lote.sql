@@ -0,0 +1,184 @@
+-- =====================================================
+-- COMISSÕES EM LOTE
+-- Substitui o trigger por linha calcular_comissao_entrega() (02_criar_trigger_comissoes.sql),
+-- que fazia três SELECTs por OS entregue, por um cálculo sobre conjuntos:
+-- - trigger por comando (transition tables): um UPDATE que entrega N OS gera
+--   as N comissões com um INSERT ... SELECT
+-- - comissoes_recalcular(): (re)calcula por empresa, período e/ou técnico, no
+--   lugar dos scripts corrigir_*/recalcular_comissoes_opcoes.sql
+-- A configuração da empresa entra por JOIN (lida uma vez por empresa no comando).
+-- Regras iguais às do trigger antigo (ver TC025).
+-- =====================================================
+
+-- 1. Índices
+CREATE INDEX IF NOT EXISTS idx_comissoes_historico_os ON comissoes_historico (ordem_servico_id);
+CREATE INDEX IF NOT EXISTS idx_comissoes_historico_empresa_entrega ON comissoes_historico (empresa_id, data_entrega);
+CREATE INDEX IF NOT EXISTS idx_comissoes_historico_tecnico_entrega ON comissoes_historico (tecnico_id, data_entrega);
+CREATE INDEX IF NOT EXISTS idx_ordens_servico_entregues
+  ON ordens_servico (empresa_id, (COALESCE(data_saida, updated_at)))
+  WHERE status = 'ENTREGUE';
+
+-- 2. Comissão de cada OS entregue com técnico de comissão ativa (sem linha = sem comissão)
+-- Base: valor_servico ou valor_faturado conforme configuracoes_comissao (sem
+-- configuração: só serviço, sem retorno/garantia). Arredondamento igual ao
+-- DECIMAL(10,2) do trigger antigo.
+CREATE OR REPLACE FUNCTION comissoes_calculo(p_os_ids UUID[])
+RETURNS TABLE (
+  ordem_servico_id UUID,
+  tecnico_id UUID,
+  empresa_id UUID,
+  valor_servico DECIMAL(10,2),
+  valor_peca DECIMAL(10,2),
+  valor_total DECIMAL(10,2),
+  percentual_comissao DECIMAL(5,2),
+  valor_comissao DECIMAL(10,2),
+  tipo_ordem VARCHAR(20),
+  entregue_em TIMESTAMPTZ
+) AS $$
+  SELECT
+    os.id,
+    os.tecnico_id,
+    os.empresa_id,
+    COALESCE(os.valor_servico::DECIMAL, 0)::DECIMAL(10,2),
+    COALESCE(os.valor_peca::DECIMAL, 0)::DECIMAL(10,2),
+    COALESCE(os.valor_faturado::DECIMAL, 0)::DECIMAL(10,2),
+    u.comissao_percentual,
+    ((CASE WHEN COALESCE(c.comissao_apenas_servico, c.empresa_id IS NULL)
+       THEN COALESCE(os.valor_servico::DECIMAL, 0)
+       ELSE COALESCE(os.valor_faturado::DECIMAL, 0)
+     END)::DECIMAL(10,2) * (u.comissao_percentual / 100))::DECIMAL(10,2),
+    COALESCE(os.tipo, 'normal')::VARCHAR(20),
+    COALESCE(os.data_saida, os.updated_at)
+  FROM ordens_servico os
+  JOIN usuarios u ON u.id = os.tecnico_id
+  LEFT JOIN configuracoes_comissao c ON c.empresa_id = os.empresa_id
+  WHERE os.id = ANY(p_os_ids)
+    AND os.status = 'ENTREGUE'
+    AND u.comissao_ativa
+    AND u.comissao_percentual > 0
+    AND (
+      COALESCE(os.tipo, 'normal') = 'normal'
+      OR (COALESCE(os.tipo, 'normal') IN ('retorno', 'garantia') AND COALESCE(c.comissao_retorno_ativo, FALSE))
+    );
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+-- 3. Insere as comissões que faltam para as OS informadas (OS que já têm comissão
+-- são ignoradas). p_data_entrega: data gravada (NULL = data_saida/updated_at da OS).
+CREATE OR REPLACE FUNCTION comissoes_calcular(p_os_ids UUID[], p_data_entrega TIMESTAMPTZ DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+  v_inseridas INTEGER;
+BEGIN
+  INSERT INTO comissoes_historico (
+    tecnico_id, ordem_servico_id, empresa_id, valor_servico, valor_peca, valor_total,
+    percentual_comissao, valor_comissao, tipo_ordem, status, data_entrega, observacoes
+  )
+  SELECT
+    k.tecnico_id, k.ordem_servico_id, k.empresa_id, k.valor_servico, k.valor_peca, k.valor_total,
+    k.percentual_comissao, k.valor_comissao, k.tipo_ordem, 'pendente',
+    COALESCE(p_data_entrega, k.entregue_em, NOW()),
+    CASE
+      WHEN k.tipo_ordem = 'normal' THEN 'Comissão calculada automaticamente'
+      WHEN k.tipo_ordem IN ('retorno', 'garantia') THEN 'Comissão de retorno/garantia'
+      ELSE 'Comissão calculada'
+    END
+  FROM comissoes_calculo(p_os_ids) k
+  WHERE k.valor_comissao > 0
+    AND NOT EXISTS (
+      SELECT 1 FROM comissoes_historico ch WHERE ch.ordem_servico_id = k.ordem_servico_id
+    );
+
+  GET DIAGNOSTICS v_inseridas = ROW_COUNT;
+  RETURN v_inseridas;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- 4. Trigger por comando: OS que passaram para ENTREGUE neste UPDATE
+CREATE OR REPLACE FUNCTION comissoes_ordens_entregues()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_ids UUID[];
+BEGIN
+  SELECT array_agg(n.id) INTO v_ids
+  FROM novas n
+  JOIN antigas a ON a.id = n.id
+  WHERE n.status = 'ENTREGUE'
+    AND a.status IS DISTINCT FROM 'ENTREGUE'
+    AND n.tecnico_id IS NOT NULL;
+
+  IF v_ids IS NOT NULL THEN
+    PERFORM comissoes_calcular(v_ids, NOW());
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trigger_calcular_comissao ON ordens_servico;
+DROP TRIGGER IF EXISTS trg_ordens_servico_comissoes ON ordens_servico;
+CREATE TRIGGER trg_ordens_servico_comissoes
+  AFTER UPDATE ON ordens_servico
+  REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+  FOR EACH STATEMENT EXECUTE FUNCTION comissoes_ordens_entregues();
+
+-- 5. (Re)cálculo em lote por empresa (NULL = todas), período de entrega [p_inicio, p_fim)
+-- e/ou técnico. Sempre insere as comissões que faltam; com p_atualizar_pendentes,
+-- também recalcula valores e percentual das comissões 'pendente' (pagas não mudam).
+CREATE OR REPLACE FUNCTION comissoes_recalcular(
+  p_empresa_id UUID DEFAULT NULL,
+  p_inicio TIMESTAMPTZ DEFAULT NULL,
+  p_fim TIMESTAMPTZ DEFAULT NULL,
+  p_tecnico_id UUID DEFAULT NULL,
+  p_atualizar_pendentes BOOLEAN DEFAULT FALSE
+) RETURNS TABLE (inseridas INTEGER, atualizadas INTEGER) AS $$
+DECLARE
+  v_ids UUID[];
+  v_inseridas INTEGER;
+  v_atualizadas INTEGER := 0;
+BEGIN
+  SELECT array_agg(os.id) INTO v_ids
+  FROM ordens_servico os
+  WHERE os.status = 'ENTREGUE'
+    AND os.tecnico_id IS NOT NULL
+    AND (p_empresa_id IS NULL OR os.empresa_id = p_empresa_id)
+    AND (p_tecnico_id IS NULL OR os.tecnico_id = p_tecnico_id)
+    AND (p_inicio IS NULL OR COALESCE(os.data_saida, os.updated_at) >= p_inicio)
+    AND (p_fim IS NULL OR COALESCE(os.data_saida, os.updated_at) < p_fim);
+
+  v_inseridas := comissoes_calcular(COALESCE(v_ids, '{}'));
+
+  IF p_atualizar_pendentes THEN
+    SELECT array_agg(ch.ordem_servico_id) INTO v_ids
+    FROM comissoes_historico ch
+    WHERE ch.status = 'pendente'
+      AND (p_empresa_id IS NULL OR ch.empresa_id = p_empresa_id)
+      AND (p_tecnico_id IS NULL OR ch.tecnico_id = p_tecnico_id)
+      AND (p_inicio IS NULL OR ch.data_entrega >= p_inicio)
+      AND (p_fim IS NULL OR ch.data_entrega < p_fim);
+
+    UPDATE comissoes_historico ch SET
+      valor_servico = k.valor_servico,
+      valor_peca = k.valor_peca,
+      valor_total = k.valor_total,
+      percentual_comissao = k.percentual_comissao,
+      valor_comissao = k.valor_comissao,
+      tipo_ordem = k.tipo_ordem,
+      data_calculo = NOW(),
+      updated_at = NOW()
+    FROM comissoes_calculo(COALESCE(v_ids, '{}')) k
+    WHERE ch.ordem_servico_id = k.ordem_servico_id
+      AND ch.tecnico_id = k.tecnico_id
+      AND ch.status = 'pendente'
+      AND (ch.valor_comissao, ch.percentual_comissao, ch.valor_servico, ch.valor_total)
+          IS DISTINCT FROM (k.valor_comissao, k.percentual_comissao, k.valor_servico, k.valor_total);
+
+    GET DIAGNOSTICS v_atualizadas = ROW_COUNT;
+  END IF;
+
+  RETURN QUERY SELECT v_inseridas, v_atualizadas;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Apenas o service role (rota /api/comissoes/recalcular filtra pela empresa do usuário)
+REVOKE EXECUTE ON FUNCTION comissoes_calculo(UUID[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION comissoes_calcular(UUID[], TIMESTAMPTZ) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION comissoes_recalcular(UUID, TIMESTAMPTZ, TIMESTAMPTZ, UUID, BOOLEAN) FROM PUBLIC, anon, authenticated;
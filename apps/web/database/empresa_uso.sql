@@ -0,0 +1,240 @@
+-- =====================================================
+-- USO DO PLANO POR EMPRESA
+-- Contadores de usuários, produtos, serviços, clientes, OS e fornecedores em
+-- uma linha por empresa, mantidos por triggers, no lugar de seis count(*)
+-- exatos a cada tela (useSubscription) e das agregações do admin SaaS.
+-- Lidos por GET /api/assinatura/uso e por admin_saas_metricas_empresas().
+-- =====================================================
+
+-- 1. Contadores
+CREATE TABLE IF NOT EXISTS empresa_uso (
+  empresa_id UUID PRIMARY KEY REFERENCES empresas(id) ON DELETE CASCADE,
+  usuarios BIGINT NOT NULL DEFAULT 0,
+  produtos BIGINT NOT NULL DEFAULT 0,
+  servicos BIGINT NOT NULL DEFAULT 0,
+  clientes BIGINT NOT NULL DEFAULT 0,
+  ordens BIGINT NOT NULL DEFAULT 0,
+  fornecedores BIGINT NOT NULL DEFAULT 0,
+  atualizado_em TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE empresa_uso ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_clientes_empresa_id ON clientes(empresa_id);
+
+-- 2. Contador de cada linha: nome do contador (argumento do trigger), ou o tipo
+-- em produtos_servicos ('produto'/'servico'; outros tipos não contam)
+CREATE OR REPLACE FUNCTION empresa_uso_contador(p_tabela TEXT, p_tipo TEXT)
+RETURNS TEXT AS $$
+  SELECT CASE
+    WHEN p_tabela <> 'produtos_servicos' THEN p_tabela
+    WHEN p_tipo = 'produto' THEN 'produtos'
+    WHEN p_tipo = 'servico' THEN 'servicos'
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 3. Soma p_sinal a cada (empresa, contador) informado, agrupado por empresa:
+-- um INSERT/DELETE de N linhas faz um upsert por empresa, não N.
+-- Empresas excluídas no mesmo comando (ON DELETE CASCADE) são ignoradas.
+CREATE OR REPLACE FUNCTION empresa_uso_aplicar(p_empresa_ids UUID[], p_contadores TEXT[], p_sinal INTEGER)
+RETURNS VOID AS $$
+  INSERT INTO empresa_uso AS u (empresa_id, usuarios, produtos, servicos, clientes, ordens, fornecedores)
+  SELECT
+    d.empresa_id,
+    p_sinal * count(*) FILTER (WHERE d.contador = 'usuarios'),
+    p_sinal * count(*) FILTER (WHERE d.contador = 'produtos'),
+    p_sinal * count(*) FILTER (WHERE d.contador = 'servicos'),
+    p_sinal * count(*) FILTER (WHERE d.contador = 'clientes'),
+    p_sinal * count(*) FILTER (WHERE d.contador = 'ordens'),
+    p_sinal * count(*) FILTER (WHERE d.contador = 'fornecedores')
+  FROM unnest(p_empresa_ids, p_contadores) AS d(empresa_id, contador)
+  JOIN empresas e ON e.id = d.empresa_id
+  WHERE d.contador IS NOT NULL
+  GROUP BY d.empresa_id
+  ON CONFLICT (empresa_id) DO UPDATE SET
+    usuarios = u.usuarios + EXCLUDED.usuarios,
+    produtos = u.produtos + EXCLUDED.produtos,
+    servicos = u.servicos + EXCLUDED.servicos,
+    clientes = u.clientes + EXCLUDED.clientes,
+    ordens = u.ordens + EXCLUDED.ordens,
+    fornecedores = u.fornecedores + EXCLUDED.fornecedores,
+    atualizado_em = NOW();
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+-- 4. Triggers por comando (transition tables) para INSERT e DELETE; por linha para
+-- UPDATE que troca a empresa (ou o tipo, em produtos_servicos), que é raro
+CREATE OR REPLACE FUNCTION empresa_uso_contar()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_tabela TEXT := TG_ARGV[0];
+  v_empresas UUID[];
+  v_contadores TEXT[];
+BEGIN
+  IF TG_LEVEL = 'ROW' THEN
+    PERFORM empresa_uso_aplicar(ARRAY[OLD.empresa_id], ARRAY[empresa_uso_contador(v_tabela, to_jsonb(OLD)->>'tipo')], -1);
+    PERFORM empresa_uso_aplicar(ARRAY[NEW.empresa_id], ARRAY[empresa_uso_contador(v_tabela, to_jsonb(NEW)->>'tipo')], 1);
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    IF v_tabela = 'produtos_servicos' THEN
+      SELECT array_agg(empresa_id), array_agg(empresa_uso_contador(v_tabela, tipo::TEXT))
+      INTO v_empresas, v_contadores FROM novas WHERE empresa_id IS NOT NULL;
+    ELSE
+      SELECT array_agg(empresa_id), array_agg(v_tabela)
+      INTO v_empresas, v_contadores FROM novas WHERE empresa_id IS NOT NULL;
+    END IF;
+  ELSE
+    IF v_tabela = 'produtos_servicos' THEN
+      SELECT array_agg(empresa_id), array_agg(empresa_uso_contador(v_tabela, tipo::TEXT))
+      INTO v_empresas, v_contadores FROM antigas WHERE empresa_id IS NOT NULL;
+    ELSE
+      SELECT array_agg(empresa_id), array_agg(v_tabela)
+      INTO v_empresas, v_contadores FROM antigas WHERE empresa_id IS NOT NULL;
+    END IF;
+  END IF;
+
+  IF v_empresas IS NOT NULL THEN
+    PERFORM empresa_uso_aplicar(v_empresas, v_contadores, CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DO $$
+DECLARE
+  v_alvo RECORD;
+BEGIN
+  FOR v_alvo IN
+    SELECT * FROM (VALUES
+      ('usuarios', 'usuarios', 'OLD.empresa_id IS DISTINCT FROM NEW.empresa_id'),
+      ('produtos_servicos', 'produtos_servicos', 'OLD.empresa_id IS DISTINCT FROM NEW.empresa_id OR OLD.tipo IS DISTINCT FROM NEW.tipo'),
+      ('clientes', 'clientes', 'OLD.empresa_id IS DISTINCT FROM NEW.empresa_id'),
+      ('ordens_servico', 'ordens', 'OLD.empresa_id IS DISTINCT FROM NEW.empresa_id'),
+      ('fornecedores', 'fornecedores', 'OLD.empresa_id IS DISTINCT FROM NEW.empresa_id')
+    ) AS t(tabela, contador, mudou)
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_uso_insert ON %I', v_alvo.tabela, v_alvo.tabela);
+    EXECUTE format('CREATE TRIGGER trg_%s_uso_insert AFTER INSERT ON %I REFERENCING NEW TABLE AS novas '
+                   'FOR EACH STATEMENT EXECUTE FUNCTION empresa_uso_contar(%L)',
+                   v_alvo.tabela, v_alvo.tabela, v_alvo.contador);
+
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_uso_delete ON %I', v_alvo.tabela, v_alvo.tabela);
+    EXECUTE format('CREATE TRIGGER trg_%s_uso_delete AFTER DELETE ON %I REFERENCING OLD TABLE AS antigas '
+                   'FOR EACH STATEMENT EXECUTE FUNCTION empresa_uso_contar(%L)',
+                   v_alvo.tabela, v_alvo.tabela, v_alvo.contador);
+
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_uso_update ON %I', v_alvo.tabela, v_alvo.tabela);
+    EXECUTE format('CREATE TRIGGER trg_%s_uso_update AFTER UPDATE ON %I '
+                   'FOR EACH ROW WHEN (%s) EXECUTE FUNCTION empresa_uso_contar(%L)',
+                   v_alvo.tabela, v_alvo.tabela, v_alvo.mudou, v_alvo.contador);
+  END LOOP;
+END $$;
+
+-- 5. Recontagem exata (carga inicial e correção de divergências)
+-- p_empresa_id NULL = todas as empresas
+CREATE OR REPLACE FUNCTION empresa_uso_recalcular(p_empresa_id UUID DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+  v_empresas INTEGER;
+BEGIN
+  INSERT INTO empresa_uso AS u (empresa_id, usuarios, produtos, servicos, clientes, ordens, fornecedores, atualizado_em)
+  SELECT
+    e.id,
+    (SELECT count(*) FROM usuarios x WHERE x.empresa_id = e.id),
+    (SELECT count(*) FROM produtos_servicos x WHERE x.empresa_id = e.id AND x.tipo = 'produto'),
+    (SELECT count(*) FROM produtos_servicos x WHERE x.empresa_id = e.id AND x.tipo = 'servico'),
+    (SELECT count(*) FROM clientes x WHERE x.empresa_id = e.id),
+    (SELECT count(*) FROM ordens_servico x WHERE x.empresa_id = e.id),
+    (SELECT count(*) FROM fornecedores x WHERE x.empresa_id = e.id),
+    NOW()
+  FROM empresas e
+  WHERE p_empresa_id IS NULL OR e.id = p_empresa_id
+  ON CONFLICT (empresa_id) DO UPDATE SET
+    usuarios = EXCLUDED.usuarios,
+    produtos = EXCLUDED.produtos,
+    servicos = EXCLUDED.servicos,
+    clientes = EXCLUDED.clientes,
+    ordens = EXCLUDED.ordens,
+    fornecedores = EXCLUDED.fornecedores,
+    atualizado_em = EXCLUDED.atualizado_em;
+
+  GET DIAGNOSTICS v_empresas = ROW_COUNT;
+  RETURN v_empresas;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+SELECT empresa_uso_recalcular();
+
+-- 6. Admin SaaS: contadores da página de empresas vêm de empresa_uso
+-- (mesma assinatura de database/admin_saas_metricas_empresas.sql, com clientes e fornecedores)
+CREATE OR REPLACE FUNCTION admin_saas_metricas_empresas(p_empresa_ids UUID[])
+RETURNS TABLE (
+  empresa_id UUID,
+  metricas JSONB,
+  assinatura JSONB,
+  ultimo_pagamento JSONB
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, storage
+AS $$
+  SELECT
+    e.id,
+    jsonb_build_object(
+      'usuarios', COALESCE(uso.usuarios, 0),
+      'produtos', COALESCE(uso.produtos, 0),
+      'servicos', COALESCE(uso.servicos, 0),
+      'clientes', COALESCE(uso.clientes, 0),
+      'ordens', COALESCE(uso.ordens, 0),
+      'fornecedores', COALESCE(uso.fornecedores, 0),
+      'uso_bytes', COALESCE(s.bytes, 0)
+    ),
+    a.assinatura,
+    pg.pagamento
+  FROM unnest(p_empresa_ids) AS e(id)
+  LEFT JOIN empresa_uso uso ON uso.empresa_id = e.id
+  LEFT JOIN (
+    -- Soma no banco em vez de trazer cada objeto para o Node
+    SELECT split_part(name, '/', 2) AS empresa, sum((metadata->>'size')::BIGINT) AS bytes
+    FROM storage.objects
+    WHERE bucket_id = 'produtos'
+      AND name LIKE 'produtos/%'
+      AND split_part(name, '/', 2) = ANY(p_empresa_ids::TEXT[])
+    GROUP BY split_part(name, '/', 2)
+  ) s ON s.empresa = e.id::TEXT
+  LEFT JOIN LATERAL (
+    SELECT jsonb_build_object(
+      'id', asn.id,
+      'status', asn.status,
+      'proxima_cobranca', asn.proxima_cobranca,
+      'plano_id', asn.plano_id,
+      'plano_nome', pl.nome,
+      'created_at', asn.created_at
+    ) AS assinatura
+    FROM assinaturas asn
+    LEFT JOIN planos pl ON pl.id = asn.plano_id
+    WHERE asn.empresa_id = e.id
+    ORDER BY asn.created_at DESC
+    LIMIT 1
+  ) a ON true
+  LEFT JOIN LATERAL (
+    SELECT jsonb_build_object(
+      'status', pag.status,
+      'paid_at', pag.paid_at,
+      'created_at', pag.created_at,
+      'valor', pag.valor
+    ) AS pagamento
+    FROM pagamentos pag
+    WHERE pag.empresa_id = e.id
+    ORDER BY pag.created_at DESC
+    LIMIT 1
+  ) pg ON true;
+$$;
+
+-- 7. Apenas o backend (service role) pode chamar
+REVOKE EXECUTE ON FUNCTION empresa_uso_aplicar(UUID[], TEXT[], INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION empresa_uso_recalcular(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION admin_saas_metricas_empresas(UUID[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION admin_saas_metricas_empresas(UUID[]) TO service_role;
@@ -0,0 +1,48 @@
+-- =====================================================
+-- LOGIN EM UMA CONSULTA
+-- POST /api/login resolve usuário -> e-mail -> perfil -> verificação do
+-- admin da empresa -> status da empresa com uma chamada a login_resolver(),
+-- no lugar das consultas sequenciais em usuarios antes e depois do Auth
+-- =====================================================
+
+-- 1. Índices das buscas do login
+CREATE INDEX IF NOT EXISTS idx_usuarios_usuario ON usuarios (usuario);
+CREATE INDEX IF NOT EXISTS idx_usuarios_empresa_nivel ON usuarios (empresa_id, nivel);
+
+-- 2. Dados de login de um e-mail ou nome de usuário (sem linha = não encontrado)
+-- admin_email_verificado: NULL para o próprio admin ou empresa sem admin
+CREATE OR REPLACE FUNCTION login_resolver(p_login TEXT)
+RETURNS TABLE (
+  email TEXT,
+  auth_user_id UUID,
+  nivel TEXT,
+  empresa_id UUID,
+  email_verificado BOOLEAN,
+  admin_email_verificado BOOLEAN,
+  empresa_status TEXT,
+  motivobloqueio TEXT
+) AS $$
+  SELECT
+    u.email::TEXT,
+    u.auth_user_id,
+    u.nivel::TEXT,
+    u.empresa_id,
+    COALESCE(u.email_verificado, FALSE),
+    CASE WHEN u.nivel <> 'admin' THEN (
+      SELECT bool_or(COALESCE(a.email_verificado, FALSE))
+      FROM usuarios a
+      WHERE a.empresa_id = u.empresa_id AND a.nivel = 'admin'
+    ) END,
+    e.status::TEXT,
+    e.motivobloqueio::TEXT
+  FROM usuarios u
+  LEFT JOIN empresas e ON e.id = u.empresa_id
+  WHERE CASE
+    WHEN position('@' IN p_login) > 0 THEN u.email = p_login
+    ELSE u.usuario = lower(trim(p_login))
+  END
+  LIMIT 1;
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+-- Expõe e-mails por nome de usuário: apenas o service role (rota /api/login)
+REVOKE EXECUTE ON FUNCTION login_resolver(TEXT) FROM PUBLIC, anon, authenticated;
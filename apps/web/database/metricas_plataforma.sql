@@ -0,0 +1,176 @@
+-- =====================================================
+-- MÉTRICAS DA PLATAFORMA MANTIDAS INCREMENTALMENTE
+-- GET /api/admin-saas/metrics lê estes contadores em tempo constante
+-- em vez de baixar todas as assinaturas e pagamentos
+-- =====================================================
+
+-- 1. Tabela de contadores
+-- Cada chave é dividida em até 16 shards para que inserts concorrentes
+-- (ex.: vários webhooks ao mesmo tempo) não disputem o lock da mesma linha.
+-- Chaves:
+--   empresas, usuarios, assinaturas, pagamentos        -> quantidade
+--   assinaturas:status:<status>, pagamentos:status:<status> -> quantidade
+--   pagamentos:receita                                  -> valor (pagamentos aprovados)
+CREATE TABLE IF NOT EXISTS metricas_plataforma (
+  chave TEXT NOT NULL,
+  shard SMALLINT NOT NULL DEFAULT 0,
+  quantidade BIGINT NOT NULL DEFAULT 0,
+  valor NUMERIC(14,2) NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (chave, shard)
+);
+
+-- Apenas o service role acessa (sem policies = bloqueado para anon/authenticated)
+ALTER TABLE metricas_plataforma ENABLE ROW LEVEL SECURITY;
+
+-- 2. Incremento de um contador
+-- SECURITY DEFINER: só o dono e os triggers (também SECURITY DEFINER, seção 3)
+-- chamam; usuários comuns não enxergam a tabela por causa do RLS
+CREATE OR REPLACE FUNCTION metricas_plataforma_somar(p_chave TEXT, p_quantidade BIGINT, p_valor NUMERIC DEFAULT 0)
+RETURNS VOID
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF COALESCE(p_quantidade, 0) = 0 AND COALESCE(p_valor, 0) = 0 THEN
+    RETURN;
+  END IF;
+  INSERT INTO metricas_plataforma (chave, shard, quantidade, valor)
+  VALUES (p_chave, floor(random() * 16)::SMALLINT, COALESCE(p_quantidade, 0), COALESCE(p_valor, 0))
+  ON CONFLICT (chave, shard) DO UPDATE
+  SET quantidade = metricas_plataforma.quantidade + EXCLUDED.quantidade,
+      valor = metricas_plataforma.valor + EXCLUDED.valor,
+      updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. Triggers por statement (com transition tables): um COPY ou INSERT ... SELECT
+--    de 1M linhas gera um incremento por chave, não um por linha.
+--    SECURITY DEFINER: disparam para anon/authenticated (ex.: cadastro de empresa
+--    pelo navegador), que não têm EXECUTE em metricas_plataforma_somar
+
+-- 3.1 Contagem simples (empresas, usuarios); TG_ARGV[0] = chave
+CREATE OR REPLACE FUNCTION metricas_contar_linhas_trigger()
+RETURNS TRIGGER
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM metricas_plataforma_somar(TG_ARGV[0], (SELECT count(*) FROM novas));
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM metricas_plataforma_somar(TG_ARGV[0], -(SELECT count(*) FROM antigas));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3.2 Assinaturas e pagamentos: total, por status e receita
+--     TG_ARGV[0] = 'assinaturas' ou 'pagamentos'
+CREATE OR REPLACE FUNCTION metricas_status_trigger()
+RETURNS TRIGGER
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  prefixo TEXT := TG_ARGV[0];
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM metricas_plataforma_somar(prefixo || ':status:' || status, -quantidade)
+    FROM (SELECT COALESCE(status, 'desconhecido') AS status, count(*) AS quantidade FROM antigas GROUP BY 1) s;
+    IF prefixo = 'pagamentos' THEN
+      PERFORM metricas_plataforma_somar('pagamentos:receita', 0, -(SELECT COALESCE(sum(valor), 0) FROM antigas WHERE status = 'approved'));
+    END IF;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM metricas_plataforma_somar(prefixo || ':status:' || status, quantidade)
+    FROM (SELECT COALESCE(status, 'desconhecido') AS status, count(*) AS quantidade FROM novas GROUP BY 1) s;
+    IF prefixo = 'pagamentos' THEN
+      PERFORM metricas_plataforma_somar('pagamentos:receita', 0, (SELECT COALESCE(sum(valor), 0) FROM novas WHERE status = 'approved'));
+    END IF;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    PERFORM metricas_plataforma_somar(prefixo, (SELECT count(*) FROM novas));
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM metricas_plataforma_somar(prefixo, -(SELECT count(*) FROM antigas));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3.3 Criar os triggers (transition tables exigem um trigger por evento)
+DROP TRIGGER IF EXISTS metricas_empresas_insert ON empresas;
+CREATE TRIGGER metricas_empresas_insert AFTER INSERT ON empresas
+  REFERENCING NEW TABLE AS novas FOR EACH STATEMENT EXECUTE FUNCTION metricas_contar_linhas_trigger('empresas');
+DROP TRIGGER IF EXISTS metricas_empresas_delete ON empresas;
+CREATE TRIGGER metricas_empresas_delete AFTER DELETE ON empresas
+  REFERENCING OLD TABLE AS antigas FOR EACH STATEMENT EXECUTE FUNCTION metricas_contar_linhas_trigger('empresas');
+
+DROP TRIGGER IF EXISTS metricas_usuarios_insert ON usuarios;
+CREATE TRIGGER metricas_usuarios_insert AFTER INSERT ON usuarios
+  REFERENCING NEW TABLE AS novas FOR EACH STATEMENT EXECUTE FUNCTION metricas_contar_linhas_trigger('usuarios');
+DROP TRIGGER IF EXISTS metricas_usuarios_delete ON usuarios;
+CREATE TRIGGER metricas_usuarios_delete AFTER DELETE ON usuarios
+  REFERENCING OLD TABLE AS antigas FOR EACH STATEMENT EXECUTE FUNCTION metricas_contar_linhas_trigger('usuarios');
+
+DROP TRIGGER IF EXISTS metricas_assinaturas_insert ON assinaturas;
+CREATE TRIGGER metricas_assinaturas_insert AFTER INSERT ON assinaturas
+  REFERENCING NEW TABLE AS novas FOR EACH STATEMENT EXECUTE FUNCTION metricas_status_trigger('assinaturas');
+DROP TRIGGER IF EXISTS metricas_assinaturas_update ON assinaturas;
+CREATE TRIGGER metricas_assinaturas_update AFTER UPDATE ON assinaturas
+  REFERENCING OLD TABLE AS antigas NEW TABLE AS novas FOR EACH STATEMENT EXECUTE FUNCTION metricas_status_trigger('assinaturas');
+DROP TRIGGER IF EXISTS metricas_assinaturas_delete ON assinaturas;
+CREATE TRIGGER metricas_assinaturas_delete AFTER DELETE ON assinaturas
+  REFERENCING OLD TABLE AS antigas FOR EACH STATEMENT EXECUTE FUNCTION metricas_status_trigger('assinaturas');
+
+DROP TRIGGER IF EXISTS metricas_pagamentos_insert ON pagamentos;
+CREATE TRIGGER metricas_pagamentos_insert AFTER INSERT ON pagamentos
+  REFERENCING NEW TABLE AS novas FOR EACH STATEMENT EXECUTE FUNCTION metricas_status_trigger('pagamentos');
+DROP TRIGGER IF EXISTS metricas_pagamentos_update ON pagamentos;
+CREATE TRIGGER metricas_pagamentos_update AFTER UPDATE ON pagamentos
+  REFERENCING OLD TABLE AS antigas NEW TABLE AS novas FOR EACH STATEMENT EXECUTE FUNCTION metricas_status_trigger('pagamentos');
+DROP TRIGGER IF EXISTS metricas_pagamentos_delete ON pagamentos;
+CREATE TRIGGER metricas_pagamentos_delete AFTER DELETE ON pagamentos
+  REFERENCING OLD TABLE AS antigas FOR EACH STATEMENT EXECUTE FUNCTION metricas_status_trigger('pagamentos');
+
+-- 4. Recalcular do zero (carga inicial, após TRUNCATE ou para corrigir divergência)
+CREATE OR REPLACE FUNCTION metricas_plataforma_recalcular()
+RETURNS VOID AS $$
+BEGIN
+  LOCK TABLE metricas_plataforma IN EXCLUSIVE MODE;
+  DELETE FROM metricas_plataforma;
+
+  INSERT INTO metricas_plataforma (chave, quantidade) SELECT 'empresas', count(*) FROM empresas;
+  INSERT INTO metricas_plataforma (chave, quantidade) SELECT 'usuarios', count(*) FROM usuarios;
+  INSERT INTO metricas_plataforma (chave, quantidade) SELECT 'assinaturas', count(*) FROM assinaturas;
+  INSERT INTO metricas_plataforma (chave, quantidade) SELECT 'pagamentos', count(*) FROM pagamentos;
+
+  INSERT INTO metricas_plataforma (chave, quantidade)
+  SELECT 'assinaturas:status:' || COALESCE(status, 'desconhecido'), count(*) FROM assinaturas GROUP BY 1;
+  INSERT INTO metricas_plataforma (chave, quantidade)
+  SELECT 'pagamentos:status:' || COALESCE(status, 'desconhecido'), count(*) FROM pagamentos GROUP BY 1;
+
+  INSERT INTO metricas_plataforma (chave, valor)
+  SELECT 'pagamentos:receita', COALESCE(sum(valor), 0) FROM pagamentos WHERE status = 'approved';
+END;
+$$ LANGUAGE plpgsql;
+
+-- 5. Leitura: soma dos shards por chave (poucas dezenas de linhas, independente do histórico)
+CREATE OR REPLACE FUNCTION metricas_plataforma_resumo()
+RETURNS JSONB AS $$
+  SELECT COALESCE(jsonb_object_agg(chave, jsonb_build_object('quantidade', quantidade, 'valor', valor)), '{}'::JSONB)
+  FROM (
+    SELECT chave, sum(quantidade) AS quantidade, sum(valor) AS valor
+    FROM metricas_plataforma
+    GROUP BY chave
+  ) m;
+$$ LANGUAGE sql STABLE;
+
+REVOKE EXECUTE ON FUNCTION metricas_plataforma_somar(TEXT, BIGINT, NUMERIC) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION metricas_plataforma_resumo() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION metricas_plataforma_recalcular() FROM PUBLIC, anon, authenticated;
+
+-- 6. Carga inicial
+SELECT metricas_plataforma_recalcular();
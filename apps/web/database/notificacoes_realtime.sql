@@ -0,0 +1,94 @@
+-- =====================================================
+-- NOTIFICAÇÕES POR EMPRESA + LEMBRETES NO SERVIDOR
+-- Os navegadores assinam notificacoes com filtro empresa_id=eq.<id> (o Realtime
+-- só entrega a cada conexão as linhas da própria empresa) e os lembretes de
+-- orçamento pendente passam a ser gerados aqui, pelo cron
+-- /api/notificacoes/lembretes, no lugar de um setInterval por OS em cada aba
+-- =====================================================
+
+-- 1. Índice das buscas por empresa/tipo (lista fixa, popup de orçamento, lembretes)
+CREATE INDEX IF NOT EXISTS idx_notificacoes_empresa_tipo_created
+  ON notificacoes (empresa_id, tipo, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_notificacoes_os_created
+  ON notificacoes (os_id, created_at DESC)
+  WHERE os_id IS NOT NULL;
+
+-- Um lembrete por OS: o cron atualiza a linha existente em vez de somar uma a cada
+-- 10 minutos. Antes do índice, mantém só o lembrete mais recente de cada OS.
+DELETE FROM notificacoes n
+USING notificacoes mais_nova
+WHERE n.tipo = 'orcamento_lembrete'
+  AND mais_nova.tipo = 'orcamento_lembrete'
+  AND mais_nova.os_id = n.os_id
+  AND (mais_nova.created_at, mais_nova.id) > (n.created_at, n.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_notificacoes_lembrete_os
+  ON notificacoes (os_id)
+  WHERE tipo = 'orcamento_lembrete';
+
+-- 2. notificacoes publicada no Realtime (sem efeito se já estiver)
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime')
+     AND NOT EXISTS (
+       SELECT 1 FROM pg_publication_tables
+       WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'notificacoes'
+     ) THEN
+    ALTER PUBLICATION supabase_realtime ADD TABLE notificacoes;
+  END IF;
+END $$;
+
+-- 3. Lembretes de orçamento aguardando aprovação
+-- Para cada OS com 'orcamento_enviado' dentro de p_janela que continua pendente
+-- e cuja última notificação tem mais de p_intervalo, grava o 'orcamento_lembrete' da OS:
+-- insere o primeiro ou reativa o existente (created_at = agora, lida = false).
+-- O INSERT/UPDATE chega pelo Realtime só às abas da empresa. Retorna quantos foram gravados.
+CREATE OR REPLACE FUNCTION notificacoes_gerar_lembretes(
+  p_intervalo INTERVAL DEFAULT INTERVAL '10 minutes',
+  p_janela INTERVAL DEFAULT INTERVAL '1 day'
+) RETURNS INTEGER AS $$
+DECLARE
+  v_criados INTEGER;
+BEGIN
+  WITH pendentes AS (
+    SELECT DISTINCT n.empresa_id, n.os_id
+    FROM notificacoes n
+    WHERE n.tipo = 'orcamento_enviado'
+      AND n.os_id IS NOT NULL
+      AND n.created_at > NOW() - p_janela
+  ), elegiveis AS (
+    SELECT p.empresa_id, p.os_id, os.numero_os
+    FROM pendentes p
+    JOIN ordens_servico os ON os.id = p.os_id AND os.empresa_id = p.empresa_id
+    WHERE (
+        upper(COALESCE(os.status_tecnico, '')) LIKE '%ORÇAMENTO%'
+        OR upper(COALESCE(os.status, '')) LIKE '%ORÇAMENTO%'
+        OR upper(COALESCE(os.status, '')) LIKE '%AGUARDANDO APROVA%'
+      )
+      AND upper(COALESCE(os.status, '')) NOT SIMILAR TO
+        '%(AGUARDANDO RETIRADA|AGUARDANDO\_RETIRADA|ENTREGUE|FINALIZADA|CONCLUIDA|CONCLUÍDO|CANCELADA)%'
+      AND NOT EXISTS (
+        SELECT 1 FROM notificacoes r
+        WHERE r.os_id = p.os_id
+          AND r.tipo IN ('orcamento_enviado', 'orcamento_lembrete')
+          AND r.created_at > NOW() - p_intervalo
+      )
+  )
+  INSERT INTO notificacoes (empresa_id, tipo, os_id, mensagem, lida, cliente_avisado)
+  SELECT empresa_id, 'orcamento_lembrete', os_id,
+         'OS #' || COALESCE(numero_os::TEXT, '') || ' - orçamento enviado. Aguardando sua aprovação.',
+         FALSE, FALSE
+  FROM elegiveis
+  ON CONFLICT (os_id) WHERE tipo = 'orcamento_lembrete' DO UPDATE
+  SET mensagem = EXCLUDED.mensagem,
+      lida = FALSE,
+      created_at = NOW();
+
+  GET DIAGNOSTICS v_criados = ROW_COUNT;
+  RETURN v_criados;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Apenas o service role (cron)
+REVOKE EXECUTE ON FUNCTION notificacoes_gerar_lembretes(INTERVAL, INTERVAL) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,20 @@
+-- =====================================================
+-- ÍNDICES PARA A LISTAGEM PAGINADA DE ORDENS (GET /api/ordens)
+-- Keyset por (created_at DESC, id DESC) dentro da empresa,
+-- com variações para os filtros de status e técnico
+-- =====================================================
+
+-- 1. Listagem geral da empresa (também atende o filtro por período)
+CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_created_id
+ON ordens_servico (empresa_id, created_at DESC, id DESC);
+
+-- 2. Filtro por status
+CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_status_created_id
+ON ordens_servico (empresa_id, status, created_at DESC, id DESC);
+
+-- 3. Filtro por técnico
+CREATE INDEX IF NOT EXISTS idx_ordens_servico_empresa_tecnico_created_id
+ON ordens_servico (empresa_id, tecnico_id, created_at DESC, id DESC);
+
+-- 4. Atualizar estatísticas para o planner escolher os novos índices
+ANALYZE ordens_servico;
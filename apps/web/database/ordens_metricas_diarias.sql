@@ -0,0 +1,179 @@
+-- =====================================================
+-- MÉTRICAS DIÁRIAS DE ORDENS DE SERVIÇO POR EMPRESA
+-- GET /api/ordens/metrics soma algumas dezenas de linhas desta tabela
+-- em vez de o navegador filtrar todas as OS da empresa
+-- =====================================================
+
+-- 1. Tabela de rollup: uma linha por empresa e dia (fuso America/Sao_Paulo)
+CREATE TABLE IF NOT EXISTS ordens_metricas_diarias (
+  empresa_id UUID NOT NULL REFERENCES empresas(id) ON DELETE CASCADE,
+  dia DATE NOT NULL,
+  total INTEGER NOT NULL DEFAULT 0,
+  retornos INTEGER NOT NULL DEFAULT 0,
+  aprovados INTEGER NOT NULL DEFAULT 0,
+  faturamento NUMERIC(14,2) NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (empresa_id, dia)
+);
+
+-- Lida só por /api/ordens/metrics com o service role; sem policies, o cliente não lê o rollup
+ALTER TABLE ordens_metricas_diarias ENABLE ROW LEVEL SECURITY;
+
+-- 2. Dia de entrada de uma OS
+CREATE OR REPLACE FUNCTION ordens_metricas_dia(p_momento TIMESTAMP WITH TIME ZONE)
+RETURNS DATE AS $$
+  SELECT (p_momento AT TIME ZONE 'America/Sao_Paulo')::DATE;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 3. Recalcular um conjunto de (empresa, dia)
+-- Recontar o dia inteiro (em vez de somar deltas) mantém o rollup exato mesmo
+-- quando a OS muda de data, de empresa ou de status várias vezes.
+-- Duas transações que mexem no mesmo dia recontariam cada uma sem ver a outra
+-- (READ COMMITTED) e a última gravaria um total velho: o advisory lock por
+-- (empresa, dia), tomado em ordem para não haver deadlock, serializa a recontagem,
+-- e o INSERT seguinte, por ser outro comando, já enxerga o que a outra commitou.
+-- Usa o índice (empresa_id, created_at DESC, id DESC) de ordens_listagem_indices.sql
+CREATE OR REPLACE FUNCTION ordens_metricas_recalcular(p_empresas UUID[], p_dias DATE[])
+RETURNS VOID
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext(c.empresa_id::TEXT), hashtext('ordens_metricas:' || c.dia::TEXT))
+  FROM (SELECT DISTINCT empresa_id, dia FROM unnest(p_empresas, p_dias) AS u(empresa_id, dia) ORDER BY 1, 2) c;
+
+  INSERT INTO ordens_metricas_diarias (empresa_id, dia, total, retornos, aprovados, faturamento, updated_at)
+  SELECT c.empresa_id, c.dia, a.total, a.retornos, a.aprovados, a.faturamento, NOW()
+  FROM (SELECT DISTINCT empresa_id, dia FROM unnest(p_empresas, p_dias) AS u(empresa_id, dia)) c
+  CROSS JOIN LATERAL (
+    SELECT
+      count(*) AS total,
+      count(*) FILTER (WHERE o.tipo = 'Retorno') AS retornos,
+      count(*) FILTER (WHERE lower(o.status) = 'aprovado' OR lower(o.status_tecnico) = 'aprovado') AS aprovados,
+      COALESCE(sum(o.valor_faturado), 0) AS faturamento
+    FROM ordens_servico o
+    WHERE o.empresa_id = c.empresa_id
+      AND o.created_at >= (c.dia::TIMESTAMP AT TIME ZONE 'America/Sao_Paulo')
+      AND o.created_at < ((c.dia + 1)::TIMESTAMP AT TIME ZONE 'America/Sao_Paulo')
+  ) a
+  ON CONFLICT (empresa_id, dia) DO UPDATE
+  SET total = EXCLUDED.total,
+      retornos = EXCLUDED.retornos,
+      aprovados = EXCLUDED.aprovados,
+      faturamento = EXCLUDED.faturamento,
+      updated_at = EXCLUDED.updated_at;
+
+  -- Dias que ficaram sem OS (exclusão ou mudança de data)
+  DELETE FROM ordens_metricas_diarias m
+  USING unnest(p_empresas, p_dias) AS u(empresa_id, dia)
+  WHERE m.empresa_id = u.empresa_id AND m.dia = u.dia AND m.total = 0;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. Trigger por statement (transition tables): um COPY ou UPDATE em massa
+--    recalcula cada (empresa, dia) afetado uma única vez
+CREATE OR REPLACE FUNCTION ordens_metricas_trigger()
+RETURNS TRIGGER
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  empresas UUID[];
+  dias DATE[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(empresa_id), array_agg(dia) INTO empresas, dias
+    FROM (SELECT DISTINCT empresa_id, ordens_metricas_dia(created_at) AS dia FROM novas WHERE empresa_id IS NOT NULL) s;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT array_agg(empresa_id), array_agg(dia) INTO empresas, dias
+    FROM (SELECT DISTINCT empresa_id, ordens_metricas_dia(created_at) AS dia FROM antigas WHERE empresa_id IS NOT NULL) s;
+  ELSE
+    -- Só as OS em que algum campo das métricas mudou; vale o dia antigo e o novo
+    SELECT array_agg(empresa_id), array_agg(dia) INTO empresas, dias
+    FROM (
+      SELECT n.empresa_id, ordens_metricas_dia(n.created_at) AS dia, a.empresa_id AS empresa_antiga, ordens_metricas_dia(a.created_at) AS dia_antigo
+      FROM novas n
+      JOIN antigas a ON a.id = n.id
+      WHERE (n.empresa_id, n.created_at, n.tipo, n.status, n.status_tecnico, n.valor_faturado)
+            IS DISTINCT FROM (a.empresa_id, a.created_at, a.tipo, a.status, a.status_tecnico, a.valor_faturado)
+    ) alteradas
+    CROSS JOIN LATERAL (VALUES (alteradas.empresa_id, alteradas.dia), (alteradas.empresa_antiga, alteradas.dia_antigo)) AS s(empresa_id, dia)
+    WHERE s.empresa_id IS NOT NULL;
+  END IF;
+
+  IF empresas IS NOT NULL THEN
+    PERFORM ordens_metricas_recalcular(empresas, dias);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables exigem um trigger por evento
+DROP TRIGGER IF EXISTS ordens_metricas_insert ON ordens_servico;
+CREATE TRIGGER ordens_metricas_insert AFTER INSERT ON ordens_servico
+  REFERENCING NEW TABLE AS novas FOR EACH STATEMENT EXECUTE FUNCTION ordens_metricas_trigger();
+DROP TRIGGER IF EXISTS ordens_metricas_update ON ordens_servico;
+CREATE TRIGGER ordens_metricas_update AFTER UPDATE ON ordens_servico
+  REFERENCING OLD TABLE AS antigas NEW TABLE AS novas FOR EACH STATEMENT EXECUTE FUNCTION ordens_metricas_trigger();
+DROP TRIGGER IF EXISTS ordens_metricas_delete ON ordens_servico;
+CREATE TRIGGER ordens_metricas_delete AFTER DELETE ON ordens_servico
+  REFERENCING OLD TABLE AS antigas FOR EACH STATEMENT EXECUTE FUNCTION ordens_metricas_trigger();
+
+-- 5. Reconstruir do zero (carga inicial ou para corrigir divergência)
+CREATE OR REPLACE FUNCTION ordens_metricas_reconstruir()
+RETURNS VOID AS $$
+BEGIN
+  LOCK TABLE ordens_metricas_diarias IN EXCLUSIVE MODE;
+  DELETE FROM ordens_metricas_diarias;
+
+  INSERT INTO ordens_metricas_diarias (empresa_id, dia, total, retornos, aprovados, faturamento)
+  SELECT
+    empresa_id,
+    ordens_metricas_dia(created_at),
+    count(*),
+    count(*) FILTER (WHERE tipo = 'Retorno'),
+    count(*) FILTER (WHERE lower(status) = 'aprovado' OR lower(status_tecnico) = 'aprovado'),
+    COALESCE(sum(valor_faturado), 0)
+  FROM ordens_servico
+  WHERE empresa_id IS NOT NULL
+  GROUP BY 1, 2;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 6. Números do dashboard a partir do rollup
+-- Contagens brutas; percentuais e ticket médio são derivados na API
+CREATE OR REPLACE FUNCTION ordens_metricas_dashboard(p_empresa_id UUID, p_hoje DATE DEFAULT NULL)
+RETURNS JSONB AS $$
+DECLARE
+  hoje DATE := COALESCE(p_hoje, ordens_metricas_dia(NOW()));
+  inicio_semana DATE := hoje - EXTRACT(DOW FROM hoje)::INT;
+  inicio_mes DATE := date_trunc('month', hoje)::DATE;
+  inicio_mes_anterior DATE := (date_trunc('month', hoje) - INTERVAL '1 month')::DATE;
+  resultado JSONB;
+BEGIN
+  SELECT jsonb_build_object(
+    'hoje', hoje,
+    'totalOS', COALESCE(sum(total), 0),
+    'osHoje', COALESCE(sum(total) FILTER (WHERE dia = hoje), 0),
+    'faturamentoHoje', COALESCE(sum(faturamento) FILTER (WHERE dia = hoje), 0),
+    'retornosHoje', COALESCE(sum(retornos) FILTER (WHERE dia = hoje), 0),
+    'aprovadosHoje', COALESCE(sum(aprovados) FILTER (WHERE dia = hoje), 0),
+    'totalMes', COALESCE(sum(total) FILTER (WHERE dia >= inicio_mes AND dia <= hoje), 0),
+    'retornosMes', COALESCE(sum(retornos) FILTER (WHERE dia >= inicio_mes AND dia <= hoje), 0),
+    'ordensSemana', COALESCE(sum(total) FILTER (WHERE dia >= inicio_semana AND dia <= hoje), 0),
+    'ordensSemanaAnterior', COALESCE(sum(total) FILTER (WHERE dia >= inicio_semana - 7 AND dia < inicio_semana), 0),
+    'ordensMesAnterior', COALESCE(sum(total) FILTER (WHERE dia >= inicio_mes_anterior AND dia < inicio_mes), 0)
+  ) INTO resultado
+  FROM ordens_metricas_diarias
+  WHERE empresa_id = p_empresa_id;
+
+  RETURN resultado;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+REVOKE EXECUTE ON FUNCTION ordens_metricas_recalcular(UUID[], DATE[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION ordens_metricas_reconstruir() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION ordens_metricas_dashboard(UUID, DATE) FROM PUBLIC, anon, authenticated;
+
+-- 7. Carga inicial
+SELECT ordens_metricas_reconstruir();
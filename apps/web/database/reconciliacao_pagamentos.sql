@@ -0,0 +1,82 @@
+-- =====================================================
+-- RECONCILIAÇÃO DE PAGAMENTOS PENDENTES EM LOTES
+-- /api/pagamentos/reconciliar percorre os pagamentos 'pending' por keyset
+-- (created_at, id), grava um checkpoint a cada lote e aplica os novos
+-- status com um único UPDATE por lote (src/lib/reconciliacaoPagamentos.ts)
+-- =====================================================
+
+-- 1. Índice para percorrer os pendentes em ordem
+CREATE INDEX IF NOT EXISTS idx_pagamentos_pendentes_created_id
+ON pagamentos (created_at, id) WHERE status = 'pending';
+
+-- 2. Execuções e checkpoint
+-- Uma execução interrompida (timeout da requisição, deploy) continua do
+-- último lote gravado na próxima chamada
+CREATE TABLE IF NOT EXISTS reconciliacao_execucoes (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  dias INTEGER NOT NULL,
+  status TEXT NOT NULL DEFAULT 'executando' CHECK (status IN ('executando', 'concluida')),
+  limite_data TIMESTAMP WITH TIME ZONE NOT NULL,
+  cursor_created_at TIMESTAMP WITH TIME ZONE,
+  cursor_id UUID,
+  total_analisados INTEGER NOT NULL DEFAULT 0,
+  atualizados INTEGER NOT NULL DEFAULT 0,
+  erros INTEGER NOT NULL DEFAULT 0,
+  em_uso_ate TIMESTAMP WITH TIME ZONE,
+  iniciado_em TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  atualizado_em TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  concluido_em TIMESTAMP WITH TIME ZONE
+);
+
+-- No máximo uma execução em andamento
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reconciliacao_execucoes_em_andamento
+ON reconciliacao_execucoes ((TRUE)) WHERE status = 'executando';
+
+-- Checkpoint interno da rota de reconciliação (service role); nenhuma policy para o cliente
+ALTER TABLE reconciliacao_execucoes ENABLE ROW LEVEL SECURITY;
+
+-- 3. Reservar a execução em andamento (ou iniciar uma nova)
+-- em_uso_ate funciona como lease: renovado a cada lote, liberado ao parar pelo tempo.
+-- Retorna vazio se outra chamada está processando agora.
+CREATE OR REPLACE FUNCTION reconciliacao_reservar(p_dias INTEGER)
+RETURNS SETOF reconciliacao_execucoes AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE reconciliacao_execucoes
+  SET em_uso_ate = NOW() + INTERVAL '2 minutes', atualizado_em = NOW()
+  WHERE status = 'executando' AND (em_uso_ate IS NULL OR em_uso_ate < NOW())
+  RETURNING *;
+  IF FOUND OR EXISTS (SELECT 1 FROM reconciliacao_execucoes WHERE status = 'executando') THEN
+    RETURN;
+  END IF;
+
+  RETURN QUERY
+  INSERT INTO reconciliacao_execucoes (dias, limite_data, em_uso_ate)
+  VALUES (p_dias, NOW() - make_interval(days => p_dias), NOW() + INTERVAL '2 minutes')
+  ON CONFLICT DO NOTHING
+  RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. Aplicar os status de um lote em um único UPDATE
+-- p_atualizacoes: [{ "id": uuid, "status": text, "status_detail": text }]
+-- Só altera quem ainda está 'pending' (o webhook pode ter chegado antes) e devolve
+-- as linhas alteradas, para a rota publicar no SSE só o que de fato mudou
+-- (o retorno mudou de INTEGER para linhas: CREATE OR REPLACE não troca o tipo)
+DROP FUNCTION IF EXISTS pagamentos_aplicar_status(JSONB);
+CREATE OR REPLACE FUNCTION pagamentos_aplicar_status(p_atualizacoes JSONB)
+RETURNS TABLE (id UUID, status TEXT, paid_at TIMESTAMP WITH TIME ZONE) AS $$
+  UPDATE pagamentos p
+  SET status = a.status,
+      status_detail = COALESCE(a.status_detail, p.status_detail),
+      paid_at = CASE WHEN a.status = 'approved' THEN NOW() ELSE p.paid_at END,
+      updated_at = NOW()
+  FROM jsonb_to_recordset(p_atualizacoes) AS a(id UUID, status TEXT, status_detail TEXT)
+  WHERE p.id = a.id
+    AND p.status = 'pending'
+    AND a.status IS DISTINCT FROM p.status
+  RETURNING p.id, p.status, p.paid_at;
+$$ LANGUAGE sql;
+
+REVOKE EXECUTE ON FUNCTION reconciliacao_reservar(INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION pagamentos_aplicar_status(JSONB) FROM PUBLIC, anon, authenticated;
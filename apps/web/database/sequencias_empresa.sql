@@ -0,0 +1,197 @@
+-- =====================================================
+-- NUMERAÇÃO POR EMPRESA (numero_cliente, codigo de produto, numero_os)
+-- Um contador por (empresa, tipo) incrementado atomicamente no INSERT, no
+-- lugar de "maior número + 1" calculado pela aplicação (O(n) e com números
+-- repetidos quando dois cadastros acontecem ao mesmo tempo)
+-- =====================================================
+
+-- 1. Contadores
+CREATE TABLE IF NOT EXISTS empresa_sequencias (
+  empresa_id UUID NOT NULL REFERENCES empresas(id) ON DELETE CASCADE,
+  tipo TEXT NOT NULL CHECK (tipo IN ('cliente', 'produto', 'os')),
+  ultimo BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (empresa_id, tipo)
+);
+
+ALTER TABLE empresa_sequencias ENABLE ROW LEVEL SECURITY;
+
+-- 2. Maior número já usado (só na primeira alocação de cada empresa/tipo)
+-- Valores não numéricos (códigos digitados à mão) são ignorados
+CREATE OR REPLACE FUNCTION empresa_sequencia_maximo(p_empresa_id UUID, p_tipo TEXT)
+RETURNS BIGINT AS $$
+DECLARE
+  v_maximo BIGINT;
+BEGIN
+  IF p_tipo = 'cliente' THEN
+    SELECT max(numero_cliente::TEXT::BIGINT) INTO v_maximo FROM clientes
+    WHERE empresa_id = p_empresa_id AND numero_cliente::TEXT ~ '^[0-9]{1,18}$';
+  ELSIF p_tipo = 'produto' THEN
+    SELECT max(codigo::TEXT::BIGINT) INTO v_maximo FROM produtos_servicos
+    WHERE empresa_id = p_empresa_id AND codigo::TEXT ~ '^[0-9]{1,18}$';
+  ELSE
+    SELECT max(numero_os::TEXT::BIGINT) INTO v_maximo FROM ordens_servico
+    WHERE empresa_id = p_empresa_id AND numero_os::TEXT ~ '^[0-9]{1,18}$';
+  END IF;
+  RETURN COALESCE(v_maximo, 0);
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER SET search_path = public;
+
+-- 3. Próximo número: UPDATE ... RETURNING trava só a linha do contador, então
+-- cadastros simultâneos da mesma empresa recebem números distintos em O(1)
+CREATE OR REPLACE FUNCTION empresa_proximo_numero(p_empresa_id UUID, p_tipo TEXT)
+RETURNS BIGINT AS $$
+DECLARE
+  v_numero BIGINT;
+BEGIN
+  UPDATE empresa_sequencias SET ultimo = ultimo + 1
+  WHERE empresa_id = p_empresa_id AND tipo = p_tipo
+  RETURNING ultimo INTO v_numero;
+
+  IF v_numero IS NULL THEN
+    -- Primeira alocação: parte do maior número existente. Se outro cadastro
+    -- criar o contador antes, o ON CONFLICT incrementa o dele.
+    INSERT INTO empresa_sequencias (empresa_id, tipo, ultimo)
+    VALUES (p_empresa_id, p_tipo, empresa_sequencia_maximo(p_empresa_id, p_tipo) + 1)
+    ON CONFLICT (empresa_id, tipo) DO UPDATE SET ultimo = empresa_sequencias.ultimo + 1
+    RETURNING ultimo INTO v_numero;
+  END IF;
+
+  RETURN v_numero;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- 4. Número informado no INSERT (importação, código digitado à mão): o contador
+-- passa a ser pelo menos esse número, para a próxima numeração automática não
+-- gerar um valor já usado. Valores não numéricos não mexem no contador.
+CREATE OR REPLACE FUNCTION empresa_sequencia_avancar(p_empresa_id UUID, p_tipo TEXT, p_valor TEXT)
+RETURNS VOID AS $$
+DECLARE
+  v_valor BIGINT;
+BEGIN
+  IF trim(p_valor) !~ '^[0-9]{1,18}$' THEN
+    RETURN;
+  END IF;
+  v_valor := trim(p_valor)::BIGINT;
+
+  UPDATE empresa_sequencias SET ultimo = GREATEST(ultimo, v_valor)
+  WHERE empresa_id = p_empresa_id AND tipo = p_tipo;
+
+  IF NOT FOUND THEN
+    INSERT INTO empresa_sequencias (empresa_id, tipo, ultimo)
+    VALUES (p_empresa_id, p_tipo, GREATEST(v_valor, empresa_sequencia_maximo(p_empresa_id, p_tipo)))
+    ON CONFLICT (empresa_id, tipo) DO UPDATE SET ultimo = GREATEST(empresa_sequencias.ultimo, EXCLUDED.ultimo);
+  END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION empresa_sequencia_maximo(UUID, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION empresa_proximo_numero(UUID, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION empresa_sequencia_avancar(UUID, TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+
+-- 5. Triggers: preenchem o número quando o INSERT não traz um
+-- (as rotas e telas de cadastro deixam de enviar numero_cliente/codigo)
+-- e avançam o contador quando traz
+CREATE OR REPLACE FUNCTION clientes_numerar()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.empresa_id IS NOT NULL AND NULLIF(trim(NEW.numero_cliente::TEXT), '') IS NULL THEN
+    NEW.numero_cliente := empresa_proximo_numero(NEW.empresa_id, 'cliente');
+  ELSIF NEW.empresa_id IS NOT NULL THEN
+    PERFORM empresa_sequencia_avancar(NEW.empresa_id, 'cliente', NEW.numero_cliente::TEXT);
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION produtos_servicos_numerar()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.empresa_id IS NOT NULL AND NULLIF(trim(NEW.codigo::TEXT), '') IS NULL THEN
+    NEW.codigo := empresa_proximo_numero(NEW.empresa_id, 'produto')::TEXT;
+  ELSIF NEW.empresa_id IS NOT NULL THEN
+    PERFORM empresa_sequencia_avancar(NEW.empresa_id, 'produto', NEW.codigo::TEXT);
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION ordens_servico_numerar()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.empresa_id IS NOT NULL AND NULLIF(trim(NEW.numero_os::TEXT), '') IS NULL THEN
+    NEW.numero_os := empresa_proximo_numero(NEW.empresa_id, 'os');
+  ELSIF NEW.empresa_id IS NOT NULL THEN
+    PERFORM empresa_sequencia_avancar(NEW.empresa_id, 'os', NEW.numero_os::TEXT);
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trg_clientes_numerar ON clientes;
+CREATE TRIGGER trg_clientes_numerar
+  BEFORE INSERT ON clientes
+  FOR EACH ROW EXECUTE FUNCTION clientes_numerar();
+
+DROP TRIGGER IF EXISTS trg_produtos_servicos_numerar ON produtos_servicos;
+CREATE TRIGGER trg_produtos_servicos_numerar
+  BEFORE INSERT ON produtos_servicos
+  FOR EACH ROW EXECUTE FUNCTION produtos_servicos_numerar();
+
+DROP TRIGGER IF EXISTS trg_ordens_servico_numerar ON ordens_servico;
+CREATE TRIGGER trg_ordens_servico_numerar
+  BEFORE INSERT ON ordens_servico
+  FOR EACH ROW EXECUTE FUNCTION ordens_servico_numerar();
+
+-- 6. Contadores das empresas existentes a partir dos números já usados
+INSERT INTO empresa_sequencias (empresa_id, tipo, ultimo)
+SELECT empresa_id, 'cliente', max(numero_cliente::TEXT::BIGINT)
+FROM clientes
+WHERE empresa_id IS NOT NULL AND numero_cliente::TEXT ~ '^[0-9]{1,18}$'
+GROUP BY empresa_id
+ON CONFLICT (empresa_id, tipo) DO UPDATE SET ultimo = GREATEST(empresa_sequencias.ultimo, EXCLUDED.ultimo);
+
+INSERT INTO empresa_sequencias (empresa_id, tipo, ultimo)
+SELECT empresa_id, 'produto', max(codigo::TEXT::BIGINT)
+FROM produtos_servicos
+WHERE empresa_id IS NOT NULL AND codigo::TEXT ~ '^[0-9]{1,18}$'
+GROUP BY empresa_id
+ON CONFLICT (empresa_id, tipo) DO UPDATE SET ultimo = GREATEST(empresa_sequencias.ultimo, EXCLUDED.ultimo);
+
+INSERT INTO empresa_sequencias (empresa_id, tipo, ultimo)
+SELECT empresa_id, 'os', max(numero_os::TEXT::BIGINT)
+FROM ordens_servico
+WHERE empresa_id IS NOT NULL AND numero_os::TEXT ~ '^[0-9]{1,18}$'
+GROUP BY empresa_id
+ON CONFLICT (empresa_id, tipo) DO UPDATE SET ultimo = GREATEST(empresa_sequencias.ultimo, EXCLUDED.ultimo);
+
+-- 7. Unicidade por empresa, quando os dados atuais permitem
+-- (números repetidos por cadastros simultâneos antigos precisam ser corrigidos antes)
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM clientes WHERE numero_cliente IS NOT NULL
+    GROUP BY empresa_id, numero_cliente HAVING count(*) > 1
+  ) THEN
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_clientes_empresa_numero ON clientes (empresa_id, numero_cliente);
+  ELSE
+    RAISE NOTICE 'clientes tem numero_cliente repetido na mesma empresa: índice único não criado';
+  END IF;
+
+  IF NOT EXISTS (
+    SELECT 1 FROM produtos_servicos WHERE codigo IS NOT NULL
+    GROUP BY empresa_id, codigo HAVING count(*) > 1
+  ) THEN
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_produtos_servicos_empresa_codigo ON produtos_servicos (empresa_id, codigo);
+  ELSE
+    RAISE NOTICE 'produtos_servicos tem codigo repetido na mesma empresa: índice único não criado';
+  END IF;
+
+  IF NOT EXISTS (
+    SELECT 1 FROM ordens_servico WHERE numero_os IS NOT NULL
+    GROUP BY empresa_id, numero_os HAVING count(*) > 1
+  ) THEN
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_ordens_servico_empresa_numero ON ordens_servico (empresa_id, numero_os);
+  ELSE
+    RAISE NOTICE 'ordens_servico tem numero_os repetido na mesma empresa: índice único não criado';
+  END IF;
+END $$;
@@ -0,0 +1,117 @@
+-- =====================================================
+-- CAIXA DE ENTRADA DE WEBHOOKS DO MERCADO PAGO
+-- /api/pagamentos/webhook e /api/assinaturas/webhook só registram a
+-- notificação e respondem; o processamento (consulta ao MP, pagamentos,
+-- assinaturas) roda em lotes em src/lib/webhookInbox.ts
+-- =====================================================
+
+-- 1. Tabela
+-- status: pendente -> processando -> processado | erro | substituido
+CREATE TABLE IF NOT EXISTS webhook_inbox (
+  id BIGSERIAL PRIMARY KEY,
+  origem TEXT NOT NULL CHECK (origem IN ('pagamentos', 'assinaturas')),
+  payment_id TEXT NOT NULL,
+  payload JSONB,
+  status TEXT NOT NULL DEFAULT 'pendente',
+  recebimentos INTEGER NOT NULL DEFAULT 1,
+  tentativas INTEGER NOT NULL DEFAULT 0,
+  erro TEXT,
+  processar_apos TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  reservado_em TIMESTAMP WITH TIME ZONE,
+  processado_em TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- 2. Índices
+-- No máximo uma notificação pendente por pagamento: reenvios do MP viram recebimentos + 1
+CREATE UNIQUE INDEX IF NOT EXISTS idx_webhook_inbox_pendente_unico
+ON webhook_inbox (origem, payment_id) WHERE status = 'pendente';
+
+-- Fila: só as linhas ainda não concluídas
+CREATE INDEX IF NOT EXISTS idx_webhook_inbox_fila
+ON webhook_inbox (id) WHERE status IN ('pendente', 'processando');
+
+-- Guarda payloads do Mercado Pago: só as rotas de webhook e o worker (service role) tocam na fila
+ALTER TABLE webhook_inbox ENABLE ROW LEVEL SECURITY;
+
+-- 3. Registrar uma notificação (chamado pelas rotas de webhook)
+CREATE OR REPLACE FUNCTION webhook_inbox_registrar(p_origem TEXT, p_payment_id TEXT, p_payload JSONB)
+RETURNS BIGINT AS $$
+  INSERT INTO webhook_inbox (origem, payment_id, payload)
+  VALUES (p_origem, p_payment_id, p_payload)
+  ON CONFLICT (origem, payment_id) WHERE status = 'pendente'
+  DO UPDATE SET payload = EXCLUDED.payload,
+                recebimentos = webhook_inbox.recebimentos + 1,
+                updated_at = NOW()
+  RETURNING id;
+$$ LANGUAGE sql;
+
+-- 4. Reservar um lote para processamento
+-- SKIP LOCKED: várias instâncias do worker não pegam a mesma linha.
+-- Linhas presas em 'processando' há mais de 5 minutos (worker morreu) voltam para a fila.
+CREATE OR REPLACE FUNCTION webhook_inbox_reservar(p_limite INTEGER DEFAULT 50)
+RETURNS SETOF webhook_inbox AS $$
+  UPDATE webhook_inbox w
+  SET status = 'processando',
+      tentativas = w.tentativas + 1,
+      reservado_em = NOW(),
+      updated_at = NOW()
+  WHERE w.id IN (
+    SELECT id FROM webhook_inbox
+    WHERE (status = 'pendente' AND processar_apos <= NOW())
+       OR (status = 'processando' AND reservado_em < NOW() - INTERVAL '5 minutes')
+    ORDER BY id
+    LIMIT p_limite
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING w.*;
+$$ LANGUAGE sql;
+
+-- 5. Concluir uma notificação
+-- Em caso de erro volta para a fila com backoff exponencial (2^tentativas s),
+-- até 8 tentativas ou quando o erro não é recuperável
+CREATE OR REPLACE FUNCTION webhook_inbox_concluir(p_id BIGINT, p_erro TEXT DEFAULT NULL, p_tentar_novamente BOOLEAN DEFAULT TRUE)
+RETURNS VOID AS $$
+BEGIN
+  IF p_erro IS NULL THEN
+    UPDATE webhook_inbox
+    SET status = 'processado', erro = NULL, processado_em = NOW(), updated_at = NOW()
+    WHERE id = p_id;
+    RETURN;
+  END IF;
+
+  BEGIN
+    UPDATE webhook_inbox
+    SET status = CASE WHEN p_tentar_novamente AND tentativas < 8 THEN 'pendente' ELSE 'erro' END,
+        erro = p_erro,
+        processar_apos = NOW() + make_interval(secs => power(2, tentativas)),
+        updated_at = NOW()
+    WHERE id = p_id;
+  EXCEPTION WHEN unique_violation THEN
+    -- Já chegou uma notificação mais nova do mesmo pagamento; ela será processada no lugar desta
+    UPDATE webhook_inbox
+    SET status = 'substituido', erro = p_erro, updated_at = NOW()
+    WHERE id = p_id;
+  END;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 6. Limpeza das notificações concluídas
+CREATE OR REPLACE FUNCTION webhook_inbox_limpar(p_dias INTEGER DEFAULT 30)
+RETURNS INTEGER AS $$
+DECLARE
+  removidas INTEGER;
+BEGIN
+  DELETE FROM webhook_inbox
+  WHERE status IN ('processado', 'substituido')
+    AND updated_at < NOW() - make_interval(days => p_dias);
+  GET DIAGNOSTICS removidas = ROW_COUNT;
+  RETURN removidas;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION webhook_inbox_registrar(TEXT, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION webhook_inbox_reservar(INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION webhook_inbox_concluir(BIGINT, TEXT, BOOLEAN) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION webhook_inbox_limpar(INTEGER) FROM PUBLIC, anon, authenticated;
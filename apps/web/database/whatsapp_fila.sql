@@ -0,0 +1,82 @@
+-- =====================================================
+-- FILA DE SAÍDA DO WHATSAPP
+-- /api/whatsapp/send e /api/whatsapp/enviar gravam a mensagem em
+-- whatsapp_mensagens com status 'pendente' e respondem; o envio roda
+-- em src/lib/whatsappFila.ts, por empresa, com limite de mensagens por minuto
+-- =====================================================
+
+-- 1. Colunas da fila
+-- status: pendente -> enviando -> enviado | erro
+ALTER TABLE whatsapp_mensagens ADD COLUMN IF NOT EXISTS tentativas INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE whatsapp_mensagens ADD COLUMN IF NOT EXISTS erro TEXT;
+ALTER TABLE whatsapp_mensagens ADD COLUMN IF NOT EXISTS processar_apos TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW();
+ALTER TABLE whatsapp_mensagens ADD COLUMN IF NOT EXISTS enviado_em TIMESTAMP WITH TIME ZONE;
+ALTER TABLE whatsapp_mensagens ADD COLUMN IF NOT EXISTS reservado_em TIMESTAMP WITH TIME ZONE;
+
+ALTER TABLE whatsapp_mensagens DROP CONSTRAINT IF EXISTS whatsapp_mensagens_status_check;
+ALTER TABLE whatsapp_mensagens ADD CONSTRAINT whatsapp_mensagens_status_check
+  CHECK (status IN ('pendente', 'enviando', 'enviado', 'entregue', 'lido', 'erro'));
+
+-- Mensagens avulsas (/api/whatsapp/enviar com número) não têm técnico
+ALTER TABLE whatsapp_mensagens ALTER COLUMN tecnico_id DROP NOT NULL;
+
+-- 2. Índice da fila: só as não concluídas, na ordem de envio
+DROP INDEX IF EXISTS idx_whatsapp_mensagens_fila;
+CREATE INDEX IF NOT EXISTS idx_whatsapp_mensagens_fila_abertas
+ON whatsapp_mensagens (empresa_id, processar_apos, created_at) WHERE status IN ('pendente', 'enviando');
+
+-- 3. Reservar um lote da empresa para envio
+-- SKIP LOCKED + 'enviando': duas instâncias (ou um restart no meio do lote) não
+-- mandam a mesma mensagem duas vezes. Linhas presas em 'enviando' há mais de
+-- 5 minutos (processo morreu) voltam a ser reservadas.
+CREATE OR REPLACE FUNCTION whatsapp_fila_reservar(p_empresa_id UUID, p_limite INTEGER DEFAULT 20)
+RETURNS TABLE (id UUID, numero_destino TEXT, mensagem TEXT) AS $$
+  WITH reservadas AS (
+    UPDATE whatsapp_mensagens m
+    SET status = 'enviando', reservado_em = NOW()
+    WHERE m.id IN (
+      SELECT f.id FROM whatsapp_mensagens f
+      WHERE f.empresa_id = p_empresa_id
+        AND ((f.status = 'pendente' AND f.processar_apos <= NOW())
+          OR (f.status = 'enviando' AND f.reservado_em < NOW() - INTERVAL '5 minutes'))
+      ORDER BY f.created_at
+      LIMIT p_limite
+      FOR UPDATE SKIP LOCKED
+    )
+    RETURNING m.id, m.numero_destino, m.mensagem, m.created_at
+  )
+  SELECT r.id, r.numero_destino, r.mensagem FROM reservadas r ORDER BY r.created_at;
+$$ LANGUAGE sql;
+
+-- 4. Quando a fila da empresa volta a ter algo para enviar: a próxima pendente
+-- em espera (backoff de falha) ou a reserva abandonada mais antiga. NULL = vazia.
+CREATE OR REPLACE FUNCTION whatsapp_fila_proxima(p_empresa_id UUID)
+RETURNS TIMESTAMP WITH TIME ZONE AS $$
+  SELECT min(CASE WHEN status = 'pendente' THEN processar_apos ELSE reservado_em + INTERVAL '5 minutes' END)
+  FROM whatsapp_mensagens
+  WHERE empresa_id = p_empresa_id AND status IN ('pendente', 'enviando');
+$$ LANGUAGE sql STABLE;
+
+-- 5. Gravar o resultado de um lote em uma chamada
+-- p_enviados: ids enviados; p_falhas: [{ "id": uuid, "erro": text }]
+-- Falhas voltam para a fila com espera crescente até p_max_tentativas
+CREATE OR REPLACE FUNCTION whatsapp_fila_concluir(p_enviados UUID[], p_falhas JSONB DEFAULT '[]'::jsonb, p_max_tentativas INTEGER DEFAULT 3)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE whatsapp_mensagens
+  SET status = 'enviado', erro = NULL, enviado_em = NOW()
+  WHERE id = ANY(p_enviados);
+
+  UPDATE whatsapp_mensagens m
+  SET tentativas = m.tentativas + 1,
+      status = CASE WHEN m.tentativas + 1 >= p_max_tentativas THEN 'erro' ELSE 'pendente' END,
+      erro = f.erro,
+      processar_apos = NOW() + make_interval(secs => 30 * (m.tentativas + 1))
+  FROM jsonb_to_recordset(COALESCE(p_falhas, '[]'::jsonb)) AS f(id UUID, erro TEXT)
+  WHERE m.id = f.id;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION whatsapp_fila_reservar(UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION whatsapp_fila_proxima(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION whatsapp_fila_concluir(UUID[], JSONB, INTEGER) FROM PUBLIC, anon, authenticated;
@@ -151,7 +151,7 @@ const nextConfig: NextConfig = {
   },
   
   // Configurações externas para servidor
-  serverExternalPackages: ['nodemailer'],
+  serverExternalPackages: ['nodemailer', 'whatsapp-web.js'],
 };
 
 export default nextConfig;
\ No newline at end of file
@@ -53,87 +53,27 @@ export async function GET(req: NextRequest) {
 
     const empresaIds = (empresas || []).map((e: any) => e.id);
 
-    // Contadores básicos por empresa (chamadas simples por empresa para manter compatibilidade)
-    async function countBy(table: string, empresaId: string) {
-      const { count } = await supabase.from(table).select('id', { count: 'exact', head: true }).eq('empresa_id', empresaId);
-      return count || 0;
-    }
-    async function countProdutos(empresaId: string) {
-      const { count } = await supabase
-        .from('produtos_servicos')
-        .select('id', { count: 'exact', head: true })
-        .eq('empresa_id', empresaId)
-        .eq('tipo', 'produto');
-      return count || 0;
-    }
-    async function countServicos(empresaId: string) {
-      const { count } = await supabase
-        .from('produtos_servicos')
-        .select('id', { count: 'exact', head: true })
-        .eq('empresa_id', empresaId)
-        .eq('tipo', 'servico');
-      return count || 0;
-    }
-
-    async function storageUsoMb(empresaId: string): Promise<number> {
-      // Somente bucket 'produtos' com prefixo produtos/{empresa_id}/
-      // Nota: ordens-imagens não possui empresa_id no path; será adicionado depois
-      const { data, error } = await supabase
-        .from('storage.objects')
-        .select('name,size')
-        .eq('bucket_id', 'produtos')
-        .like('name', `produtos/${empresaId}/%`);
-      if (error || !data) return 0;
-      const totalBytes = data.reduce((acc: number, obj: any) => acc + (Number(obj.size) || 0), 0);
-      return Math.round((totalBytes / (1024 * 1024)) * 100) / 100; // MB com 2 casas
-    }
-
-    const enriched = await Promise.all((empresas || []).map(async (e: any) => {
-      const [usuarios, produtos, servicos, ordens, usoMb] = await Promise.all([
-        countBy('usuarios', e.id),
-        countProdutos(e.id),
-        countServicos(e.id),
-        countBy('ordens_servico', e.id),
-        storageUsoMb(e.id),
-      ]);
-
-      // Assinatura e cobrança
-      let assinatura: any = null;
-      try {
-        const { data } = await supabase
-          .from('assinaturas')
-          .select('id,status,proxima_cobranca,plano_id,created_at')
-          .eq('empresa_id', e.id)
-          .order('created_at', { ascending: false })
-          .limit(1)
-          .single();
-        assinatura = data || null;
-      } catch {}
-
-      let planoNome = 'Acesso Completo';
-      if (assinatura?.plano_id) {
-        try {
-          const { data: plano } = await supabase
-            .from('planos')
-            .select('nome')
-            .eq('id', assinatura.plano_id)
-            .limit(1)
-            .single();
-          if (plano?.nome) planoNome = plano.nome;
-        } catch {}
+    // Contadores, assinatura e último pagamento da página inteira em uma consulta
+    // (ver database/admin_saas_metricas_empresas.sql; contadores de database/empresa_uso.sql)
+    const metricasPorEmpresa = new Map<string, any>();
+    if (empresaIds.length > 0) {
+      const { data: metricas, error: metricasError } = await supabase
+        .rpc('admin_saas_metricas_empresas', { p_empresa_ids: empresaIds });
+      if (metricasError) {
+        return NextResponse.json({ ok: false, error: metricasError }, { status: 500 });
+      }
+      for (const linha of (metricas || []) as any[]) {
+        metricasPorEmpresa.set(linha.empresa_id, linha);
       }
+    }
 
-      let ultimoPagamento: any = null;
-      try {
-        const { data } = await supabase
-          .from('pagamentos')
-          .select('status,paid_at,created_at,valor')
-          .eq('empresa_id', e.id)
-          .order('created_at', { ascending: false })
-          .limit(1)
-          .single();
-        ultimoPagamento = data || null;
-      } catch {}
+    const enriched = (empresas || []).map((e: any) => {
+      const linha = metricasPorEmpresa.get(e.id) || {};
+      const m = linha.metricas || {};
+      const usoMb = Math.round(((Number(m.uso_bytes) || 0) / (1024 * 1024)) * 100) / 100; // MB com 2 casas
+      const assinatura: any = linha.assinatura || null;
+      const ultimoPagamento: any = linha.ultimo_pagamento || null;
+      const planoNome = assinatura?.plano_nome || 'Acesso Completo';
 
       // Cálculo de vencimento
       let vencido = false;
@@ -165,8 +105,18 @@ export async function GET(req: NextRequest) {
         ultimoPagamentoValor: ultimoPagamento?.valor || null,
       };
 
-      return { ...e, metrics: { usuarios, produtos, servicos, ordens, usoMb }, billing };
-    }));
+      const metrics = {
+        usuarios: Number(m.usuarios) || 0,
+        produtos: Number(m.produtos) || 0,
+        servicos: Number(m.servicos) || 0,
+        clientes: Number(m.clientes) || 0,
+        ordens: Number(m.ordens) || 0,
+        fornecedores: Number(m.fornecedores) || 0,
+        usoMb,
+      };
+
+      return { ...e, metrics, billing };
+    });
 
     return NextResponse.json({ ok: true, items: enriched, page, pageSize, total: count || 0 });
   } catch (err: any) {
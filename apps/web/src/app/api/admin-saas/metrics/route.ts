@@ -27,47 +27,42 @@ export async function GET(req: NextRequest) {
 
     const supabase = getSupabaseAdmin();
 
-    const [empresasCount, usuariosCount, assinaturasCount, pagamentosCount] = await Promise.all([
-      supabase.from('empresas').select('id', { count: 'exact', head: true }),
-      supabase.from('usuarios').select('id', { count: 'exact', head: true }),
-      supabase.from('assinaturas').select('id,status', { count: 'exact', head: true }),
-      supabase.from('pagamentos').select('id,status', { count: 'exact', head: true }),
-    ]);
+    // Contadores mantidos por trigger (ver database/metricas_plataforma.sql):
+    // custo constante, independente do histórico de assinaturas e pagamentos
+    const { data: resumo, error } = await supabase.rpc('metricas_plataforma_resumo');
+    if (error) {
+      return NextResponse.json({ ok: false, error }, { status: 500 });
+    }
 
-    const assinaturasPorStatus = await supabase
-      .from('assinaturas')
-      .select('status', { count: 'exact' })
-      .then(r => {
-        if (r.error || !r.data) return {} as Record<string, number>;
-        const map: Record<string, number> = {};
-        for (const row of r.data as any[]) {
-          const s = String(row.status || 'desconhecido');
-          map[s] = (map[s] || 0) + 1;
+    const contadores = (resumo || {}) as Record<string, { quantidade: number; valor: number }>;
+    const quantidade = (chave: string) => Number(contadores[chave]?.quantidade) || 0;
+    const porStatus = (prefixo: string) => {
+      const map: Record<string, number> = {};
+      for (const [chave, c] of Object.entries(contadores)) {
+        if (chave.startsWith(`${prefixo}:status:`) && Number(c.quantidade) !== 0) {
+          map[chave.slice(prefixo.length + ':status:'.length)] = Number(c.quantidade);
         }
-        return map;
-      });
+      }
+      return map;
+    };
 
-    const pagamentosPorStatus = await supabase
-      .from('pagamentos')
-      .select('status', { count: 'exact' })
-      .then(r => {
-        if (r.error || !r.data) return {} as Record<string, number>;
-        const map: Record<string, number> = {};
-        for (const row of r.data as any[]) {
-          const s = String(row.status || 'desconhecido');
-          map[s] = (map[s] || 0) + 1;
-        }
-        return map;
-      });
+    const assinaturasPorStatus = porStatus('assinaturas');
+    const pagamentosPorStatus = porStatus('pagamentos');
+    const receita = Number(contadores['pagamentos:receita']?.valor) || 0;
 
     return NextResponse.json({
       ok: true,
-      empresas: empresasCount.count || 0,
-      usuarios: usuariosCount.count || 0,
-      assinaturas: assinaturasCount.count || 0,
-      pagamentos: pagamentosCount.count || 0,
+      empresas: quantidade('empresas'),
+      usuarios: quantidade('usuarios'),
+      assinaturas: quantidade('assinaturas'),
+      pagamentos: quantidade('pagamentos'),
       assinaturasPorStatus,
       pagamentosPorStatus,
+      totalCompanies: quantidade('empresas'),
+      totalSubscriptions: quantidade('assinaturas'),
+      activeSubscriptions: (assinaturasPorStatus['active'] || 0) + (assinaturasPorStatus['ativa'] || 0),
+      subscriptionRevenue: Math.round(receita * 100) / 100,
+      systemUptimeSeconds: Math.round(process.uptime()),
     });
   } catch (err: any) {
     return NextResponse.json({ ok: false, error: err?.message || 'Erro inesperado' }, { status: 500 });
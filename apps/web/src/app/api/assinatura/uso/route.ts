@@ -0,0 +1,59 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { createRequestSupabaseClient, getUsuarioEmpresa } from '@/lib/supabase/server';
+
+// Cache curto por empresa: a tela de limites é aberta a cada navegação, mas os
+// contadores só mudam com cadastros. ?atualizar=1 ignora o cache (após criar algo).
+const USO_CACHE_TTL_MS = Number(process.env.USO_CACHE_TTL_MS) || 30_000;
+const usoPorEmpresa = new Map<string, { resposta: unknown; expiraEm: number }>();
+
+const USO_VAZIO = { usuarios: 0, produtos: 0, servicos: 0, clientes: 0, ordens: 0, fornecedores: 0 };
+
+// GET /api/assinatura/uso[?atualizar=1]
+// Assinatura mais recente da empresa (com o plano) e o uso atual do plano, lido dos
+// contadores de empresa_uso (database/empresa_uso.sql) em vez de seis count(*)
+export async function GET(request: NextRequest) {
+  try {
+    const supabase = await createRequestSupabaseClient(request);
+    const usuario = await getUsuarioEmpresa(supabase, request);
+    if (!usuario) {
+      return NextResponse.json({ error: 'Não autorizado - faça login novamente.' }, { status: 401 });
+    }
+
+    const atualizar = request.nextUrl.searchParams.get('atualizar') === '1';
+    const emCache = usoPorEmpresa.get(usuario.empresaId);
+    if (!atualizar && emCache && emCache.expiraEm > Date.now()) {
+      return NextResponse.json(emCache.resposta);
+    }
+
+    const admin = getSupabaseAdmin();
+    const [{ data: assinaturas, error: assinaturaError }, { data: uso, error: usoError }] = await Promise.all([
+      admin
+        .from('assinaturas')
+        .select('*, planos!inner(id, nome, descricao, preco, limite_usuarios, limite_produtos, limite_clientes, limite_fornecedores, recursos_disponiveis)')
+        .eq('empresa_id', usuario.empresaId)
+        .order('created_at', { ascending: false })
+        .limit(1),
+      admin
+        .from('empresa_uso')
+        .select('usuarios, produtos, servicos, clientes, ordens, fornecedores, atualizado_em')
+        .eq('empresa_id', usuario.empresaId)
+        .maybeSingle(),
+    ]);
+    if (assinaturaError || usoError) {
+      console.error('Erro ao buscar uso do plano:', assinaturaError || usoError);
+      return NextResponse.json({ error: 'Erro ao buscar uso do plano' }, { status: 500 });
+    }
+
+    const resposta = {
+      assinatura: assinaturas?.[0] || null,
+      uso: { ...USO_VAZIO, ...(uso || {}) },
+    };
+    usoPorEmpresa.set(usuario.empresaId, { resposta, expiraEm: Date.now() + USO_CACHE_TTL_MS });
+
+    return NextResponse.json(resposta);
+  } catch (error) {
+    console.error('Erro interno ao buscar uso do plano:', error);
+    return NextResponse.json({ error: 'Erro interno do servidor' }, { status: 500 });
+  }
+}
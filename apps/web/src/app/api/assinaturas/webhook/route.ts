@@ -1,118 +1,39 @@
-import { NextRequest, NextResponse } from 'next/server';
-import { configureMercadoPago } from '@/lib/mercadopago';
-import { createServerSupabaseClient } from '@/lib/supabase/server';
+import { NextRequest, NextResponse, after } from 'next/server';
+import { processarInbox, registrarWebhook } from '@/lib/webhookInbox';
 
 export async function POST(request: NextRequest) {
   try {
     const body = await request.json();
-    
+
     // Verificar se é uma notificação do Mercado Pago
     if (body.type !== 'payment') {
       return NextResponse.json({ received: true });
     }
 
-    const paymentId = body.data.id;
-    
-    // Configurar Mercado Pago
-    const mercadopago = configureMercadoPago();
-    
-    // Buscar informações do pagamento
-    const payment = await new mercadopago.Payment(mercadopago.config).get(paymentId);
-    
-    if (!payment) {
-      console.error('Pagamento não encontrado:', paymentId);
-      return NextResponse.json({ error: 'Pagamento não encontrado' }, { status: 404 });
-    }
-
-    // Extrair assinatura_id do external_reference
-    const externalRef = payment.external_reference;
-    const assinaturaId = externalRef?.replace('assinatura_', '');
-    
-    if (!assinaturaId) {
-      console.error('External reference inválido:', externalRef);
-      return NextResponse.json({ error: 'External reference inválido' }, { status: 400 });
-    }
-
-    // Salvar no banco de dados
-    const supabase = await createServerSupabaseClient();
-    
-    // Buscar pagamento pelo external_reference
-    const { data: pagamento, error: fetchError } = await supabase
-      .from('pagamentos')
-      .select('*')
-      .eq('mercadopago_external_reference', externalRef)
-      .single();
-
-    if (fetchError || !pagamento) {
-      console.error('Pagamento não encontrado no banco:', externalRef);
-      return NextResponse.json({ error: 'Pagamento não encontrado no banco' }, { status: 404 });
-    }
-
-    // Atualizar status do pagamento
-    const updateData: any = {
-      mercadopago_payment_id: paymentId.toString(),
-      status: payment.status,
-      status_detail: payment.status_detail,
-      webhook_received: true,
-      webhook_data: body,
-      updated_at: new Date().toISOString(),
-    };
-
-    // Se foi aprovado, adicionar paid_at e atualizar assinatura
-    if (payment.status === 'approved') {
-      updateData.paid_at = new Date().toISOString();
-      
-      // Atualizar assinatura para ativa
-      const { error: assinaturaError } = await supabase
-        .from('assinaturas')
-        .update({
-          status: 'active',
-          data_fim: new Date(Date.now() + 30 * 24 * 60 * 60 * 1000).toISOString(), // +30 dias
-          proxima_cobranca: new Date(Date.now() + 30 * 24 * 60 * 60 * 1000).toISOString(),
-          updated_at: new Date().toISOString(),
-        })
-        .eq('id', assinaturaId);
-
-      if (assinaturaError) {
-        console.error('Erro ao atualizar assinatura:', assinaturaError);
-      } else {
-        }
-    } else if (payment.status === 'rejected' || payment.status === 'cancelled') {
-      // Atualizar assinatura para suspensa
-      const { error: assinaturaError } = await supabase
-        .from('assinaturas')
-        .update({
-          status: 'suspended',
-          updated_at: new Date().toISOString(),
-        })
-        .eq('id', assinaturaId);
-
-      if (assinaturaError) {
-        console.error('Erro ao suspender assinatura:', assinaturaError);
-      } else {
-        }
+    const paymentId = body.data?.id;
+    if (!paymentId) {
+      return NextResponse.json({ received: true, message: 'no id' });
     }
 
-    // Atualizar pagamento
-    const { error: updateError } = await supabase
-      .from('pagamentos')
-      .update(updateData)
-      .eq('id', pagamento.id);
-
-    if (updateError) {
-      console.error('Erro ao atualizar pagamento:', updateError);
-      return NextResponse.json({ error: 'Erro ao atualizar pagamento' }, { status: 500 });
-    }
+    // Registrar na caixa de entrada e responder; o pagamento e a assinatura
+    // são atualizados em src/lib/webhookInbox.ts após a resposta
+    await registrarWebhook('assinaturas', String(paymentId), body);
+    after(async () => {
+      try {
+        await processarInbox();
+      } catch (error) {
+        console.error('Erro ao processar caixa de webhooks:', error);
+      }
+    });
 
-    return NextResponse.json({ 
+    return NextResponse.json({
       received: true,
       payment_id: paymentId,
-      assinatura_id: assinaturaId,
-      status: payment.status 
+      queued: true
     });
 
   } catch (error) {
     console.error('Erro no webhook de assinatura:', error);
     return NextResponse.json({ error: 'Erro interno' }, { status: 500 });
   }
-} 
\ No newline at end of file
+}
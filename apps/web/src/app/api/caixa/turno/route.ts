@@ -0,0 +1,187 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { createRequestSupabaseClient, getUsuarioEmpresa } from '@/lib/supabase/server';
+
+const TIPOS_MOVIMENTACAO = ['sangria', 'suprimento', 'venda'];
+
+// Data/hora de Brasília no formato que movimentacoes_caixa já usa
+// (horário local gravado como ISO, igual às movimentações existentes)
+function getDataHoraBrasil() {
+  const dataBrasil = new Date().toLocaleString('pt-BR', {
+    timeZone: 'America/Sao_Paulo',
+    year: 'numeric',
+    month: '2-digit',
+    day: '2-digit',
+    hour: '2-digit',
+    minute: '2-digit',
+    second: '2-digit',
+    hour12: false
+  });
+  const [data, hora] = dataBrasil.split(', ');
+  const [dia, mes, ano] = data.split('/');
+  return `${ano}-${mes}-${dia}T${hora}.000Z`;
+}
+
+async function estadoTurno(empresaId: string, turnoId: string | null = null) {
+  const { data, error } = await getSupabaseAdmin().rpc('caixa_turno_estado', {
+    p_empresa_id: empresaId,
+    p_turno_id: turnoId,
+  });
+  if (error) throw error;
+  return data;
+}
+
+// P0001 = já existe turno aberto, P0002 = turno não está aberto (database/caixa_turno_resumo.sql)
+function erroTurno(error: { code?: string; message?: string }, contexto: string) {
+  if (error.code === 'P0001' || error.code === 'P0002') {
+    return NextResponse.json({ error: error.message }, { status: 409 });
+  }
+  console.error(`Erro ao ${contexto}:`, error);
+  return NextResponse.json({ error: `Erro ao ${contexto}` }, { status: 500 });
+}
+
+// GET /api/caixa/turno[?turno_id=]
+// Estado completo do turno (aberto, ou o informado) em uma consulta: turno com saldo
+// corrente, movimentações com operador, vendas por forma de pagamento e último fechamento
+export async function GET(request: NextRequest) {
+  try {
+    const supabase = await createRequestSupabaseClient(request);
+    const usuario = await getUsuarioEmpresa(supabase, request);
+    if (!usuario) {
+      return NextResponse.json({ error: 'Não autorizado - faça login novamente.' }, { status: 401 });
+    }
+
+    const turnoId = request.nextUrl.searchParams.get('turno_id');
+    return NextResponse.json(await estadoTurno(usuario.empresaId, turnoId));
+  } catch (error) {
+    console.error('Erro ao buscar turno de caixa:', error);
+    return NextResponse.json({ error: 'Erro ao buscar turno de caixa' }, { status: 500 });
+  }
+}
+
+// POST /api/caixa/turno
+// { acao: 'abrir', valor_abertura, observacoes? }                   -> estado do turno
+// { acao: 'movimentar', tipo, valor, descricao?, venda_id? }        -> { movimentacao, turno }
+// { acao: 'fechar', valor_fechamento, valor_troco?, observacoes? }  -> estado do turno fechado
+// Os totais e o saldo do turno são mantidos pelo trigger de movimentacoes_caixa.
+export async function POST(request: NextRequest) {
+  try {
+    const supabase = await createRequestSupabaseClient(request);
+    const usuario = await getUsuarioEmpresa(supabase, request);
+    if (!usuario) {
+      return NextResponse.json({ error: 'Não autorizado - faça login novamente.' }, { status: 401 });
+    }
+
+    const body = await request.json().catch(() => ({}));
+    const admin = getSupabaseAdmin();
+
+    if (body.acao === 'abrir') {
+      const valorAbertura = Number(body.valor_abertura);
+      if (!Number.isFinite(valorAbertura) || valorAbertura < 0) {
+        return NextResponse.json({ error: 'Valor de abertura inválido' }, { status: 400 });
+      }
+
+      const { error } = await admin.rpc('caixa_abrir_turno', {
+        p_empresa_id: usuario.empresaId,
+        p_usuario_id: usuario.usuarioId,
+        p_valor_abertura: valorAbertura,
+        p_observacoes: body.observacoes || null,
+      });
+      if (error) return erroTurno(error, 'abrir caixa');
+
+      return NextResponse.json(await estadoTurno(usuario.empresaId), { status: 201 });
+    }
+
+    if (body.acao === 'movimentar') {
+      const valor = Number(body.valor);
+      if (!TIPOS_MOVIMENTACAO.includes(body.tipo)) {
+        return NextResponse.json({ error: 'Tipo de movimentação inválido' }, { status: 400 });
+      }
+      if (!Number.isFinite(valor) || valor <= 0) {
+        return NextResponse.json({ error: 'Valor inválido' }, { status: 400 });
+      }
+
+      const { data: turno } = await admin
+        .from('turnos_caixa')
+        .select('id')
+        .eq('empresa_id', usuario.empresaId)
+        .eq('status', 'aberto')
+        .maybeSingle();
+      if (!turno) {
+        return NextResponse.json({ error: 'Nenhum turno aberto' }, { status: 409 });
+      }
+
+      const vendaId = body.venda_id ? String(body.venda_id) : null;
+      const { data: movimentacao, error } = await admin
+        .from('movimentacoes_caixa')
+        .insert({
+          turno_id: turno.id,
+          tipo: body.tipo,
+          valor,
+          descricao: body.descricao || (vendaId ? `Venda #${vendaId}` : null),
+          usuario_id: usuario.usuarioId,
+          venda_id: vendaId,
+          empresa_id: usuario.empresaId,
+          data_movimentacao: getDataHoraBrasil(),
+        })
+        .select('*, usuario:usuario_id(nome)')
+        .single();
+      if (error) return erroTurno(error, 'registrar movimentação');
+
+      // Venda do PDV: vincula pelo número da venda na empresa
+      if (body.tipo === 'venda' && vendaId) {
+        const { error: vinculoError } = await admin
+          .from('vendas')
+          .update({ turno_id: turno.id })
+          .eq('empresa_id', usuario.empresaId)
+          .eq('numero_venda', vendaId);
+        if (vinculoError) console.error('Erro ao vincular venda ao turno:', vinculoError);
+      }
+
+      const { data: totais } = await admin
+        .from('turnos_caixa')
+        .select('valor_vendas, valor_sangrias, valor_suprimentos, saldo_atual')
+        .eq('id', turno.id)
+        .single();
+
+      return NextResponse.json({ movimentacao, turno: totais }, { status: 201 });
+    }
+
+    if (body.acao === 'fechar') {
+      const valorFechamento = Number(body.valor_fechamento);
+      if (!Number.isFinite(valorFechamento) || valorFechamento < 0) {
+        return NextResponse.json({ error: 'Valor de fechamento inválido' }, { status: 400 });
+      }
+
+      let turnoId = body.turno_id || null;
+      if (!turnoId) {
+        const { data: turno } = await admin
+          .from('turnos_caixa')
+          .select('id')
+          .eq('empresa_id', usuario.empresaId)
+          .eq('status', 'aberto')
+          .maybeSingle();
+        turnoId = turno?.id || null;
+      }
+      if (!turnoId) {
+        return NextResponse.json({ error: 'Nenhum turno aberto' }, { status: 409 });
+      }
+
+      const { error } = await admin.rpc('caixa_fechar_turno', {
+        p_empresa_id: usuario.empresaId,
+        p_turno_id: turnoId,
+        p_valor_fechamento: valorFechamento,
+        p_valor_troco: Number(body.valor_troco) || 0,
+        p_observacoes: body.observacoes || null,
+      });
+      if (error) return erroTurno(error, 'fechar caixa');
+
+      return NextResponse.json(await estadoTurno(usuario.empresaId, turnoId));
+    }
+
+    return NextResponse.json({ error: 'Ação inválida' }, { status: 400 });
+  } catch (error) {
+    console.error('Erro interno no turno de caixa:', error);
+    return NextResponse.json({ error: 'Erro interno do servidor' }, { status: 500 });
+  }
+}
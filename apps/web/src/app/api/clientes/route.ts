@@ -2,37 +2,66 @@ import { NextResponse } from 'next/server';
 import { createServerSupabaseClient } from '@/lib/supabase/server';
 import { getSupabaseAdmin } from '@/lib/supabase/admin';
 
+const LIMITE_PADRAO = 50;
+const LIMITE_MAXIMO = 200;
+
+// Cursor opaco: último (nome, id) da página anterior, em base64url (nome NULL = '', como no ORDER BY)
+function codificarCursor(cliente: { nome: string | null; id: string }) {
+  return Buffer.from(JSON.stringify([cliente.nome ?? '', cliente.id])).toString('base64url');
+}
+
+function decodificarCursor(cursor: string): [string, string] | null {
+  try {
+    const valor = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    if (Array.isArray(valor) && valor.length === 2 && typeof valor[0] === 'string' && typeof valor[1] === 'string') {
+      return [valor[0], valor[1]];
+    }
+  } catch {}
+  return null;
+}
+
 export async function GET(request: Request) {
   try {
     // usar service role para contornar RLS no cadastro
     const supabase = getSupabaseAdmin();
     const { searchParams } = new URL(request.url);
     const empresaId = searchParams.get('empresaId');
-    const search = searchParams.get('search') || '';
+    const search = (searchParams.get('search') || '').trim();
+    const cursorParam = searchParams.get('cursor');
+    const limiteParam = parseInt(searchParams.get('limit') || '', 10);
+    const limite = Number.isNaN(limiteParam) ? LIMITE_PADRAO : Math.min(Math.max(limiteParam, 1), LIMITE_MAXIMO);
 
     if (!empresaId) {
       return NextResponse.json({ error: 'Empresa ID é obrigatório' }, { status: 400 });
     }
 
-    let query = supabase
-      .from('clientes')
-      .select('id, nome, telefone, celular, email, documento, numero_cliente')
-      .eq('empresa_id', empresaId)
-      .eq('status', 'ativo')
-      .order('nome', { ascending: true });
-
-    if (search) {
-      query = query.or(`nome.ilike.%${search}%,telefone.ilike.%${search}%,celular.ilike.%${search}%,documento.ilike.%${search}%`);
+    const cursor = cursorParam ? decodificarCursor(cursorParam) : null;
+    if (cursorParam && !cursor) {
+      return NextResponse.json({ error: 'Cursor inválido' }, { status: 400 });
     }
 
-    const { data, error } = await query;
+    // Busca indexada (trigramas) com keyset por (nome, id) – ver database/clientes_busca_indexada.sql
+    // Pede um registro a mais para saber se existe próxima página
+    const { data, error } = await supabase
+      .rpc('buscar_clientes', {
+        p_empresa_id: empresaId,
+        p_busca: search || null,
+        p_limite: limite + 1,
+        p_apos_nome: cursor ? cursor[0] : null,
+        p_apos_id: cursor ? cursor[1] : null
+      })
+      .select('id, nome, telefone, celular, email, documento, numero_cliente');
 
     if (error) {
       console.error('Erro ao buscar clientes:', error);
       return NextResponse.json({ error: 'Erro ao buscar clientes' }, { status: 500 });
     }
 
-    return NextResponse.json({ clientes: data });
+    const linhas = (data || []) as any[];
+    const clientes = linhas.slice(0, limite);
+    const nextCursor = linhas.length > limite ? codificarCursor(clientes[clientes.length - 1]) : null;
+
+    return NextResponse.json({ clientes, nextCursor });
   } catch (error) {
     console.error('Erro interno:', error);
     return NextResponse.json({ error: 'Erro interno do servidor' }, { status: 500 });
@@ -49,24 +78,7 @@ export async function POST(request: Request) {
       return NextResponse.json({ error: 'empresaId e nome são obrigatórios' }, { status: 400 });
     }
 
-    // Gerar próximo numero_cliente sequencial por empresa (fallback simples)
-    const { data: ultimo, error: erroUltimo } = await supabase
-      .from('clientes')
-      .select('numero_cliente')
-      .eq('empresa_id', empresaId)
-      .order('numero_cliente', { ascending: false })
-      .limit(1);
-
-    if (erroUltimo) {
-      console.error('Erro ao obter último número de cliente:', erroUltimo);
-    }
-
-    let proximoNumero = 1;
-    if (Array.isArray(ultimo) && ultimo.length > 0 && ultimo[0]?.numero_cliente != null) {
-      const prev = typeof (ultimo[0] as any).numero_cliente === 'string' ? parseInt((ultimo[0] as any).numero_cliente) : Number((ultimo[0] as any).numero_cliente);
-      proximoNumero = (isNaN(prev) ? 0 : prev) + 1;
-    }
-
+    // numero_cliente é alocado no INSERT pelo contador da empresa (database/sequencias_empresa.sql)
     const { data, error } = await supabase
       .from('clientes')
       .insert({
@@ -76,7 +88,6 @@ export async function POST(request: Request) {
         celular: celular ?? '',
         email: email ?? '',
         documento: documento ?? '',
-        numero_cliente: proximoNumero,
         status: 'ativo',
         tipo: 'pf',
         data_cadastro: new Date().toISOString(),
@@ -0,0 +1,48 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { createRequestSupabaseClient, getUsuarioEmpresa } from '@/lib/supabase/server';
+
+const DATA = /^\d{4}-\d{2}-\d{2}$/;
+
+// POST /api/comissoes/recalcular { inicio?, fim?, tecnico_id?, atualizar_pendentes? }
+// (Re)calcula em lote as comissões da empresa do usuário (database/comissoes_lote.sql):
+// gera as que faltam para OS entregues em [inicio, fim] e, com atualizar_pendentes,
+// recalcula as pendentes com o percentual e a configuração atuais. Apenas admin.
+export async function POST(request: NextRequest) {
+  try {
+    const supabase = await createRequestSupabaseClient(request);
+    const usuario = await getUsuarioEmpresa(supabase, request);
+    if (!usuario) {
+      return NextResponse.json({ error: 'Não autorizado - faça login novamente.' }, { status: 401 });
+    }
+    if (usuario.nivel !== 'admin') {
+      return NextResponse.json({ error: 'Apenas administradores podem recalcular comissões' }, { status: 403 });
+    }
+
+    const { inicio, fim, tecnico_id, atualizar_pendentes } = await request.json().catch(() => ({}));
+    if ((inicio && !DATA.test(inicio)) || (fim && !DATA.test(fim))) {
+      return NextResponse.json({ error: 'Data inválida (use AAAA-MM-DD)' }, { status: 400 });
+    }
+
+    // fim inclusivo: até o início do dia seguinte
+    const fimExclusivo = fim ? new Date(new Date(`${fim}T00:00:00-03:00`).getTime() + 86400000).toISOString() : null;
+
+    const { data, error } = await getSupabaseAdmin().rpc('comissoes_recalcular', {
+      p_empresa_id: usuario.empresaId,
+      p_inicio: inicio ? `${inicio}T00:00:00-03:00` : null,
+      p_fim: fimExclusivo,
+      p_tecnico_id: tecnico_id || null,
+      p_atualizar_pendentes: Boolean(atualizar_pendentes),
+    });
+    if (error) {
+      console.error('Erro ao recalcular comissões:', error);
+      return NextResponse.json({ error: 'Erro ao recalcular comissões' }, { status: 500 });
+    }
+
+    const resumo = (Array.isArray(data) ? data[0] : data) || {};
+    return NextResponse.json({ ok: true, inseridas: resumo.inseridas ?? 0, atualizadas: resumo.atualizadas ?? 0 });
+  } catch (error) {
+    console.error('Erro interno ao recalcular comissões:', error);
+    return NextResponse.json({ error: 'Erro interno do servidor' }, { status: 500 });
+  }
+}
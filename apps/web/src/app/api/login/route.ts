@@ -6,7 +6,55 @@ const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
 const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY!;
 const jwtSecret = process.env.JWT_SECRET || 'your-jwt-secret';
 
-const supabase = createClient(supabaseUrl, supabaseServiceKey);
+const supabase = createClient(supabaseUrl, supabaseServiceKey, {
+  auth: { autoRefreshToken: false, persistSession: false },
+});
+
+// Cliente próprio para cada signInWithPassword: a sessão do usuário fica nele e não
+// passa a ser usada nas consultas do cliente service role compartilhado
+function criarClienteAuth() {
+  return createClient(supabaseUrl, process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!, {
+    auth: { autoRefreshToken: false, persistSession: false },
+  });
+}
+
+interface PerfilLogin {
+  email: string;
+  auth_user_id: string | null;
+  nivel: string;
+  empresa_id: string | null;
+  email_verificado: boolean;
+  admin_email_verificado: boolean | null;
+  empresa_status: string | null;
+  motivobloqueio: string | null;
+}
+
+// Cache curto dos dados de login (nada secreto: a senha é sempre conferida pelo Auth).
+// Só entram perfis liberados para login, para que uma verificação de e-mail recém-feita
+// valha na hora; bloqueios feitos depois levam até LOGIN_CACHE_TTL_MS para valer.
+const LOGIN_CACHE_TTL_MS = Number(process.env.LOGIN_CACHE_TTL_MS) || 60_000;
+const perfisLogin = new Map<string, { perfil: PerfilLogin; expiraEm: number }>();
+
+async function resolverLogin(login: string): Promise<PerfilLogin | null> {
+  const chave = login.toLowerCase();
+  const emCache = perfisLogin.get(chave);
+  if (emCache && emCache.expiraEm > Date.now()) return emCache.perfil;
+
+  const { data, error } = await supabase.rpc('login_resolver', { p_login: login });
+  if (error) throw error;
+  const perfil = ((data || []) as PerfilLogin[])[0] || null;
+
+  const liberado = perfil
+    && perfil.empresa_id
+    && perfil.empresa_status !== 'bloqueado'
+    && (perfil.nivel === 'admin' ? perfil.email_verificado : perfil.admin_email_verificado);
+  if (liberado) {
+    perfisLogin.set(chave, { perfil, expiraEm: Date.now() + LOGIN_CACHE_TTL_MS });
+  } else {
+    perfisLogin.delete(chave);
+  }
+  return perfil;
+}
 
 export async function POST(request: NextRequest) {
   try {
@@ -19,42 +67,28 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    let emailToLogin = username;
-
-    // Verificar se é email ou usuário
-    if (!username.includes('@')) {
-      const usernameNormalized = username.trim().toLowerCase();
-      const { data: usuario, error } = await supabase
-        .from('usuarios')
-        .select('email')
-        .eq('usuario', usernameNormalized)
-        .single();
-      
-      if (error || !usuario?.email) {
-        return NextResponse.json(
-          { error: 'User not found. Please check your username.' },
-          { status: 404 }
-        );
-      }
-      emailToLogin = usuario.email;
+    const login = String(username).trim();
+    if (!login) {
+      return NextResponse.json(
+        { error: 'Username and password are required' },
+        { status: 400 }
+      );
     }
 
-    // Verificar se o email foi confirmado ANTES de tentar login
-    const { data: usuarioVerificacao, error: verificacaoError } = await supabase
-      .from('usuarios')
-      .select('email_verificado, auth_user_id, nivel, empresa_id')
-      .eq('email', emailToLogin)
-      .single();
-    
-    if (verificacaoError) {
+    // Usuário/e-mail, perfil, verificação do admin e status da empresa em uma consulta
+    const perfilLogin = await resolverLogin(login);
+
+    if (!perfilLogin) {
       return NextResponse.json(
         { error: 'User not found. Please check your credentials.' },
         { status: 404 }
       );
     }
 
+    const emailToLogin = perfilLogin.email;
+
     // Se o usuário é ADMIN (criador da empresa), verificar se o email foi confirmado
-    if (usuarioVerificacao?.nivel === 'admin' && !usuarioVerificacao?.email_verificado) {
+    if (perfilLogin.nivel === 'admin' && !perfilLogin.email_verificado) {
       return NextResponse.json(
         { error: 'Email not verified. Please verify your email before logging in.' },
         { status: 403 }
@@ -62,22 +96,15 @@ export async function POST(request: NextRequest) {
     }
 
     // Se o usuário NÃO é admin, verificar se o ADMIN da empresa foi verificado
-    if (usuarioVerificacao?.nivel !== 'admin' && usuarioVerificacao?.empresa_id) {
-      const { data: adminEmpresa, error: adminError } = await supabase
-        .from('usuarios')
-        .select('email_verificado')
-        .eq('empresa_id', usuarioVerificacao.empresa_id)
-        .eq('nivel', 'admin')
-        .single();
-      
-      if (adminError) {
+    if (perfilLogin.nivel !== 'admin' && perfilLogin.empresa_id) {
+      if (perfilLogin.admin_email_verificado === null) {
         return NextResponse.json(
           { error: 'Error verifying company. Please try again.' },
           { status: 500 }
         );
       }
-      
-      if (!adminEmpresa?.email_verificado) {
+
+      if (!perfilLogin.admin_email_verificado) {
         return NextResponse.json(
           { error: 'Company not verified. Please contact the administrator.' },
           { status: 403 }
@@ -85,8 +112,15 @@ export async function POST(request: NextRequest) {
       }
     }
 
+    if (perfilLogin.empresa_status === 'bloqueado') {
+      return NextResponse.json(
+        { error: perfilLogin.motivobloqueio || 'Company blocked. Please contact support.' },
+        { status: 403 }
+      );
+    }
+
     // Tentar fazer login usando Supabase Auth
-    const { data: authData, error: authError } = await supabase.auth.signInWithPassword({
+    const { data: authData, error: authError } = await criarClienteAuth().auth.signInWithPassword({
       email: emailToLogin,
       password,
     });
@@ -117,19 +151,24 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Buscar dados do usuário
+    // Perfil já resolvido antes do Auth; só relê se o vínculo auth_user_id estiver diferente
     const userId = authData.session.user.id;
-    const { data: perfil, error: perfilError } = await supabase
-      .from('usuarios')
-      .select('nivel, empresa_id')
-      .eq('auth_user_id', userId)
-      .single();
-    
-    if (perfilError || !perfil) {
-      return NextResponse.json(
-        { error: 'Error fetching user profile. Please try again.' },
-        { status: 500 }
-      );
+    let perfil: { nivel: string; empresa_id: string | null } = perfilLogin;
+    if (perfilLogin.auth_user_id !== userId) {
+      perfisLogin.delete(login.toLowerCase());
+      const { data, error: perfilError } = await supabase
+        .from('usuarios')
+        .select('nivel, empresa_id')
+        .eq('auth_user_id', userId)
+        .single();
+
+      if (perfilError || !data) {
+        return NextResponse.json(
+          { error: 'Error fetching user profile. Please try again.' },
+          { status: 500 }
+        );
+      }
+      perfil = data;
     }
 
     if (!perfil.empresa_id) {
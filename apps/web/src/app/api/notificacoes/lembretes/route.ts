@@ -0,0 +1,30 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+
+// Intervalo entre lembretes da mesma OS (o cron roda a cada 10 minutos)
+const INTERVALO_MINUTOS = Number(process.env.NOTIFICACOES_LEMBRETE_MINUTOS) || 10;
+
+// GET /api/notificacoes/lembretes
+// Gera os lembretes de orçamento aguardando aprovação (database/notificacoes_realtime.sql).
+// Cada OS tem uma linha de lembrete em notificacoes, reativada a cada intervalo e
+// entregue pelo Realtime só à empresa da OS.
+export async function GET(request: NextRequest) {
+  try {
+    const tokenHeader = request.headers.get('x-internal-token');
+    const tokenOk = tokenHeader && process.env.INTERNAL_ADMIN_TOKEN && tokenHeader === process.env.INTERNAL_ADMIN_TOKEN;
+    const cronOk = process.env.CRON_SECRET && request.headers.get('authorization') === `Bearer ${process.env.CRON_SECRET}`;
+    if (!tokenOk && !cronOk) {
+      return NextResponse.json({ error: 'Não autorizado' }, { status: 403 });
+    }
+
+    const { data, error } = await getSupabaseAdmin().rpc('notificacoes_gerar_lembretes', {
+      p_intervalo: `${INTERVALO_MINUTOS} minutes`,
+    });
+    if (error) throw error;
+
+    return NextResponse.json({ ok: true, lembretes: data ?? 0 });
+  } catch (error) {
+    console.error('Erro ao gerar lembretes de orçamento:', error);
+    return NextResponse.json({ error: 'Erro interno' }, { status: 500 });
+  }
+}
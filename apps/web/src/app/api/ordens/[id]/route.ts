@@ -1,6 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { createServerClient } from '@supabase/ssr';
-import { cookies } from 'next/headers';
+import { createRequestSupabaseClient } from '@/lib/supabase/server';
 
 export async function PUT(
   request: NextRequest,
@@ -10,21 +9,12 @@ export async function PUT(
     const { id } = await params;
     // Parse JSON data from request body
     const updateData = await request.json();
-    const cookieStore = await cookies();
-    const supabase = createServerClient(
-      process.env.NEXT_PUBLIC_SUPABASE_URL!,
-      process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
-      {
-        cookies: {
-          get(name: string) { return cookieStore.get(name)?.value; },
-          set() {},
-          remove() {},
-        },
-      }
-    );
+    const supabase = await createRequestSupabaseClient(request);
     
-    // Tentar obter usuário diretamente
-    const { data: { user }, error: userError } = await supabase.auth.getUser();
+    // Tentar obter usuário diretamente (sem cookie de sessão, pelo Bearer)
+    const authHeader = request.headers.get('authorization') || '';
+    const token = authHeader.startsWith('Bearer ') ? authHeader.slice(7) : undefined;
+    const { data: { user }, error: userError } = await supabase.auth.getUser(token);
     
     if (userError || !user) {
       console.error('API Route - Usuário não encontrado:', userError);
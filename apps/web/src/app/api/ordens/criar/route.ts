@@ -1,21 +1,10 @@
-import { createServerClient } from '@supabase/ssr';
-import { cookies } from 'next/headers';
 import { NextRequest, NextResponse } from 'next/server';
+import { createRequestSupabaseClient } from '@/lib/supabase/server';
 
 export async function POST(request: NextRequest) {
   try {
-    const cookieStore = await cookies();
-    const supabase = createServerClient(
-      process.env.NEXT_PUBLIC_SUPABASE_URL!,
-      process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
-      {
-        cookies: {
-          get(name: string) { return cookieStore.get(name)?.value; },
-          set() {},
-          remove() {},
-        },
-      }
-    );
+    // Sessão do cookie ou Bearer com o access_token do Supabase (testes de carga)
+    const supabase = await createRequestSupabaseClient(request);
     const dadosOS = await request.json();
     // Verificar se empresa_id já está presente nos dados
     if (!dadosOS.empresa_id) {
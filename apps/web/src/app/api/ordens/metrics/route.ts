@@ -0,0 +1,66 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { createRequestSupabaseClient, getUsuarioEmpresa } from '@/lib/supabase/server';
+
+const calcPercent = (atual: number, anterior: number) => {
+  if (anterior === 0) return atual > 0 ? 100 : 0;
+  return Math.round(((atual - anterior) / anterior) * 100);
+};
+
+export async function GET(request: NextRequest) {
+  try {
+    const supabase = await createRequestSupabaseClient(request);
+    const usuario = await getUsuarioEmpresa(supabase, request);
+    if (!usuario) {
+      return NextResponse.json({ error: 'Não autorizado - faça login novamente.' }, { status: 401 });
+    }
+
+    // ?data=AAAA-MM-DD: dia de referência (padrão: hoje em America/Sao_Paulo)
+    const data = new URL(request.url).searchParams.get('data');
+    if (data && !/^\d{4}-\d{2}-\d{2}$/.test(data)) {
+      return NextResponse.json({ error: 'Data inválida (use AAAA-MM-DD)' }, { status: 400 });
+    }
+
+    // Rollup diário mantido por trigger (ver database/ordens_metricas_diarias.sql)
+    const { data: resumo, error } = await getSupabaseAdmin().rpc('ordens_metricas_dashboard', {
+      p_empresa_id: usuario.empresaId,
+      p_hoje: data || null,
+    });
+    if (error) {
+      console.error('Erro ao buscar métricas de ordens:', error);
+      return NextResponse.json({ error: 'Erro ao buscar métricas de ordens' }, { status: 500 });
+    }
+
+    const r = (resumo || {}) as Record<string, number | string>;
+    const n = (chave: string) => Number(r[chave]) || 0;
+    const osHoje = n('osHoje');
+    const faturamentoHoje = n('faturamentoHoje');
+    const totalOS = n('totalOS');
+    const totalMes = n('totalMes');
+    const retornosMes = n('retornosMes');
+    const ordensSemana = n('ordensSemana');
+    const ordensSemanaAnterior = n('ordensSemanaAnterior');
+    const ordensMesAnterior = n('ordensMesAnterior');
+
+    return NextResponse.json({
+      hoje: r.hoje,
+      totalOS,
+      percentualRetornos: totalOS > 0 ? Math.round((retornosMes / totalOS) * 100) : 0,
+      osHoje,
+      faturamentoHoje,
+      ticketMedioHoje: osHoje > 0 ? faturamentoHoje / osHoje : 0,
+      retornosHoje: n('retornosHoje'),
+      aprovadosHoje: n('aprovadosHoje'),
+      totalMes,
+      retornosMes,
+      ordensSemana,
+      ordensSemanaAnterior,
+      ordensMesAnterior,
+      crescimentoSemanal: calcPercent(ordensSemana, ordensSemanaAnterior),
+      crescimentoMensal: calcPercent(totalMes, ordensMesAnterior),
+    });
+  } catch (error) {
+    console.error('Erro interno ao buscar métricas de ordens:', error);
+    return NextResponse.json({ error: 'Erro interno do servidor' }, { status: 500 });
+  }
+}
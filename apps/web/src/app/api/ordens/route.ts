@@ -0,0 +1,126 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { createRequestSupabaseClient, getUsuarioEmpresa } from '@/lib/supabase/server';
+
+const LIMITE_PADRAO = 50;
+const LIMITE_MAXIMO = 200;
+
+// Colunas que podem ser pedidas em ?campos=
+const CAMPOS_PERMITIDOS = new Set([
+  'numero_os', 'cliente_id', 'categoria', 'marca', 'modelo', 'status', 'status_tecnico',
+  'tecnico_id', 'tipo', 'valor_faturado', 'valor_peca', 'valor_servico', 'forma_pagamento',
+  'observacao', 'relato', 'condicoes_equipamento', 'cor', 'numero_serie', 'acessorios',
+  'atendente', 'senha_acesso', 'data_entrega', 'prazo_entrega',
+]);
+
+// Projeção da listagem quando ?campos= não é informado
+const CAMPOS_PADRAO = [
+  'numero_os', 'cliente_id', 'categoria', 'marca', 'modelo', 'status', 'status_tecnico',
+  'tecnico_id', 'tipo', 'valor_faturado', 'data_entrega',
+];
+
+// Relacionamentos que podem ser incluídos em ?incluir=
+const RELACOES: Record<string, string> = {
+  cliente: 'clientes!cliente_id(nome, telefone)',
+  tecnico: 'usuarios!tecnico_id(nome)',
+};
+
+const UUID_RE = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+// Cursor opaco: (created_at, id) da última OS da página anterior, em base64url
+function codificarCursor(ordem: { created_at: string; id: string }) {
+  return Buffer.from(JSON.stringify([ordem.created_at, ordem.id])).toString('base64url');
+}
+
+function decodificarCursor(cursor: string): [string, string] | null {
+  try {
+    const valor = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    if (
+      Array.isArray(valor) && valor.length === 2 &&
+      typeof valor[0] === 'string' && !Number.isNaN(Date.parse(valor[0])) &&
+      typeof valor[1] === 'string' && UUID_RE.test(valor[1])
+    ) {
+      return [valor[0], valor[1]];
+    }
+  } catch {}
+  return null;
+}
+
+function lista(valor: string | null) {
+  return (valor || '').split(',').map(v => v.trim()).filter(Boolean);
+}
+
+export async function GET(request: NextRequest) {
+  try {
+    const supabase = await createRequestSupabaseClient(request);
+    const usuario = await getUsuarioEmpresa(supabase, request);
+    if (!usuario) {
+      return NextResponse.json({ error: 'Não autorizado - faça login novamente.' }, { status: 401 });
+    }
+
+    const { searchParams } = new URL(request.url);
+    const limiteParam = parseInt(searchParams.get('limit') || '', 10);
+    const limite = Number.isNaN(limiteParam) ? LIMITE_PADRAO : Math.min(Math.max(limiteParam, 1), LIMITE_MAXIMO);
+
+    const cursorParam = searchParams.get('cursor');
+    const cursor = cursorParam ? decodificarCursor(cursorParam) : null;
+    if (cursorParam && !cursor) {
+      return NextResponse.json({ error: 'Cursor inválido' }, { status: 400 });
+    }
+
+    const campos = searchParams.has('campos') ? lista(searchParams.get('campos')) : CAMPOS_PADRAO;
+    const invalidos = campos.filter(c => !CAMPOS_PERMITIDOS.has(c));
+    const incluir = searchParams.has('incluir') ? lista(searchParams.get('incluir')) : Object.keys(RELACOES);
+    const relacoesInvalidas = incluir.filter(r => !RELACOES[r]);
+    if (invalidos.length || relacoesInvalidas.length) {
+      return NextResponse.json(
+        { error: `Campos inválidos: ${[...invalidos, ...relacoesInvalidas].join(', ')}` },
+        { status: 400 }
+      );
+    }
+
+    const status = lista(searchParams.get('status'));
+    const tecnicoId = searchParams.get('tecnico_id');
+    const desde = searchParams.get('desde');
+    const ate = searchParams.get('ate');
+    if ((tecnicoId && !UUID_RE.test(tecnicoId)) || (desde && Number.isNaN(Date.parse(desde))) || (ate && Number.isNaN(Date.parse(ate)))) {
+      return NextResponse.json({ error: 'Filtro inválido (tecnico_id, desde ou ate)' }, { status: 400 });
+    }
+
+    // id e created_at sempre vêm: são a chave do cursor
+    const select = ['id', 'created_at', ...campos, ...incluir.map(r => RELACOES[r])].join(', ');
+
+    // Keyset por (created_at desc, id desc) – índices em database/ordens_listagem_indices.sql
+    let query = supabase
+      .from('ordens_servico')
+      .select(select)
+      .eq('empresa_id', usuario.empresaId)
+      .order('created_at', { ascending: false })
+      .order('id', { ascending: false })
+      .limit(limite + 1);
+
+    if (status.length === 1) query = query.eq('status', status[0]);
+    if (status.length > 1) query = query.in('status', status);
+    if (tecnicoId) query = query.eq('tecnico_id', tecnicoId);
+    if (desde) query = query.gte('created_at', desde);
+    if (ate) query = query.lt('created_at', ate);
+    if (cursor) {
+      const [createdAt, id] = cursor;
+      query = query.or(`created_at.lt."${createdAt}",and(created_at.eq."${createdAt}",id.lt.${id})`);
+    }
+
+    const { data, error } = await query;
+    if (error) {
+      console.error('Erro ao listar ordens:', error);
+      return NextResponse.json({ error: 'Erro ao listar ordens de serviço' }, { status: 500 });
+    }
+
+    const linhas = (data || []) as any[];
+    const ordens = linhas.slice(0, limite);
+    const nextCursor = linhas.length > limite ? codificarCursor(ordens[ordens.length - 1]) : null;
+
+    return NextResponse.json({ ordens, nextCursor });
+  } catch (error) {
+    console.error('Erro interno ao listar ordens:', error);
+    return NextResponse.json({ error: 'Erro interno do servidor' }, { status: 500 });
+  }
+}
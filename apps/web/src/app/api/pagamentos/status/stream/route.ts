@@ -0,0 +1,125 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { assinarStatusPagamento, STATUS_FINAIS, StatusPagamento } from '@/lib/pagamentosEventos';
+
+export const runtime = 'nodejs';
+export const dynamic = 'force-dynamic';
+
+// Conexão encerrada após este tempo; o EventSource do navegador reconecta sozinho
+const DURACAO_MAXIMA_MS = 5 * 60 * 1000;
+// Ping + releitura do banco (mudança aplicada por outra instância)
+const INTERVALO_VERIFICACAO_MS = 15_000;
+
+function formatar(p: any): StatusPagamento {
+  return { pagamento_id: p.id, payment_id: p.mercadopago_payment_id, status: p.status, paid_at: p.paid_at };
+}
+
+// GET /api/pagamentos/status/stream?pagamento_id=|payment_id=
+// Server-sent events: envia o status atual ao conectar e cada mudança publicada pelo
+// worker dos webhooks; fecha quando o pagamento chega a um status final.
+// EventSource não envia headers, então o token pode vir em ?access_token=
+export async function GET(request: NextRequest) {
+  try {
+    const { searchParams } = new URL(request.url);
+    const pagamentoId = searchParams.get('pagamento_id');
+    const paymentId = searchParams.get('payment_id');
+    if (!pagamentoId && !paymentId) {
+      return NextResponse.json({ error: 'pagamento_id ou payment_id é obrigatório' }, { status: 400 });
+    }
+
+    const authHeader = request.headers.get('authorization') || '';
+    const token = authHeader.startsWith('Bearer ') ? authHeader.slice(7) : searchParams.get('access_token');
+    if (!token) {
+      return NextResponse.json({ error: 'Usuário não autenticado' }, { status: 401 });
+    }
+
+    const supabase = getSupabaseAdmin();
+    const { data: { user } } = await supabase.auth.getUser(token);
+    if (!user) {
+      return NextResponse.json({ error: 'Usuário não autenticado' }, { status: 401 });
+    }
+    const { data: usuario } = await supabase
+      .from('usuarios')
+      .select('empresa_id')
+      .eq('auth_user_id', user.id)
+      .single();
+
+    const ler = async () => {
+      let query = supabase
+        .from('pagamentos')
+        .select('id, empresa_id, status, mercadopago_payment_id, paid_at')
+        .limit(1);
+      query = pagamentoId ? query.eq('id', pagamentoId) : query.eq('mercadopago_payment_id', paymentId!);
+      const { data } = await query.maybeSingle();
+      return data;
+    };
+
+    const pagamento = await ler();
+    if (!pagamento || !usuario?.empresa_id || pagamento.empresa_id !== usuario.empresa_id) {
+      return NextResponse.json({ error: 'Pagamento não encontrado' }, { status: 404 });
+    }
+
+    const encoder = new TextEncoder();
+    let encerrar = () => {};
+
+    const stream = new ReadableStream({
+      start(controller) {
+        let ultimoStatus: string | null = null;
+        let fechado = false;
+        let cancelarAssinatura: (() => void) | null = null;
+        let verificacao: ReturnType<typeof setInterval> | null = null;
+        let limite: ReturnType<typeof setTimeout> | null = null;
+
+        const fechar = () => {
+          if (fechado) return;
+          fechado = true;
+          cancelarAssinatura?.();
+          if (verificacao) clearInterval(verificacao);
+          if (limite) clearTimeout(limite);
+          try { controller.close(); } catch {}
+        };
+        encerrar = fechar;
+
+        const enviar = (status: StatusPagamento) => {
+          if (fechado || status.status === ultimoStatus) return;
+          ultimoStatus = status.status;
+          controller.enqueue(encoder.encode(`event: status\ndata: ${JSON.stringify(status)}\n\n`));
+          if (STATUS_FINAIS.has(status.status)) fechar();
+        };
+
+        // Assinar antes de enviar o estado atual para não perder uma mudança no meio
+        cancelarAssinatura = assinarStatusPagamento(pagamento.id, enviar);
+        enviar(formatar(pagamento));
+        if (fechado) return;
+
+        verificacao = setInterval(async () => {
+          try {
+            controller.enqueue(encoder.encode(': ping\n\n'));
+            const atual = await ler();
+            if (atual) enviar(formatar(atual));
+          } catch {
+            fechar();
+          }
+        }, INTERVALO_VERIFICACAO_MS);
+        limite = setTimeout(fechar, DURACAO_MAXIMA_MS);
+        request.signal.addEventListener('abort', fechar);
+      },
+      cancel() {
+        encerrar();
+      },
+    });
+
+    return new Response(stream, {
+      headers: {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache, no-transform',
+        Connection: 'keep-alive',
+        // nginx (deploy na VPS) não deve bufferizar o stream
+        'X-Accel-Buffering': 'no',
+      },
+    });
+  } catch (err) {
+    console.error('Erro no stream de status de pagamento:', err);
+    return NextResponse.json({ error: 'Erro interno do servidor' }, { status: 500 });
+  }
+}
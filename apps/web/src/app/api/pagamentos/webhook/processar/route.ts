@@ -0,0 +1,25 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { processarInbox } from '@/lib/webhookInbox';
+
+// GET /api/pagamentos/webhook/processar
+// Drena a caixa de entrada dos webhooks (cron de segurança: retentativas com backoff
+// e notificações cujo processamento pós-resposta foi interrompido)
+export async function GET(request: NextRequest) {
+  try {
+    const tokenHeader = request.headers.get('x-internal-token');
+    const tokenOk = tokenHeader && process.env.INTERNAL_ADMIN_TOKEN && tokenHeader === process.env.INTERNAL_ADMIN_TOKEN;
+    const cronOk = process.env.CRON_SECRET && request.headers.get('authorization') === `Bearer ${process.env.CRON_SECRET}`;
+    if (!tokenOk && !cronOk) {
+      return NextResponse.json({ error: 'Não autorizado' }, { status: 403 });
+    }
+
+    const resumo = await processarInbox();
+    const { data: removidas } = await getSupabaseAdmin().rpc('webhook_inbox_limpar', { p_dias: 30 });
+
+    return NextResponse.json({ ok: true, ...resumo, removidas: removidas ?? 0 });
+  } catch (error) {
+    console.error('Erro ao drenar caixa de webhooks:', error);
+    return NextResponse.json({ error: 'Erro interno' }, { status: 500 });
+  }
+}
@@ -21,49 +21,21 @@ export async function POST(req: NextRequest) {
       );
     }
 
-    // Buscar todos os códigos da empresa e calcular o máximo de forma robusta
-    const { data: codigosData } = await supabaseAdmin
-      .from('produtos_servicos')
-      .select('codigo')
-      .eq('empresa_id', empresa_id);
-
-    const maxCodigo = (codigosData || [])
-      .map((r: any) => parseInt(String(r?.codigo || '0'), 10))
-      .filter((n: number) => !Number.isNaN(n))
-      .reduce((acc: number, n: number) => (n > acc ? n : acc), 0);
-
-    let proximoCodigo = maxCodigo + 1;
-
+    // codigo é alocado no INSERT pelo contador da empresa (database/sequencias_empresa.sql)
     const payload = {
       empresa_id,
       nome,
       tipo,
       preco: parseFloat(preco),
       unidade: unidade || 'un',
-      ativo: true, // Sempre ativo por padrão
-      codigo: proximoCodigo.toString()
+      ativo: true // Sempre ativo por padrão
     };
 
-    // Inserção com retry se houver conflito de código único (23505)
-    let data: any = null;
-    let error: any = null;
-    for (let tentativas = 0; tentativas < 5; tentativas++) {
-      const tentativaPayload = { ...payload, codigo: proximoCodigo.toString() };
-      const res = await supabaseAdmin
-        .from('produtos_servicos')
-        .insert(tentativaPayload)
-        .select()
-        .single();
-      data = res.data;
-      error = res.error;
-      if (!error) break;
-      if (error?.code === '23505') {
-        // código duplicado – incrementar e tentar novamente
-        proximoCodigo += 1;
-        continue;
-      }
-      break;
-    }
+    const { data, error } = await supabaseAdmin
+      .from('produtos_servicos')
+      .insert(payload)
+      .select()
+      .single();
 
     if (error) {
       console.error('Error inserting product/service:', error);
@@ -1,98 +1,203 @@
-import { createServerClient } from '@supabase/ssr';
-import { cookies } from 'next/headers';
 import { NextRequest, NextResponse } from 'next/server';
+import { Readable } from 'stream';
+import busboy from 'busboy';
+import sharp from 'sharp';
+import { createRequestSupabaseClient } from '@/lib/supabase/server';
+import { criarLimitador } from '@/lib/concorrencia';
+import { caminhoVariante } from '@/lib/imagensOS';
 
+export const runtime = 'nodejs';
+
+const BUCKET = 'ordens-imagens';
+const TAMANHO_MAXIMO = 5 * 1024 * 1024;
+const MAX_ARQUIVOS = 20;
+// Arquivos processados/enviados ao Storage ao mesmo tempo
+const CONCORRENCIA = Number(process.env.UPLOAD_CONCORRENCIA) || 4;
+
+// Sem cache de operações do libvips: cada foto é processada uma vez só
+sharp.cache(false);
+
+class ErroUpload extends Error {}
+
+interface ArquivoEnviado {
+  name: string;
+  url: string;
+  size: number;
+  type: string;
+  thumbnail_url: string | null;
+  webp_url: string | null;
+}
+
+// Miniatura para listas e versão WebP para exibição; rotate() aplica a orientação EXIF das fotos de celular
+async function gerarVariantes(original: Buffer) {
+  const [miniatura, exibicao] = await Promise.all([
+    sharp(original).rotate().resize({ width: 320, height: 320, fit: 'inside', withoutEnlargement: true }).webp({ quality: 70 }).toBuffer(),
+    sharp(original).rotate().resize({ width: 1600, height: 1600, fit: 'inside', withoutEnlargement: true }).webp({ quality: 80 }).toBuffer(),
+  ]);
+  return { miniatura, exibicao };
+}
+
+// POST /api/upload (multipart: ordemId + files[])
+// O corpo é lido em streaming: cada foto começa a ser processada e enviada ao Storage
+// assim que termina de chegar, no máximo CONCORRENCIA por vez, enquanto as próximas
+// ainda estão sendo recebidas. Para cada foto são gravadas a original, a miniatura
+// e a versão WebP (caminhos em src/lib/imagensOS.ts).
 export async function POST(request: NextRequest) {
+  const supabase = await createRequestSupabaseClient(request);
+  const enviados: string[] = [];
+
   try {
-    const cookieStore = await cookies();
-    const supabase = createServerClient(
-      process.env.NEXT_PUBLIC_SUPABASE_URL!,
-      process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
-      {
-        cookies: {
-          get(name: string) { return cookieStore.get(name)?.value; },
-          set() {},
-          remove() {},
-        },
-      }
-    );
+    const contentType = request.headers.get('content-type') || '';
+    if (!request.body || !contentType.startsWith('multipart/form-data')) {
+      return NextResponse.json(
+        { error: 'Nenhum arquivo enviado' },
+        { status: 400 }
+      );
+    }
+
+    const timestamp = Date.now();
+    const limitar = criarLimitador(CONCORRENCIA);
+    const tarefas: Promise<ArquivoEnviado>[] = [];
+    let erroValidacao: string | null = null;
+
+    // ordemId normalmente vem antes dos arquivos; se vier depois, as fotos esperam por ele
+    let definirOrdem!: (ordemId: string | null) => void;
+    const ordemPronta = new Promise<string | null>(resolve => { definirOrdem = resolve; });
+
+    const enviar = async (caminho: string, conteudo: Buffer, tipo: string) => {
+      const { error } = await supabase.storage
+        .from(BUCKET)
+        .upload(caminho, conteudo, { contentType: tipo, upsert: false });
+      if (error) throw new ErroUpload('Erro ao fazer upload da imagem: ' + error.message);
+      enviados.push(caminho);
+    };
+
+    const processar = async (indice: number, nome: string, tipo: string, conteudo: Buffer): Promise<ArquivoEnviado> => {
+      const ordemId = await ordemPronta;
+      if (!ordemId || erroValidacao) throw new ErroUpload(erroValidacao || 'ID da ordem não fornecido');
+
+      return limitar(async () => {
+        // Gerar nome de arquivo seguro (índice evita colisão entre fotos enviadas em paralelo)
+        const safeName = nome.replace(/[^a-zA-Z0-9.\-_]/g, '_');
+        const filePath = `${ordemId}/${timestamp}_${indice}_${safeName}`;
+
+        let variantes: Awaited<ReturnType<typeof gerarVariantes>> | null = null;
+        try {
+          variantes = await gerarVariantes(conteudo);
+        } catch (err) {
+          // Formato que o sharp não lê (ex.: HEIC): a original é enviada sem variantes
+          console.error('Erro ao gerar miniaturas:', err);
+        }
 
-    const formData = await request.formData();
-    const files = formData.getAll('files') as File[];
-    const ordemId = formData.get('ordemId') as string;
+        const caminhoMiniatura = caminhoVariante(filePath, 'thumbs');
+        const caminhoExibicao = caminhoVariante(filePath, 'webp');
+        await Promise.all([
+          enviar(filePath, conteudo, tipo),
+          variantes && enviar(caminhoMiniatura, variantes.miniatura, 'image/webp'),
+          variantes && enviar(caminhoExibicao, variantes.exibicao, 'image/webp'),
+        ]);
 
-    if (!files || files.length === 0) {
+        const publica = (caminho: string) => supabase.storage.from(BUCKET).getPublicUrl(caminho).data.publicUrl;
+        return {
+          name: nome,
+          url: publica(filePath),
+          size: conteudo.length,
+          type: tipo,
+          thumbnail_url: variantes ? publica(caminhoMiniatura) : null,
+          webp_url: variantes ? publica(caminhoExibicao) : null,
+        };
+      });
+    };
+
+    await new Promise<void>((resolve, reject) => {
+      const bb = busboy({
+        headers: { 'content-type': contentType },
+        limits: { fileSize: TAMANHO_MAXIMO, files: MAX_ARQUIVOS },
+      });
+
+      bb.on('field', (nome, valor) => {
+        if (nome === 'ordemId') definirOrdem(valor);
+      });
+
+      bb.on('file', (campo, arquivo, info) => {
+        if (campo !== 'files' || erroValidacao) {
+          arquivo.resume();
+          return;
+        }
+        // Verificar tipo de arquivo
+        if (!info.mimeType.startsWith('image/')) {
+          erroValidacao = 'Apenas imagens são permitidas';
+          arquivo.resume();
+          return;
+        }
+
+        const indice = tarefas.length;
+        const partes: Buffer[] = [];
+        const recebido = new Promise<Buffer>((resolveArquivo, rejectArquivo) => {
+          arquivo.on('data', (parte: Buffer) => partes.push(parte));
+          arquivo.on('limit', () => {
+            erroValidacao = 'Arquivo muito grande. Máximo 5MB por arquivo';
+          });
+          arquivo.on('end', () => resolveArquivo(Buffer.concat(partes)));
+          arquivo.on('error', rejectArquivo);
+        });
+        const tarefa = recebido.then(conteudo => processar(indice, info.filename || `imagem_${indice}`, info.mimeType, conteudo));
+        // Rejeições são tratadas no Promise.allSettled abaixo
+        tarefa.catch(() => {});
+        tarefas.push(tarefa);
+      });
+
+      bb.on('filesLimit', () => {
+        erroValidacao = `Máximo de ${MAX_ARQUIVOS} arquivos por envio`;
+      });
+      bb.on('close', () => {
+        definirOrdem(null);
+        resolve();
+      });
+      bb.on('error', reject);
+
+      Readable.fromWeb(request.body as any).on('error', reject).pipe(bb);
+    });
+
+    if (!erroValidacao && tarefas.length === 0) {
       return NextResponse.json(
         { error: 'Nenhum arquivo enviado' },
         { status: 400 }
       );
     }
 
-    if (!ordemId) {
+    const resultados = await Promise.allSettled(tarefas);
+    if (!erroValidacao && !(await ordemPronta)) {
       return NextResponse.json(
         { error: 'ID da ordem não fornecido' },
         { status: 400 }
       );
     }
 
-    const uploadedFiles = [];
-
-    for (const file of files) {
-      // Verificar tipo de arquivo
-      if (!file.type.startsWith('image/')) {
-        return NextResponse.json(
-          { error: 'Apenas imagens são permitidas' },
-          { status: 400 }
-        );
+    const falha = resultados.find((r): r is PromiseRejectedResult => r.status === 'rejected');
+    if (erroValidacao || falha) {
+      // Não deixar no Storage parte das fotos de um envio que falhou
+      if (enviados.length > 0) {
+        await supabase.storage.from(BUCKET).remove(enviados);
       }
-
-      // Verificar tamanho (5MB)
-      if (file.size > 5 * 1024 * 1024) {
-        return NextResponse.json(
-          { error: 'Arquivo muito grande. Máximo 5MB por arquivo' },
-          { status: 400 }
-        );
+      if (erroValidacao) {
+        return NextResponse.json({ error: erroValidacao }, { status: 400 });
       }
-
-      // Gerar nome de arquivo seguro
-      const timestamp = Date.now();
-      const rawName = file.name;
-      const safeName = rawName.replace(/[^a-zA-Z0-9.\-_]/g, '_');
-      const filePath = `${ordemId}/${timestamp}_${safeName}`;
-
-      // Upload para o Supabase Storage
-      const { error: uploadError } = await supabase.storage
-        .from('ordens-imagens')
-        .upload(filePath, file, { upsert: false });
-
-      if (uploadError) {
-        console.error('Erro no upload:', uploadError);
-        return NextResponse.json(
-          { error: 'Erro ao fazer upload da imagem: ' + uploadError.message },
-          { status: 500 }
-        );
-      }
-
-      // Obter URL pública
-      const { data: urlData } = supabase.storage
-        .from('ordens-imagens')
-        .getPublicUrl(filePath);
-
-      uploadedFiles.push({
-        name: file.name,
-        url: urlData.publicUrl,
-        size: file.size,
-        type: file.type
-      });
+      console.error('Erro no upload:', falha!.reason);
+      const mensagem = falha!.reason instanceof ErroUpload ? falha!.reason.message : 'Erro inesperado no upload';
+      return NextResponse.json({ error: mensagem }, { status: 500 });
     }
 
     return NextResponse.json({
       success: true,
-      files: uploadedFiles
+      files: resultados.map(r => (r as PromiseFulfilledResult<ArquivoEnviado>).value)
     });
 
   } catch (error) {
     console.error('Erro geral no upload:', error);
+    if (enviados.length > 0) {
+      await supabase.storage.from(BUCKET).remove(enviados).catch(() => {});
+    }
     return NextResponse.json(
       { error: 'Erro inesperado no upload' },
       { status: 500 }
@@ -1,23 +1,12 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { Client, LocalAuth } from 'whatsapp-web.js';
 import { createClient } from '@supabase/supabase-js';
-import path from 'path';
-import fs from 'fs';
+import { clienteAtivo, conectarWhatsApp, desconectarWhatsApp } from '@/lib/whatsappSessoes';
 
 // Configuração do Supabase
 const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
 const supabaseKey = process.env.SUPABASE_SERVICE_ROLE_KEY!;
 const supabase = createClient(supabaseUrl, supabaseKey);
 
-// Declaração global para clientes ativos
-declare global {
-  var activeClients: Map<string, Client>;
-}
-
-if (!global.activeClients) {
-  global.activeClients = new Map();
-}
-
 // Método GET para verificar status da conexão
 export async function GET(request: NextRequest) {
   try {
@@ -32,7 +21,7 @@ export async function GET(request: NextRequest) {
     }
 
     // Verificar se há cliente ativo
-    const hasActiveClient = global.activeClients.has(empresa_id);
+    const hasActiveClient = clienteAtivo(empresa_id);
     
     // Buscar status da sessão no banco
     const { data, error } = await supabase
@@ -78,6 +67,8 @@ export async function GET(request: NextRequest) {
 }
 
 // Método POST para conectar WhatsApp
+// O Client fica no gerenciador de sessões (src/lib/whatsappSessoes.ts), que também
+// o restaura do LocalAuth quando o servidor reinicia
 export async function POST(request: NextRequest) {
   try {
     const { empresa_id } = await request.json();
@@ -90,161 +81,31 @@ export async function POST(request: NextRequest) {
     }
 
     // Verificar se já existe um cliente ativo
-    if (global.activeClients.has(empresa_id)) {
+    if (clienteAtivo(empresa_id)) {
       return NextResponse.json(
         { error: 'Cliente já está conectado' },
         { status: 400 }
       );
     }
 
-    // Criar/atualizar sessão no banco
-    const { error: upsertError } = await supabase
-      .from('whatsapp_sessions')
-      .upsert({
-        empresa_id,
-        status: 'connecting',
-        qr_code: null,
-        numero_whatsapp: '',
-        nome_contato: '',
-        updated_at: new Date().toISOString()
-      });
-
-    if (upsertError) {
-      console.error('❌ WhatsApp: Erro ao criar/atualizar sessão no banco:', upsertError);
-      return NextResponse.json(
-        { error: 'Erro ao criar sessão no banco' },
-        { status: 500 }
-      );
-    }
-
-    // Configurar diretório de sessão
-    const sessionPath = path.join(process.cwd(), 'whatsapp-sessions', empresa_id);
-    if (!fs.existsSync(sessionPath)) {
-      fs.mkdirSync(sessionPath, { recursive: true });
-    }
-
-    // Criar cliente WhatsApp com Puppeteer integrado
-    const client = new Client({
-      authStrategy: new LocalAuth({
-        clientId: empresa_id,
-        dataPath: sessionPath
-      }),
-      puppeteer: {
-        headless: true,
-        args: [
-          '--no-sandbox',
-          '--disable-setuid-sandbox',
-          '--disable-dev-shm-usage',
-          '--disable-gpu',
-          '--disable-software-rasterizer',
-          '--disable-webgl',
-          '--disable-3d-apis',
-          '--disable-accelerated-2d-canvas',
-          '--disable-features=VizDisplayCompositor',
-          '--single-process',
-          '--no-zygote',
-          '--disable-extensions',
-          '--disable-background-timer-throttling',
-          '--disable-backgrounding-occluded-windows',
-          '--disable-renderer-backgrounding'
-        ]
-      }
-    });
-
-    // Eventos do cliente
-    client.on('qr', async (qr) => {
-      // Atualizar QR Code no banco
-      const { error: updateError } = await supabase
-        .from('whatsapp_sessions')
-        .update({
-          qr_code: qr,
-          status: 'qr_ready',
-          updated_at: new Date().toISOString()
-        })
-        .eq('empresa_id', empresa_id);
-
-      if (updateError) {
-        console.error('❌ WhatsApp: Erro ao atualizar QR Code no banco:', updateError);
-      } else {
-        }
-    });
-
-    client.on('ready', async () => {
-      // Atualizar status no banco
-      const { error: updateError } = await supabase
-        .from('whatsapp_sessions')
-        .update({
-          status: 'connected',
-          qr_code: null,
-          updated_at: new Date().toISOString()
-        })
-        .eq('empresa_id', empresa_id);
-
-      if (updateError) {
-        console.error('❌ WhatsApp: Erro ao atualizar status no banco:', updateError);
-      } else {
-        }
-    });
-
-    client.on('authenticated', () => {
-      });
-
-    client.on('auth_failure', (msg) => {
-      console.error('❌ WhatsApp: Falha na autenticação:', msg);
-    });
-
-    client.on('disconnected', async (reason) => {
-      // Remover cliente da lista global
-      global.activeClients.delete(empresa_id);
-      
-      // Atualizar status no banco
-      const { error: updateError } = await supabase
-        .from('whatsapp_sessions')
-        .update({
-          status: 'disconnected',
-          qr_code: null,
-          updated_at: new Date().toISOString()
-        })
-        .eq('empresa_id', empresa_id);
-
-      if (updateError) {
-        console.error('❌ WhatsApp: Erro ao atualizar status no banco:', updateError);
-      }
-    });
-
-    // Inicializar cliente com timeout
     try {
-      const initPromise = client.initialize();
-      const timeoutPromise = new Promise((_, reject) => {
-        setTimeout(() => reject(new Error('Timeout na inicialização do WhatsApp')), 30000);
-      });
-      
-      await Promise.race([initPromise, timeoutPromise]);
-      
-      // Adicionar cliente à lista global
-      global.activeClients.set(empresa_id, client);
-
-      return NextResponse.json({
-        success: true,
-        message: 'WhatsApp conectado com sucesso!',
-        status: 'connecting',
-        timestamp: new Date().toISOString()
-      }, {
-        headers: {
-          'Content-Type': 'application/json'
-        }
-      });
+      await conectarWhatsApp(empresa_id);
     } catch (initError) {
       console.error('❌ WhatsApp: Erro na inicialização:', initError);
-      
-      // Limpar cliente em caso de erro
-      if (global.activeClients.has(empresa_id)) {
-        global.activeClients.delete(empresa_id);
-      }
-      
       throw new Error(`Falha na inicialização: ${initError instanceof Error ? initError.message : 'Erro desconhecido'}`);
     }
 
+    return NextResponse.json({
+      success: true,
+      message: 'WhatsApp conectado com sucesso!',
+      status: 'connecting',
+      timestamp: new Date().toISOString()
+    }, {
+      headers: {
+        'Content-Type': 'application/json'
+      }
+    });
+
   } catch (error) {
     console.error('❌ WhatsApp: Erro ao conectar:', error);
     
@@ -266,4 +127,32 @@ export async function POST(request: NextRequest) {
       }
     );
   }
-}
\ No newline at end of file
+}
+
+// Método DELETE para desconectar WhatsApp (encerra a sessão e apaga o LocalAuth)
+export async function DELETE(request: NextRequest) {
+  try {
+    const { empresa_id } = await request.json();
+
+    if (!empresa_id) {
+      return NextResponse.json(
+        { error: 'Empresa ID é obrigatório' },
+        { status: 400 }
+      );
+    }
+
+    await desconectarWhatsApp(empresa_id);
+
+    return NextResponse.json({
+      success: true,
+      message: 'WhatsApp desconectado com sucesso!',
+      status: 'disconnected'
+    });
+  } catch (error) {
+    console.error('❌ WhatsApp: Erro ao desconectar:', error);
+    return NextResponse.json(
+      { error: 'Erro interno do servidor' },
+      { status: 500 }
+    );
+  }
+}
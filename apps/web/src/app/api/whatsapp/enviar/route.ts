@@ -1,22 +1,16 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { Client } from 'whatsapp-web.js';
-import { createClient } from '@supabase/supabase-js';
-
-// Configuração do Supabase
-const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
-const supabaseKey = process.env.SUPABASE_SERVICE_ROLE_KEY!;
-const supabase = createClient(supabaseUrl, supabaseKey);
-
-// Declaração global para clientes ativos
-declare global {
-  var activeClients: Map<string, Client>;
-}
+import { buscarSessao, buscarTecnico } from '@/lib/whatsappSessoes';
+import { enfileirarMensagem, mensagemNovaOS } from '@/lib/whatsappFila';
 
+// Aceita uma mensagem avulsa ({ empresa_id, numero, mensagem }) ou a notificação de
+// nova OS ({ empresa_id, tecnico_id, aparelho_info }, formato usado pelo
+// useWhatsAppNotification e pela página de configurações). Em ambos os casos a
+// mensagem vai para a fila da empresa e a resposta é 202.
 export async function POST(request: NextRequest) {
   try {
-    const { empresa_id, numero, mensagem } = await request.json();
+    const { empresa_id, numero, mensagem, tecnico_id, aparelho_info } = await request.json();
 
-    if (!empresa_id || !numero || !mensagem) {
+    if (!empresa_id || !((numero && mensagem) || (tecnico_id && aparelho_info))) {
       return NextResponse.json(
         { error: 'Empresa ID, número e mensagem são obrigatórios' },
         { status: 400 }
@@ -24,13 +18,9 @@ export async function POST(request: NextRequest) {
     }
 
     // Verificar se há uma sessão ativa
-    const { data: session, error: sessionError } = await supabase
-      .from('whatsapp_sessions')
-      .select('*')
-      .eq('empresa_id', empresa_id)
-      .single();
+    const session = await buscarSessao(empresa_id);
 
-    if (sessionError || !session) {
+    if (!session) {
       return NextResponse.json(
         { error: 'Sessão WhatsApp não encontrada' },
         { status: 404 }
@@ -44,39 +34,49 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Verificar se o cliente está ativo
-    if (!global.activeClients || !global.activeClients.has(empresa_id)) {
-      return NextResponse.json(
-        { error: 'Cliente WhatsApp não está ativo' },
-        { status: 400 }
-      );
+    let destino = numero as string;
+    let texto = mensagem as string;
+    if (!(numero && mensagem)) {
+      const tecnico = await buscarTecnico(tecnico_id);
+      if (!tecnico?.whatsapp_numero) {
+        return NextResponse.json(
+          { error: 'Técnico sem número de WhatsApp cadastrado' },
+          { status: 400 }
+        );
+      }
+      destino = tecnico.whatsapp_numero;
+      texto = mensagemNovaOS(tecnico.nome, aparelho_info);
     }
 
-    const client = global.activeClients.get(empresa_id)!;
-
-    // Enviar mensagem
-    const result = await client.sendMessage(numero + '@c.us', mensagem);
+    const mensagemId = await enfileirarMensagem({
+      empresa_id,
+      tecnico_id: tecnico_id || null,
+      numero_destino: destino,
+      mensagem: texto,
+      os_id: aparelho_info?.os_id || null
+    });
 
     return NextResponse.json({
       success: true,
-      message: 'Mensagem enviada com sucesso!',
-      message_id: result.id._serialized
-    });
+      queued: true,
+      message: 'Mensagem enfileirada para envio',
+      mensagem_id: mensagemId
+    }, { status: 202 });
 
   } catch (error) {
     console.error('❌ WhatsApp: Erro ao enviar mensagem:', error);
-    
+
     // Garantir que a resposta JSON seja válida
     const errorMessage = error instanceof Error ? error.message : 'Erro desconhecido';
-    
+
     return NextResponse.json(
-      { 
+      {
         success: false,
         error: 'Erro interno do servidor',
         message: errorMessage,
         timestamp: new Date().toISOString()
       },
-      { 
+      {
         status: 500,
         headers: {
           'Content-Type': 'application/json'
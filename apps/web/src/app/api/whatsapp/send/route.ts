@@ -1,21 +1,9 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@supabase/supabase-js';
-import { Client } from 'whatsapp-web.js';
-
-const supabase = createClient(
-  process.env.NEXT_PUBLIC_SUPABASE_URL!,
-  process.env.SUPABASE_SERVICE_ROLE_KEY!
-);
-
-// Importar o mapa de clientes ativos (em produção, use Redis)
-declare global {
-  var activeClients: Map<string, Client>;
-}
-
-if (!global.activeClients) {
-  global.activeClients = new Map();
-}
+import { buscarSessao, buscarTecnico } from '@/lib/whatsappSessoes';
+import { enfileirarMensagem, mensagemNovaOS } from '@/lib/whatsappFila';
 
+// Notificação de nova OS para o técnico. A mensagem entra na fila da empresa
+// (src/lib/whatsappFila.ts) e a resposta sai sem esperar o envio pelo WhatsApp.
 export async function POST(request: NextRequest) {
   try {
     const body = await request.json();
@@ -29,14 +17,9 @@ export async function POST(request: NextRequest) {
     }
 
     // 1. Verificar se a empresa tem WhatsApp conectado
-    const { data: session, error: sessionError } = await supabase
-      .from('whatsapp_sessions')
-      .select('*')
-      .eq('empresa_id', empresa_id)
-      .single();
+    const session = await buscarSessao(empresa_id);
 
-    if (sessionError || !session) {
-      console.error('❌ WhatsApp: Sessão não encontrada:', sessionError);
+    if (!session) {
       return NextResponse.json(
         { error: 'WhatsApp não conectado para esta empresa' },
         { status: 404 }
@@ -51,14 +34,9 @@ export async function POST(request: NextRequest) {
     }
 
     // 2. Buscar dados do técnico
-    const { data: tecnico, error: tecnicoError } = await supabase
-      .from('usuarios')
-      .select('nome, whatsapp_numero')
-      .eq('id', tecnico_id)
-      .single();
+    const tecnico = await buscarTecnico(tecnico_id);
 
-    if (tecnicoError || !tecnico) {
-      console.error('❌ WhatsApp: Técnico não encontrado:', tecnicoError);
+    if (!tecnico) {
       return NextResponse.json(
         { error: 'Técnico não encontrado' },
         { status: 404 }
@@ -72,69 +50,21 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // 3. Preparar mensagem
-    const mensagem = `🔔 *Nova OS Cadastrada*
-
-👨‍🔧 *Técnico:* ${tecnico.nome}
-📱 *Aparelho:* ${aparelho_info.marca} ${aparelho_info.modelo}
-👤 *Cliente:* ${aparelho_info.cliente_nome}
-🔧 *Problema:* ${aparelho_info.problema}
-🆔 *OS ID:* ${aparelho_info.os_id}
-
-Acesse o sistema para mais detalhes!`;
-
-    // 4. Enviar mensagem via WhatsApp Web
-    try {
-      // Enviar mensagem real via WhatsApp Web
-      const client = global.activeClients.get(empresa_id);
-      if (client) {
-        const chatId = `${tecnico.whatsapp_numero}@c.us`;
-        await client.sendMessage(chatId, mensagem);
-        } else {
-        throw new Error('WhatsApp não está conectado');
-      }
-
-      // 5. Registrar mensagem no banco
-      const { error: logError } = await supabase
-        .from('whatsapp_mensagens')
-        .insert({
-          empresa_id,
-          tecnico_id,
-          numero_destino: tecnico.whatsapp_numero,
-          mensagem,
-          status: 'enviado',
-          os_id: aparelho_info.os_id || null
-        });
-
-      if (logError) {
-        console.error('⚠️ WhatsApp: Erro ao registrar log:', logError);
-      }
-
-      return NextResponse.json({
-        success: true,
-        message: 'Mensagem enviada com sucesso'
-      });
-
-    } catch (sendError) {
-      console.error('❌ WhatsApp: Erro ao enviar mensagem:', sendError);
-      
-      // Registrar erro no banco
-      await supabase
-        .from('whatsapp_mensagens')
-        .insert({
-          empresa_id,
-          tecnico_id,
-          numero_destino: tecnico.whatsapp_numero,
-          mensagem,
-          status: 'erro',
-          os_id: aparelho_info.os_id || null
-        });
-
-      return NextResponse.json(
-        { error: 'Erro ao enviar mensagem via WhatsApp' },
-        { status: 500 }
-      );
-    }
+    // 3. Enfileirar mensagem
+    const mensagemId = await enfileirarMensagem({
+      empresa_id,
+      tecnico_id,
+      numero_destino: tecnico.whatsapp_numero,
+      mensagem: mensagemNovaOS(tecnico.nome, aparelho_info),
+      os_id: aparelho_info.os_id || null
+    });
+
+    return NextResponse.json({
+      success: true,
+      queued: true,
+      mensagem_id: mensagemId,
+      message: 'Mensagem enfileirada para envio'
+    }, { status: 202 });
 
   } catch (error) {
     console.error('❌ WhatsApp: Erro interno:', error);
@@ -10,6 +10,7 @@ import ProdutoServicoSearch from '@/components/ProdutoServicoSearch';
 import { Button } from '@/components/Button';
 import { useToast } from '@/components/Toast';
 import { useConfirm } from '@/components/ConfirmDialog';
+import { urlVariante } from '@/lib/imagensOS';
 
 export default function DetalheBancadaPage() {
   const params = useParams();
@@ -1135,7 +1136,9 @@ export default function DetalheBancadaPage() {
                     {imagensExistentes.map((url, index) => (
                       <div key={index} className="relative group">
                         <img
-                          src={url}
+                          src={urlVariante(url, 'thumbs')}
+                          onError={(e) => { if (e.currentTarget.src !== url) e.currentTarget.src = url; }}
+                          loading="lazy"
                           alt={`Imagem ${index + 1}`}
                           className="w-full h-24 object-cover rounded-lg border border-gray-200 shadow-sm"
                         />
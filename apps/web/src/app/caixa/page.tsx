@@ -70,6 +70,8 @@ export default function CaixaPage() {
   const [clientes, setClientes] = useState<Cliente[]>([]);
   const [searchCliente, setSearchCliente] = useState('');
   const [loadingClientes, setLoadingClientes] = useState(false);
+  const [clientesCursor, setClientesCursor] = useState<string | null>(null);
+  const [carregandoMaisClientes, setCarregandoMaisClientes] = useState(false);
   const clienteSearchRef = React.useRef<HTMLDivElement>(null);
 
   // Modal cadastro rápido de cliente
@@ -93,22 +95,26 @@ export default function CaixaPage() {
     };
   }, []);
 
-  // Buscar clientes
-  const buscarClientes = async (search = '') => {
+  // Buscar clientes (uma página; com cursor, acrescenta a próxima página à lista)
+  const buscarClientes = async (search = '', cursor?: string) => {
     if (!usuarioData?.empresa_id) return;
     
-    setLoadingClientes(true);
+    const setCarregando = cursor ? setCarregandoMaisClientes : setLoadingClientes;
+    setCarregando(true);
     try {
-      const response = await fetch(`/api/clientes?empresaId=${usuarioData.empresa_id}&search=${search}`);
+      const params = new URLSearchParams({ empresaId: usuarioData.empresa_id, search });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`/api/clientes?${params.toString()}`);
       const data = await response.json();
       
       if (data.clientes) {
-        setClientes(data.clientes);
+        setClientes(prev => cursor ? [...prev, ...data.clientes] : data.clientes);
+        setClientesCursor(data.nextCursor || null);
       }
     } catch (error) {
       console.error('Erro ao buscar clientes:', error);
     }
-    setLoadingClientes(false);
+    setCarregando(false);
   };
 
   // Selecionar cliente
@@ -466,7 +472,8 @@ export default function CaixaPage() {
     adicionarMovimentacao, 
     registrarVenda, 
     calcularSaldoAtual,
-    buscarUltimoValorFechamento
+    buscarUltimoValorFechamento,
+    ultimoFechamento
   } = useCaixa();
 
   // Função para fechar caixa
@@ -489,7 +496,6 @@ export default function CaixaPage() {
   const [valorMovimentacao, setValorMovimentacao] = useState('');
   const [descricaoMovimentacao, setDescricaoMovimentacao] = useState('');
   const [valorUltimoFechamento, setValorUltimoFechamento] = useState(0);
-  const [ultimoFechamento, setUltimoFechamento] = useState<{ data: string; usuario: string } | null>(null);
 
   // Buscar valor do último fechamento quando abrir o modal
   useEffect(() => {
@@ -500,13 +506,6 @@ export default function CaixaPage() {
     }
   }, [modalAbrirCaixa]);
 
-  // Buscar dados do último fechamento quando o caixa estiver fechado
-  useEffect(() => {
-    if (!turnoAtual && usuarioData?.empresa_id) {
-      buscarUltimoFechamento();
-    }
-  }, [turnoAtual, usuarioData]);
-
   // Controlar inicialização para evitar flash
   useEffect(() => {
     if (!caixaLoading && usuarioData && !isInitialized) {
@@ -518,33 +517,6 @@ export default function CaixaPage() {
     }
   }, [caixaLoading, usuarioData, isInitialized]);
 
-  const buscarUltimoFechamento = async () => {
-    if (!usuarioData?.empresa_id) return;
-
-    try {
-      const { data } = await supabase
-        .from('turnos_caixa')
-        .select(`
-          data_fechamento,
-          usuario:usuario_id(nome)
-        `)
-        .eq('empresa_id', usuarioData.empresa_id)
-        .eq('status', 'fechado')
-        .order('data_fechamento', { ascending: false })
-        .limit(1)
-        .maybeSingle();
-
-      if (data) {
-        setUltimoFechamento({
-          data: data.data_fechamento,
-          usuario: (data.usuario as any)?.nome || 'N/A'
-        });
-      }
-    } catch (error) {
-      console.error('Erro ao buscar último fechamento:', error);
-    }
-  };
-
   // Early return para loading - evita qualquer flash
   if (caixaLoading || !isInitialized || !usuarioData) {
     return (
@@ -595,8 +567,8 @@ export default function CaixaPage() {
                       <div className="mt-4 text-sm text-gray-500">
                         {ultimoFechamento ? (
                           <div>
-                            <div>Último fechamento: {new Date(ultimoFechamento.data).toLocaleString('pt-BR')}</div>
-                            <div>Por: {ultimoFechamento.usuario}</div>
+                            <div>Último fechamento: {new Date(ultimoFechamento.data_fechamento).toLocaleString('pt-BR')}</div>
+                            <div>Por: {ultimoFechamento.usuario?.nome || 'N/A'}</div>
                           </div>
                         ) : (
                           <div>Último fechamento: N/A</div>
@@ -756,6 +728,16 @@ export default function CaixaPage() {
                                       <p className="text-xs text-gray-500">#{cliente.numero_cliente}</p>
                                     </div>
                                   ))}
+                                  {clientesCursor && (
+                                    <button
+                                      type="button"
+                                      onClick={() => buscarClientes(searchCliente, clientesCursor)}
+                                      disabled={carregandoMaisClientes}
+                                      className="w-full p-2 text-center text-xs text-blue-600 hover:bg-gray-50 disabled:text-gray-400"
+                                    >
+                                      {carregandoMaisClientes ? 'Carregando...' : 'Carregar mais clientes'}
+                                    </button>
+                                  )}
                                 </div>
                               )}
                             </div>
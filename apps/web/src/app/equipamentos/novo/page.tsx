@@ -222,31 +222,13 @@ export default function NovoProdutoPage() {
   }, [produtoId]);
 
   const handleSubmit = async () => {
-    // Gerar código sequencial por empresa, somente se não estiver editando (novo produto)
+    // Produto novo: o código é alocado pelo banco (contador da empresa)
     const empresa_id = localStorage.getItem('empresa_id');
     if (!empresa_id) {
       addToast('error', 'Erro: empresa_id não encontrado. Faça login novamente.');
       return;
     }
 
-    if (!produtoId) {
-      let proximoCodigo = 1;
-      try {
-        const res = await fetch(`/api/produtos?empresa_id=${empresa_id}`);
-        if (res.ok && res.headers.get('content-type')?.includes('application/json')) {
-          const json = await res.json();
-          const ultimo = Number(json?.ultimoCodigo) || 0;
-          proximoCodigo = ultimo + 1;
-        } else {
-          const text = await res.text();
-          console.error('Erro GET /api/produtos:', res.status, text);
-        }
-      } catch (err) {
-        console.error('Erro ao buscar último código:', err);
-      }
-      formData.codigo = proximoCodigo.toString();
-    }
-
     // Checagem dos campos obrigatórios: apenas Nome e Preço de Venda
     if (!formData.nome || !formData.preco) {
       addToast('error', 'Por favor, preencha os campos obrigatórios: Nome e Preço de Venda.');
@@ -257,24 +257,8 @@ export default function ProdutosServicosPage() {
       return;
     }
 
-    // Buscar o maior código já existente
-    const { data: ultimos, error: erroUltimos } = await supabase
-      .from('produtos_servicos')
-      .select('codigo')
-      // Não filtrar por empresa_id manualmente, RLS já faz isso
-      .order('codigo', { ascending: false })
-      .limit(1);
-
-    let novoCodigo = '1';
-    if (!erroUltimos && ultimos && ultimos.length > 0 && ultimos[0].codigo) {
-      const ultimoNumero = parseInt(ultimos[0].codigo);
-      if (!isNaN(ultimoNumero)) {
-        novoCodigo = (ultimoNumero + 1).toString();
-      }
-    }
-
+    // O código é alocado pelo banco (contador da empresa)
     const novoRegistro = {
-      codigo: novoCodigo,
       nome,
       descricao,
       preco: parseFloat(preco),
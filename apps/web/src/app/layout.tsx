@@ -17,14 +17,14 @@ import { Toaster } from 'react-hot-toast';
 import StickyOrcamentoPopup from '@/components/StickyOrcamentoPopup';
 
 function AuthContent({ children }: { children: React.ReactNode }) {
-  const { user, loading, signOut } = useAuth();
+  const { user, loading, signOut, empresaData } = useAuth();
   const pathname = usePathname();
   const [showLogout, setShowLogout] = useState(false);
   const [bypassTrialGuard, setBypassTrialGuard] = useState(false);
 
 
 
-  useRealtimeNotificacoes();
+  useRealtimeNotificacoes(empresaData?.id);
   useAutoReload();
 
   useEffect(() => {
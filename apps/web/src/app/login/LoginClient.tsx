@@ -361,30 +361,17 @@ function LoginClientInner() {
       return;
     }
     
-    // Buscar dados do usuário
+    // Buscar dados do usuário (nível e empresa na mesma consulta)
     const userId = session.user.id;
-    const { data: perfil, error: perfilError } = await supabase
-      .from('usuarios')
-      .select('nivel')
-      .eq('auth_user_id', userId)
-      .single();
-    
-    if (perfilError || !perfil) {
-      setIsSubmitting(false);
-      addToast('error', 'Erro ao buscar perfil do usuário. Tente novamente.');
-      return;
-    }
-    
-    // Verificar empresa
     const { data: usuario, error: usuarioError } = await supabase
       .from('usuarios')
-      .select('empresa_id')
+      .select('nivel, empresa_id')
       .eq('auth_user_id', userId)
       .single();
     
     if (usuarioError || !usuario) {
       setIsSubmitting(false);
-      addToast('error', 'Dados do usuário incompletos. Entre em contato com o suporte.');
+      addToast('error', 'Erro ao buscar perfil do usuário. Tente novamente.');
       return;
     }
     
@@ -455,7 +442,7 @@ function LoginClientInner() {
     localStorage.setItem("user", JSON.stringify({
       id: userId,
       email: emailToLogin,
-      nivel: perfil.nivel
+      nivel: usuario.nivel
     }));
     localStorage.setItem("empresa_id", usuario.empresa_id);
     
@@ -411,17 +411,7 @@ function NovaOS2Content() {
     const empresaId = getCompanyId();
     setCadastrando(true);
     
-    // Buscar próximo número de cliente
-    const { data: maxResult } = await supabase
-      .from('clientes')
-      .select('numero_cliente')
-      .eq('empresa_id', empresaId)
-      .order('numero_cliente', { ascending: false })
-      .limit(1)
-      .single();
-
-    const proximoNumero = maxResult?.numero_cliente ? maxResult.numero_cliente + 1 : 1;
-
+    // numero_cliente é alocado pelo banco (contador da empresa)
     const clientePayload = {
       empresa_id: empresaId,
       nome: data.nome,
@@ -429,7 +419,6 @@ function NovaOS2Content() {
       celular: data.whatsapp,
       email: data.email || '',
       documento: data.cpf,
-      numero_cliente: proximoNumero,
       data_cadastro: new Date().toISOString(),
       status: 'ativo',
       tipo: 'pf'
@@ -9,6 +9,7 @@ import { useToast } from '@/components/Toast';
 import { useConfirm } from '@/components/ConfirmDialog';
 import { useAuth } from '@/context/AuthContext';
 import { useStatusHistorico } from '@/hooks/useStatusHistorico';
+import { urlVariante } from '@/lib/imagensOS';
 import { FiArrowLeft, FiSave, FiUser, FiCheckCircle, FiTool, FiFileText } from 'react-icons/fi';
 
 interface Item {
@@ -1041,7 +1042,9 @@ export default function EditarOSSimples() {
                     {imagens.map((img, index) => (
                       <div key={index} className="relative group">
                         <img
-                          src={img}
+                          src={urlVariante(img, 'thumbs')}
+                          onError={(e) => { if (e.currentTarget.src !== img) e.currentTarget.src = img; }}
+                          loading="lazy"
                           alt={`Anexo ${index + 1}`}
                           className="w-full h-32 object-cover rounded-lg border border-gray-200"
                         />
@@ -153,19 +153,8 @@ export default function ClienteForm({ cliente, returnToOS }: { cliente?: Cliente
       }
     }
 
-    // Buscar o maior numero_cliente atual para a empresa e calcular o próximo, preservando ao editar
-    let numeroCliente = cliente?.numero_cliente;
-    if (!numeroCliente) {
-      const { data: maxResult } = await supabase
-        .from('clientes')
-        .select('numero_cliente')
-        .eq('empresa_id', empresaId)
-        .order('numero_cliente', { ascending: false })
-        .limit(1)
-        .single();
-
-      numeroCliente = maxResult?.numero_cliente ? maxResult.numero_cliente + 1 : 1;
-    }
+    // Preserva o número ao editar; no cadastro o banco aloca o próximo (contador da empresa)
+    const numeroCliente = cliente?.numero_cliente || null;
 
     const clientePayload = {
       empresa_id: empresaId,
@@ -2,6 +2,7 @@
 
 import { useState } from 'react';
 import { FiX, FiZoomIn, FiDownload } from 'react-icons/fi';
+import { urlVariante } from '@/lib/imagensOS';
 
 interface ImagensOSProps {
   imagens: string;
@@ -61,7 +62,9 @@ export default function ImagensOS({ imagens, ordemId }: ImagensOSProps) {
           {imageUrls.map((imageUrl, index) => (
             <div key={index} className="relative group">
               <img
-                src={imageUrl}
+                src={urlVariante(imageUrl, 'thumbs')}
+                onError={(e) => { if (e.currentTarget.src !== imageUrl) e.currentTarget.src = imageUrl; }}
+                loading="lazy"
                 alt={`Imagem ${index + 1} da OS ${ordemId}`}
                 className="w-full h-32 object-cover rounded-lg border border-gray-200 shadow-sm cursor-pointer hover:shadow-md transition-shadow"
                 onClick={() => openModal(imageUrl)}
@@ -96,7 +99,8 @@ export default function ImagensOS({ imagens, ordemId }: ImagensOSProps) {
         <div className="fixed inset-0 bg-black bg-opacity-75 flex items-center justify-center z-50 p-4">
           <div className="relative max-w-4xl max-h-[90vh]">
             <img
-              src={selectedImage}
+              src={urlVariante(selectedImage, 'webp')}
+              onError={(e) => { if (e.currentTarget.src !== selectedImage) e.currentTarget.src = selectedImage; }}
               alt="Imagem ampliada"
               className="max-w-full max-h-full object-contain rounded-lg"
             />
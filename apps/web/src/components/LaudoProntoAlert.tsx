@@ -103,18 +103,6 @@ export default function LaudoProntoAlert() {
     // Buscar dados iniciais
     fetchLaudosProntos();
 
-    // Testar conexão Realtime primeiro
-    const testChannel = supabase
-      .channel('test_connection')
-      .on('postgres_changes', {
-        event: '*',
-        schema: 'public',
-        table: 'ordens_servico'
-      }, (payload: any) => {
-        })
-      .subscribe((status: any) => {
-        });
-
     // Configurar subscription em tempo real
     const channel = supabase
       .channel('laudos_prontos_changes')
@@ -136,7 +124,6 @@ export default function LaudoProntoAlert() {
 
     // Cleanup da subscription
     return () => {
-      supabase.removeChannel(testChannel);
       supabase.removeChannel(channel);
     };
   }, [empresaData?.id]);
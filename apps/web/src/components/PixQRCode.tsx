@@ -218,37 +218,79 @@ export default function PixQRCode({ valor, descricao, onSuccess, onError, mock,
     return () => clearInterval(id);
   }, [expiresIn]);
 
-  // Polling leve para status do pagamento
+  // Status do pagamento por server-sent events (GET /api/pagamentos/status/stream);
+  // se o stream não estiver disponível, volta ao polling leve
   useEffect(() => {
     if (!qrCodeData?.pagamento_id && !qrCodeData?.payment_id) return;
     let stopped = false;
+    let fonte: EventSource | null = null;
+    let pollId: ReturnType<typeof setInterval> | null = null;
+    const params = new URLSearchParams();
+    if (qrCodeData?.pagamento_id) params.set('pagamento_id', qrCodeData.pagamento_id);
+    if (qrCodeData?.payment_id) params.set('payment_id', qrCodeData.payment_id);
+
+    const aplicarStatus = (status: string) => {
+      setQrCodeData(prev => prev ? { ...prev, status } : prev);
+      if (status === 'approved') {
+        triggerConfetti();
+        // pequeno delay para UX e permitir atualização de backend
+        setTimeout(() => {
+          if (!stopped) window.location.href = '/dashboard';
+        }, 10000);
+      }
+    };
+
     const poll = async () => {
       try {
-        const authHeader = {} as Record<string, string>;
-        const params = new URLSearchParams();
-        if (qrCodeData?.pagamento_id) params.set('pagamento_id', qrCodeData.pagamento_id);
-        if (qrCodeData?.payment_id) params.set('payment_id', qrCodeData.payment_id);
         // Usa rota interna do admin que consulta MP e sincroniza
-        const res = await fetch(`/api/admin-saas/pagamentos/status?${params.toString()}`, { cache: 'no-store', headers: { ...authHeader } });
+        const res = await fetch(`/api/admin-saas/pagamentos/status?${params.toString()}`, { cache: 'no-store' });
         const json = await res.json();
         if (res.ok && json?.status) {
-          setQrCodeData(prev => prev ? { ...prev, status: json.status } : prev);
-          if (json.status === 'approved') {
-            triggerConfetti();
-            // pequeno delay para UX e permitir atualização de backend
-            setTimeout(() => {
-              if (!stopped) window.location.href = '/dashboard';
-            }, 10000);
-          }
-        } else if (res.status === 401) {
+          aplicarStatus(json.status);
+        } else if (res.status === 401 && pollId) {
           // para evitar loop quando sessão não é reconhecida
-          stopped = true;
+          clearInterval(pollId);
         }
       } catch (_) {}
     };
-    const id = setInterval(poll, 4000);
-    poll();
-    return () => { stopped = true; clearInterval(id); };
+
+    const iniciarPolling = () => {
+      if (pollId || stopped) return;
+      pollId = setInterval(poll, 4000);
+      poll();
+    };
+
+    (async () => {
+      const { data: { session } } = await supabaseBrowser.auth.getSession();
+      if (stopped) return;
+      if (!session?.access_token || typeof EventSource === 'undefined') {
+        iniciarPolling();
+        return;
+      }
+      // EventSource não envia headers: o token vai na query
+      const streamParams = new URLSearchParams(params);
+      streamParams.set('access_token', session.access_token);
+      fonte = new EventSource(`/api/pagamentos/status/stream?${streamParams.toString()}`);
+      fonte.addEventListener('status', (event) => {
+        try {
+          const json = JSON.parse((event as MessageEvent).data);
+          if (!json?.status) return;
+          aplicarStatus(json.status);
+          // Status final: o servidor fecha o stream; sem isso o EventSource reconectaria
+          if (['approved', 'rejected', 'cancelled', 'refunded', 'charged_back'].includes(json.status)) fonte?.close();
+        } catch (_) {}
+      });
+      fonte.onerror = () => {
+        // Reconexões automáticas ficam em CONNECTING; CLOSED = rota recusou (401/404)
+        if (fonte?.readyState === EventSource.CLOSED) iniciarPolling();
+      };
+    })();
+
+    return () => {
+      stopped = true;
+      fonte?.close();
+      if (pollId) clearInterval(pollId);
+    };
   }, [qrCodeData?.pagamento_id, qrCodeData?.payment_id]);
 
   const StatusBadge = () => {
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
-import { supabase } from '@/lib/supabaseClient';
 import { useAuth } from '@/context/AuthContext';
+import { authHeaders } from '@/lib/supabaseClient';
 
 export interface TurnoCaixa {
   id: string;
@@ -15,12 +15,16 @@ export interface TurnoCaixa {
   valor_suprimentos: number;
   valor_diferenca: number;
   valor_troco: number | null;
+  saldo_atual: number;
   status: 'aberto' | 'fechado';
   observacoes: string | null;
   empresa_id: string;
   usuario?: {
     nome: string;
   };
+  caixa?: {
+    nome: string;
+  };
 }
 
 export interface MovimentacaoCaixa {
@@ -33,11 +37,34 @@ export interface MovimentacaoCaixa {
   data_movimentacao: string;
   venda_id: string | null;
   empresa_id: string;
+  saldo_apos?: number | null;
   usuario?: {
     nome: string;
   };
 }
 
+export interface VendasPorForma {
+  forma_pagamento: string;
+  quantidade: number;
+  total: number;
+}
+
+export interface UltimoFechamento {
+  data_fechamento: string;
+  valor_troco: number | null;
+  usuario?: {
+    nome: string;
+  };
+}
+
+// Resposta de GET /api/caixa/turno (caixa_turno_estado)
+interface EstadoTurno {
+  turno: TurnoCaixa | null;
+  movimentacoes: MovimentacaoCaixa[];
+  vendas_por_forma: VendasPorForma[];
+  ultimo_fechamento: UltimoFechamento | null;
+}
+
 export interface Caixa {
   id: string;
   nome: string;
@@ -49,28 +76,30 @@ export const useCaixa = () => {
   const { usuarioData } = useAuth();
   const [turnoAtual, setTurnoAtual] = useState<TurnoCaixa | null>(null);
   const [movimentacoes, setMovimentacoes] = useState<MovimentacaoCaixa[]>([]);
+  const [vendasPorForma, setVendasPorForma] = useState<VendasPorForma[]>([]);
+  const [ultimoFechamento, setUltimoFechamento] = useState<UltimoFechamento | null>(null);
   const [loading, setLoading] = useState(false);
   const [verificacaoInicial, setVerificacaoInicial] = useState(false);
 
-  // Função para obter data/hora no fuso brasileiro
-  const getDataHoraBrasil = () => {
-    const agora = new Date();
-    // Formatar diretamente no fuso brasileiro
-    const dataBrasil = agora.toLocaleString('pt-BR', { 
-      timeZone: 'America/Sao_Paulo',
-      year: 'numeric',
-      month: '2-digit',
-      day: '2-digit',
-      hour: '2-digit',
-      minute: '2-digit',
-      second: '2-digit',
-      hour12: false
+  // Turno, movimentações, vendas por forma e último fechamento chegam juntos
+  const aplicarEstado = (estado: EstadoTurno) => {
+    setTurnoAtual(estado.turno);
+    setMovimentacoes(estado.movimentacoes || []);
+    setVendasPorForma(estado.vendas_por_forma || []);
+    setUltimoFechamento(estado.ultimo_fechamento);
+  };
+
+  const enviarAcao = async (payload: Record<string, unknown>) => {
+    const response = await fetch('/api/caixa/turno', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', ...(await authHeaders()) },
+      body: JSON.stringify(payload),
     });
-    // Converter para formato ISO
-    const [data, hora] = dataBrasil.split(', ');
-    const [dia, mes, ano] = data.split('/');
-    const [horaStr, minutoStr, segundoStr] = hora.split(':');
-    return `${ano}-${mes}-${dia}T${horaStr}:${minutoStr}:${segundoStr}.000Z`;
+    const data = await response.json().catch(() => ({}));
+    if (!response.ok) {
+      throw new Error(data.error || 'Erro ao atualizar o caixa');
+    }
+    return data;
   };
 
   // Verificar se há turno aberto apenas na inicialização
@@ -86,25 +115,12 @@ export const useCaixa = () => {
 
     setLoading(true);
     try {
-      const { data, error } = await supabase
-        .from('turnos_caixa')
-        .select(`
-          *,
-          usuario:usuario_id(nome)
-        `)
-        .eq('empresa_id', usuarioData.empresa_id)
-        .eq('status', 'aberto')
-        .maybeSingle();
-
-      if (error) {
-        console.error('Erro ao verificar turno:', error);
+      const response = await fetch('/api/caixa/turno', { cache: 'no-store', headers: await authHeaders() });
+      if (!response.ok) {
+        console.error('Erro ao verificar turno:', response.status);
         return;
       }
-
-      setTurnoAtual(data);
-      if (data) {
-        await buscarMovimentacoes(data.id);
-      }
+      aplicarEstado(await response.json());
     } catch (error) {
       console.error('Erro ao verificar turno aberto:', error);
     } finally {
@@ -112,88 +128,18 @@ export const useCaixa = () => {
     }
   };
 
-  const buscarMovimentacoes = async (turnoId: string) => {
-    try {
-      const { data } = await supabase
-        .from('movimentacoes_caixa')
-        .select(`
-          *,
-          usuario:usuario_id(nome)
-        `)
-        .eq('turno_id', turnoId)
-        .order('data_movimentacao', { ascending: false });
-
-      setMovimentacoes(data || []);
-    } catch (error) {
-      console.error('Erro ao buscar movimentações:', error);
-    }
-  };
-
   const abrirCaixa = async (valorAbertura: number, observacoes?: string) => {
     if (!usuarioData?.empresa_id) throw new Error('Empresa não encontrada');
 
     setLoading(true);
     try {
-      // Verificar se já existe turno aberto
-      const { data: turnoExistente } = await supabase
-        .from('turnos_caixa')
-        .select('id')
-        .eq('empresa_id', usuarioData.empresa_id)
-        .eq('status', 'aberto')
-        .maybeSingle();
-
-      if (turnoExistente) {
-        throw new Error('Já existe um turno aberto');
-      }
-
-      // Buscar ou criar caixa padrão
-      let { data: caixa } = await supabase
-        .from('caixas')
-        .select('id')
-        .eq('empresa_id', usuarioData.empresa_id)
-        .eq('nome', 'Caixa Principal')
-        .maybeSingle();
-
-      if (!caixa) {
-        const { data: novoCaixa } = await supabase
-          .from('caixas')
-          .insert({
-            nome: 'Caixa Principal',
-            empresa_id: usuarioData.empresa_id
-          })
-          .select('id')
-          .single();
-        caixa = novoCaixa;
-      }
-
-      // Buscar usuario_id
-      const { data: usuario } = await supabase
-        .from('usuarios')
-        .select('id')
-        .eq('auth_user_id', (await supabase.auth.getUser()).data.user?.id)
-        .single();
-
-      if (!usuario) throw new Error('Usuário não encontrado');
-
-      // Criar novo turno
-      const { data: novoTurno } = await supabase
-        .from('turnos_caixa')
-        .insert({
-          caixa_id: caixa.id,
-          usuario_id: usuario.id,
-          valor_abertura: valorAbertura,
-          observacoes,
-          empresa_id: usuarioData.empresa_id
-        })
-        .select(`
-          *,
-          usuario:usuario_id(nome)
-        `)
-        .single();
-
-      setTurnoAtual(novoTurno);
-      setMovimentacoes([]);
-      return novoTurno;
+      const estado: EstadoTurno = await enviarAcao({
+        acao: 'abrir',
+        valor_abertura: valorAbertura,
+        observacoes
+      });
+      aplicarEstado(estado);
+      return estado.turno;
     } finally {
       setLoading(false);
     }
@@ -204,56 +150,32 @@ export const useCaixa = () => {
 
     setLoading(true);
     try {
-      const saldoEsperado = turnoAtual.valor_abertura + 
-        turnoAtual.valor_vendas + 
-        turnoAtual.valor_suprimentos - 
-        turnoAtual.valor_sangrias;
-      
-      const valorDiferenca = valorFechamento - saldoEsperado;
-
-      const dadosUpdate = {
-        data_fechamento: new Date().toISOString(),
+      const estado: EstadoTurno = await enviarAcao({
+        acao: 'fechar',
+        turno_id: turnoAtual.id,
         valor_fechamento: valorFechamento,
         valor_troco: valorTroco,
-        status: 'fechado',
         observacoes: observacoes || turnoAtual.observacoes || null
-      };
-
-      // Primeiro, tentar apenas o update sem select
-      const { error: updateError } = await supabase
-        .from('turnos_caixa')
-        .update(dadosUpdate)
-        .eq('id', turnoAtual.id);
-
-      if (updateError) {
-        throw new Error(`Erro no update: ${updateError.message}`);
-      }
-
-      // Depois, buscar os dados atualizados
-      const { data, error: selectError } = await supabase
-        .from('turnos_caixa')
-        .select(`
-          *,
-          usuario:usuario_id(nome)
-        `)
-        .eq('id', turnoAtual.id)
-        .single();
-
-      if (selectError) {
-        console.error('Erro ao buscar dados atualizados:', selectError);
-        // Não vamos falhar aqui, pois o update já foi feito
-      }
+      });
 
       // Limpar estado local
       setTurnoAtual(null);
       setMovimentacoes([]);
-      
-      return data;
+      setVendasPorForma([]);
+      setUltimoFechamento(estado.ultimo_fechamento);
+
+      return estado.turno;
     } finally {
       setLoading(false);
     }
   };
 
+  // Totais do turno recalculados no banco (trigger de movimentacoes_caixa)
+  const aplicarMovimentacao = (movimentacao: MovimentacaoCaixa, totais: Partial<TurnoCaixa>) => {
+    setTurnoAtual(prev => prev ? { ...prev, ...totais } : null);
+    setMovimentacoes(prev => [movimentacao, ...prev]);
+  };
+
   const adicionarMovimentacao = async (
     tipo: 'sangria' | 'suprimento',
     valor: number,
@@ -263,58 +185,8 @@ export const useCaixa = () => {
     if (!usuarioData?.empresa_id) throw new Error('Empresa não encontrada');
 
     try {
-      // Buscar usuario_id
-      const { data: usuario } = await supabase
-        .from('usuarios')
-        .select('id')
-        .eq('auth_user_id', (await supabase.auth.getUser()).data.user?.id)
-        .single();
-
-      if (!usuario) throw new Error('Usuário não encontrado');
-
-      // Adicionar movimentação
-      const { data: movimentacao } = await supabase
-        .from('movimentacoes_caixa')
-        .insert({
-          turno_id: turnoAtual.id,
-          tipo,
-          valor,
-          descricao,
-          usuario_id: usuario.id,
-          empresa_id: usuarioData.empresa_id,
-          data_movimentacao: getDataHoraBrasil()
-        })
-        .select(`
-          *,
-          usuario:usuario_id(nome)
-        `)
-        .single();
-
-      // Atualizar valores do turno
-      const novoValorSangrias = tipo === 'sangria' 
-        ? turnoAtual.valor_sangrias + valor 
-        : turnoAtual.valor_sangrias;
-      
-      const novoValorSuprimentos = tipo === 'suprimento' 
-        ? turnoAtual.valor_suprimentos + valor 
-        : turnoAtual.valor_suprimentos;
-
-      await supabase
-        .from('turnos_caixa')
-        .update({
-          valor_sangrias: novoValorSangrias,
-          valor_suprimentos: novoValorSuprimentos
-        })
-        .eq('id', turnoAtual.id);
-
-      // Atualizar estado local
-      setTurnoAtual(prev => prev ? {
-        ...prev,
-        valor_sangrias: novoValorSangrias,
-        valor_suprimentos: novoValorSuprimentos
-      } : null);
-
-      setMovimentacoes(prev => [movimentacao, ...prev]);
+      const { movimentacao, turno } = await enviarAcao({ acao: 'movimentar', tipo, valor, descricao });
+      aplicarMovimentacao(movimentacao, turno);
       return movimentacao;
     } catch (error) {
       console.error('Erro ao adicionar movimentação:', error);
@@ -327,53 +199,14 @@ export const useCaixa = () => {
     if (!usuarioData?.empresa_id) return;
 
     try {
-      // Buscar usuario_id
-      const { data: usuario } = await supabase
-        .from('usuarios')
-        .select('id')
-        .eq('auth_user_id', (await supabase.auth.getUser()).data.user?.id)
-        .single();
-
-      if (!usuario) return;
-
-      // Registrar movimentação da venda
-      await supabase
-        .from('movimentacoes_caixa')
-        .insert({
-          turno_id: turnoAtual.id,
-          tipo: 'venda',
-          valor,
-          descricao: `Venda #${vendaId}`,
-          usuario_id: usuario.id,
-          venda_id: vendaId,
-          empresa_id: usuarioData.empresa_id,
-          data_movimentacao: getDataHoraBrasil()
-        });
-
-      // Atualizar valor de vendas no turno
-      const novoValorVendas = turnoAtual.valor_vendas + valor;
-      
-      await supabase
-        .from('turnos_caixa')
-        .update({
-          valor_vendas: novoValorVendas
-        })
-        .eq('id', turnoAtual.id);
-
-      // Vincular venda ao turno
-      await supabase
-        .from('vendas')
-        .update({
-          turno_id: turnoAtual.id
-        })
-        .eq('id', vendaId);
-
-      // Atualizar estado local
-      setTurnoAtual(prev => prev ? {
-        ...prev,
-        valor_vendas: novoValorVendas
-      } : null);
-
+      // vendaId = numero_venda; a rota vincula a venda ao turno
+      const { movimentacao, turno } = await enviarAcao({
+        acao: 'movimentar',
+        tipo: 'venda',
+        valor,
+        venda_id: vendaId
+      });
+      aplicarMovimentacao(movimentacao, turno);
     } catch (error) {
       console.error('Erro ao registrar venda no caixa:', error);
     }
@@ -381,26 +214,24 @@ export const useCaixa = () => {
 
   const calcularSaldoAtual = () => {
     if (!turnoAtual) return 0;
-    return turnoAtual.valor_abertura + 
-           turnoAtual.valor_vendas + 
-           turnoAtual.valor_suprimentos - 
-           turnoAtual.valor_sangrias;
+    return turnoAtual.saldo_atual ?? (
+      turnoAtual.valor_abertura +
+      turnoAtual.valor_vendas +
+      turnoAtual.valor_suprimentos -
+      turnoAtual.valor_sangrias
+    );
   };
 
   const buscarUltimoValorFechamento = async (): Promise<number> => {
+    if (ultimoFechamento) return ultimoFechamento.valor_troco || 0;
     if (!usuarioData?.empresa_id) return 0;
 
     try {
-      const { data } = await supabase
-        .from('turnos_caixa')
-        .select('valor_troco')
-        .eq('empresa_id', usuarioData.empresa_id)
-        .eq('status', 'fechado')
-        .order('data_fechamento', { ascending: false })
-        .limit(1)
-        .maybeSingle();
-
-      return data?.valor_troco || 0;
+      const response = await fetch('/api/caixa/turno', { cache: 'no-store', headers: await authHeaders() });
+      if (!response.ok) return 0;
+      const estado: EstadoTurno = await response.json();
+      setUltimoFechamento(estado.ultimo_fechamento);
+      return estado.ultimo_fechamento?.valor_troco || 0;
     } catch (error) {
       console.error('Erro ao buscar último valor de fechamento:', error);
       return 0;
@@ -410,6 +241,8 @@ export const useCaixa = () => {
   return {
     turnoAtual,
     movimentacoes,
+    vendasPorForma,
+    ultimoFechamento,
     loading,
     abrirCaixa,
     fecharCaixa,
@@ -419,4 +252,4 @@ export const useCaixa = () => {
     verificarTurnoAberto,
     buscarUltimoValorFechamento
   };
-}; 
\ No newline at end of file
+};
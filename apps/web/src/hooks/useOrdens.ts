@@ -2,7 +2,7 @@ import { useState, useCallback, useEffect } from 'react';
 import { useAuth } from '@/context/AuthContext';
 import { useToast } from './useToast';
 import { useSupabaseRetry } from './useRetry';
-import { supabase } from '@/lib/supabaseClient';
+import { authHeaders, supabase } from '@/lib/supabaseClient';
 
 export interface OrdemTransformada {
   id: string;
@@ -35,6 +35,9 @@ export interface OrdemTransformada {
 interface UseOrdensReturn {
   ordens: OrdemTransformada[];
   loading: boolean;
+  loadingMore: boolean;
+  hasMore: boolean;
+  loadMore: () => Promise<void>;
   error: any;
   totalOS: number;
   fetchOrdens: (forceRefresh?: boolean) => Promise<void>;
@@ -42,6 +45,13 @@ interface UseOrdensReturn {
   handleRetry: () => Promise<void>;
 }
 
+const TAMANHO_PAGINA = 100;
+const CAMPOS_LISTAGEM = [
+  'numero_os', 'cliente_id', 'categoria', 'marca', 'modelo', 'status', 'status_tecnico', 'tecnico_id',
+  'tipo', 'valor_faturado', 'valor_peca', 'valor_servico', 'forma_pagamento', 'observacao', 'relato',
+  'condicoes_equipamento', 'cor', 'numero_serie', 'acessorios', 'atendente', 'senha_acesso', 'data_entrega',
+].join(',');
+
 export const useOrdens = (): UseOrdensReturn => {
   const { empresaData } = useAuth();
   const empresaId = empresaData?.id;
@@ -53,6 +63,8 @@ export const useOrdens = (): UseOrdensReturn => {
   const [error, setError] = useState<any>(null);
   const [lastFetchTime, setLastFetchTime] = useState(0);
   const [cacheKey, setCacheKey] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Funções auxiliares de formatação
   const formatDate = useCallback((dateString: string) => {
@@ -90,6 +102,44 @@ export const useOrdens = (): UseOrdensReturn => {
     return formas[forma] || forma;
   }, []);
 
+  const transformarOrdem = useCallback((ordem: any): OrdemTransformada => ({
+    id: ordem.id,
+    numeroOS: ordem.numero_os?.toString() || '',
+    cliente: ordem.clientes?.nome || 'Cliente não informado',
+    telefone: formatPhoneNumber(ordem.clientes?.telefone || ''),
+    categoria: ordem.categoria || '',
+    marca: ordem.marca || '',
+    modelo: ordem.modelo || '',
+    statusOS: ordem.status || '',
+    statusTecnico: ordem.status_tecnico || '',
+    entrada: formatDate(ordem.created_at),
+    prazoEntrega: ordem.data_entrega ? formatDate(ordem.data_entrega) : '',
+    tecnico: ordem.usuarios?.nome || 'Não atribuído',
+    tipo: ordem.tipo || 'Normal',
+    valorFaturado: ordem.valor_faturado || 0,
+    valorPeca: ordem.valor_peca || 0,
+    valorServico: ordem.valor_servico || 0,
+    formaPagamento: formatFormaPagamento(ordem.forma_pagamento || ''),
+    observacao: ordem.observacao || '',
+    relato: ordem.relato || '',
+    condicoesEquipamento: ordem.condicoes_equipamento || '',
+    cor: ordem.cor || '',
+    numeroSerie: ordem.numero_serie || '',
+    acessorios: ordem.acessorios || '',
+    atendente: ordem.atendente || '',
+    senhaAcesso: ordem.senha_acesso || ''
+  }), [formatDate, formatPhoneNumber, formatFormaPagamento]);
+
+  // Uma página da listagem paginada no servidor (GET /api/ordens)
+  const buscarPagina = useCallback(async (cursor?: string) => {
+    const params = new URLSearchParams({ limit: String(TAMANHO_PAGINA), campos: CAMPOS_LISTAGEM });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`/api/ordens?${params.toString()}`, { cache: 'no-store', headers: await authHeaders() });
+    const body = await response.json();
+    if (!response.ok) throw new Error(body?.error || `Erro ${response.status} ao buscar ordens`);
+    return body as { ordens: any[]; nextCursor: string | null };
+  }, []);
+
   // Função principal de busca
   const fetchOrdens = useCallback(async (forceRefresh = false) => {
     if (!empresaId || !empresaId.trim()) {
@@ -125,81 +175,12 @@ export const useOrdens = (): UseOrdensReturn => {
     
     try {
       await executeWithRetry(async () => {
-        const { data, error } = await Promise.race([
-          supabase
-            .from('ordens_servico')
-            .select(`
-              id,
-              numero_os,
-              cliente_id,
-              categoria,
-              marca,
-              modelo,
-              status,
-              status_tecnico,
-              created_at,
-              tecnico_id,
-              tipo,
-              valor_faturado,
-              valor_peca,
-              valor_servico,
-              forma_pagamento,
-              observacao,
-              relato,
-              condicoes_equipamento,
-              cor,
-              numero_serie,
-              acessorios,
-              atendente,
-              senha_acesso,
-              data_entrega,
-              clientes!cliente_id(
-                nome,
-                telefone
-              ),
-              usuarios!tecnico_id(
-                nome
-              )
-            `)
-            .eq('empresa_id', empresaId)
-            .order('created_at', { ascending: false })
-            .limit(500),
-          new Promise((_, reject) => 
-            setTimeout(() => reject(new Error('Timeout')), 15000)
-          )
-        ]);
-
-        if (error) throw error;
-
-        const ordensFormatadas: OrdemTransformada[] = (data || []).map((ordem: any) => ({
-          id: ordem.id,
-          numeroOS: ordem.numero_os?.toString() || '',
-          cliente: ordem.clientes?.nome || 'Cliente não informado',
-          telefone: formatPhoneNumber(ordem.clientes?.telefone || ''),
-          categoria: ordem.categoria || '',
-          marca: ordem.marca || '',
-          modelo: ordem.modelo || '',
-          statusOS: ordem.status || '',
-          statusTecnico: ordem.status_tecnico || '',
-          entrada: formatDate(ordem.created_at),
-          prazoEntrega: ordem.data_entrega ? formatDate(ordem.data_entrega) : '',
-          tecnico: ordem.usuarios?.nome || 'Não atribuído',
-          tipo: ordem.tipo || 'Normal',
-          valorFaturado: ordem.valor_faturado || 0,
-          valorPeca: ordem.valor_peca || 0,
-          valorServico: ordem.valor_servico || 0,
-          formaPagamento: formatFormaPagamento(ordem.forma_pagamento || ''),
-          observacao: ordem.observacao || '',
-          relato: ordem.relato || '',
-          condicoesEquipamento: ordem.condicoes_equipamento || '',
-          cor: ordem.cor || '',
-          numeroSerie: ordem.numero_serie || '',
-          acessorios: ordem.acessorios || '',
-          atendente: ordem.atendente || '',
-          senhaAcesso: ordem.senha_acesso || ''
-        }));
+        const { ordens: data, nextCursor: cursor } = await buscarPagina();
+
+        const ordensFormatadas: OrdemTransformada[] = (data || []).map(transformarOrdem);
 
         setOrdens(ordensFormatadas);
+        setNextCursor(cursor);
         setLastFetchTime(now);
         setCacheKey(currentCacheKey);
       });
@@ -210,7 +191,23 @@ export const useOrdens = (): UseOrdensReturn => {
     } finally {
       setLoading(false);
     }
-  }, [empresaId, executeWithRetry, addToast, formatDate, formatPhoneNumber, formatFormaPagamento, cacheKey, lastFetchTime, ordens.length]);
+  }, [empresaId, executeWithRetry, addToast, buscarPagina, transformarOrdem, cacheKey, lastFetchTime, ordens.length]);
+
+  // Próxima página (keyset) acrescentada à lista já carregada
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const { ordens: data, nextCursor: cursor } = await buscarPagina(nextCursor);
+      setOrdens(prev => [...prev, ...(data || []).map(transformarOrdem)]);
+      setNextCursor(cursor);
+    } catch (err: any) {
+      console.error('❌ Erro ao carregar mais ordens:', err);
+      addToast('Erro ao carregar mais ordens de serviço', 'error');
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [nextCursor, loadingMore, buscarPagina, transformarOrdem, addToast]);
 
   // Função para alterar status
   const handleStatusChange = useCallback((ordemId: string, newStatus: string, newStatusTecnico: string) => {
@@ -239,6 +236,9 @@ export const useOrdens = (): UseOrdensReturn => {
   return {
     ordens,
     loading,
+    loadingMore,
+    hasMore: nextCursor !== null,
+    loadMore,
     error,
     totalOS: ordens.length,
     fetchOrdens,
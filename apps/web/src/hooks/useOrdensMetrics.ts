@@ -1,96 +1,71 @@
-import { useMemo } from 'react';
-import { OrdemTransformada } from './useOrdens';
+import { useState, useCallback, useEffect } from 'react';
+import { useAuth } from '@/context/AuthContext';
+import { authHeaders } from '@/lib/supabaseClient';
 
-export const useOrdensMetrics = (ordens: OrdemTransformada[]) => {
-  const metrics = useMemo(() => {
-    const hoje = new Date();
-    const inicioMes = new Date(hoje.getFullYear(), hoje.getMonth(), 1);
-    const inicioSemana = new Date(hoje.setDate(hoje.getDate() - hoje.getDay()));
-    const mesAnterior = new Date(hoje.getFullYear(), hoje.getMonth() - 1, 1);
-    
-    // Métricas diárias
-    const hojeAgora = new Date();
-    const inicioDia = new Date(hojeAgora.getFullYear(), hojeAgora.getMonth(), hojeAgora.getDate());
-    const fimDia = new Date(hojeAgora.getFullYear(), hojeAgora.getMonth(), hojeAgora.getDate() + 1);
+export interface OrdensMetrics {
+  totalOS: number;
+  percentualRetornos: number;
+  osHoje: number;
+  faturamentoHoje: number;
+  ticketMedioHoje: number;
+  retornosHoje: number;
+  aprovadosHoje: number;
+  totalMes: number;
+  retornosMes: number;
+  ordensSemana: number;
+  ordensSemanaAnterior: number;
+  ordensMesAnterior: number;
+  crescimentoSemanal: number;
+  crescimentoMensal: number;
+}
 
-    const osHoje = ordens.filter(os => {
-      let dataOS: Date;
-      if (typeof os.entrada === 'string') {
-        const match = os.entrada.match(/^(\d{4})-(\d{2})-(\d{2})/);
-        if (match) {
-          const [, year, month, day] = match;
-          dataOS = new Date(parseInt(year), parseInt(month) - 1, parseInt(day));
-        } else {
-          dataOS = new Date(os.entrada);
-        }
-      } else {
-        dataOS = new Date(os.entrada);
-      }
-      
-      return dataOS >= inicioDia && dataOS < fimDia;
-    }).length;
+const METRICAS_VAZIAS: OrdensMetrics = {
+  totalOS: 0,
+  percentualRetornos: 0,
+  osHoje: 0,
+  faturamentoHoje: 0,
+  ticketMedioHoje: 0,
+  retornosHoje: 0,
+  aprovadosHoje: 0,
+  totalMes: 0,
+  retornosMes: 0,
+  ordensSemana: 0,
+  ordensSemanaAnterior: 0,
+  ordensMesAnterior: 0,
+  crescimentoSemanal: 0,
+  crescimentoMensal: 0
+};
 
-    const faturamentoHoje = ordens.filter(os => {
-      const dataOS = new Date(os.entrada);
-      return dataOS >= inicioDia && dataOS < fimDia && os.valorFaturado;
-    }).reduce((sum: number, o: any) => sum + (o.valorFaturado || 0), 0);
+// Métricas calculadas no servidor sobre todas as OS da empresa (GET /api/ordens/metrics),
+// não apenas sobre a página carregada por useOrdens
+export const useOrdensMetrics = () => {
+  const { empresaData } = useAuth();
+  const empresaId = empresaData?.id;
 
-    const ticketMedioHoje = osHoje > 0 ? faturamentoHoje / osHoje : 0;
+  const [metrics, setMetrics] = useState<OrdensMetrics>(METRICAS_VAZIAS);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<any>(null);
 
-    const retornosHoje = ordens.filter(os => {
-      const dataOS = new Date(os.entrada);
-      return dataOS >= inicioDia && dataOS < fimDia && os.tipo === 'Retorno';
-    }).length;
+  const recarregar = useCallback(async () => {
+    if (!empresaId) return;
+    setLoading(true);
+    setError(null);
+    try {
+      const response = await fetch('/api/ordens/metrics', { cache: 'no-store', headers: await authHeaders() });
+      const body = await response.json();
+      if (!response.ok) throw new Error(body?.error || `Erro ${response.status} ao buscar métricas`);
+      setMetrics({ ...METRICAS_VAZIAS, ...body });
+    } catch (err: any) {
+      console.error('❌ Erro ao buscar métricas de ordens:', err);
+      setError(err);
+    } finally {
+      setLoading(false);
+    }
+  }, [empresaId]);
 
-    const aprovadosHoje = ordens.filter(os => {
-      const dataOS = new Date(os.entrada);
-      return dataOS >= inicioDia && dataOS < fimDia && 
-             (os.statusOS?.toLowerCase() === 'aprovado' || 
-              os.statusTecnico?.toLowerCase() === 'aprovado');
-    }).length;
+  useEffect(() => {
+    recarregar();
+  }, [recarregar]);
 
-    // Métricas gerais
-    const totalOS = ordens.length;
-    const totalMes = ordens.filter((o: any) => new Date(o.entrada) >= inicioMes).length;
-    const retornosMes = ordens.filter((o: any) => o.tipo === 'Retorno' && new Date(o.entrada) >= inicioMes).length;
-    const percentualRetornos = totalOS > 0 ? Math.round((retornosMes / totalOS) * 100) : 0;
-
-    // Crescimento
-    const ordensSemana = ordens.filter((o: any) => new Date(o.entrada) >= inicioSemana).length;
-    const ordensSemanaAnterior = ordens.filter((o: any) => {
-      const data = new Date(o.entrada);
-      const semanaAnterior = new Date(inicioSemana);
-      semanaAnterior.setDate(semanaAnterior.getDate() - 7);
-      return data >= semanaAnterior && data < inicioSemana;
-    }).length;
-
-    const ordensMesAnterior = ordens.filter((o: any) => {
-      const data = new Date(o.entrada);
-      return data >= mesAnterior && data < inicioMes;
-    }).length;
-
-    const calcPercent = (atual: number, anterior: number) => {
-      if (anterior === 0) return atual > 0 ? 100 : 0;
-      return Math.round(((atual - anterior) / anterior) * 100);
-    };
-
-    return {
-      totalOS,
-      percentualRetornos,
-      osHoje,
-      faturamentoHoje,
-      ticketMedioHoje,
-      retornosHoje,
-      aprovadosHoje,
-      totalMes,
-      retornosMes,
-      ordensSemana,
-      ordensSemanaAnterior,
-      ordensMesAnterior,
-      crescimentoSemanal: calcPercent(ordensSemana, ordensSemanaAnterior),
-      crescimentoMensal: calcPercent(totalMes, ordensMesAnterior)
-    };
-  }, [ordens]);
-
-  return metrics;
-};
\ No newline at end of file
+  return { ...metrics, loading, error, recarregar };
+};
@@ -13,36 +13,8 @@ export function useRealtimeNotificacoes(empresaId?: string | null) {
   const isBrowser = typeof window !== 'undefined';
   // Mantém o último ID visto para evitar duplicidade e permitir fallback por polling
   const lastSeenIdRef = useRef<{ empresaId?: string | null; lastId?: string | null; lastSeenTime?: number }>({ empresaId: null, lastId: null });
-  const intervalsRef = useRef<Record<string, any>>({});
   const [notificacoesFixas, setNotificacoesFixas] = useState<any[]>([]);
 
-  function shouldKeepAlerting(status?: string | null, statusTecnico?: string | null): boolean {
-    // ✅ CORREÇÃO: Só alerta se orçamento pendente E status não indica conclusão
-    const s = (status || '').toUpperCase();
-    const st = (statusTecnico || '').toUpperCase();
-    
-    // Não alertar se status indica que já foi processado/finalizado
-    const statusFinalizados = [
-      'AGUARDANDO RETIRADA',
-      'AGUARDANDO_RETIRADA', 
-      'ENTREGUE',
-      'FINALIZADA',
-      'CONCLUIDA',
-      'CONCLUÍDO',
-      'CANCELADA'
-    ];
-    
-    if (statusFinalizados.some(status => s.includes(status))) {
-      return false;
-    }
-    
-    // Só alerta se tem orçamento pendente
-    if (st.includes('ORÇAMENTO')) return true;
-    if (s.includes('ORÇAMENTO')) return true;
-    if (s.includes('AGUARDANDO') && (s.includes('APROVACAO') || s.includes('APROVAÇÃO'))) return true;
-    return false;
-  }
-
   function buildPopupNode(params: { numero?: string | number; mensagem?: string; createdAt?: string }) {
     const { numero, mensagem, createdAt } = params;
     return (
@@ -141,27 +113,6 @@ export function useRealtimeNotificacoes(empresaId?: string | null) {
     }
   }
 
-  function startReminderIfNeeded(osId?: string | null) {
-    if (!osId || !isBrowser) return;
-    if (intervalsRef.current[osId]) return; // já ativo
-    intervalsRef.current[osId] = setInterval(async () => {
-      try {
-        const { data } = await supabase
-          .from('ordens_servico')
-          .select('status, status_tecnico, numero_os')
-          .eq('id', osId)
-          .single();
-        if (!data) return;
-        if (shouldKeepAlerting(data.status as any, (data as any).status_tecnico)) {
-          presentPopup({ tipo: 'orcamento_enviado', os_id: osId, numero_os: (data as any).numero_os, mensagem: 'Orçamento enviado. Aguardando sua aprovação.' });
-        } else {
-          clearInterval(intervalsRef.current[osId]);
-          delete intervalsRef.current[osId];
-        }
-      } catch {}
-    }, 10 * 60 * 1000); // 10 minutos
-  }
-
   useEffect(() => {
     if (!empresaId || !isBrowser) return;
 
@@ -175,19 +126,23 @@ export function useRealtimeNotificacoes(empresaId?: string | null) {
       return;
     }
 
-    // --- Realtime via Supabase (sem filtro no canal; filtramos no handler para evitar incompatibilidades) ---
+    // --- Realtime via Supabase: canal da empresa, filtrado no servidor ---
+    // Cada aba recebe só as notificações da própria empresa. Lembretes de orçamento
+    // pendente chegam por aqui como 'orcamento_lembrete' (cron /api/notificacoes/lembretes):
+    // INSERT no primeiro lembrete da OS, UPDATE nos seguintes.
     let channel: any;
     if (isBrowser) {
       channel = supabase
         .channel(`notificacoes_realtime_${empresaId}`)
-        .on('postgres_changes', { event: 'INSERT', schema: 'public', table: 'notificacoes' }, (payload: any) => {
+        .on('postgres_changes', {
+          event: 'INSERT',
+          schema: 'public',
+          table: 'notificacoes',
+          filter: `empresa_id=eq.${empresaId}`
+        }, (payload: any) => {
         const nova = (payload as any)?.new;
         if (!nova) return;
         
-        if (nova.empresa_id !== empresaId) {
-          return;
-        }
-        
         // Processa a nova notificação
         presentPopup(nova);
         
@@ -195,6 +150,16 @@ export function useRealtimeNotificacoes(empresaId?: string | null) {
         if (nova.tipo === 'reparo_concluido') {
           buscarNotificacoesFixas();
         }
+      })
+        // O lembrete de orçamento é uma linha por OS, reativada pelo cron com UPDATE
+        .on('postgres_changes', {
+          event: 'UPDATE',
+          schema: 'public',
+          table: 'notificacoes',
+          filter: `empresa_id=eq.${empresaId}`
+        }, (payload: any) => {
+        const lembrete = (payload as any)?.new;
+        if (lembrete?.tipo === 'orcamento_lembrete' && !lembrete.lida) presentPopup(lembrete);
       })
         .subscribe((status: any) => {
           if (status === 'SUBSCRIBED') {
@@ -211,19 +176,9 @@ export function useRealtimeNotificacoes(empresaId?: string | null) {
     };
   }, [empresaId, isBrowser]);
 
-  // Cleanup dos intervals ao desmontar
-  useEffect(() => {
-    return () => {
-      Object.values(intervalsRef.current).forEach(interval => {
-        if (interval) clearInterval(interval);
-      });
-    };
-  }, []);
-
   return {
     notificacoesFixas,
     marcarClienteAvisado,
-    startReminderIfNeeded,
     buscarNotificacoesFixas
   };
 }
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useAuth } from '@/context/AuthContext';
-import { supabase } from '@/lib/supabaseClient';
+import { authHeaders } from '@/lib/supabaseClient';
 
 interface Plano {
   id: string;
@@ -43,7 +43,56 @@ export const useSubscription = () => {
   const [limites, setLimites] = useState<Limites | null>(null);
   const [loading, setLoading] = useState(true);
 
-  // Buscar assinatura real do banco de dados
+  // Assinatura e uso do plano em uma chamada (GET /api/assinatura/uso, com cache curto no servidor)
+  const fetchUso = async (atualizar = false) => {
+    const response = await fetch(`/api/assinatura/uso${atualizar ? '?atualizar=1' : ''}`, {
+      cache: 'no-store',
+      headers: await authHeaders(),
+    });
+    if (!response.ok) {
+      console.error('Erro ao buscar uso do plano:', response.status);
+      return;
+    }
+    const { assinatura: assinaturaData, uso } = await response.json();
+    if (!assinaturaData) return;
+
+    // Mapear dados da assinatura
+    const assinaturaMapeada: Assinatura = {
+      id: assinaturaData.id,
+      empresa_id: assinaturaData.empresa_id,
+      plano_id: assinaturaData.plano_id,
+      status: assinaturaData.status,
+      data_inicio: assinaturaData.data_inicio || assinaturaData.created_at,
+      data_fim: assinaturaData.data_fim,
+      data_trial_fim: assinaturaData.data_trial_fim,
+      proxima_cobranca: assinaturaData.proxima_cobranca,
+      valor: assinaturaData.valor || 0,
+      plano: {
+        id: assinaturaData.planos.id,
+        nome: assinaturaData.planos.nome,
+        descricao: assinaturaData.planos.descricao,
+        preco: assinaturaData.planos.preco,
+        limite_usuarios: assinaturaData.planos.limite_usuarios,
+        limite_produtos: assinaturaData.planos.limite_produtos,
+        limite_clientes: assinaturaData.planos.limite_clientes,
+        limite_fornecedores: assinaturaData.planos.limite_fornecedores,
+        limite_ordens: 100, // Valor padrão
+        recursos_disponiveis: assinaturaData.planos.recursos_disponiveis || {}
+      }
+    };
+    const plano = assinaturaMapeada.plano;
+
+    setAssinatura(assinaturaMapeada);
+    setLimites({
+      usuarios: { atual: uso.usuarios, limite: plano.limite_usuarios || 5 },
+      produtos: { atual: uso.produtos, limite: plano.limite_produtos || 50 },
+      servicos: { atual: uso.servicos, limite: 50 }, // Valor padrão
+      clientes: { atual: uso.clientes, limite: plano.limite_clientes || 100 },
+      ordens: { atual: uso.ordens, limite: plano.limite_ordens || 100 },
+      fornecedores: { atual: uso.fornecedores, limite: plano.limite_fornecedores || 10 }
+    });
+  };
+
   useEffect(() => {
     if (!user || !usuarioData?.empresa_id) {
       setLoading(false);
@@ -53,53 +102,7 @@ export const useSubscription = () => {
     const fetchAssinatura = async () => {
       try {
         setLoading(true);
-        
-        // Buscar assinatura da empresa - com tratamento de erro mais robusto
-        const { data: assinaturaData, error: assinaturaError } = await supabase
-          .from('assinaturas')
-          .select(`
-            *,
-            planos!inner(nome, descricao, preco, limite_usuarios, limite_produtos, limite_clientes, limite_fornecedores, recursos_disponiveis)
-          `)
-          .eq('empresa_id', usuarioData.empresa_id)
-          .order('created_at', { ascending: false })
-          .limit(1);
-
-        // Se não há erro e há dados, pegar o primeiro item
-        if (!assinaturaError && assinaturaData && assinaturaData.length > 0) {
-          const primeiraAssinatura = assinaturaData[0];
-          // Mapear dados da assinatura
-          const assinaturaMapeada: Assinatura = {
-            id: primeiraAssinatura.id,
-            empresa_id: primeiraAssinatura.empresa_id,
-            plano_id: primeiraAssinatura.plano_id,
-            status: primeiraAssinatura.status,
-            data_inicio: primeiraAssinatura.data_inicio || primeiraAssinatura.created_at,
-            data_fim: primeiraAssinatura.data_fim,
-            data_trial_fim: primeiraAssinatura.data_trial_fim,
-            proxima_cobranca: primeiraAssinatura.proxima_cobranca,
-            valor: primeiraAssinatura.valor || 0,
-            plano: {
-              id: primeiraAssinatura.planos.id,
-              nome: primeiraAssinatura.planos.nome,
-              descricao: primeiraAssinatura.planos.descricao,
-              preco: primeiraAssinatura.planos.preco,
-              limite_usuarios: primeiraAssinatura.planos.limite_usuarios,
-              limite_produtos: primeiraAssinatura.planos.limite_produtos,
-              limite_clientes: primeiraAssinatura.planos.limite_clientes,
-              limite_fornecedores: primeiraAssinatura.planos.limite_fornecedores,
-              limite_ordens: 100, // Valor padrão
-              recursos_disponiveis: primeiraAssinatura.planos.recursos_disponiveis || {}
-            }
-          };
-
-          setAssinatura(assinaturaMapeada);
-          
-          // Buscar limites reais
-          await fetchLimites(usuarioData.empresa_id);
-        } else if (assinaturaError && assinaturaError.code !== 'PGRST116') {
-          console.error('Erro ao buscar assinatura:', assinaturaError);
-        }
+        await fetchUso();
       } catch (error) {
         console.error('Erro ao buscar assinatura:', error);
       } finally {
@@ -110,41 +113,6 @@ export const useSubscription = () => {
     fetchAssinatura();
   }, [user, usuarioData?.empresa_id]);
 
-  // Buscar limites reais da empresa
-  const fetchLimites = async (empresaId: string) => {
-    try {
-      // Buscar contadores reais
-      const [
-        { count: usuariosCount },
-        { count: produtosCount },
-        { count: servicosCount },
-        { count: clientesCount },
-        { count: ordensCount },
-        { count: fornecedoresCount }
-      ] = await Promise.all([
-        supabase.from('usuarios').select('*', { count: 'exact', head: true }).eq('empresa_id', empresaId),
-        supabase.from('produtos').select('*', { count: 'exact', head: true }).eq('empresa_id', empresaId),
-        supabase.from('servicos').select('*', { count: 'exact', head: true }).eq('empresa_id', empresaId),
-        supabase.from('clientes').select('*', { count: 'exact', head: true }).eq('empresa_id', empresaId),
-        supabase.from('ordens_servico').select('*', { count: 'exact', head: true }).eq('empresa_id', empresaId),
-        supabase.from('fornecedores').select('*', { count: 'exact', head: true }).eq('empresa_id', empresaId)
-      ]);
-
-      const limitesReais: Limites = {
-        usuarios: { atual: usuariosCount || 0, limite: assinatura?.plano.limite_usuarios || 5 },
-        produtos: { atual: produtosCount || 0, limite: assinatura?.plano.limite_produtos || 50 },
-        servicos: { atual: servicosCount || 0, limite: 50 }, // Valor padrão
-        clientes: { atual: clientesCount || 0, limite: assinatura?.plano.limite_clientes || 100 },
-        ordens: { atual: ordensCount || 0, limite: 100 }, // Valor padrão
-        fornecedores: { atual: fornecedoresCount || 0, limite: assinatura?.plano.limite_fornecedores || 10 }
-      };
-
-      setLimites(limitesReais);
-    } catch (error) {
-      console.error('Erro ao buscar limites:', error);
-    }
-  };
-
   // Funções de verificação reais
   const isTrialExpired = (): boolean => {
     if (!assinatura || assinatura.status !== 'trial') return false;
@@ -187,13 +155,13 @@ export const useSubscription = () => {
   // Funções para recarregar dados
   const carregarAssinatura = async () => {
     if (usuarioData?.empresa_id) {
-      await fetchLimites(usuarioData.empresa_id);
+      await fetchUso(true);
     }
   };
 
   const carregarLimites = async () => {
     if (usuarioData?.empresa_id) {
-      await fetchLimites(usuarioData.empresa_id);
+      await fetchUso(true);
     }
   };
 
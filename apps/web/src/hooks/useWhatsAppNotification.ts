@@ -12,18 +12,6 @@ export function useWhatsAppNotification() {
       return;
     }
 
-    // TESTE: Vamos primeiro testar se o canal está funcionando
-    const testChannel = supabase
-      .channel('test-channel')
-      .on('postgres_changes', {
-        event: '*',
-        schema: 'public',
-        table: 'ordens_servico'
-      }, (payload: any) => {
-        })
-      .subscribe((status: any) => {
-        });
-
     // Canal para monitorar novas OS
     const channel = supabase
       .channel('whatsapp-notifications')
@@ -132,7 +120,6 @@ export function useWhatsAppNotification() {
         });
 
     return () => {
-      supabase.removeChannel(testChannel);
       supabase.removeChannel(channel);
     };
   }, [empresaData?.id]);
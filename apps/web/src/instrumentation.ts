@@ -0,0 +1,10 @@
+// Executado uma vez quando o servidor Next sobe
+export async function register() {
+  if (process.env.NEXT_RUNTIME !== 'nodejs') return;
+
+  // Restaura as sessões do WhatsApp salvas no LocalAuth e retoma as filas de envio
+  const { iniciarGerenciadorWhatsApp } = await import('@/lib/whatsappSessoes');
+  iniciarGerenciadorWhatsApp().catch(err => {
+    console.error('❌ WhatsApp: Erro ao iniciar gerenciador de sessões:', err);
+  });
+}
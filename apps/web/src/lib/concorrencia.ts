@@ -0,0 +1,60 @@
+// Utilitários para chamadas em paralelo a APIs externas (Mercado Pago, Storage)
+
+// Executa fn sobre os itens com no máximo `limite` execuções simultâneas
+export async function comLimite<T, R>(itens: T[], limite: number, fn: (item: T) => Promise<R>) {
+  const resultados: R[] = new Array(itens.length);
+  let proximo = 0;
+  const trabalhadores = Array.from({ length: Math.min(limite, itens.length) }, async () => {
+    while (proximo < itens.length) {
+      const indice = proximo++;
+      resultados[indice] = await fn(itens[indice]);
+    }
+  });
+  await Promise.all(trabalhadores);
+  return resultados;
+}
+
+// Para tarefas que chegam aos poucos (ex.: arquivos de um upload em streaming):
+// devolve uma função que executa fn assim que houver vaga entre as `limite` em andamento
+export function criarLimitador(limite: number) {
+  let ativas = 0;
+  const fila: Array<() => void> = [];
+  return async function <R>(fn: () => Promise<R>): Promise<R> {
+    // A vaga de quem termina passa direto para o próximo da fila
+    if (ativas >= limite) await new Promise<void>(resolve => fila.push(resolve));
+    else ativas++;
+    try {
+      return await fn();
+    } finally {
+      const proximo = fila.shift();
+      if (proximo) proximo();
+      else ativas--;
+    }
+  };
+}
+
+const esperar = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+// Estado compartilhado entre as chamadas de um pool: um 429 pausa todas, não só a que o recebeu
+export interface LimiteDeTaxa {
+  pausadoAte: number;
+}
+
+// Repete fn em 429 (respeitando Retry-After) e em erros 5xx/de rede, com backoff exponencial e jitter
+export async function comBackoff<R>(fn: () => Promise<R>, limite: LimiteDeTaxa = { pausadoAte: 0 }, tentativas = 5): Promise<R> {
+  for (let tentativa = 0; ; tentativa++) {
+    const pausa = limite.pausadoAte - Date.now();
+    if (pausa > 0) await esperar(pausa);
+    try {
+      return await fn();
+    } catch (error: any) {
+      const status = Number(error?.status) || 0;
+      const recuperavel = status === 429 || status >= 500 || status === 0;
+      if (!recuperavel || tentativa + 1 >= tentativas) throw error;
+
+      const atraso = error?.retryAfterMs ?? Math.min(30_000, 500 * 2 ** tentativa) * (0.5 + Math.random());
+      if (status === 429) limite.pausadoAte = Math.max(limite.pausadoAte, Date.now() + atraso);
+      await esperar(atraso);
+    }
+  }
+}
@@ -0,0 +1,20 @@
+// URLs das variantes geradas por /api/upload para cada imagem da OS no bucket
+// ordens-imagens. Para <ordem>/<arquivo>:
+//   <ordem>/thumbs/<arquivo sem extensão>.webp  miniatura (até 320px) para listas e grades
+//   <ordem>/webp/<arquivo sem extensão>.webp    versão de exibição (até 1600px)
+// Imagens antigas não têm variantes; quem exibe deve voltar para a original no onError.
+
+export type VarianteImagem = 'thumbs' | 'webp';
+
+export function caminhoVariante(caminho: string, variante: VarianteImagem) {
+  const barra = caminho.lastIndexOf('/');
+  const pasta = caminho.slice(0, barra + 1);
+  const arquivo = caminho.slice(barra + 1).replace(/\.[^.]*$/, '');
+  return `${pasta}${variante}/${arquivo}.webp`;
+}
+
+export function urlVariante(url: string, variante: VarianteImagem) {
+  if (!url.includes('/ordens-imagens/')) return url;
+  const [semQuery] = url.split('?');
+  return caminhoVariante(semQuery, variante);
+}
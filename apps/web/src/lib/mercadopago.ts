@@ -19,4 +19,29 @@ const configureMercadoPago = () => {
   return { config, Preference, Payment };
 };
 
-export { configureMercadoPago }; 
\ No newline at end of file
+// Consulta um pagamento no Mercado Pago.
+// MERCADOPAGO_API_BASE_URL aponta a consulta para um stand-in local (testes de carga dos webhooks)
+const buscarPagamento = async (paymentId: string): Promise<any> => {
+  const baseUrl = process.env.MERCADOPAGO_API_BASE_URL;
+  if (!baseUrl) {
+    const { config, Payment } = configureMercadoPago();
+    return new Payment(config).get({ id: paymentId });
+  }
+
+  const response = await fetch(`${baseUrl.replace(/\/$/, '')}/v1/payments/${encodeURIComponent(paymentId)}`, {
+    headers: { Authorization: `Bearer ${process.env.MERCADOPAGO_ACCESS_TOKEN || ''}` },
+    cache: 'no-store',
+  });
+  if (response.status === 404) return null;
+  if (!response.ok) {
+    // status e Retry-After para o backoff de src/lib/concorrencia.ts
+    const retryAfter = Number(response.headers.get('retry-after'));
+    throw Object.assign(new Error(`Mercado Pago respondeu ${response.status}`), {
+      status: response.status,
+      retryAfterMs: retryAfter > 0 ? retryAfter * 1000 : undefined,
+    });
+  }
+  return response.json();
+};
+
+export { configureMercadoPago, buscarPagamento }; 
\ No newline at end of file
@@ -0,0 +1,31 @@
+import { EventEmitter } from 'events';
+
+// Mudanças de status de pagamento publicadas por quem as aplica (worker dos webhooks,
+// reconciliação) e entregues a GET /api/pagamentos/status/stream.
+// Barramento em memória do processo; o stream relê o banco periodicamente para
+// cobrir mudanças aplicadas por outra instância.
+
+export interface StatusPagamento {
+  pagamento_id: string;
+  payment_id: string | null;
+  status: string;
+  paid_at: string | null;
+}
+
+export const STATUS_FINAIS = new Set(['approved', 'rejected', 'cancelled', 'refunded', 'charged_back']);
+
+// No globalThis para sobreviver ao hot reload do Next em desenvolvimento
+const globalParaEventos = globalThis as unknown as { __pagamentosEventos?: EventEmitter };
+const eventos = globalParaEventos.__pagamentosEventos ?? new EventEmitter().setMaxListeners(0);
+globalParaEventos.__pagamentosEventos = eventos;
+
+export function publicarStatusPagamento(status: StatusPagamento) {
+  eventos.emit(status.pagamento_id, status);
+}
+
+export function assinarStatusPagamento(pagamentoId: string, ouvinte: (status: StatusPagamento) => void) {
+  eventos.on(pagamentoId, ouvinte);
+  return () => {
+    eventos.off(pagamentoId, ouvinte);
+  };
+}
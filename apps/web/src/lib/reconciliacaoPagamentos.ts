@@ -0,0 +1,158 @@
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { buscarPagamento } from '@/lib/mercadopago';
+import { comBackoff, comLimite, LimiteDeTaxa } from '@/lib/concorrencia';
+import { publicarStatusPagamento } from '@/lib/pagamentosEventos';
+
+// Reconciliação dos pagamentos 'pending' com o Mercado Pago (tabelas e RPCs em
+// database/reconciliacao_pagamentos.sql). Percorre os pendentes por keyset em lotes,
+// consulta o MP com concorrência limitada e grava status + checkpoint a cada lote:
+// se o tempo acabar, a próxima chamada continua do último lote concluído.
+
+const TAMANHO_LOTE = Number(process.env.RECONCILIACAO_LOTE) || 200;
+const CONCORRENCIA = Number(process.env.RECONCILIACAO_CONCORRENCIA) || 8;
+const LEASE_MS = 2 * 60 * 1000;
+
+export interface ResultadoReconciliacao {
+  execucao_id: string | null;
+  dias: number;
+  concluida: boolean;
+  em_andamento?: boolean;
+  total_analisados: number;
+  atualizados: number;
+  erros: number;
+  falhas: Array<{ id: string; payment_id: string | null; erro: string }>;
+}
+
+interface Execucao {
+  id: string;
+  dias: number;
+  limite_data: string;
+  cursor_created_at: string | null;
+  cursor_id: string | null;
+  total_analisados: number;
+  atualizados: number;
+  erros: number;
+}
+
+interface Pendente {
+  id: string;
+  mercadopago_payment_id: string | null;
+  status: string;
+  created_at: string;
+}
+
+const MAX_FALHAS_NA_RESPOSTA = 50;
+
+export async function reconciliarPagamentos(dias: number, tempoMaximoMs = 50_000): Promise<ResultadoReconciliacao> {
+  const supabase = getSupabaseAdmin();
+  const prazo = Date.now() + tempoMaximoMs;
+
+  const { data: reservadas, error: reservaError } = await supabase.rpc('reconciliacao_reservar', { p_dias: dias });
+  if (reservaError) throw reservaError;
+  const execucao = ((reservadas || []) as Execucao[])[0];
+  if (!execucao) {
+    // Outra chamada está processando a execução em andamento
+    return { execucao_id: null, dias, concluida: false, em_andamento: true, total_analisados: 0, atualizados: 0, erros: 0, falhas: [] };
+  }
+
+  const resultado: ResultadoReconciliacao = {
+    execucao_id: execucao.id,
+    dias: execucao.dias,
+    concluida: false,
+    total_analisados: execucao.total_analisados,
+    atualizados: execucao.atualizados,
+    erros: execucao.erros,
+    falhas: [],
+  };
+  let cursor = execucao.cursor_created_at && execucao.cursor_id
+    ? { createdAt: execucao.cursor_created_at, id: execucao.cursor_id }
+    : null;
+  const limiteDeTaxa: LimiteDeTaxa = { pausadoAte: 0 };
+
+  while (Date.now() < prazo) {
+    let query = supabase
+      .from('pagamentos')
+      .select('id, mercadopago_payment_id, status, created_at')
+      .eq('status', 'pending')
+      .gte('created_at', execucao.limite_data)
+      .order('created_at', { ascending: true })
+      .order('id', { ascending: true })
+      .limit(TAMANHO_LOTE);
+    if (cursor) {
+      query = query.or(`created_at.gt."${cursor.createdAt}",and(created_at.eq."${cursor.createdAt}",id.gt.${cursor.id})`);
+    }
+    const { data, error } = await query;
+    if (error) throw error;
+    const lote = (data || []) as Pendente[];
+    if (lote.length === 0) {
+      resultado.concluida = true;
+      break;
+    }
+
+    const consultas = await comLimite(lote, CONCORRENCIA, async p => {
+      if (!p.mercadopago_payment_id) return { p, erro: 'Sem mercadopago_payment_id' };
+      try {
+        const mp = await comBackoff(() => buscarPagamento(p.mercadopago_payment_id!), limiteDeTaxa);
+        return { p, status: mp?.status as string | undefined, status_detail: mp?.status_detail as string | undefined };
+      } catch (e: any) {
+        return { p, erro: e?.message || 'Erro ao consultar MP' };
+      }
+    });
+
+    const atualizacoes = consultas
+      .filter(c => c.status && c.status !== c.p.status)
+      .map(c => ({ id: c.p.id, status: c.status, status_detail: c.status_detail || null }));
+    if (atualizacoes.length > 0) {
+      const { data, error: updateError } = await supabase.rpc('pagamentos_aplicar_status', { p_atualizacoes: atualizacoes });
+      if (updateError) throw updateError;
+      // Só as linhas que o UPDATE alterou: se o webhook chegou antes, o evento já saiu por ele
+      const alterados = (data || []) as Array<{ id: string; status: string; paid_at: string | null }>;
+      resultado.atualizados += alterados.length;
+      const paymentIds = new Map(lote.map(p => [p.id, p.mercadopago_payment_id]));
+      for (const a of alterados) {
+        publicarStatusPagamento({
+          pagamento_id: a.id,
+          payment_id: paymentIds.get(a.id) ?? null,
+          status: a.status,
+          paid_at: a.paid_at,
+        });
+      }
+    }
+
+    for (const c of consultas) {
+      if (!c.erro) continue;
+      resultado.erros += 1;
+      if (resultado.falhas.length < MAX_FALHAS_NA_RESPOSTA) {
+        resultado.falhas.push({ id: c.p.id, payment_id: c.p.mercadopago_payment_id, erro: c.erro });
+      }
+    }
+    resultado.total_analisados += lote.length;
+    const ultimo = lote[lote.length - 1];
+    cursor = { createdAt: ultimo.created_at, id: ultimo.id };
+
+    // Checkpoint do lote e renovação do lease
+    const { error: checkpointError } = await supabase
+      .from('reconciliacao_execucoes')
+      .update({
+        cursor_created_at: cursor.createdAt,
+        cursor_id: cursor.id,
+        total_analisados: resultado.total_analisados,
+        atualizados: resultado.atualizados,
+        erros: resultado.erros,
+        em_uso_ate: new Date(Date.now() + LEASE_MS).toISOString(),
+        atualizado_em: new Date().toISOString(),
+      })
+      .eq('id', execucao.id);
+    if (checkpointError) throw checkpointError;
+  }
+
+  // Conclui ou libera o lease para a próxima chamada continuar
+  await supabase
+    .from('reconciliacao_execucoes')
+    .update(resultado.concluida
+      ? { status: 'concluida', em_uso_ate: null, concluido_em: new Date().toISOString(), atualizado_em: new Date().toISOString() }
+      : { em_uso_ate: null, atualizado_em: new Date().toISOString() })
+    .eq('id', execucao.id);
+
+  return resultado;
+}
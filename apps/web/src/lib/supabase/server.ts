@@ -19,3 +19,50 @@ export async function createServerSupabaseClient() {
   )
   return supabase
 }
+
+/**
+ * Cliente com a sessão do usuário vinda do cookie ou do header Authorization
+ * (Bearer com o access_token do Supabase), para rotas usadas também fora do navegador.
+ */
+export async function createRequestSupabaseClient(request: Request) {
+  const cookieStore = await cookies()
+  const authorization = request.headers.get('authorization')
+  return createServerClient(
+    process.env.NEXT_PUBLIC_SUPABASE_URL!,
+    process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
+    {
+      cookies: {
+        get(name: string) {
+          return cookieStore.get(name)?.value
+        },
+        set() {},
+        remove() {},
+      },
+      // Header vazio impediria o supabase-js de usar o token da sessão do cookie
+      global: authorization ? { headers: { Authorization: authorization } } : undefined,
+    }
+  )
+}
+
+/**
+ * Usuário autenticado e sua empresa, ou null se não houver sessão/vínculo.
+ */
+export async function getUsuarioEmpresa(
+  supabase: Awaited<ReturnType<typeof createRequestSupabaseClient>>,
+  request: Request
+) {
+  // Sem cookie de sessão o getUser() precisa receber o token explicitamente
+  const authHeader = request.headers.get('authorization') || ''
+  const token = authHeader.startsWith('Bearer ') ? authHeader.slice(7) : undefined
+  const { data: { user } } = await supabase.auth.getUser(token)
+  if (!user) return null
+
+  const { data: usuario } = await supabase
+    .from('usuarios')
+    .select('id, empresa_id, nivel')
+    .eq('auth_user_id', user.id)
+    .single()
+
+  if (!usuario?.empresa_id) return null
+  return { user, usuarioId: usuario.id as string, empresaId: usuario.empresa_id as string, nivel: usuario.nivel as string }
+}
@@ -73,6 +73,13 @@ export const clearAuthData = () => {
   }
 };
 
+// Header Authorization com o access_token da sessão, para as rotas /api que
+// autenticam com getUsuarioEmpresa (a sessão fica no localStorage, sem cookies sb-*)
+export const authHeaders = async (): Promise<Record<string, string>> => {
+  const { data: { session } } = await supabase.auth.getSession();
+  return session?.access_token ? { Authorization: `Bearer ${session.access_token}` } : {};
+};
+
 // Função para verificar se a sessão é válida
 export const isValidSession = async () => {
   try {
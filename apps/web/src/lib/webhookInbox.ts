@@ -0,0 +1,211 @@
+import { SupabaseClient } from '@supabase/supabase-js';
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { buscarPagamento } from '@/lib/mercadopago';
+import { comLimite } from '@/lib/concorrencia';
+import { publicarStatusPagamento } from '@/lib/pagamentosEventos';
+
+// Caixa de entrada dos webhooks do Mercado Pago (tabela em database/webhook_inbox.sql).
+// As rotas de webhook só chamam registrarWebhook() e respondem; processarInbox()
+// consome a fila em lotes, com número limitado de consultas simultâneas ao MP.
+
+export type OrigemWebhook = 'pagamentos' | 'assinaturas';
+
+interface ItemInbox {
+  id: number;
+  origem: OrigemWebhook;
+  payment_id: string;
+  payload: any;
+  tentativas: number;
+}
+
+export interface ResumoProcessamento {
+  lotes: number;
+  processados: number;
+  erros: number;
+}
+
+const TAMANHO_LOTE = Number(process.env.WEBHOOK_LOTE) || 50;
+const CONCORRENCIA = Number(process.env.WEBHOOK_CONCORRENCIA) || 8;
+
+// Erro que não adianta tentar de novo (ex.: referência externa inválida)
+class ErroDefinitivo extends Error {}
+
+export async function registrarWebhook(origem: OrigemWebhook, paymentId: string, payload: any) {
+  const { data, error } = await getSupabaseAdmin().rpc('webhook_inbox_registrar', {
+    p_origem: origem,
+    p_payment_id: paymentId,
+    p_payload: payload,
+  });
+  if (error) throw error;
+  return data as number;
+}
+
+// Próxima cobrança: dia 10
+function proximaCobrancaDia10(now: Date) {
+  const y = now.getUTCFullYear();
+  const m = now.getUTCMonth();
+  const tenthThis = new Date(Date.UTC(y, m, 10, 0, 0, 0));
+  return now.getTime() < tenthThis.getTime() ? tenthThis.toISOString() : new Date(Date.UTC(y, m + 1, 10, 0, 0, 0)).toISOString();
+}
+
+// Notificação de /api/pagamentos/webhook: atualiza o pagamento e ativa a assinatura da empresa
+async function processarPagamento(supabase: SupabaseClient, paymentId: string, rawPayload: any) {
+  const payment = await buscarPagamento(paymentId);
+  if (!payment) throw new Error('Pagamento não encontrado no MP');
+
+  const { data: pagamento } = await supabase
+    .from('pagamentos')
+    .select('id,empresa_id,valor,plano_id')
+    .eq('mercadopago_payment_id', String(paymentId))
+    .maybeSingle();
+  if (!pagamento?.id) return;
+
+  const updateData: any = {
+    mercadopago_payment_id: String(paymentId),
+    status: payment.status as string,
+    status_detail: payment.status_detail || null,
+    webhook_received: true,
+    webhook_data: rawPayload,
+    updated_at: new Date().toISOString(),
+  };
+  if (payment.status === 'approved') updateData.paid_at = new Date().toISOString();
+
+  const { error: updateError } = await supabase.from('pagamentos').update(updateData).eq('id', pagamento.id);
+  if (updateError) throw updateError;
+  publicarStatusPagamento({ pagamento_id: pagamento.id, payment_id: String(paymentId), status: updateData.status, paid_at: updateData.paid_at || null });
+
+  // Se aprovado, ativar assinatura da empresa (tolerante ao plano)
+  if (payment.status === 'approved' && pagamento.empresa_id) {
+    const preco = Number(pagamento.valor || 0);
+    const now = new Date();
+    const proxima = proximaCobrancaDia10(now);
+    const { data: trial } = await supabase
+      .from('assinaturas')
+      .select('id,plano_id')
+      .eq('empresa_id', pagamento.empresa_id)
+      .eq('status', 'trial')
+      .maybeSingle();
+    if (trial?.id) {
+      await supabase
+        .from('assinaturas')
+        .update({ status: 'active', plano_id: pagamento.plano_id || trial.plano_id || null, data_inicio: now.toISOString(), data_trial_fim: null, proxima_cobranca: proxima, data_fim: null, valor: preco })
+        .eq('id', trial.id);
+    } else {
+      const { data: plano } = await supabase.from('planos').select('id,preco').eq('preco', preco).maybeSingle();
+      await supabase
+        .from('assinaturas')
+        .insert({ empresa_id: pagamento.empresa_id, plano_id: pagamento.plano_id || plano?.id || null, status: 'active', data_inicio: now.toISOString(), data_trial_fim: null, proxima_cobranca: proxima, data_fim: null, valor: preco });
+    }
+  }
+}
+
+// Notificação de /api/assinaturas/webhook: pagamento identificado pelo external_reference "assinatura_<id>"
+async function processarAssinatura(supabase: SupabaseClient, paymentId: string, rawPayload: any) {
+  const payment = await buscarPagamento(paymentId);
+  if (!payment) throw new Error('Pagamento não encontrado no MP');
+
+  const externalRef = payment.external_reference;
+  const assinaturaId = externalRef?.replace('assinatura_', '');
+  if (!assinaturaId) throw new ErroDefinitivo(`External reference inválido: ${externalRef}`);
+
+  const { data: pagamento, error: fetchError } = await supabase
+    .from('pagamentos')
+    .select('id')
+    .eq('mercadopago_external_reference', externalRef)
+    .single();
+  if (fetchError || !pagamento) throw new ErroDefinitivo(`Pagamento não encontrado no banco: ${externalRef}`);
+
+  const updateData: any = {
+    mercadopago_payment_id: paymentId.toString(),
+    status: payment.status,
+    status_detail: payment.status_detail,
+    webhook_received: true,
+    webhook_data: rawPayload,
+    updated_at: new Date().toISOString(),
+  };
+
+  if (payment.status === 'approved') {
+    updateData.paid_at = new Date().toISOString();
+    const { error: assinaturaError } = await supabase
+      .from('assinaturas')
+      .update({
+        status: 'active',
+        data_fim: new Date(Date.now() + 30 * 24 * 60 * 60 * 1000).toISOString(), // +30 dias
+        proxima_cobranca: new Date(Date.now() + 30 * 24 * 60 * 60 * 1000).toISOString(),
+        updated_at: new Date().toISOString(),
+      })
+      .eq('id', assinaturaId);
+    if (assinaturaError) console.error('Erro ao atualizar assinatura:', assinaturaError);
+  } else if (payment.status === 'rejected' || payment.status === 'cancelled') {
+    const { error: assinaturaError } = await supabase
+      .from('assinaturas')
+      .update({ status: 'suspended', updated_at: new Date().toISOString() })
+      .eq('id', assinaturaId);
+    if (assinaturaError) console.error('Erro ao suspender assinatura:', assinaturaError);
+  }
+
+  const { error: updateError } = await supabase.from('pagamentos').update(updateData).eq('id', pagamento.id);
+  if (updateError) throw updateError;
+  publicarStatusPagamento({ pagamento_id: pagamento.id, payment_id: String(paymentId), status: updateData.status, paid_at: updateData.paid_at || null });
+}
+
+const PROCESSADORES: Record<OrigemWebhook, typeof processarPagamento> = {
+  pagamentos: processarPagamento,
+  assinaturas: processarAssinatura,
+};
+
+async function processarItem(supabase: SupabaseClient, item: ItemInbox) {
+  try {
+    await PROCESSADORES[item.origem](supabase, item.payment_id, item.payload);
+    await supabase.rpc('webhook_inbox_concluir', { p_id: item.id });
+    return true;
+  } catch (error: any) {
+    console.error(`Erro ao processar webhook ${item.origem} ${item.payment_id} (tentativa ${item.tentativas}):`, error);
+    await supabase.rpc('webhook_inbox_concluir', {
+      p_id: item.id,
+      p_erro: String(error?.message || error).slice(0, 1000),
+      p_tentar_novamente: !(error instanceof ErroDefinitivo),
+    });
+    return false;
+  }
+}
+
+async function drenar(resumo: ResumoProcessamento, prazo: number) {
+  const supabase = getSupabaseAdmin();
+  while (Date.now() < prazo) {
+    const { data, error } = await supabase.rpc('webhook_inbox_reservar', { p_limite: TAMANHO_LOTE });
+    if (error) throw error;
+    const lote = (data || []) as ItemInbox[];
+    if (lote.length === 0) return;
+
+    const resultados = await comLimite(lote, CONCORRENCIA, item => processarItem(supabase, item));
+    resumo.lotes += 1;
+    resumo.processados += resultados.filter(Boolean).length;
+    resumo.erros += resultados.filter(ok => !ok).length;
+  }
+}
+
+// Uma drenagem por processo; chamadas durante a drenagem fazem a fila ser relida antes de terminar
+let drenagemAtual: Promise<ResumoProcessamento> | null = null;
+let chamadoDuranteDrenagem = false;
+
+export function processarInbox(tempoMaximoMs = 50_000): Promise<ResumoProcessamento> {
+  if (drenagemAtual) {
+    chamadoDuranteDrenagem = true;
+    return drenagemAtual;
+  }
+
+  drenagemAtual = (async () => {
+    const resumo: ResumoProcessamento = { lotes: 0, processados: 0, erros: 0 };
+    const prazo = Date.now() + tempoMaximoMs;
+    do {
+      chamadoDuranteDrenagem = false;
+      await drenar(resumo, prazo);
+    } while (chamadoDuranteDrenagem && Date.now() < prazo);
+    return resumo;
+  })().finally(() => {
+    drenagemAtual = null;
+  });
+
+  return drenagemAtual;
+}
@@ -0,0 +1,190 @@
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { obterTransporte } from '@/lib/whatsappSessoes';
+
+// Fila de saída do WhatsApp (colunas e RPC em database/whatsapp_fila.sql).
+// As rotas só gravam a mensagem como 'pendente' em whatsapp_mensagens; processarFila()
+// reserva as pendentes de uma empresa em lotes ('enviando', FOR UPDATE SKIP LOCKED),
+// envia uma de cada vez pela sessão dela, no máximo WHATSAPP_MSGS_POR_MINUTO por minuto,
+// e grava o resultado do lote em uma chamada. Como a fila está no banco, o que não foi
+// enviado antes de um restart continua lá, e a próxima passada é agendada para quando
+// a primeira mensagem em espera (backoff de falha) fica pronta.
+
+export interface NovaMensagem {
+  empresa_id: string;
+  numero_destino: string;
+  mensagem: string;
+  tecnico_id?: string | null;
+  os_id?: string | null;
+}
+
+export interface AparelhoInfo {
+  marca?: string;
+  modelo?: string;
+  cliente_nome?: string;
+  problema?: string;
+  os_id?: string;
+}
+
+interface Pendente {
+  id: string;
+  numero_destino: string;
+  mensagem: string;
+}
+
+const TAMANHO_LOTE = Number(process.env.WHATSAPP_LOTE) || 20;
+const MSGS_POR_MINUTO = Number(process.env.WHATSAPP_MSGS_POR_MINUTO) || 30;
+const RAJADA = Number(process.env.WHATSAPP_RAJADA) || 5;
+const MAX_TENTATIVAS = 3;
+
+const UUID = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+// Balde de fichas por empresa: até RAJADA envios seguidos, depois MSGS_POR_MINUTO
+interface Balde {
+  fichas: number;
+  atualizadoEm: number;
+}
+
+interface EstadoFila {
+  rodando: Set<string>;
+  drenarDeNovo: Set<string>;
+  agendadas: Map<string, ReturnType<typeof setTimeout>>;
+  baldes: Map<string, Balde>;
+}
+
+// No globalThis para sobreviver ao hot reload do Next em desenvolvimento
+const globalParaFila = globalThis as unknown as { __whatsappFila?: EstadoFila };
+const estado: EstadoFila = globalParaFila.__whatsappFila ?? {
+  rodando: new Set(),
+  drenarDeNovo: new Set(),
+  agendadas: new Map(),
+  baldes: new Map(),
+};
+globalParaFila.__whatsappFila = estado;
+
+const esperar = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+export function mensagemNovaOS(tecnicoNome: string, aparelho: AparelhoInfo) {
+  return `🔔 *Nova OS Cadastrada*
+
+👨‍🔧 *Técnico:* ${tecnicoNome}
+📱 *Aparelho:* ${aparelho.marca} ${aparelho.modelo}
+👤 *Cliente:* ${aparelho.cliente_nome}
+🔧 *Problema:* ${aparelho.problema}
+🆔 *OS ID:* ${aparelho.os_id}
+
+Acesse o sistema para mais detalhes!`;
+}
+
+export async function enfileirarMensagem(nova: NovaMensagem): Promise<string> {
+  const { data, error } = await getSupabaseAdmin()
+    .from('whatsapp_mensagens')
+    .insert({
+      empresa_id: nova.empresa_id,
+      tecnico_id: nova.tecnico_id || null,
+      numero_destino: nova.numero_destino.replace(/\D/g, ''),
+      mensagem: nova.mensagem,
+      status: 'pendente',
+      // os_id referencia ordens_servico; identificadores de teste ('TESTE-001') ficam de fora
+      os_id: nova.os_id && UUID.test(nova.os_id) ? nova.os_id : null
+    })
+    .select('id')
+    .single();
+  if (error) throw error;
+
+  processarFila(nova.empresa_id);
+  return data.id as string;
+}
+
+async function aguardarVez(empresaId: string) {
+  let balde = estado.baldes.get(empresaId);
+  if (!balde) {
+    balde = { fichas: RAJADA, atualizadoEm: Date.now() };
+    estado.baldes.set(empresaId, balde);
+  }
+  for (;;) {
+    const agora = Date.now();
+    balde.fichas = Math.min(RAJADA, balde.fichas + (agora - balde.atualizadoEm) * MSGS_POR_MINUTO / 60_000);
+    balde.atualizadoEm = agora;
+    if (balde.fichas >= 1) {
+      balde.fichas -= 1;
+      return;
+    }
+    await esperar(Math.ceil((1 - balde.fichas) * 60_000 / MSGS_POR_MINUTO));
+  }
+}
+
+// Envia as pendentes prontas até não sobrar nenhuma. Devolve quando a fila volta a ter
+// o que enviar (retentativas com backoff), ou null se está vazia ou sem sessão.
+async function drenar(empresaId: string): Promise<Date | null> {
+  const supabase = getSupabaseAdmin();
+
+  for (;;) {
+    const transporte = obterTransporte(empresaId);
+    // Sem sessão ativa as mensagens esperam: o evento 'ready' do Client retoma a fila
+    if (!transporte) return null;
+
+    const { data, error } = await supabase.rpc('whatsapp_fila_reservar', {
+      p_empresa_id: empresaId,
+      p_limite: TAMANHO_LOTE,
+    });
+    if (error) throw error;
+    const lote = (data || []) as Pendente[];
+    if (lote.length === 0) {
+      const { data: proxima, error: proximaError } = await supabase.rpc('whatsapp_fila_proxima', {
+        p_empresa_id: empresaId,
+      });
+      if (proximaError) throw proximaError;
+      return proxima ? new Date(proxima as string) : null;
+    }
+
+    const enviados: string[] = [];
+    const falhas: Array<{ id: string; erro: string }> = [];
+    for (const m of lote) {
+      await aguardarVez(empresaId);
+      try {
+        await transporte.enviar(`${m.numero_destino}@c.us`, m.mensagem);
+        enviados.push(m.id);
+      } catch (err: any) {
+        falhas.push({ id: m.id, erro: err?.message || 'Erro ao enviar mensagem' });
+      }
+    }
+
+    const { error: concluirError } = await supabase.rpc('whatsapp_fila_concluir', {
+      p_enviados: enviados,
+      p_falhas: falhas,
+      p_max_tentativas: MAX_TENTATIVAS,
+    });
+    if (concluirError) throw concluirError;
+  }
+}
+
+function agendar(empresaId: string, quando: Date) {
+  clearTimeout(estado.agendadas.get(empresaId));
+  const timer = setTimeout(() => {
+    estado.agendadas.delete(empresaId);
+    processarFila(empresaId);
+  }, Math.max(0, quando.getTime() - Date.now()));
+  timer.unref?.();
+  estado.agendadas.set(empresaId, timer);
+}
+
+// Um worker por empresa no processo; chamadas durante o envio só pedem mais uma passada
+export function processarFila(empresaId: string) {
+  if (estado.rodando.has(empresaId)) {
+    estado.drenarDeNovo.add(empresaId);
+    return;
+  }
+  estado.rodando.add(empresaId);
+
+  drenar(empresaId)
+    .then(proxima => {
+      if (proxima) agendar(empresaId, proxima);
+    })
+    .catch(err => {
+      console.error(`❌ WhatsApp: Erro ao processar fila da empresa ${empresaId}:`, err);
+    })
+    .finally(() => {
+      estado.rodando.delete(empresaId);
+      if (estado.drenarDeNovo.delete(empresaId)) processarFila(empresaId);
+    });
+}
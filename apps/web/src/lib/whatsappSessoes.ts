@@ -0,0 +1,304 @@
+import path from 'path';
+import fs from 'fs';
+import { Client, LocalAuth } from 'whatsapp-web.js';
+import { getSupabaseAdmin } from '@/lib/supabase/admin';
+import { comLimite } from '@/lib/concorrencia';
+import { processarFila } from '@/lib/whatsappFila';
+
+// Gerenciador das sessões do WhatsApp Web: um Client por empresa, mantido no processo
+// (global.activeClients). Na subida do servidor (src/instrumentation.ts) as sessões
+// 'connected' são restauradas do LocalAuth em whatsapp-sessions/<empresa_id>, sem novo QR.
+// Também guarda em cache as leituras de sessão e técnico feitas a cada envio.
+
+declare global {
+  var activeClients: Map<string, Client>;
+}
+
+if (!global.activeClients) {
+  global.activeClients = new Map();
+}
+
+export interface SessaoWhatsApp {
+  empresa_id: string;
+  status: string;
+  qr_code: string | null;
+  numero_whatsapp: string | null;
+  nome_contato: string | null;
+  updated_at: string | null;
+}
+
+export interface TecnicoWhatsApp {
+  nome: string;
+  whatsapp_numero: string | null;
+}
+
+// Quem de fato entrega a mensagem: o Client da empresa ou, com WHATSAPP_TRANSPORTE_URL,
+// um serviço HTTP (stub dos testes de carga em testsprite_tests/whatsapp_stub.py)
+export interface TransporteWhatsApp {
+  enviar(chatId: string, mensagem: string): Promise<void>;
+}
+
+const CACHE_TTL_MS = Number(process.env.WHATSAPP_CACHE_TTL_MS) || 30_000;
+const TIMEOUT_INICIALIZACAO_MS = 30_000;
+const RESTAURAR_CONCORRENCIA = Number(process.env.WHATSAPP_RESTAURAR_CONCORRENCIA) || 2;
+
+const PUPPETEER_ARGS = [
+  '--no-sandbox',
+  '--disable-setuid-sandbox',
+  '--disable-dev-shm-usage',
+  '--disable-gpu',
+  '--disable-software-rasterizer',
+  '--disable-webgl',
+  '--disable-3d-apis',
+  '--disable-accelerated-2d-canvas',
+  '--disable-features=VizDisplayCompositor',
+  '--single-process',
+  '--no-zygote',
+  '--disable-extensions',
+  '--disable-background-timer-throttling',
+  '--disable-backgrounding-occluded-windows',
+  '--disable-renderer-backgrounding'
+];
+
+// Estado do gerenciador no globalThis para sobreviver ao hot reload do Next em desenvolvimento
+interface EstadoGerenciador {
+  iniciado: boolean;
+  iniciando: Map<string, Promise<void>>;
+  // Client aberto mostrando QR Code: só entra em activeClients no evento 'ready'
+  aguardandoLeitura: Map<string, Client>;
+  sessoes: Map<string, { valor: SessaoWhatsApp | null; expiraEm: number }>;
+  tecnicos: Map<string, { valor: TecnicoWhatsApp | null; expiraEm: number }>;
+}
+
+const globalParaGerenciador = globalThis as unknown as { __whatsappGerenciador?: EstadoGerenciador };
+const estado: EstadoGerenciador = globalParaGerenciador.__whatsappGerenciador ?? {
+  iniciado: false,
+  iniciando: new Map(),
+  aguardandoLeitura: new Map(),
+  sessoes: new Map(),
+  tecnicos: new Map(),
+};
+globalParaGerenciador.__whatsappGerenciador = estado;
+
+function caminhoSessao(empresaId: string) {
+  return path.join(process.cwd(), 'whatsapp-sessions', empresaId);
+}
+
+export async function buscarSessao(empresaId: string): Promise<SessaoWhatsApp | null> {
+  const emCache = estado.sessoes.get(empresaId);
+  if (emCache && emCache.expiraEm > Date.now()) return emCache.valor;
+
+  const { data, error } = await getSupabaseAdmin()
+    .from('whatsapp_sessions')
+    .select('empresa_id, status, qr_code, numero_whatsapp, nome_contato, updated_at')
+    .eq('empresa_id', empresaId)
+    .maybeSingle();
+  if (error) throw error;
+  estado.sessoes.set(empresaId, { valor: data, expiraEm: Date.now() + CACHE_TTL_MS });
+  return data;
+}
+
+export async function buscarTecnico(tecnicoId: string): Promise<TecnicoWhatsApp | null> {
+  const emCache = estado.tecnicos.get(tecnicoId);
+  if (emCache && emCache.expiraEm > Date.now()) return emCache.valor;
+
+  const { data, error } = await getSupabaseAdmin()
+    .from('usuarios')
+    .select('nome, whatsapp_numero')
+    .eq('id', tecnicoId)
+    .maybeSingle();
+  if (error) throw error;
+  estado.tecnicos.set(tecnicoId, { valor: data, expiraEm: Date.now() + CACHE_TTL_MS });
+  return data;
+}
+
+// Toda mudança de status passa por aqui para o cache não servir o status antigo
+async function atualizarSessao(empresaId: string, campos: Partial<SessaoWhatsApp>) {
+  estado.sessoes.delete(empresaId);
+  const { error } = await getSupabaseAdmin()
+    .from('whatsapp_sessions')
+    .update({ ...campos, updated_at: new Date().toISOString() })
+    .eq('empresa_id', empresaId);
+  if (error) {
+    console.error('❌ WhatsApp: Erro ao atualizar status no banco:', error);
+  }
+}
+
+export function obterTransporte(empresaId: string): TransporteWhatsApp | null {
+  const url = process.env.WHATSAPP_TRANSPORTE_URL;
+  if (url) {
+    return {
+      async enviar(chatId, mensagem) {
+        const response = await fetch(`${url.replace(/\/$/, '')}/messages`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ empresa_id: empresaId, chat_id: chatId, mensagem }),
+        });
+        if (!response.ok) throw new Error(`Transporte HTTP respondeu ${response.status}`);
+      },
+    };
+  }
+
+  const client = global.activeClients.get(empresaId);
+  if (!client) return null;
+  return {
+    async enviar(chatId, mensagem) {
+      await client.sendMessage(chatId, mensagem);
+    },
+  };
+}
+
+// Cria e inicializa o Client da empresa. Com `restaurando`, a sessão do LocalAuth já
+// existe: se o WhatsApp pedir QR Code é porque ela expirou, e a empresa volta a
+// 'disconnected' em vez de deixar um navegador aberto esperando leitura.
+async function iniciarCliente(empresaId: string, restaurando: boolean) {
+  const sessionPath = caminhoSessao(empresaId);
+  if (!fs.existsSync(sessionPath)) {
+    fs.mkdirSync(sessionPath, { recursive: true });
+  }
+
+  const client = new Client({
+    authStrategy: new LocalAuth({
+      clientId: empresaId,
+      dataPath: sessionPath
+    }),
+    puppeteer: {
+      headless: true,
+      args: PUPPETEER_ARGS
+    }
+  });
+
+  client.on('qr', async (qr) => {
+    if (restaurando) {
+      await atualizarSessao(empresaId, { status: 'disconnected', qr_code: null });
+      client.destroy().catch(() => {});
+      return;
+    }
+    estado.aguardandoLeitura.set(empresaId, client);
+    await atualizarSessao(empresaId, { qr_code: qr, status: 'qr_ready' });
+  });
+
+  client.on('ready', async () => {
+    estado.aguardandoLeitura.delete(empresaId);
+    global.activeClients.set(empresaId, client);
+    await atualizarSessao(empresaId, { status: 'connected', qr_code: null });
+    // Mensagens que ficaram na fila enquanto a sessão estava fora
+    processarFila(empresaId);
+  });
+
+  client.on('auth_failure', (msg) => {
+    console.error('❌ WhatsApp: Falha na autenticação:', msg);
+  });
+
+  client.on('disconnected', async () => {
+    estado.aguardandoLeitura.delete(empresaId);
+    global.activeClients.delete(empresaId);
+    await atualizarSessao(empresaId, { status: 'disconnected', qr_code: null });
+  });
+
+  let timeout: ReturnType<typeof setTimeout> | undefined;
+  try {
+    await Promise.race([
+      client.initialize(),
+      new Promise((_, reject) => {
+        timeout = setTimeout(() => reject(new Error('Timeout na inicialização do WhatsApp')), TIMEOUT_INICIALIZACAO_MS);
+      }),
+    ]);
+  } catch (error) {
+    estado.aguardandoLeitura.delete(empresaId);
+    global.activeClients.delete(empresaId);
+    client.destroy().catch(() => {});
+    throw error;
+  } finally {
+    clearTimeout(timeout);
+  }
+}
+
+// Uma inicialização por empresa de cada vez (restauração e /connect podem coincidir)
+function iniciarUmaVez(empresaId: string, restaurando: boolean) {
+  const emAndamento = estado.iniciando.get(empresaId);
+  if (emAndamento) return emAndamento;
+  const promessa = iniciarCliente(empresaId, restaurando).finally(() => {
+    estado.iniciando.delete(empresaId);
+  });
+  estado.iniciando.set(empresaId, promessa);
+  return promessa;
+}
+
+export function clienteAtivo(empresaId: string) {
+  return global.activeClients.has(empresaId) || estado.aguardandoLeitura.has(empresaId) || estado.iniciando.has(empresaId);
+}
+
+// POST /api/whatsapp/connect
+export async function conectarWhatsApp(empresaId: string) {
+  estado.sessoes.delete(empresaId);
+  const { error } = await getSupabaseAdmin()
+    .from('whatsapp_sessions')
+    .upsert({
+      empresa_id: empresaId,
+      status: 'connecting',
+      qr_code: null,
+      numero_whatsapp: '',
+      nome_contato: '',
+      updated_at: new Date().toISOString()
+    }, { onConflict: 'empresa_id' });
+  if (error) throw error;
+
+  await iniciarUmaVez(empresaId, false);
+}
+
+// DELETE /api/whatsapp/connect: encerra a sessão e apaga o LocalAuth
+export async function desconectarWhatsApp(empresaId: string) {
+  const client = global.activeClients.get(empresaId) ?? estado.aguardandoLeitura.get(empresaId);
+  global.activeClients.delete(empresaId);
+  estado.aguardandoLeitura.delete(empresaId);
+  if (client) {
+    await client.logout().catch(() => {});
+    await client.destroy().catch(() => {});
+  }
+  fs.rmSync(caminhoSessao(empresaId), { recursive: true, force: true });
+  await atualizarSessao(empresaId, { status: 'disconnected', qr_code: null });
+}
+
+// Restaura as sessões salvas e retoma as filas pendentes. Chamado uma vez por processo.
+export async function iniciarGerenciadorWhatsApp() {
+  if (estado.iniciado) return;
+  estado.iniciado = true;
+
+  const supabase = getSupabaseAdmin();
+
+  if (!process.env.WHATSAPP_TRANSPORTE_URL && process.env.WHATSAPP_RESTAURAR_SESSOES !== '0') {
+    const { data, error } = await supabase
+      .from('whatsapp_sessions')
+      .select('empresa_id')
+      .eq('status', 'connected');
+    if (error) {
+      console.error('❌ WhatsApp: Erro ao listar sessões para restaurar:', error);
+    } else {
+      const empresas = (data || []).map(s => s.empresa_id as string);
+      await comLimite(empresas, RESTAURAR_CONCORRENCIA, async empresaId => {
+        if (!fs.existsSync(caminhoSessao(empresaId))) {
+          await atualizarSessao(empresaId, { status: 'disconnected', qr_code: null });
+          return;
+        }
+        try {
+          await iniciarUmaVez(empresaId, true);
+        } catch (err) {
+          console.error(`❌ WhatsApp: Erro ao restaurar sessão da empresa ${empresaId}:`, err);
+        }
+      });
+    }
+  }
+
+  const { data: pendentes, error: pendentesError } = await supabase
+    .from('whatsapp_mensagens')
+    .select('empresa_id')
+    .in('status', ['pendente', 'enviando']);
+  if (pendentesError) {
+    console.error('❌ WhatsApp: Erro ao listar mensagens pendentes:', pendentesError);
+    return;
+  }
+  for (const empresaId of new Set((pendentes || []).map(m => m.empresa_id as string))) {
+    processarFila(empresaId);
+  }
+}
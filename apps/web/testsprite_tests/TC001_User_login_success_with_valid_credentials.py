@@ -1,29 +1,52 @@
 import asyncio
+import os
+import re
+import time
 from playwright import async_api
 
+import auth_state
+import browser_pool
+import ui_actions
+from loadtest import percentile
+
+# Shift start: several attendants open the login page and sign in at the same time
+CONCURRENT_UI_LOGINS = int(os.environ.get("UI_LOGIN_CONCURRENCY", "5"))
+UI_LOGIN_P95_MS = float(os.environ.get("UI_LOGIN_P95_MS", "5000"))
+
+
+async def login_once(username, password):
+    """Sign in through the login form; returns ms from submit until the dashboard URL."""
+    lease = await browser_pool.acquire()
+    try:
+        page = await lease.context.new_page()
+        await page.goto(f"{auth_state.BASE_URL}/login", timeout=auth_state.LOGIN_TIMEOUT_MS)
+        await ui_actions.fill(page.locator("form input[type=text]").first, username)
+        await ui_actions.fill(page.locator("form input[type=password]").first, password)
+        started = time.perf_counter()
+        await page.locator("form button[type=submit]").first.click()
+        await page.wait_for_url(re.compile(r"/dashboard"), timeout=auth_state.LOGIN_TIMEOUT_MS)
+        return (time.perf_counter() - started) * 1000
+    finally:
+        await lease.release()
+
+
+async def run_concurrent_login_test():
+    username, password = auth_state.ROLES["admin"]
+    latencies = sorted(await asyncio.gather(*(login_once(username, password) for _ in range(CONCURRENT_UI_LOGINS))))
+    p95 = percentile(latencies, 95)
+    print(f"{CONCURRENT_UI_LOGINS} concurrent UI logins: p50 {percentile(latencies, 50):.0f}ms, p95 {p95:.0f}ms")
+    assert p95 < UI_LOGIN_P95_MS, (
+        f"Login p95 {p95:.0f}ms with {CONCURRENT_UI_LOGINS} concurrent users exceeds {UI_LOGIN_P95_MS:.0f}ms"
+    )
+
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
+    lease = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+        # Borrow a fresh isolated context from this worker's long-lived browser
+        lease = await browser_pool.acquire()
+        context = lease.context
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -48,73 +71,70 @@ async def run_test():
         # Click the login button to go to the login page.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/nav/div/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Input admin username and password, then click login button.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('wdglp')
+        await ui_actions.fill(elem, 'wdglp')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123123')
+        await ui_actions.fill(elem, '123123')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem, wait_for="login")
         
 
         # Click logout button to log out admin user and prepare for technician login.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Input technician username and password, then click login button.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('technician')
+        await ui_actions.fill(elem, 'technician')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123123')
+        await ui_actions.fill(elem, '123123')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem, wait_for="login")
         
 
         # Try to find the correct valid username for technician or verify credentials before retrying login.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+        await ui_actions.fill(elem, '')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+        await ui_actions.fill(elem, '')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         assert False, 'Test plan execution failed: expected result unknown, generic failure assertion.'
-        await asyncio.sleep(5)
     
     finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
+        if lease:
+            await lease.release()
             
+# The generated UI flow above ends in an unconditional failure, so the concurrent
+# login check runs first to always report its latencies
+asyncio.run(run_concurrent_login_test())
 asyncio.run(run_test())
-    
\ No newline at end of file
@@ -1,11 +1,13 @@
 import requests
 from requests.auth import HTTPBasicAuth
 
-BASE_URL = "http://localhost:3000"
-TIMEOUT = 30
+from api_client import BASE_URL, TIMEOUT, get_session
+
 USERNAME = "wdglp"
 PASSWORD = "123123"
 
+session = get_session()
+
 def test_authentication_api_role_based_access_control():
     """
     Verify that the authentication API correctly enforces role-based access control 
@@ -42,7 +44,7 @@ def test_authentication_api_role_based_access_control():
     login_url = f"{BASE_URL}/api/auth/login"
     try:
         # Assuming POST login with basic auth returns token and role info
-        login_response = requests.post(login_url, auth=auth, timeout=TIMEOUT)
+        login_response = session.post(login_url, auth=auth, timeout=TIMEOUT)
         assert login_response.status_code == 200, f"Login failed with status {login_response.status_code}"
         login_data = login_response.json()
         assert "token" in login_data, "No token in login response"
@@ -59,7 +61,7 @@ def test_authentication_api_role_based_access_control():
     def check_access(path, should_allow):
         url = f"{BASE_URL}{path}"
         try:
-            response = requests.get(url, headers=headers, timeout=TIMEOUT)
+            response = session.get(url, headers=headers, timeout=TIMEOUT)
             if should_allow:
                 assert response.status_code == 200, (
                     f"Access denied to allowed endpoint {path} with status {response.status_code}"
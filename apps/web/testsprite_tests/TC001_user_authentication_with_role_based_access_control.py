@@ -1,17 +1,28 @@
+import asyncio
+import os
+import time
+
+import aiohttp
 import requests
 
-BASE_URL = "http://localhost:3000"
-TIMEOUT = 30
+from api_client import BASE_URL, TIMEOUT, get_session
+from loadtest import percentile
 
 auth_credential = {
     "username": "wdglp",
     "password": "123123"
 }
 
+# Shift start: the whole team logs in within the same few seconds
+CONCURRENT_LOGINS = int(os.environ.get("LOGIN_CONCURRENCY", "20"))
+LOGIN_P95_MS = float(os.environ.get("LOGIN_CONCURRENT_P95_MS", "1000"))
+
+session = get_session()
+
 def test_user_authentication_role_based_access_control():
     try:
         # Login with valid credentials
-        login_response = requests.post(
+        login_response = session.post(
             f"{BASE_URL}/api/login",
             json=auth_credential,
             timeout=TIMEOUT
@@ -28,19 +39,53 @@ def test_user_authentication_role_based_access_control():
 
         # Verify access to a protected route based on role
         protected_endpoint = f"{BASE_URL}/api/protected-route"
-        protected_response = requests.get(protected_endpoint, headers=headers, timeout=TIMEOUT)
+        protected_response = session.get(protected_endpoint, headers=headers, timeout=TIMEOUT)
         assert protected_response.status_code == 200, f"Authorized user with role {user_role} couldn't access protected route"
 
         # Test unauthorized access with invalid token
         unauthorized_headers = {"Authorization": "Bearer invalidtoken123"}
-        unauthorized_response = requests.get(protected_endpoint, headers=unauthorized_headers, timeout=TIMEOUT)
+        unauthorized_response = session.get(protected_endpoint, headers=unauthorized_headers, timeout=TIMEOUT)
         assert unauthorized_response.status_code == 401, "Unauthorized access not blocked with invalid token"
 
         # Test unauthorized access without token
-        no_token_response = requests.get(protected_endpoint, timeout=TIMEOUT)
+        no_token_response = session.get(protected_endpoint, headers={"Authorization": None}, timeout=TIMEOUT)
         assert no_token_response.status_code == 401, "Unauthorized access not blocked without token"
 
     except requests.exceptions.RequestException as e:
         assert False, f"Request failed: {e}"
 
-test_user_authentication_role_based_access_control()
\ No newline at end of file
+
+
+async def concurrent_logins(n):
+    """POST /api/login n times at once; returns (status, latency_ms, body) per login."""
+    async def one(http):
+        started = time.perf_counter()
+        async with http.post(f"{BASE_URL}/api/login", json=auth_credential) as resp:
+            body = await resp.json(content_type=None)
+            return resp.status, (time.perf_counter() - started) * 1000, body
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as http:
+        return await asyncio.gather(*(one(http) for _ in range(n)))
+
+
+def test_login_latency_under_concurrent_logins():
+    # Warm-up: route compiled and profile lookup cached, like a server that has been up since the last shift
+    warm = session.post(f"{BASE_URL}/api/login", json=auth_credential, timeout=TIMEOUT)
+    assert warm.status_code == 200, f"Login failed with status {warm.status_code}"
+
+    results = asyncio.run(concurrent_logins(CONCURRENT_LOGINS))
+    failed = [status for status, _, _ in results if status != 200]
+    assert not failed, f"{len(failed)}/{len(results)} concurrent logins failed (statuses {set(failed)})"
+    for _, _, body in results:
+        assert body.get("token") and body.get("session"), "Login response without token/session"
+        assert body["user"]["empresa_id"] == warm.json()["user"]["empresa_id"], "Concurrent logins returned another profile"
+
+    latencies = sorted(ms for _, ms, _ in results)
+    p50, p95 = percentile(latencies, 50), percentile(latencies, 95)
+    print(f"{CONCURRENT_LOGINS} concurrent logins: p50 {p50:.0f}ms, p95 {p95:.0f}ms")
+    assert p95 < LOGIN_P95_MS, f"Login p95 {p95:.0f}ms with {CONCURRENT_LOGINS} concurrent logins exceeds {LOGIN_P95_MS:.0f}ms"
+
+
+test_user_authentication_role_based_access_control()
+test_login_latency_under_concurrent_logins()
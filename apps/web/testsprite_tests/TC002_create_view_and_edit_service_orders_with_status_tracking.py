@@ -1,11 +1,9 @@
-import requests
-from requests.auth import HTTPBasicAuth
+from api_client import BASE_URL, TIMEOUT, authenticated_session
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
-TIMEOUT = 30
 HEADERS = {"Content-Type": "application/json"}
 
+session = authenticated_session()
+
 def test_create_view_edit_service_orders_with_status_tracking():
     new_order_id = None
     try:
@@ -15,11 +13,10 @@ def test_create_view_edit_service_orders_with_status_tracking():
             "description": "Test service order creation",
             "status": "pending"
         }
-        create_resp = requests.post(
+        create_resp = session.post(
             f"{BASE_URL}/api/ordens/criar",
             json=create_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT
         )
         assert create_resp.status_code == 201, f"Failed to create order: {create_resp.text}"
@@ -28,10 +25,9 @@ def test_create_view_edit_service_orders_with_status_tracking():
         assert new_order_id is not None, "Created order ID not returned"
 
         # Step 2: View the created service order
-        view_resp = requests.get(
+        view_resp = session.get(
             f"{BASE_URL}/api/ordens/{new_order_id}",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT
         )
         assert view_resp.status_code == 200, f"Failed to view order: {view_resp.text}"
@@ -43,11 +39,10 @@ def test_create_view_edit_service_orders_with_status_tracking():
         edit_payload = {
             "description": "Updated test service order"
         }
-        edit_resp = requests.put(
+        edit_resp = session.put(
             f"{BASE_URL}/api/ordens/{new_order_id}",
             json=edit_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT
         )
         assert edit_resp.status_code == 200, f"Failed to edit order: {edit_resp.text}"
@@ -57,11 +52,10 @@ def test_create_view_edit_service_orders_with_status_tracking():
         # Step 4: Update order status through its lifecycle and verify notification
         for status in ["in progress", "completed"]:
             status_payload = {"status": status}
-            status_resp = requests.patch(
+            status_resp = session.patch(
                 f"{BASE_URL}/api/ordens/{new_order_id}/status",
                 json=status_payload,
                 headers=HEADERS,
-                auth=AUTH,
                 timeout=TIMEOUT
             )
             assert status_resp.status_code == 200, f"Failed to update status to {status}: {status_resp.text}"
@@ -69,10 +63,9 @@ def test_create_view_edit_service_orders_with_status_tracking():
             assert status_data.get("status") == status, f"Status not updated to {status}"
 
             # Check notifications for status update
-            notifications_resp = requests.get(
+            notifications_resp = session.get(
                 f"{BASE_URL}/api/notifications?order_id={new_order_id}&status={status}",
                 headers=HEADERS,
-                auth=AUTH,
                 timeout=TIMEOUT
             )
             assert notifications_resp.status_code == 200, f"Failed to fetch notifications for status {status}"
@@ -84,10 +77,9 @@ def test_create_view_edit_service_orders_with_status_tracking():
             ), f"No notification found for status {status} update"
 
         # Step 5: Final view to confirm complete status
-        final_view_resp = requests.get(
+        final_view_resp = session.get(
             f"{BASE_URL}/api/ordens/{new_order_id}",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT
         )
         assert final_view_resp.status_code == 200, f"Failed to view order after status updates: {final_view_resp.text}"
@@ -97,10 +89,9 @@ def test_create_view_edit_service_orders_with_status_tracking():
     finally:
         # Cleanup: Delete the created service order if it exists
         if new_order_id:
-            del_resp = requests.delete(
+            del_resp = session.delete(
                 f"{BASE_URL}/api/ordens/{new_order_id}",
                 headers=HEADERS,
-                auth=AUTH,
                 timeout=TIMEOUT
             )
             if del_resp.status_code not in (200, 204):
@@ -1,10 +1,15 @@
-import requests
-from requests.auth import HTTPBasicAuth
+import os
+
+from api_client import BASE_URL, TIMEOUT, authenticated_session, login
+from loadtest import percentile
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
 HEADERS = {"Content-Type": "application/json"}
-TIMEOUT = 30
+
+LIST_PAGE_SIZE = 50
+LIST_PAGES = int(os.environ.get("ORDENS_LIST_PAGES", "5"))
+LIST_P95_MS = float(os.environ.get("ORDENS_LIST_P95_MS", "300"))
+
+session = authenticated_session()
 
 def test_service_orders_api_create_edit_status_update_notifications():
     service_order = None
@@ -19,11 +24,10 @@ def test_service_orders_api_create_edit_status_update_notifications():
             "status": "pending",
             "dataPrevistaConclusao": "2025-09-20"
         }
-        response_create = requests.post(
+        response_create = session.post(
             f"{BASE_URL}/api/ordens/criar",
             json=create_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert response_create.status_code == 201, f"Create service order failed: {response_create.text}"
@@ -40,11 +44,10 @@ def test_service_orders_api_create_edit_status_update_notifications():
             "description": "Updated description after review",
             "equipment": "Laptop Model XYZ - updated specs",
         }
-        response_edit = requests.put(
+        response_edit = session.put(
             f"{BASE_URL}/api/ordens/{service_order_id}",
             json=edit_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert response_edit.status_code == 200, f"Edit service order failed: {response_edit.text}"
@@ -54,11 +57,10 @@ def test_service_orders_api_create_edit_status_update_notifications():
 
         # Step 3: Update the status of the service order
         status_update_payload = {"status": "in-progress"}
-        response_status_update = requests.patch(
+        response_status_update = session.patch(
             f"{BASE_URL}/api/ordens/{service_order_id}/status",
             json=status_update_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert response_status_update.status_code == 200, f"Status update failed: {response_status_update.text}"
@@ -67,10 +69,9 @@ def test_service_orders_api_create_edit_status_update_notifications():
 
         # Step 4: Verify notifications sent to client and technician
         # Assuming an endpoint exists like /api/notifications with query params to filter by order ID
-        response_notifications = requests.get(
+        response_notifications = session.get(
             f"{BASE_URL}/api/notifications?orderId={service_order_id}",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert response_notifications.status_code == 200, f"Fetching notifications failed: {response_notifications.text}"
@@ -85,11 +86,61 @@ def test_service_orders_api_create_edit_status_update_notifications():
     finally:
         # Cleanup: delete created service order if exists
         if service_order and "id" in service_order:
-            requests.delete(
+            session.delete(
                 f"{BASE_URL}/api/ordens/{service_order['id']}",
                 headers=HEADERS,
-                auth=AUTH,
                 timeout=TIMEOUT,
             )
 
+def test_service_orders_listing_pagination():
+    # /api/ordens resolves the Supabase user, so send the Supabase access token
+    headers = {**HEADERS, "Authorization": f"Bearer {login()['session']['access_token']}"}
+
+    def list_page(**params):
+        resp = session.get(f"{BASE_URL}/api/ordens", params=params, headers=headers)
+        return resp, resp.timing.total_ms
+
+    seen = set()
+    latencies = []
+    cursor = None
+    for _ in range(LIST_PAGES):
+        params = {"limit": LIST_PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        resp, elapsed = list_page(**params)
+        assert resp.status_code == 200, f"Listing service orders failed: {resp.status_code} {resp.text}"
+        latencies.append(elapsed)
+        body = resp.json()
+        ordens = body["ordens"]
+        assert len(ordens) <= LIST_PAGE_SIZE, f"Page has {len(ordens)} orders, limit was {LIST_PAGE_SIZE}"
+        ids = [o["id"] for o in ordens]
+        assert not seen.intersection(ids), "Pagination repeated a service order"
+        seen.update(ids)
+        cursor = body["nextCursor"]
+        if not cursor:
+            break
+
+    # Status filter only returns the requested statuses
+    resp, elapsed = list_page(limit=LIST_PAGE_SIZE, status="ABERTA,APROVADO")
+    assert resp.status_code == 200, f"Filtered listing failed: {resp.status_code} {resp.text}"
+    latencies.append(elapsed)
+    assert all(o["status"] in ("ABERTA", "APROVADO") for o in resp.json()["ordens"]), "Status filter leaked other statuses"
+
+    # Narrow projection without relations
+    resp, _ = list_page(limit=5, campos="numero_os,status", incluir="")
+    assert resp.status_code == 200, f"Projected listing failed: {resp.status_code} {resp.text}"
+    for ordem in resp.json()["ordens"]:
+        assert set(ordem) == {"id", "created_at", "numero_os", "status"}, f"Unexpected columns: {sorted(ordem)}"
+
+    resp, _ = list_page(cursor="not-a-cursor")
+    assert resp.status_code == 400, f"Invalid cursor should be rejected, got {resp.status_code}"
+    resp, _ = list_page(campos="senha_hash")
+    assert resp.status_code == 400, f"Unknown column should be rejected, got {resp.status_code}"
+
+    p95 = percentile(sorted(latencies), 95)
+    print(f"/api/ordens p95 over {len(latencies)} pages: {p95:.0f}ms")
+    assert p95 < LIST_P95_MS, f"/api/ordens p95 {p95:.0f}ms exceeds {LIST_P95_MS:.0f}ms"
+
+
 test_service_orders_api_create_edit_status_update_notifications()
+test_service_orders_listing_pagination()
@@ -1,29 +1,16 @@
 import asyncio
 from playwright import async_api
 
+import browser_pool
+import ui_actions
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
+    lease = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+        # Borrow a fresh isolated context from this worker's long-lived browser
+        lease = await browser_pool.acquire()
+        context = lease.context
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -48,23 +35,23 @@ async def run_test():
         # Click on the Login button to start login as attendant
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/nav/div/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Fill username and password fields and submit login form as attendant
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('wdglp')
+        await ui_actions.fill(elem, 'wdglp')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123123')
+        await ui_actions.fill(elem, '123123')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem, wait_for="login")
         
 
         # Attempt to access administrator-only page such as user management
@@ -82,50 +69,44 @@ async def run_test():
         # Click the 'Sair' button to log out admin user
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Fill username and password fields and submit login form as technician
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('technician')
+        await ui_actions.fill(elem, 'technician')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123123')
+        await ui_actions.fill(elem, '123123')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem, wait_for="login")
         
 
         # Click on 'Configurações' link to attempt access to critical system settings
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/nav/div[9]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Click on 'Configurações' link to attempt access to critical system settings
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/nav/div[9]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Assertion for attendant trying to access admin-only page
         assert 'Access Denied' in await page.content() or page.url != 'http://localhost:3000/admin/users', 'Attendant should not access admin users page'
         # Assertion for technician trying to access critical system settings
         assert 'Access Denied' in await page.content() or 'not authorized' in await page.content().lower() or page.url != 'http://localhost:3000/settings', 'Technician should not access critical system settings'
-        await asyncio.sleep(5)
     
     finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
+        if lease:
+            await lease.release()
             
 asyncio.run(run_test())
-    
\ No newline at end of file
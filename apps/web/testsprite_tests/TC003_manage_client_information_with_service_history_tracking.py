@@ -1,11 +1,9 @@
-import requests
-from requests.auth import HTTPBasicAuth
+from api_client import BASE_URL, TIMEOUT, authenticated_session
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
-TIMEOUT = 30
 HEADERS = {"Content-Type": "application/json"}
 
+session = authenticated_session()
+
 
 def test_manage_client_information_with_service_history_tracking():
     # Create a new client
@@ -20,10 +18,9 @@ def test_manage_client_information_with_service_history_tracking():
     client_id = None
     try:
         # Create client
-        create_response = requests.post(
+        create_response = session.post(
             f"{BASE_URL}/api/clientes",
             json=client_data,
-            auth=AUTH,
             headers=HEADERS,
             timeout=TIMEOUT
         )
@@ -33,9 +30,8 @@ def test_manage_client_information_with_service_history_tracking():
         client_id = created_client["id"]
 
         # View client details
-        view_response = requests.get(
+        view_response = session.get(
             f"{BASE_URL}/api/clientes/{client_id}",
-            auth=AUTH,
             headers=HEADERS,
             timeout=TIMEOUT
         )
@@ -47,10 +43,9 @@ def test_manage_client_information_with_service_history_tracking():
 
         # Edit client details (update notes)
         updated_data = {"notes": "Updated notes for client"}
-        edit_response = requests.put(
+        edit_response = session.put(
             f"{BASE_URL}/api/clientes/{client_id}",
             json=updated_data,
-            auth=AUTH,
             headers=HEADERS,
             timeout=TIMEOUT
         )
@@ -59,9 +54,8 @@ def test_manage_client_information_with_service_history_tracking():
         assert edited_client.get("notes") == updated_data["notes"], "Client notes not updated"
 
         # Retrieve service history related to client
-        service_history_response = requests.get(
+        service_history_response = session.get(
             f"{BASE_URL}/api/clientes/{client_id}/service-history",
-            auth=AUTH,
             headers=HEADERS,
             timeout=TIMEOUT
         )
@@ -73,9 +67,8 @@ def test_manage_client_information_with_service_history_tracking():
     finally:
         # Clean up - delete the created client if exists
         if client_id:
-            requests.delete(
+            session.delete(
                 f"{BASE_URL}/api/clientes/{client_id}",
-                auth=AUTH,
                 headers=HEADERS,
                 timeout=TIMEOUT
             )
@@ -1,10 +1,8 @@
-import requests
-from requests.auth import HTTPBasicAuth
+from api_client import BASE_URL, TIMEOUT, authenticated_session
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
 HEADERS = {"Content-Type": "application/json"}
-TIMEOUT = 30
+
+session = authenticated_session()
 
 
 def test_manage_equipment_details_associated_with_service_orders():
@@ -18,11 +16,10 @@ def test_manage_equipment_details_associated_with_service_orders():
             "status": "pending",
             "empresa_id": 1  # added required field
         }
-        so_response = requests.post(
+        so_response = session.post(
             f"{BASE_URL}/api/ordens/criar",
             json=service_order_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert so_response.status_code == 201, f"Failed to create service order: {so_response.text}"
@@ -39,11 +36,10 @@ def test_manage_equipment_details_associated_with_service_orders():
             "service_order_id": service_order_id,
             "description": "Equipment added for testing",
         }
-        eq_response = requests.post(
+        eq_response = session.post(
             f"{BASE_URL}/api/equipamentos",
             json=equipment_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert eq_response.status_code == 201, f"Failed to create equipment: {eq_response.text}"
@@ -54,10 +50,9 @@ def test_manage_equipment_details_associated_with_service_orders():
         assert equipment_data.get("service_order_id") == service_order_id
 
         # Step 3: View equipment details by ID
-        get_eq_response = requests.get(
+        get_eq_response = session.get(
             f"{BASE_URL}/api/equipamentos/{equipment_id}",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert get_eq_response.status_code == 200, f"Failed to get equipment: {get_eq_response.text}"
@@ -70,11 +65,10 @@ def test_manage_equipment_details_associated_with_service_orders():
         update_payload = {
             "description": updated_description
         }
-        put_eq_response = requests.put(
+        put_eq_response = session.put(
             f"{BASE_URL}/api/equipamentos/{equipment_id}",
             json=update_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert put_eq_response.status_code == 200, f"Failed to update equipment: {put_eq_response.text}"
@@ -82,10 +76,9 @@ def test_manage_equipment_details_associated_with_service_orders():
         assert put_eq_data.get("description") == updated_description
 
         # Step 5: Verify equipment service history is tracked correctly
-        service_history_response = requests.get(
+        service_history_response = session.get(
             f"{BASE_URL}/api/equipamentos/{equipment_id}/service-history",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert service_history_response.status_code == 200, f"Failed to get service history: {service_history_response.text}"
@@ -100,10 +93,9 @@ def test_manage_equipment_details_associated_with_service_orders():
         # Cleanup: Delete the created equipment and service order if they exist
         if equipment_id:
             try:
-                requests.delete(
+                session.delete(
                     f"{BASE_URL}/api/equipamentos/{equipment_id}",
                     headers=HEADERS,
-                    auth=AUTH,
                     timeout=TIMEOUT,
                 )
             except Exception:
@@ -111,10 +103,9 @@ def test_manage_equipment_details_associated_with_service_orders():
 
         if service_order_id:
             try:
-                requests.delete(
+                session.delete(
                     f"{BASE_URL}/api/ordens/{service_order_id}",
                     headers=HEADERS,
-                    auth=AUTH,
                     timeout=TIMEOUT,
                 )
             except Exception:
@@ -1,9 +1,53 @@
-import requests
+import asyncio
+import json
+import os
+import threading
 import time
+import uuid
+
+import aiohttp
+import psycopg
+
+from api_client import BASE_URL, TIMEOUT, authenticated_session, empresa_id, login
+from loadtest import percentile
+from mercadopago_stub import MercadoPagoStub
+from seed_data import database_url
+
+# Burst: every payment is notified DELIVERIES times at once, like Mercado Pago retrying
+BURST_PAYMENTS = int(os.environ.get("WEBHOOK_BURST_PAYMENTS", "200"))
+DELIVERIES = 2
+ACK_P95_MS = float(os.environ.get("WEBHOOK_ACK_P95_MS", "200"))
+DRAIN_TIMEOUT_S = 90
+# Must match WEBHOOK_CONCORRENCIA of the app (single server process)
+WORKER_CONCURRENCY = int(os.environ.get("WEBHOOK_CONCORRENCIA", "8"))
+
+# Reconciliation backlog: large enough that one request runs out of time and the next resumes
+RECON_PAYMENTS = int(os.environ.get("RECON_BACKLOG_PAYMENTS", "3000"))
+RECON_CONCURRENCY = int(os.environ.get("RECONCILIACAO_CONCORRENCIA", "8"))
+RECON_MAX_CALLS = 20
+INTERNAL_TOKEN = os.environ.get("INTERNAL_ADMIN_TOKEN", "")
+
+# Time from the webhook POST until the new status arrives on the stream
+STATUS_PUSH_MS = float(os.environ.get("STATUS_PUSH_MAX_MS", "1500"))
+
+session = authenticated_session()
+
+
+def status_events(params, stream_timeout=TIMEOUT):
+    """Yield (received_at, status) from GET /api/pagamentos/status/stream until the server closes it."""
+    headers = {"Authorization": f"Bearer {login()['session']['access_token']}", "Accept": "text/event-stream"}
+    resp = session.get(f"{BASE_URL}/api/pagamentos/status/stream", params=params, headers=headers,
+                       stream=True, timeout=(TIMEOUT, stream_timeout))
+    with resp:
+        assert resp.status_code == 200, f"Expected 200 on status stream, got {resp.status_code}"
+        assert resp.headers["Content-Type"].startswith("text/event-stream"), "Status stream is not server-sent events"
+        event = None
+        for line in resp.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event == "status":
+                yield time.perf_counter(), json.loads(line[len("data: "):])
 
-BASE_URL = "http://localhost:3000"
-AUTH = ("wdglp", "123123")
-TIMEOUT = 30
 
 def test_payment_processing_api_mercadopago_integration():
     payment_id = None
@@ -16,9 +60,8 @@ def test_payment_processing_api_mercadopago_integration():
             "payment_method_id": "mercadopago",
             "external_reference": "test_ref_12345"
         }
-        create_resp = requests.post(
+        create_resp = session.post(
             f"{BASE_URL}/api/pagamentos/criar",
-            auth=AUTH,
             json=payment_payload,
             timeout=TIMEOUT
         )
@@ -27,31 +70,20 @@ def test_payment_processing_api_mercadopago_integration():
         assert "id" in payment_data, "Payment creation response missing 'id'"
         payment_id = payment_data["id"]
 
-        # Step 2: Check payment status repeatedly until it is not pending or timeout after 60 seconds
+        # Step 2: Follow the status stream until it is not pending or 60 seconds pass
         status = None
-        start_time = time.time()
-        while True:
-            status_resp = requests.get(
-                f"{BASE_URL}/api/pagamentos/status",
-                auth=AUTH,
-                params={"paymentId": payment_id},
-                timeout=TIMEOUT
-            )
-            assert status_resp.status_code == 200, f"Expected 200 OK on status, got {status_resp.status_code}"
-            status_data = status_resp.json()
-            status = status_data.get("status")
-            assert status is not None, "Status response missing 'status' field"
-
-            if status.lower() != "pending" or time.time() - start_time > 60:
+        for _, event in status_events({"payment_id": payment_id}, stream_timeout=60):
+            status = event.get("status")
+            assert status is not None, "Status event missing 'status' field"
+            if status.lower() != "pending":
                 break
-            time.sleep(2)
 
         assert status.lower() in {"approved", "rejected", "cancelled", "pending"}, f"Unexpected payment status '{status}'"
 
         # Step 3: Reconcile payments
-        reconcile_resp = requests.post(
+        reconcile_resp = session.post(
             f"{BASE_URL}/api/pagamentos/reconciliar",
-            auth=AUTH,
+            headers={"x-internal-token": INTERNAL_TOKEN},
             timeout=TIMEOUT
         )
         assert reconcile_resp.status_code == 200, f"Expected 200 OK on reconciliation, got {reconcile_resp.status_code}"
@@ -67,9 +99,8 @@ def test_payment_processing_api_mercadopago_integration():
                 "status": status
             }
         }
-        webhook_resp = requests.post(
+        webhook_resp = session.post(
             f"{BASE_URL}/api/pagamentos/webhook",
-            auth=AUTH,
             json=webhook_payload,
             timeout=TIMEOUT
         )
@@ -79,12 +110,190 @@ def test_payment_processing_api_mercadopago_integration():
         # Clean up: attempt to delete the created payment if possible
         if payment_id:
             try:
-                requests.delete(
+                session.delete(
                     f"{BASE_URL}/api/pagamentos/{payment_id}",
-                    auth=AUTH,
                     timeout=TIMEOUT
                 )
             except Exception:
                 pass
 
+
+async def post_burst(payment_ids):
+    """POST every webhook at once; returns (status, latency_ms) per delivery."""
+    async def deliver(http, payment_id):
+        started = time.perf_counter()
+        async with http.post(f"{BASE_URL}/api/pagamentos/webhook",
+                             json={"type": "payment", "action": "payment.updated", "data": {"id": payment_id}}) as resp:
+            await resp.read()
+            return resp.status, (time.perf_counter() - started) * 1000
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as http:
+        deliveries = [pid for pid in payment_ids for _ in range(DELIVERIES)]
+        return await asyncio.gather(*(deliver(http, pid) for pid in deliveries))
+
+
+def test_webhook_burst_is_acked_fast_and_deduplicated():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL to create the burst payments"
+    prefix = f"bench-webhook-{uuid.uuid4().hex[:12]}-"
+    payment_ids = [f"{prefix}{n}" for n in range(BURST_PAYMENTS)]
+    usuario_id = (login().get("user") or {}).get("id")
+
+    with MercadoPagoStub() as stub, psycopg.connect(dsn, autocommit=True) as conn:
+        # in_process: a real MP status that does not activate the empresa's subscription
+        for pid in payment_ids:
+            stub.register(pid, status="in_process", status_detail="pending_review_manual")
+        try:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO pagamentos (empresa_id, usuario_id, mercadopago_payment_id, valor, metodo_pagamento, status)
+                    VALUES (%s, %s, %s, 1.00, 'pix', 'pending')
+                    """,
+                    [(empresa_id(), usuario_id, pid) for pid in payment_ids],
+                )
+
+            results = asyncio.run(post_burst(payment_ids))
+            failed = [status for status, _ in results if status != 200]
+            assert not failed, f"{len(failed)} webhook deliveries were not acked (statuses {set(failed)})"
+            ack_p95 = percentile(sorted(ms for _, ms in results), 95)
+            print(f"webhook ack p95 over {len(results)} deliveries: {ack_p95:.0f}ms")
+            assert ack_p95 < ACK_P95_MS, f"Webhook ack p95 {ack_p95:.0f}ms exceeds {ACK_P95_MS:.0f}ms"
+
+            # Every delivery is durably recorded, collapsed to one pending row per payment
+            received = conn.execute(
+                "SELECT COALESCE(sum(recebimentos), 0) FROM webhook_inbox WHERE payment_id LIKE %s", (prefix + "%",)
+            ).fetchone()[0]
+            assert received == len(results), f"Inbox recorded {received} of {len(results)} deliveries"
+
+            deadline = time.time() + DRAIN_TIMEOUT_S
+            while True:
+                done = conn.execute(
+                    "SELECT count(*) FROM pagamentos WHERE mercadopago_payment_id LIKE %s AND status = 'in_process' AND webhook_received",
+                    (prefix + "%",),
+                ).fetchone()[0]
+                if done == BURST_PAYMENTS or time.time() > deadline:
+                    break
+                time.sleep(1)
+            assert done == BURST_PAYMENTS, f"Only {done}/{BURST_PAYMENTS} payments processed within {DRAIN_TIMEOUT_S}s"
+
+            total_calls = sum(stub.calls[pid] for pid in payment_ids)
+            print(f"Mercado Pago lookups: {total_calls} for {len(results)} deliveries, peak in flight {stub.peak_in_flight}")
+            assert total_calls < len(results), "Duplicate deliveries were not deduplicated before hitting Mercado Pago"
+            assert stub.peak_in_flight <= WORKER_CONCURRENCY, (
+                f"{stub.peak_in_flight} concurrent Mercado Pago lookups, worker limit is {WORKER_CONCURRENCY}"
+            )
+        finally:
+            conn.execute("DELETE FROM webhook_inbox WHERE payment_id LIKE %s", (prefix + "%",))
+            conn.execute("DELETE FROM pagamentos WHERE mercadopago_payment_id LIKE %s", (prefix + "%",))
+
+
+def test_reconciliation_resumes_through_large_backlog():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL to create the pending backlog"
+    assert INTERNAL_TOKEN, "Set INTERNAL_ADMIN_TOKEN (same value as the app) to call the reconciliation"
+    prefix = f"bench-recon-{uuid.uuid4().hex[:12]}-"
+    payment_ids = [f"{prefix}{n}" for n in range(RECON_PAYMENTS)]
+    # 60% approved, 20% rejected, 20% still pending at Mercado Pago
+    expected = {pid: ("approved" if n % 5 < 3 else "rejected" if n % 5 == 3 else "pending") for n, pid in enumerate(payment_ids)}
+    usuario_id = (login().get("user") or {}).get("id")
+
+    with MercadoPagoStub(throttle_every=97) as stub, psycopg.connect(dsn, autocommit=True) as conn:
+        for pid, status in expected.items():
+            stub.register(pid, status=status)
+        try:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO pagamentos (empresa_id, usuario_id, mercadopago_payment_id, valor, metodo_pagamento, status)
+                    VALUES (%s, %s, %s, 1.00, 'pix', 'pending')
+                    """,
+                    [(empresa_id(), usuario_id, pid) for pid in payment_ids],
+                )
+
+            calls = []
+            for _ in range(RECON_MAX_CALLS):
+                resp = session.post(
+                    f"{BASE_URL}/api/pagamentos/reconciliar",
+                    params={"dias": 1},
+                    headers={"x-internal-token": INTERNAL_TOKEN},
+                    timeout=120,
+                )
+                assert resp.status_code == 200, f"Reconciliation failed: {resp.status_code} {resp.text}"
+                body = resp.json()
+                assert isinstance(body, dict), "Reconciliation response should be a JSON object"
+                calls.append((resp.timing.total_ms, body["total_analisados"]))
+                if body["concluida"]:
+                    break
+            assert body["concluida"], f"Reconciliation did not finish in {RECON_MAX_CALLS} calls"
+            print(f"reconciliation: {len(calls)} calls, {body['total_analisados']} analysed, "
+                  f"{body['atualizados']} updated, {stub.throttled} throttled, peak in flight {stub.peak_in_flight}")
+
+            rows = dict(conn.execute(
+                "SELECT mercadopago_payment_id, status FROM pagamentos WHERE mercadopago_payment_id LIKE %s", (prefix + "%",)
+            ).fetchall())
+            wrong = [pid for pid, status in expected.items() if rows.get(pid) != status]
+            assert not wrong, f"{len(wrong)} payments have the wrong status after reconciliation, e.g. {wrong[:3]}"
+            assert all(stub.served[pid] == 1 for pid in payment_ids), (
+                "A payment was looked up more than once: checkpointing did not resume where it stopped"
+            )
+            assert stub.throttled > 0, "The stub never rate-limited; raise RECON_BACKLOG_PAYMENTS"
+            assert stub.peak_in_flight <= RECON_CONCURRENCY, (
+                f"{stub.peak_in_flight} concurrent Mercado Pago lookups, reconciliation limit is {RECON_CONCURRENCY}"
+            )
+        finally:
+            conn.execute("DELETE FROM pagamentos WHERE mercadopago_payment_id LIKE %s", (prefix + "%",))
+
+
+def test_status_stream_pushes_webhook_update():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL to create the streamed payment"
+    payment_id = f"bench-stream-{uuid.uuid4().hex[:12]}"
+    usuario_id = (login().get("user") or {}).get("id")
+
+    # rejected: final, so the server closes the stream; does not touch the subscription
+    with MercadoPagoStub() as stub, psycopg.connect(dsn, autocommit=True) as conn:
+        stub.register(payment_id, status="rejected", status_detail="cc_rejected_other_reason")
+        try:
+            conn.execute(
+                """
+                INSERT INTO pagamentos (empresa_id, usuario_id, mercadopago_payment_id, valor, metodo_pagamento, status)
+                VALUES (%s, %s, %s, 1.00, 'pix', 'pending')
+                """,
+                (empresa_id(), usuario_id, payment_id),
+            )
+
+            received = []
+            connected = threading.Event()
+
+            def listen():
+                for at, event in status_events({"payment_id": payment_id}):
+                    received.append((at, event))
+                    connected.set()
+
+            listener = threading.Thread(target=listen, daemon=True)
+            listener.start()
+            assert connected.wait(TIMEOUT), "Status stream sent no initial event"
+            assert received[0][1]["status"] == "pending", f"Initial event should be pending, got {received[0][1]}"
+
+            sent_at = time.perf_counter()
+            resp = session.post(f"{BASE_URL}/api/pagamentos/webhook", json={"type": "payment", "data": {"id": payment_id}})
+            assert resp.status_code == 200, f"Webhook was not acked: {resp.status_code} {resp.text}"
+
+            listener.join(TIMEOUT)
+            assert not listener.is_alive(), "Stream stayed open after the payment reached a final status"
+            statuses = [event["status"] for _, event in received]
+            assert statuses == ["pending", "rejected"], f"Expected exactly one pushed change, got {statuses}"
+            push_ms = (received[-1][0] - sent_at) * 1000
+            print(f"status pushed {push_ms:.0f}ms after the webhook")
+            assert push_ms < STATUS_PUSH_MS, f"Status arrived {push_ms:.0f}ms after the webhook (limit {STATUS_PUSH_MS:.0f}ms)"
+        finally:
+            conn.execute("DELETE FROM webhook_inbox WHERE payment_id = %s", (payment_id,))
+            conn.execute("DELETE FROM pagamentos WHERE mercadopago_payment_id = %s", (payment_id,))
+
+
 test_payment_processing_api_mercadopago_integration()
+test_webhook_burst_is_acked_fast_and_deduplicated()
+test_reconciliation_resumes_through_large_backlog()
+test_status_stream_pushes_webhook_update()
@@ -1,35 +1,22 @@
 import asyncio
 from playwright import async_api
 
+import browser_pool
+import ui_actions
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
+    lease = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+        # Borrow a fresh context that starts already logged in as admin (cached storage state)
+        lease = await browser_pool.acquire(role="admin")
+        context = lease.context
         
         # Open a new page in the browser context
         page = await context.new_page()
         
         # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
+        await page.goto("http://localhost:3000/dashboard", wait_until="commit", timeout=10000)
         
         # Wait for the main page to reach DOMContentLoaded state (optional for stability)
         try:
@@ -45,63 +32,35 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # Click on the Login button to start login process as technician.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/nav/div/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input username and password, then submit the login form.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('wdglp')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123123')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # Locate and open an existing service order with 'pending' status.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Click on the 'Ordens de Serviço' tab in the sidebar to view all service orders.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/nav/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Clear the 'Pendente' filter and try to find any service order to open for editing, or create a new one if none exist.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div[2]/div/div/div[4]/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Click on '+ Criar Primeira OS' button to create a new service order.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div[2]/div/div/div[7]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Generic failing assertion since expected result is unknown
         assert False, 'Test plan execution failed: generic failure assertion'
-        await asyncio.sleep(5)
     
     finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
+        if lease:
+            await lease.release()
             
 asyncio.run(run_test())
-    
\ No newline at end of file
@@ -1,18 +1,16 @@
 import requests
-from requests.auth import HTTPBasicAuth
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
-TIMEOUT = 30
+from api_client import BASE_URL, TIMEOUT, authenticated_session
+
+session = authenticated_session()
 
 def test_send_and_receive_whatsapp_messages():
     headers = {"Content-Type": "application/json"}
 
     # Step 1: Connect to WhatsApp
     try:
-        connect_resp = requests.post(
+        connect_resp = session.post(
             f"{BASE_URL}/api/whatsapp/connect",
-            auth=AUTH,
             headers=headers,
             timeout=TIMEOUT
         )
@@ -26,9 +24,8 @@ def test_send_and_receive_whatsapp_messages():
             "to": "5511999999999",  # Example phone number in international format
             "message": "Test message from automated test."
         }
-        send_resp = requests.post(
+        send_resp = session.post(
             f"{BASE_URL}/api/whatsapp/enviar",
-            auth=AUTH,
             headers=headers,
             json=message_payload,
             timeout=TIMEOUT
@@ -1,15 +1,26 @@
-import requests
-from requests.auth import HTTPBasicAuth
+import asyncio
+import os
+import time
+import uuid
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
-HEADERS = {"Content-Type": "application/json"}
-TIMEOUT = 30
+import aiohttp
+import psycopg
+
+from api_client import BASE_URL, TIMEOUT, authenticated_session, empresa_id
+from loadtest import percentile
+from seed_data import database_url
+from whatsapp_stub import WhatsAppStub
+
+BURST_MESSAGES = int(os.environ.get("WHATSAPP_BURST_MESSAGES", "200"))
+ACK_P95_MS = float(os.environ.get("WHATSAPP_ACK_P95_MS", "200"))
+# Must match the app's outbound queue settings (single server process)
+RATE_PER_MINUTE = float(os.environ.get("WHATSAPP_MSGS_POR_MINUTO", "600"))
+BURST_ALLOWANCE = int(os.environ.get("WHATSAPP_RAJADA", "5"))
+# Session lookups are cached by the app; a status flipped in the database shows up after this
+CACHE_TTL_S = float(os.environ.get("WHATSAPP_CACHE_TTL_MS", "30000")) / 1000
 
 def test_whatsapp_integration_api_message_sending_and_connection_management():
-    session = requests.Session()
-    session.auth = AUTH
-    session.headers.update(HEADERS)
+    session = authenticated_session()
     connection_id = None
 
     try:
@@ -49,4 +60,93 @@ def test_whatsapp_integration_api_message_sending_and_connection_management():
             except Exception:
                 pass
 
+
+
+async def post_burst(empresa, marker):
+    """POST every message at once; returns (status, latency_ms) per request."""
+    async def send(http, n):
+        started = time.perf_counter()
+        payload = {"empresa_id": empresa, "numero": f"55119{n:08d}", "mensagem": f"{marker} #{n}"}
+        async with http.post(f"{BASE_URL}/api/whatsapp/enviar", json=payload) as resp:
+            await resp.read()
+            return resp.status, (time.perf_counter() - started) * 1000
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as http:
+        return await asyncio.gather(*(send(http, n) for n in range(BURST_MESSAGES)))
+
+
+def test_outbound_queue_throughput_against_fake_transport():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL to mark the test empresa's WhatsApp session as connected"
+    empresa = empresa_id()
+    marker = f"bench-whatsapp-{uuid.uuid4().hex[:12]}"
+    session = authenticated_session()
+
+    with WhatsAppStub() as stub, psycopg.connect(dsn, autocommit=True) as conn:
+        previous = conn.execute("SELECT status FROM whatsapp_sessions WHERE empresa_id = %s", (empresa,)).fetchone()
+        conn.execute(
+            """
+            INSERT INTO whatsapp_sessions (empresa_id, numero_whatsapp, status) VALUES (%s, '', 'connected')
+            ON CONFLICT (empresa_id) DO UPDATE SET status = 'connected'
+            """,
+            (empresa,),
+        )
+        try:
+            # Wait for the app's cached session status to pick up the change
+            deadline = time.time() + CACHE_TTL_S + 5
+            while True:
+                warmup = session.post(f"{BASE_URL}/api/whatsapp/enviar", timeout=TIMEOUT,
+                                      json={"empresa_id": empresa, "numero": "5511900000000", "mensagem": f"{marker} warmup"})
+                if warmup.status_code == 202 or time.time() > deadline:
+                    break
+                time.sleep(1)
+            assert warmup.status_code == 202, f"Expected 202 from enviar, got {warmup.status_code}: {warmup.text}"
+            assert warmup.json().get("queued") is True, "enviar did not queue the message"
+
+            started = time.perf_counter()
+            results = asyncio.run(post_burst(empresa, marker))
+            failed = [status for status, _ in results if status != 202]
+            assert not failed, f"{len(failed)} messages were not queued (statuses {set(failed)})"
+            ack_p95 = percentile(sorted(ms for _, ms in results), 95)
+            print(f"whatsapp enqueue p95 over {len(results)} requests: {ack_p95:.0f}ms")
+            assert ack_p95 < ACK_P95_MS, f"Enqueue p95 {ack_p95:.0f}ms exceeds {ACK_P95_MS:.0f}ms"
+
+            # The queue drains at the configured rate, not faster
+            expected = 1 + BURST_MESSAGES
+            drain_s = max(0, expected - BURST_ALLOWANCE) * 60 / RATE_PER_MINUTE
+            deadline = time.time() + drain_s * 1.5 + 30
+            while len(stub.received(marker)) < expected and time.time() < deadline:
+                time.sleep(0.5)
+            delivered = sorted(t for t, _ in stub.received(marker))
+            assert len(delivered) == expected, f"Only {len(delivered)}/{expected} messages delivered within the deadline"
+
+            elapsed = delivered[-1] - started
+            print(f"whatsapp throughput: {BURST_MESSAGES / elapsed:.1f} msg/s "
+                  f"(limit {RATE_PER_MINUTE / 60:.1f} msg/s), peak in flight {stub.peak_in_flight[empresa]}")
+            for n, t in enumerate(delivered):
+                allowed = BURST_ALLOWANCE + (t - delivered[0]) * RATE_PER_MINUTE / 60 + 1
+                assert n + 1 <= allowed, f"{n + 1} messages sent after {t - delivered[0]:.1f}s exceeds the rate limit"
+            assert stub.peak_in_flight[empresa] == 1, "Messages of one empresa must go out one at a time"
+
+            # Results are recorded in batches right after each send
+            deadline = time.time() + 10
+            while True:
+                sent = conn.execute(
+                    "SELECT count(*) FROM whatsapp_mensagens WHERE mensagem LIKE %s AND status = 'enviado'",
+                    (marker + "%",),
+                ).fetchone()[0]
+                if sent == expected or time.time() > deadline:
+                    break
+                time.sleep(0.5)
+            assert sent == expected, f"Only {sent}/{expected} messages marked as enviado"
+        finally:
+            conn.execute("DELETE FROM whatsapp_mensagens WHERE mensagem LIKE %s", (marker + "%",))
+            if previous:
+                conn.execute("UPDATE whatsapp_sessions SET status = %s WHERE empresa_id = %s", (previous[0], empresa))
+            else:
+                conn.execute("DELETE FROM whatsapp_sessions WHERE empresa_id = %s", (empresa,))
+
+
 test_whatsapp_integration_api_message_sending_and_connection_management()
+test_outbound_queue_throughput_against_fake_transport()
@@ -1,29 +1,16 @@
 import asyncio
 from playwright import async_api
 
+import browser_pool
+import ui_actions
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
+    lease = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+        # Borrow a fresh isolated context from this worker's long-lived browser
+        lease = await browser_pool.acquire()
+        context = lease.context
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -48,47 +35,41 @@ async def run_test():
         # Click on the Login button to start login process.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/nav/div/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Input username and password, then click the login button.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('wdglp')
+        await ui_actions.fill(elem, 'wdglp')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123123')
+        await ui_actions.fill(elem, '123123')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem, wait_for="login")
         
 
         # Click on a service order with status 'ENTREGUE' to open its details.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div[2]/div/div[2]/div[2]/div/div[11]/div[2]/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         # Click the 'Editar' button to enable editing the service order status.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div[2]/div[2]/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await ui_actions.click(elem)
         
 
         assert False, 'Test failed: Expected error notification for invalid status change, but it was not found.'
-        await asyncio.sleep(5)
     
     finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
+        if lease:
+            await lease.release()
             
 asyncio.run(run_test())
-    
\ No newline at end of file
@@ -1,9 +1,8 @@
 import requests
-from requests.auth import HTTPBasicAuth
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
-TIMEOUT = 30
+from api_client import BASE_URL, TIMEOUT, authenticated_session
+
+session = authenticated_session()
 
 def test_email_verification_api_send_verify_resend_codes():
     email = "testuser@example.com"
@@ -14,11 +13,10 @@ def test_email_verification_api_send_verify_resend_codes():
     # Send verification code
     send_payload = {"usuarioId": usuarioId, "email": email, "nomeEmpresa": nomeEmpresa}
     try:
-        resp_send = requests.post(
+        resp_send = session.post(
             f"{BASE_URL}/api/email/enviar-codigo",
             json=send_payload,
             headers=headers,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert resp_send.status_code == 200, f"Send code failed: {resp_send.text}"
@@ -33,11 +31,10 @@ def test_email_verification_api_send_verify_resend_codes():
 
         # Verify code
         verify_payload = {"email": email, "code": code}
-        resp_verify = requests.post(
+        resp_verify = session.post(
             f"{BASE_URL}/api/email/verificar-codigo",
             json=verify_payload,
             headers=headers,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert resp_verify.status_code == 200, f"Verify code failed: {resp_verify.text}"
@@ -46,11 +43,10 @@ def test_email_verification_api_send_verify_resend_codes():
 
         # Resend code
         resend_payload = {"usuarioId": usuarioId, "email": email, "nomeEmpresa": nomeEmpresa}
-        resp_resend = requests.post(
+        resp_resend = session.post(
             f"{BASE_URL}/api/email/reenviar-codigo",
             json=resend_payload,
             headers=headers,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert resp_resend.status_code == 200, f"Resend code failed: {resp_resend.text}"
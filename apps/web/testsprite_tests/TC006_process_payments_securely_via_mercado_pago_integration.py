@@ -1,9 +1,6 @@
-import requests
-from requests.auth import HTTPBasicAuth
+from api_client import BASE_URL, TIMEOUT, authenticated_session
 
-BASE_URL = "http://localhost:3000"
-TIMEOUT = 30
-AUTH = HTTPBasicAuth('wdglp', '123123')
+session = authenticated_session()
 
 def test_tc006_process_payments_via_mercado_pago():
     headers = {
@@ -33,11 +30,10 @@ def test_tc006_process_payments_via_mercado_pago():
 
     # Test successful payment processing
     try:
-        response = requests.post(
+        response = session.post(
             payment_endpoint,
             json=payment_data_success,
             headers=headers,
-            auth=AUTH,
             timeout=TIMEOUT
         )
         assert response.status_code == 200, f"Expected status code 200, got {response.status_code}"
@@ -50,11 +46,10 @@ def test_tc006_process_payments_via_mercado_pago():
 
     # Test failed payment processing
     try:
-        response = requests.post(
+        response = session.post(
             payment_endpoint,
             json=payment_data_failure,
             headers=headers,
-            auth=AUTH,
             timeout=TIMEOUT
         )
         # Expected to fail, could be 400 or 402 or another client error according to implementation
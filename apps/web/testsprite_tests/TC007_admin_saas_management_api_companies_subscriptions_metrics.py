@@ -1,11 +1,16 @@
-import requests
-from requests.auth import HTTPBasicAuth
+import os
 
+from api_client import BASE_URL, TIMEOUT, authenticated_session
+from loadtest import percentile
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
 HEADERS = {"Content-Type": "application/json"}
-TIMEOUT = 30
+
+# A full admin page must come back in a couple of grouped queries, not one fan-out per company
+EMPRESAS_PAGE_SIZE = int(os.environ.get("ADMIN_EMPRESAS_PAGE_SIZE", "100"))
+EMPRESAS_SAMPLES = int(os.environ.get("ADMIN_EMPRESAS_SAMPLES", "10"))
+EMPRESAS_MAX_P95_MS = float(os.environ.get("ADMIN_EMPRESAS_MAX_P95_MS", "800"))
+
+session = authenticated_session()
 
 
 def test_admin_saas_management_api_companies_subscriptions_metrics():
@@ -20,11 +25,10 @@ def test_admin_saas_management_api_companies_subscriptions_metrics():
             "email": "testcompany@example.com",
             "phone": "1234567890"
         }
-        create_company_resp = requests.post(
+        create_company_resp = session.post(
             f"{BASE_URL}/api/admin-saas/empresas",
             json=company_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert create_company_resp.status_code == 201, f"Company creation failed: {create_company_resp.text}"
@@ -40,11 +44,10 @@ def test_admin_saas_management_api_companies_subscriptions_metrics():
             "startDate": "2025-01-01",
             "endDate": "2025-12-31"
         }
-        create_subscription_resp = requests.post(
+        create_subscription_resp = session.post(
             f"{BASE_URL}/api/admin-saas/assinaturas",
             json=subscription_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         # If subscription endpoint returns 404, try payments listing for subs (based on PRD files)
@@ -59,22 +62,38 @@ def test_admin_saas_management_api_companies_subscriptions_metrics():
             assert subscription_id is not None, "Created subscription id is missing"
 
         # 3. Get Companies List and check the created company is included
-        list_companies_resp = requests.get(
+        list_companies_resp = session.get(
             f"{BASE_URL}/api/admin-saas/empresas",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert list_companies_resp.status_code == 200, f"Fetching companies failed: {list_companies_resp.text}"
         companies = list_companies_resp.json()
         assert any(c.get("id") == company_id for c in companies), "Created company not found in list"
 
+        # 3b. Latency of a page with many tenants, each enriched with metrics and billing
+        latencies = []
+        for _ in range(EMPRESAS_SAMPLES):
+            page_resp = session.get(
+                f"{BASE_URL}/api/admin-saas/empresas",
+                params={"page": 1, "pageSize": EMPRESAS_PAGE_SIZE},
+                headers=HEADERS,
+                timeout=TIMEOUT,
+            )
+            assert page_resp.status_code == 200, f"Fetching companies page failed: {page_resp.text}"
+            latencies.append(page_resp.timing.total_ms)
+        items = page_resp.json().get("items", [])
+        assert all("metrics" in item and "billing" in item for item in items), "Companies page items missing metrics/billing"
+        p95 = percentile(sorted(latencies), 95)
+        assert p95 < EMPRESAS_MAX_P95_MS, (
+            f"Companies page of {len(items)} tenants: p95 {p95:.0f}ms exceeds {EMPRESAS_MAX_P95_MS:.0f}ms"
+        )
+
         # 4. Get Subscriptions List and check the created subscription is included (if created)
         if subscription_id:
-            list_subscriptions_resp = requests.get(
+            list_subscriptions_resp = session.get(
                 f"{BASE_URL}/api/admin-saas/assinaturas",
                 headers=HEADERS,
-                auth=AUTH,
                 timeout=TIMEOUT,
             )
             if list_subscriptions_resp.status_code == 200:
@@ -82,10 +101,9 @@ def test_admin_saas_management_api_companies_subscriptions_metrics():
                 assert any(s.get("id") == subscription_id for s in subscriptions), "Created subscription not found in list"
 
         # 5. Get System Metrics
-        metrics_resp = requests.get(
+        metrics_resp = session.get(
             f"{BASE_URL}/api/admin-saas/metrics",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert metrics_resp.status_code == 200, f"Fetching metrics failed: {metrics_resp.text}"
@@ -104,18 +122,16 @@ def test_admin_saas_management_api_companies_subscriptions_metrics():
     finally:
         # Clean up subscription if created
         if subscription_id:
-            requests.delete(
+            session.delete(
                 f"{BASE_URL}/api/admin-saas/assinaturas/{subscription_id}",
                 headers=HEADERS,
-                auth=AUTH,
                 timeout=TIMEOUT,
             )
         # Clean up company
         if company_id:
-            requests.delete(
+            session.delete(
                 f"{BASE_URL}/api/admin-saas/empresas/{company_id}",
                 headers=HEADERS,
-                auth=AUTH,
                 timeout=TIMEOUT,
             )
 
@@ -1,11 +1,9 @@
-import requests
-from requests.auth import HTTPBasicAuth
+from api_client import BASE_URL, TIMEOUT, authenticated_session
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
-TIMEOUT = 30
 HEADERS = {"Content-Type": "application/json"}
 
+session = authenticated_session()
+
 def test_supabase_backend_crud_operations():
     # Removed user CRUD as no /api/users endpoint is defined in PRD
     user_id = "test_user_id"  # Placeholder user_id for order creation
@@ -21,11 +19,10 @@ def test_supabase_backend_crud_operations():
             "phone": "+5511999999999",
             "address": "Rua Exemplo, 123, São Paulo",
         }
-        r = requests.post(
+        r = session.post(
             f"{BASE_URL}/api/clientes",
             json=client_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert r.status_code == 201, f"Client creation failed: {r.text}"
@@ -34,10 +31,9 @@ def test_supabase_backend_crud_operations():
         assert client_id is not None, "Client ID missing in creation response"
 
         # 2. Retrieve client
-        r = requests.get(
+        r = session.get(
             f"{BASE_URL}/api/clientes/{client_id}",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert r.status_code == 200, f"Client retrieval failed: {r.text}"
@@ -48,11 +44,10 @@ def test_supabase_backend_crud_operations():
 
         # 3. Update client phone
         update_client_payload = {"phone": "+5511988888888"}
-        r = requests.put(
+        r = session.put(
             f"{BASE_URL}/api/clientes/{client_id}",
             json=update_client_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert r.status_code == 200, f"Client update failed: {r.text}"
@@ -69,11 +64,10 @@ def test_supabase_backend_crud_operations():
             "serial_number": "SN123456789",
             "notes": "Battery not charging",
         }
-        r = requests.post(
+        r = session.post(
             f"{BASE_URL}/api/equipamentos",
             json=equipment_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert r.status_code == 201, f"Equipment creation failed: {r.text}"
@@ -82,10 +76,9 @@ def test_supabase_backend_crud_operations():
         assert equipment_id is not None, "Equipment ID missing in creation response"
 
         # 2. Retrieve equipment
-        r = requests.get(
+        r = session.get(
             f"{BASE_URL}/api/equipamentos/{equipment_id}",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert r.status_code == 200, f"Equipment retrieval failed: {r.text}"
@@ -96,11 +89,10 @@ def test_supabase_backend_crud_operations():
 
         # 3. Update equipment notes
         update_equipment_payload = {"notes": "Battery replaced"}
-        r = requests.put(
+        r = session.put(
             f"{BASE_URL}/api/equipamentos/{equipment_id}",
             json=update_equipment_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert r.status_code == 200, f"Equipment update failed: {r.text}"
@@ -116,11 +108,10 @@ def test_supabase_backend_crud_operations():
             "description": "Battery replacement service order",
             "status": "pending"
         }
-        r = requests.post(
+        r = session.post(
             f"{BASE_URL}/api/ordens",
             json=order_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert r.status_code == 201, f"Order creation failed: {r.text}"
@@ -129,10 +120,9 @@ def test_supabase_backend_crud_operations():
         assert order_id is not None, "Order ID missing in creation response"
 
         # 2. Retrieve order
-        r = requests.get(
+        r = session.get(
             f"{BASE_URL}/api/ordens/{order_id}",
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert r.status_code == 200, f"Order retrieval failed: {r.text}"
@@ -145,11 +135,10 @@ def test_supabase_backend_crud_operations():
 
         # 3. Update order status to 'in progress'
         update_order_payload = {"status": "in progress"}
-        r = requests.put(
+        r = session.put(
             f"{BASE_URL}/api/ordens/{order_id}",
             json=update_order_payload,
             headers=HEADERS,
-            auth=AUTH,
             timeout=TIMEOUT,
         )
         assert r.status_code == 200, f"Order update failed: {r.text}"
@@ -161,10 +150,9 @@ def test_supabase_backend_crud_operations():
 
         if order_id:
             try:
-                r = requests.delete(
+                r = session.delete(
                     f"{BASE_URL}/api/ordens/{order_id}",
                     headers=HEADERS,
-                    auth=AUTH,
                     timeout=TIMEOUT,
                 )
                 assert r.status_code in [200, 204], f"Order deletion failed: {r.text}"
@@ -173,10 +161,9 @@ def test_supabase_backend_crud_operations():
 
         if equipment_id:
             try:
-                r = requests.delete(
+                r = session.delete(
                     f"{BASE_URL}/api/equipamentos/{equipment_id}",
                     headers=HEADERS,
-                    auth=AUTH,
                     timeout=TIMEOUT,
                 )
                 assert r.status_code in [200, 204], f"Equipment deletion failed: {r.text}"
@@ -185,10 +172,9 @@ def test_supabase_backend_crud_operations():
 
         if client_id:
             try:
-                r = requests.delete(
+                r = session.delete(
                     f"{BASE_URL}/api/clientes/{client_id}",
                     headers=HEADERS,
-                    auth=AUTH,
                     timeout=TIMEOUT,
                 )
                 assert r.status_code in [200, 204], f"Client deletion failed: {r.text}"
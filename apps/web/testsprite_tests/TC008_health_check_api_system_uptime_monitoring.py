@@ -1,17 +1,18 @@
 import requests
-from requests.auth import HTTPBasicAuth
+
+from api_client import BASE_URL, TIMEOUT, authenticated_session
+
+session = authenticated_session()
 
 def test_health_check_api_system_uptime_monitoring():
-    base_url = "http://localhost:3000"
     endpoint = "/api/health-check"
-    url = base_url + endpoint
-    auth = HTTPBasicAuth("wdglp", "123123")
+    url = BASE_URL + endpoint
     headers = {
         "Accept": "application/json"
     }
 
     try:
-        response = requests.get(url, auth=auth, headers=headers, timeout=30)
+        response = session.get(url, headers=headers, timeout=TIMEOUT)
     except requests.RequestException as e:
         assert False, f"Request to health check API failed: {e}"
 
@@ -1,11 +1,11 @@
 import requests
-from requests.auth import HTTPBasicAuth
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
-TIMEOUT = 30
+from api_client import BASE_URL, TIMEOUT, authenticated_session
+
 HEADERS = {"Accept": "application/json"}
 
+session = authenticated_session()
+
 def test_render_reusable_ui_components_consistently():
     """
     This test checks the backend endpoints related to reusable UI components to ensure they render
@@ -23,7 +23,7 @@ def test_render_reusable_ui_components_consistently():
 
     url = f"{BASE_URL}/api/ui-components"
     try:
-        response = requests.get(url, auth=AUTH, headers=HEADERS, timeout=TIMEOUT)
+        response = session.get(url, headers=HEADERS, timeout=TIMEOUT)
         assert response.status_code == 200, f"Expected status 200 but got {response.status_code}"
         data = response.json()
 
@@ -1,9 +1,8 @@
 import requests
-from requests.auth import HTTPBasicAuth
 
-BASE_URL = "http://localhost:3000"
-AUTH = HTTPBasicAuth("wdglp", "123123")
-TIMEOUT = 30
+from api_client import BASE_URL, TIMEOUT, authenticated_session
+
+session = authenticated_session()
 
 def test_centralized_error_handling():
     """
@@ -16,7 +15,7 @@ def test_centralized_error_handling():
     }
 
     try:
-        response = requests.get(invalid_endpoint, auth=AUTH, headers=headers, timeout=TIMEOUT)
+        response = session.get(invalid_endpoint, headers=headers, timeout=TIMEOUT)
         # We expect a 4xx or 5xx error status code
         assert response.status_code >= 400, f"Expected error status code but got {response.status_code}"
         try:
@@ -1,15 +1,16 @@
 import requests
-from requests.auth import HTTPBasicAuth
+
+from api_client import BASE_URL, TIMEOUT, authenticated_session
+
+session = authenticated_session()
 
 def test_health_check_api():
-    base_url = "http://localhost:3000"
-    endpoint = f"{base_url}/api/health-check"
-    auth = HTTPBasicAuth('wdglp', '123123')
+    endpoint = f"{BASE_URL}/api/health-check"
     headers = {
         "Accept": "application/json"
     }
     try:
-        response = requests.get(endpoint, headers=headers, auth=auth, timeout=30)
+        response = session.get(endpoint, headers=headers, timeout=TIMEOUT)
         response.raise_for_status()
     except requests.RequestException as e:
         assert False, f"Health check API request failed: {e}"
@@ -1,29 +1,16 @@
 import asyncio
 from playwright import async_api
 
+import browser_pool
+import timing
+
 async def run_test():
-    pw = None
-    browser = None
-    context = None
+    lease = None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+        # Borrow a fresh isolated context from this worker's long-lived browser
+        lease = await browser_pool.acquire()
+        context = lease.context
         
         # Open a new page in the browser context
         page = await context.new_page()
@@ -52,16 +39,11 @@ async def run_test():
         response = await page.goto('http://localhost:3000/api/health-check', timeout=10000)
         assert response.status == 200, f'Expected status 200 but got {response.status}'
         response_time = response.timing['responseEnd'] - response.timing['requestStart']
-        assert response_time < 2000, f'Response time {response_time}ms exceeds 2000ms limit'
-        await asyncio.sleep(5)
+        budget_ms = timing.budget_for('GET', '/api/health-check').get('total_ms', 2000)
+        assert response_time < budget_ms, f'Response time {response_time}ms exceeds {budget_ms}ms limit'
     
     finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
+        if lease:
+            await lease.release()
             
 asyncio.run(run_test())
-    
\ No newline at end of file
@@ -1,95 +1,36 @@
 import asyncio
-from playwright import async_api
+import os
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Click the Login button to test the login API action.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/nav/div/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input username and password, then submit login form to test login API latency.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('wdglp')
-        
+import bench_store
+from loadtest import LoadEngine, service_order_scenario
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123123')
-        
+VIRTUAL_USERS = int(os.environ.get("LOAD_USERS", "50"))
+ARRIVAL_RATE = float(os.environ.get("LOAD_ARRIVAL_RATE", "10"))
+ITERATIONS = int(os.environ.get("LOAD_ITERATIONS", "3"))
+MAX_ERROR_RATE = float(os.environ.get("LOAD_MAX_ERROR_RATE", "0.01"))
+MAX_P95_MS = float(os.environ.get("LOAD_MAX_P95_MS", "2000"))
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+async def run_test():
+    # Drive N virtual users through login -> Nova OS -> update OS -> client search
+    engine = LoadEngine(
+        service_order_scenario,
+        virtual_users=VIRTUAL_USERS,
+        arrival_rate=ARRIVAL_RATE,
+        iterations=ITERATIONS,
+    )
+    report = await engine.run()
+    print(report.format_table())
+    # Keep the samples in the benchmark history before asserting, so failing runs are comparable too
+    bench_store.record_load_report(report, label="TC016")
 
-        # Click on 'Ordens de Serviço' tab to start testing order creation API latency and concurrency.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div[2]/nav/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    summaries = {s["endpoint"]: s for s in report.summaries()}
+    assert "POST /api/login" in summaries, "No login requests were issued"
+    assert summaries["POST /api/login"]["requests"] == VIRTUAL_USERS * ITERATIONS, "Not every virtual user logged in"
 
-        # Click on 'Nova OS' button to start creating a new order and test order creation API latency.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div[2]/div[2]/div/div/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    for name, s in summaries.items():
+        assert s["error_rate"] <= MAX_ERROR_RATE, (
+            f"{name}: error rate {s['error_rate']:.1%} exceeds {MAX_ERROR_RATE:.1%} (status codes {s['status_codes']})"
+        )
+        assert s["p95_ms"] < MAX_P95_MS, f"{name}: p95 {s['p95_ms']:.0f}ms exceeds {MAX_P95_MS:.0f}ms"
 
-        # Final generic failing assertion since expected result is unknown
-        assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
 asyncio.run(run_test())
-    
\ No newline at end of file
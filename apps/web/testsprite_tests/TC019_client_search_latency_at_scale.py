@@ -0,0 +1,95 @@
+import json
+import os
+import random
+
+from api_client import BASE_URL, get_session
+from loadtest import percentile
+from seed_data import FIRST_NAMES, LAST_NAMES, RESULTS_DIR
+
+# Large tenant seeded with: python seed_data.py --empresas 1 --clientes 200000
+MIN_CLIENTES = int(os.environ.get("CLIENT_SEARCH_MIN_CLIENTES", "200000"))
+QUERIES = int(os.environ.get("CLIENT_SEARCH_QUERIES", "300"))
+WARMUP = 20
+MAX_P95_MS = float(os.environ.get("CLIENT_SEARCH_MAX_P95_MS", "100"))
+PAGE_SIZE = 50
+
+session = get_session()
+
+
+def large_tenant():
+    """(empresa_id, size) from CLIENT_SEARCH_EMPRESA_ID or the biggest tenant in the seed manifest."""
+    if os.environ.get("CLIENT_SEARCH_EMPRESA_ID"):
+        return os.environ["CLIENT_SEARCH_EMPRESA_ID"], MIN_CLIENTES
+    with open(RESULTS_DIR / "seed-manifest.json") as fh:
+        biggest = json.load(fh)["tenants"][0]
+    return biggest["id"], biggest["clientes"]
+
+
+def search_terms(rng, n):
+    """Keystroke-like terms: name prefixes, full surnames, phone fragments and empty (list all)."""
+    terms = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.35:
+            name = rng.choice(FIRST_NAMES)
+            terms.append(name[: rng.randint(3, len(name))])
+        elif kind < 0.65:
+            terms.append(rng.choice(LAST_NAMES))
+        elif kind < 0.9:
+            terms.append(str(rng.randint(1000, 9999)))
+        else:
+            terms.append("")
+    return terms
+
+
+def search(empresa, term, cursor=None):
+    params = {"empresaId": empresa, "search": term, "limit": PAGE_SIZE}
+    if cursor:
+        params["cursor"] = cursor
+    resp = session.get(f"{BASE_URL}/api/clientes", params=params)
+    assert resp.status_code == 200, f"Search '{term}' failed: {resp.status_code} {resp.text}"
+    return resp
+
+
+def test_client_search_latency_at_scale():
+    empresa, size = large_tenant()
+    assert size >= MIN_CLIENTES, (
+        f"Largest seeded tenant has {size} clientes, need {MIN_CLIENTES}: "
+        f"run `python seed_data.py --empresas 1 --clientes {MIN_CLIENTES}`"
+    )
+    rng = random.Random(7)
+
+    # Pagination: pages are bounded and never repeat a client
+    seen = set()
+    cursor = None
+    for _ in range(3):
+        body = search(empresa, "silva", cursor).json()
+        page = body["clientes"]
+        assert 0 < len(page) <= PAGE_SIZE, f"Page size {len(page)} outside 1..{PAGE_SIZE}"
+        ids = {c["id"] for c in page}
+        assert not ids & seen, "Client repeated across pages"
+        seen |= ids
+        cursor = body["nextCursor"]
+        assert cursor, "Expected more pages for a common surname in a large tenant"
+
+    resp = session.get(f"{BASE_URL}/api/clientes", params={"empresaId": empresa, "cursor": "not-a-cursor"})
+    assert resp.status_code == 400, f"Invalid cursor should return 400, got {resp.status_code}"
+
+    for term in search_terms(rng, WARMUP):
+        search(empresa, term)
+
+    latencies = []
+    sizes = []
+    for term in search_terms(rng, QUERIES):
+        resp = search(empresa, term)
+        latencies.append(resp.timing.total_ms)
+        sizes.append(len(resp.content))
+        assert len(resp.json()["clientes"]) <= PAGE_SIZE, "Response exceeded the requested limit"
+
+    latencies.sort()
+    p50, p95 = percentile(latencies, 50), percentile(latencies, 95)
+    print(f"{QUERIES} searches over {size} clientes: p50 {p50:.0f}ms, p95 {p95:.0f}ms, max response {max(sizes)} bytes")
+    assert p95 < MAX_P95_MS, f"Client search p95 {p95:.0f}ms exceeds {MAX_P95_MS:.0f}ms"
+
+
+test_client_search_latency_at_scale()
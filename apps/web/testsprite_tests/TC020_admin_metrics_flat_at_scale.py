@@ -0,0 +1,80 @@
+import os
+import uuid
+
+import psycopg
+
+from api_client import BASE_URL, get_session
+from loadtest import percentile
+from seed_data import database_url
+
+# Payments inserted in one INSERT ... SELECT, like a bulk import or a backlog replay
+BENCH_PAYMENTS = int(os.environ.get("METRICS_BENCH_PAYMENTS", "1000000"))
+SAMPLES = int(os.environ.get("METRICS_BENCH_SAMPLES", "30"))
+# After the insert p95 may grow by at most this factor plus a small absolute slack
+MAX_GROWTH = float(os.environ.get("METRICS_BENCH_MAX_GROWTH", "1.5"))
+SLACK_MS = 25
+VALOR = 99.90
+
+session = get_session()
+
+
+def sample_metrics():
+    latencies = []
+    for _ in range(SAMPLES):
+        resp = session.get(f"{BASE_URL}/api/admin-saas/metrics")
+        assert resp.status_code == 200, f"Fetching metrics failed: {resp.status_code} {resp.text}"
+        latencies.append(resp.timing.total_ms)
+    return resp.json(), percentile(sorted(latencies), 95)
+
+
+def test_admin_metrics_flat_at_scale():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL to seed payments directly"
+    run = uuid.uuid4().hex[:12]
+    prefix = f"bench-metrics-{run}-"
+
+    before, p95_before = sample_metrics()
+    for key in ("totalCompanies", "activeSubscriptions", "subscriptionRevenue", "systemUptimeSeconds"):
+        assert key in before, f"Metric key '{key}' missing in metrics response"
+
+    with psycopg.connect(dsn) as conn:
+        usuario_id, empresa_id = conn.execute(
+            "SELECT id, empresa_id FROM usuarios WHERE empresa_id IS NOT NULL ORDER BY created_at LIMIT 1"
+        ).fetchone()
+        try:
+            # 9 of every 10 approved, the rest pending
+            conn.execute(
+                """
+                INSERT INTO pagamentos (empresa_id, usuario_id, mercadopago_payment_id, valor, metodo_pagamento, status, paid_at)
+                SELECT %s, %s, %s::TEXT || n, %s, 'pix',
+                       CASE WHEN n %% 10 = 0 THEN 'pending' ELSE 'approved' END,
+                       CASE WHEN n %% 10 = 0 THEN NULL ELSE NOW() END
+                FROM generate_series(1, %s) AS n
+                """,
+                (empresa_id, usuario_id, prefix, VALOR, BENCH_PAYMENTS),
+            )
+            conn.commit()
+
+            after, p95_after = sample_metrics()
+            approved = BENCH_PAYMENTS - BENCH_PAYMENTS // 10
+            assert after["pagamentos"] - before["pagamentos"] == BENCH_PAYMENTS, "Payment counter did not follow the insert"
+            assert (
+                after["pagamentosPorStatus"].get("approved", 0) - before["pagamentosPorStatus"].get("approved", 0) == approved
+            ), "Approved counter did not follow the insert"
+            revenue_delta = after["subscriptionRevenue"] - before["subscriptionRevenue"]
+            assert abs(revenue_delta - approved * VALOR) < 0.05, f"Revenue grew by {revenue_delta:.2f}, expected {approved * VALOR:.2f}"
+
+            print(f"metrics p95: {p95_before:.0f}ms before, {p95_after:.0f}ms after {BENCH_PAYMENTS} payments")
+            assert p95_after <= p95_before * MAX_GROWTH + SLACK_MS, (
+                f"Metrics endpoint is not flat: p95 {p95_before:.0f}ms -> {p95_after:.0f}ms after {BENCH_PAYMENTS} payments"
+            )
+        finally:
+            conn.rollback()
+            conn.execute("DELETE FROM pagamentos WHERE mercadopago_payment_id LIKE %s", (prefix + "%",))
+            conn.commit()
+
+    restored, _ = sample_metrics()
+    assert restored["pagamentos"] == before["pagamentos"], "Payment counter did not follow the cleanup delete"
+
+
+test_admin_metrics_flat_at_scale()
@@ -0,0 +1,147 @@
+import json
+import math
+import os
+import random
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import psycopg
+
+from api_client import BASE_URL, empresa_id, get_session, login
+from seed_data import RESULTS_DIR, database_url
+
+TZ = ZoneInfo("America/Sao_Paulo")
+# Reference days checked besides today, drawn from the seeded history
+HISTORY_DAYS = int(os.environ.get("ORDER_METRICS_HISTORY_DAYS", "20"))
+COUNT_KEYS = ("totalOS", "osHoje", "retornosHoje", "aprovadosHoje", "totalMes", "retornosMes",
+              "ordensSemana", "ordensSemanaAnterior", "ordensMesAnterior")
+
+session = get_session()
+
+
+def js_round(x):
+    return math.floor(x + 0.5)
+
+
+def seeded_tenant():
+    """ORDER_METRICS_EMPRESA_ID or the biggest tenant in the seed manifest."""
+    if os.environ.get("ORDER_METRICS_EMPRESA_ID"):
+        return os.environ["ORDER_METRICS_EMPRESA_ID"]
+    with open(RESULTS_DIR / "seed-manifest.json") as fh:
+        return json.load(fh)["tenants"][0]["id"]
+
+
+def load_orders(conn, empresa):
+    return conn.execute(
+        "SELECT created_at, tipo, status, status_tecnico, valor_faturado FROM ordens_servico WHERE empresa_id = %s",
+        (empresa,),
+    ).fetchall()
+
+
+def brute_force(orders, hoje):
+    """Every dashboard number straight from the order rows, one pass per metric like the old hook."""
+    inicio_semana = hoje - timedelta(days=(hoje.weekday() + 1) % 7)
+    inicio_mes = hoje.replace(day=1)
+    inicio_mes_anterior = (inicio_mes - timedelta(days=1)).replace(day=1)
+    dias = [(created_at.astimezone(TZ).date(), tipo, status, status_tecnico, valor)
+            for created_at, tipo, status, status_tecnico, valor in orders]
+
+    def aprovado(status, status_tecnico):
+        return (status or "").lower() == "aprovado" or (status_tecnico or "").lower() == "aprovado"
+
+    m = {
+        "totalOS": len(dias),
+        "osHoje": sum(1 for d, *_ in dias if d == hoje),
+        "faturamentoHoje": float(sum(v or 0 for d, _, _, _, v in dias if d == hoje)),
+        "retornosHoje": sum(1 for d, t, *_ in dias if d == hoje and t == "Retorno"),
+        "aprovadosHoje": sum(1 for d, _, s, st, _ in dias if d == hoje and aprovado(s, st)),
+        "totalMes": sum(1 for d, *_ in dias if inicio_mes <= d <= hoje),
+        "retornosMes": sum(1 for d, t, *_ in dias if inicio_mes <= d <= hoje and t == "Retorno"),
+        "ordensSemana": sum(1 for d, *_ in dias if inicio_semana <= d <= hoje),
+        "ordensSemanaAnterior": sum(1 for d, *_ in dias if inicio_semana - timedelta(days=7) <= d < inicio_semana),
+        "ordensMesAnterior": sum(1 for d, *_ in dias if inicio_mes_anterior <= d < inicio_mes),
+    }
+    m["ticketMedioHoje"] = m["faturamentoHoje"] / m["osHoje"] if m["osHoje"] else 0
+    m["percentualRetornos"] = js_round(m["retornosMes"] / m["totalOS"] * 100) if m["totalOS"] else 0
+    return m
+
+
+def assert_matches(actual, expected, context):
+    for key in COUNT_KEYS:
+        assert int(actual[key]) == expected[key], f"{context}: {key} = {actual[key]}, brute force gives {expected[key]}"
+    assert abs(float(actual["faturamentoHoje"]) - expected["faturamentoHoje"]) < 0.01, (
+        f"{context}: faturamentoHoje = {actual['faturamentoHoje']}, brute force gives {expected['faturamentoHoje']:.2f}"
+    )
+
+
+def dashboard(conn, empresa, hoje):
+    return conn.execute("SELECT ordens_metricas_dashboard(%s, %s)", (empresa, hoje)).fetchone()[0]
+
+
+def test_order_metrics_match_brute_force():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL to compare the rollup with the order rows"
+    rng = random.Random(7)
+    today = datetime.now(TZ).date()
+
+    with psycopg.connect(dsn) as conn:
+        # 1. Rollup of a seeded tenant against the raw rows, on today and random past days
+        tenant = seeded_tenant()
+        orders = load_orders(conn, tenant)
+        assert orders, f"Tenant {tenant} has no service orders; run seed_data.py first"
+        days = [today] + sorted({o[0].astimezone(TZ).date() for o in rng.sample(orders, min(HISTORY_DAYS, len(orders)))})
+        for hoje in days:
+            assert_matches(dashboard(conn, tenant, hoje), brute_force(orders, hoje), f"tenant {tenant} on {hoje}")
+
+        # 2. Triggers keep the rollup exact through status, date and delete changes (rolled back afterwards)
+        try:
+            moved_id, old_created = conn.execute(
+                "SELECT id, created_at FROM ordens_servico WHERE empresa_id = %s ORDER BY created_at LIMIT 1", (tenant,)
+            ).fetchone()
+            old_day = old_created.astimezone(TZ).date()
+            conn.execute(
+                "UPDATE ordens_servico SET created_at = NOW(), status = 'APROVADO', tipo = 'Retorno' WHERE id = %s",
+                (moved_id,),
+            )
+            conn.execute(
+                """
+                UPDATE ordens_servico SET status = 'APROVADO'
+                WHERE id IN (SELECT id FROM ordens_servico WHERE empresa_id = %s AND status <> 'APROVADO' LIMIT 500)
+                """,
+                (tenant,),
+            )
+            conn.execute(
+                """
+                DELETE FROM ordens_servico WHERE id IN (
+                    SELECT o.id FROM ordens_servico o
+                    WHERE o.empresa_id = %s AND o.id <> %s
+                      AND NOT EXISTS (SELECT 1 FROM pagamentos p WHERE p.ordem_servico_id = o.id)
+                      AND NOT EXISTS (SELECT 1 FROM comissoes_historico c WHERE c.ordem_servico_id = o.id)
+                    LIMIT 50
+                )
+                """,
+                (tenant, moved_id),
+            )
+            orders = load_orders(conn, tenant)
+            for hoje in (today, old_day):
+                assert_matches(dashboard(conn, tenant, hoje), brute_force(orders, hoje), f"after updates, {hoje}")
+        finally:
+            conn.rollback()
+
+        # 3. The endpoint serves the logged-in user's empresa from the same rollup
+        own_orders = load_orders(conn, empresa_id())
+
+    headers = {"Authorization": f"Bearer {login()['session']['access_token']}"}
+    resp = session.get(f"{BASE_URL}/api/ordens/metrics", params={"data": today.isoformat()}, headers=headers)
+    assert resp.status_code == 200, f"Fetching order metrics failed: {resp.status_code} {resp.text}"
+    body = resp.json()
+    expected = brute_force(own_orders, today)
+    assert_matches(body, expected, "GET /api/ordens/metrics")
+    assert body["percentualRetornos"] == expected["percentualRetornos"], "percentualRetornos differs from brute force"
+    assert abs(body["ticketMedioHoje"] - expected["ticketMedioHoje"]) < 0.01, "ticketMedioHoje differs from brute force"
+
+    resp = session.get(f"{BASE_URL}/api/ordens/metrics", params={"data": "ontem"}, headers=headers)
+    assert resp.status_code == 400, f"Invalid date should be rejected, got {resp.status_code}"
+
+
+test_order_metrics_match_brute_force()
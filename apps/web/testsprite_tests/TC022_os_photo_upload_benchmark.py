@@ -0,0 +1,161 @@
+import os
+import random
+import struct
+import threading
+import time
+import uuid
+import zlib
+from pathlib import Path
+
+from supabase import create_client
+
+from api_client import BASE_URL, TIMEOUT, get_session, login
+
+# One OS intake: phone photos of a few MB each
+PHOTOS = int(os.environ.get("UPLOAD_BENCH_PHOTOS", "10"))
+WIDTH, HEIGHT = 1280, 960
+RUNS = int(os.environ.get("UPLOAD_BENCH_RUNS", "3"))
+MAX_SECONDS = float(os.environ.get("UPLOAD_BENCH_MAX_S", "8"))
+# Growth of the server's resident memory over its idle baseline while uploading
+MAX_RSS_GROWTH_MB = float(os.environ.get("UPLOAD_BENCH_MAX_RSS_MB", "200"))
+MAX_THUMBNAIL_KB = 60
+NOISE_MASK = bytes(i & 0x3F for i in range(256))
+BUCKET = "ordens-imagens"
+SUPABASE_URL = os.environ.get("NEXT_PUBLIC_SUPABASE_URL", "")
+# Service role: removes the benchmark uploads through the Storage API
+SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "")
+
+session = get_session()
+
+
+def synthetic_photo(seed):
+    """A PNG of gradient plus sensor-like noise: barely compressible, like a real photo."""
+    rng = random.Random(seed)
+    # Gradient channels stay <= 191 and noise <= 63, so adding them as big integers never carries
+    gradient = bytearray(WIDTH * 3)
+    gradient[0::3] = bytes(x * 191 // WIDTH for x in range(WIDTH))
+    gradient[2::3] = bytes(191 - x * 191 // WIDTH for x in range(WIDTH))
+    rows = []
+    for y in range(HEIGHT):
+        gradient[1::3] = bytes([y * 191 // HEIGHT]) * WIDTH
+        noise = rng.randbytes(WIDTH * 3).translate(NOISE_MASK)
+        pixels = int.from_bytes(gradient, "big") + int.from_bytes(noise, "big")
+        rows.append(b"\x00" + pixels.to_bytes(WIDTH * 3, "big"))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", WIDTH, HEIGHT, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + chunk(b"IEND", b""))
+
+
+def server_pid():
+    """PID of the Next server: TESTSPRITE_APP_PID or the process titled next-server."""
+    if os.environ.get("TESTSPRITE_APP_PID"):
+        return int(os.environ["TESTSPRITE_APP_PID"])
+    for proc in Path("/proc").iterdir():
+        if not proc.name.isdigit():
+            continue
+        try:
+            if (proc / "cmdline").read_bytes().startswith(b"next-server"):
+                return int(proc.name)
+        except OSError:
+            continue
+    return None
+
+
+def rss_mb(pid):
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class RssSampler(threading.Thread):
+    """Samples the server's RSS every 20ms until stopped; `peak` is the highest value seen."""
+
+    def __init__(self, pid):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.peak = rss_mb(pid)
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(0.02):
+            self.peak = max(self.peak, rss_mb(self.pid))
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.peak
+
+
+def object_path(public_url):
+    """Path inside the bucket of a public Storage URL (.../object/public/<bucket>/<path>)."""
+    return public_url.split(f"/object/public/{BUCKET}/", 1)[1].split("?", 1)[0]
+
+
+def test_os_photo_upload_throughput_and_memory():
+    headers = {"Authorization": f"Bearer {login()['session']['access_token']}"}
+    photos = [synthetic_photo(n) for n in range(PHOTOS)]
+    total_mb = sum(len(p) for p in photos) / 1024 / 1024
+    pid = server_pid()
+    stored = []
+
+    try:
+        durations, rss_growth = [], []
+        for run in range(RUNS):
+            ordem_id = f"bench-upload-{uuid.uuid4().hex[:12]}"
+            files = [("files", (f"foto_{n}.png", photo, "image/png")) for n, photo in enumerate(photos)]
+
+            baseline = rss_mb(pid) if pid else None
+            sampler = RssSampler(pid) if pid else None
+            if sampler:
+                sampler.start()
+            started = time.perf_counter()
+            resp = session.post(f"{BASE_URL}/api/upload", data={"ordemId": ordem_id}, files=files,
+                                headers=headers, timeout=TIMEOUT * 2)
+            durations.append(time.perf_counter() - started)
+            if sampler:
+                rss_growth.append(sampler.stop() - baseline)
+
+            assert resp.status_code == 200, f"Upload failed with {resp.status_code}: {resp.text}"
+            uploaded = resp.json()["files"]
+            stored += [object_path(u) for f in uploaded for u in (f["url"], f["thumbnail_url"], f["webp_url"]) if u]
+            assert [f["name"] for f in uploaded] == [f"foto_{n}.png" for n in range(PHOTOS)], "Files out of order"
+            assert all(f["thumbnail_url"] and f["webp_url"] for f in uploaded), "Missing thumbnail/WebP variants"
+
+            if run == 0:
+                for f in uploaded[:3]:
+                    thumb = session.get(f["thumbnail_url"], timeout=TIMEOUT)
+                    assert thumb.status_code == 200, f"Thumbnail not served: {thumb.status_code}"
+                    assert thumb.headers.get("Content-Type", "").startswith("image/webp"), "Thumbnail is not WebP"
+                    assert len(thumb.content) < MAX_THUMBNAIL_KB * 1024, (
+                        f"Thumbnail is {len(thumb.content) // 1024}KB, list views should stay under {MAX_THUMBNAIL_KB}KB"
+                    )
+
+        best = min(durations)
+        print(f"upload of {PHOTOS} photos ({total_mb:.1f}MB): best {best:.2f}s, "
+              f"{total_mb / best:.1f}MB/s, {PHOTOS / best:.1f} photos/s")
+        assert best < MAX_SECONDS, f"Uploading {PHOTOS} photos took {best:.2f}s (budget {MAX_SECONDS:.0f}s)"
+        if rss_growth:
+            print(f"server RSS growth during upload: max {max(rss_growth):.0f}MB")
+            assert max(rss_growth) < MAX_RSS_GROWTH_MB, (
+                f"Server RSS grew {max(rss_growth):.0f}MB while uploading {total_mb:.1f}MB (budget {MAX_RSS_GROWTH_MB:.0f}MB)"
+            )
+        else:
+            print("next-server process not found: set TESTSPRITE_APP_PID to measure peak RSS")
+    finally:
+        # Storage objects of the benchmark OS (originals and variants); going through the
+        # Storage API also deletes the files, not just their rows in storage.objects
+        if stored and SUPABASE_URL and SUPABASE_KEY:
+            try:
+                create_client(SUPABASE_URL, SUPABASE_KEY).storage.from_(BUCKET).remove(stored)
+            except Exception as exc:
+                print(f"could not remove benchmark uploads: {exc}")
+        elif stored:
+            print(f"Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY to remove {len(stored)} benchmark uploads")
+
+
+test_os_photo_upload_throughput_and_memory()
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+
+import aiohttp
+import psycopg
+
+from api_client import BASE_URL, TIMEOUT, get_session
+from loadtest import percentile
+from seed_data import database_url
+
+SUPABASE_URL = os.environ.get("NEXT_PUBLIC_SUPABASE_URL", "")
+# Service role: the test measures the fan-out, not the RLS of a browser session
+SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "")
+SUBSCRIBERS = int(os.environ.get("NOTIF_FANOUT_SUBSCRIBERS", "300"))
+EMPRESAS = int(os.environ.get("NOTIF_FANOUT_EMPRESAS", "30"))
+PER_EMPRESA = int(os.environ.get("NOTIF_FANOUT_PER_EMPRESA", "5"))
+# A few subscribers on the old unfiltered channel, for the delivered-volume comparison
+UNFILTERED = int(os.environ.get("NOTIF_FANOUT_UNFILTERED", "5"))
+MAX_P95_MS = float(os.environ.get("NOTIF_FANOUT_MAX_P95_MS", "2000"))
+JOIN_TIMEOUT_S = 30
+HEARTBEAT_S = 25
+
+
+def socket_url():
+    base = SUPABASE_URL.rstrip("/").replace("https://", "wss://").replace("http://", "ws://")
+    return f"{base}/realtime/v1/websocket?apikey={SUPABASE_KEY}&vsn=1.0.0"
+
+
+async def subscriber(http, empresa, ready, stop, received):
+    """One browser tab: joins notificacoes_realtime_<empresa> (filtered) or an unfiltered
+    channel when empresa is None, and appends (received_at, record) for every INSERT."""
+    change = {"event": "INSERT", "schema": "public", "table": "notificacoes"}
+    if empresa:
+        change["filter"] = f"empresa_id=eq.{empresa}"
+    topic = f"realtime:notificacoes_realtime_{empresa or 'todas'}"
+    join = {
+        "topic": topic, "event": "phx_join", "ref": "1", "join_ref": "1",
+        "payload": {"config": {"broadcast": {"self": False}, "presence": {"key": ""},
+                               "postgres_changes": [change]},
+                    "access_token": SUPABASE_KEY},
+    }
+
+    async with http.ws_connect(socket_url(), heartbeat=None) as ws:
+        await ws.send_json(join)
+        next_heartbeat = time.monotonic() + HEARTBEAT_S
+        while not stop.is_set():
+            if time.monotonic() > next_heartbeat:
+                await ws.send_json({"topic": "phoenix", "event": "heartbeat", "payload": {}, "ref": "hb"})
+                next_heartbeat = time.monotonic() + HEARTBEAT_S
+            try:
+                msg = await ws.receive(timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                break
+            frame = json.loads(msg.data)
+            payload = frame.get("payload") or {}
+            if frame.get("event") == "system" and payload.get("extension") == "postgres_changes":
+                assert payload.get("status") == "ok", f"Realtime refused {topic}: {payload}"
+                ready.set()
+            elif frame.get("event") == "phx_reply" and payload.get("status") == "error":
+                raise AssertionError(f"Realtime refused {topic}: {payload}")
+            elif frame.get("event") == "postgres_changes":
+                received.append((time.time(), payload["data"]["record"]))
+
+
+def insert_notifications(dsn, empresas, marker):
+    """PER_EMPRESA notificacoes per empresa, interleaved; mensagem carries the send time."""
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        for n in range(PER_EMPRESA):
+            for empresa in empresas:
+                conn.execute(
+                    "INSERT INTO notificacoes (empresa_id, tipo, mensagem, lida, cliente_avisado) "
+                    "VALUES (%s, 'fanout_teste', %s, FALSE, FALSE)",
+                    (empresa, f"{marker} {n} {time.time():.6f}"),
+                )
+
+
+async def run_fanout(dsn, empresas, marker):
+    stop = asyncio.Event()
+    tabs = [empresas[n % len(empresas)] for n in range(SUBSCRIBERS)] + [None] * UNFILTERED
+    inboxes = [[] for _ in tabs]
+    readies = [asyncio.Event() for _ in tabs]
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as http:
+        tasks = [asyncio.create_task(subscriber(http, empresa, ready, stop, inbox))
+                 for empresa, ready, inbox in zip(tabs, readies, inboxes)]
+        try:
+            await asyncio.wait_for(asyncio.gather(*(r.wait() for r in readies)), JOIN_TIMEOUT_S)
+            await asyncio.to_thread(insert_notifications, dsn, empresas, marker)
+
+            expected = SUBSCRIBERS * PER_EMPRESA + UNFILTERED * PER_EMPRESA * len(empresas)
+            deadline = time.monotonic() + TIMEOUT
+            while sum(len(i) for i in inboxes) < expected and time.monotonic() < deadline:
+                await asyncio.sleep(0.2)
+            # Grace period: anything arriving now would be a cross-tenant leak or a duplicate
+            await asyncio.sleep(1)
+        finally:
+            stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return tabs, inboxes
+
+
+def test_notifications_reach_only_their_empresa_under_load():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL to pick empresas and insert notificacoes"
+    assert SUPABASE_URL and SUPABASE_KEY, "Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY"
+    marker = f"bench-notif-{uuid.uuid4().hex[:12]}"
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        empresas = [str(r[0]) for r in conn.execute("SELECT id FROM empresas ORDER BY id LIMIT %s", (EMPRESAS,))]
+    assert len(empresas) >= 2, "Need at least two empresas to check tenant isolation"
+
+    try:
+        tabs, inboxes = asyncio.run(run_fanout(dsn, empresas, marker))
+
+        latencies, delivered = [], 0
+        for empresa, inbox in zip(tabs, inboxes):
+            ours = [(at, r) for at, r in inbox if (r.get("mensagem") or "").startswith(marker)]
+            delivered += len(ours)
+            if empresa is None:
+                continue
+            foreign = [r for _, r in ours if r["empresa_id"] != empresa]
+            assert not foreign, f"Subscriber of {empresa} received {len(foreign)} notificacoes of other empresas"
+            assert len(ours) == PER_EMPRESA, f"Subscriber of {empresa} got {len(ours)} of {PER_EMPRESA} notificacoes"
+            latencies += [(at - float(r["mensagem"].rsplit(" ", 1)[1])) * 1000 for at, r in ours]
+
+        latencies.sort()
+        unfiltered_volume = (SUBSCRIBERS + UNFILTERED) * PER_EMPRESA * len(empresas)
+        print(f"{SUBSCRIBERS} subscribers over {len(empresas)} empresas: {delivered} messages delivered "
+              f"(an unfiltered channel would deliver {unfiltered_volume}), latency p50 "
+              f"{percentile(latencies, 50):.0f}ms p95 {percentile(latencies, 95):.0f}ms max {latencies[-1]:.0f}ms")
+        assert percentile(latencies, 95) < MAX_P95_MS, (
+            f"Notification p95 latency {percentile(latencies, 95):.0f}ms (budget {MAX_P95_MS:.0f}ms)"
+        )
+    finally:
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            conn.execute("DELETE FROM notificacoes WHERE mensagem LIKE %s", (marker + "%",))
+
+
+def test_pending_quote_reminder_is_generated_by_the_server():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL to backdate the orçamento notification"
+    cron_secret = os.environ.get("CRON_SECRET")
+    assert cron_secret, "Set CRON_SECRET to call /api/notificacoes/lembretes"
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        os_row = conn.execute(
+            "SELECT id, empresa_id FROM ordens_servico os WHERE upper(status_tecnico) LIKE '%ORÇAMENTO ENVIADO%' "
+            "AND upper(COALESCE(status, '')) NOT LIKE '%ENTREGUE%' AND NOT EXISTS ("
+            "  SELECT 1 FROM notificacoes n WHERE n.os_id = os.id AND n.created_at > NOW() - INTERVAL '10 minutes'"
+            ") LIMIT 1"
+        ).fetchone()
+        assert os_row, "No OS waiting for orçamento approval (and not notified in the last 10 minutes)"
+        os_id, empresa = os_row
+        started = conn.execute("SELECT NOW()").fetchone()[0]
+        # Last notification of this OS is older than the reminder interval
+        conn.execute(
+            "INSERT INTO notificacoes (empresa_id, tipo, os_id, mensagem, lida, cliente_avisado, created_at) "
+            "VALUES (%s, 'orcamento_enviado', %s, 'bench reminder', FALSE, FALSE, NOW() - INTERVAL '15 minutes')",
+            (empresa, os_id),
+        )
+        try:
+            resp = get_session().get(f"{BASE_URL}/api/notificacoes/lembretes",
+                                     headers={"Authorization": f"Bearer {cron_secret}"}, timeout=TIMEOUT)
+            assert resp.status_code == 200, f"lembretes returned {resp.status_code}: {resp.text}"
+            assert resp.json()["lembretes"] >= 1, "No reminder generated for a pending orçamento"
+
+            # One reminder row per OS, whether it was created now or reactivated
+            reminders = conn.execute(
+                "SELECT empresa_id, lida, created_at FROM notificacoes WHERE os_id = %s AND tipo = 'orcamento_lembrete'",
+                (os_id,),
+            ).fetchall()
+            assert [r[:2] for r in reminders] == [(empresa, False)] and reminders[0][2] >= started, (
+                f"Expected one fresh unread reminder for the OS, got {reminders}"
+            )
+
+            # A second run within the interval does not remind again
+            again = get_session().get(f"{BASE_URL}/api/notificacoes/lembretes",
+                                      headers={"Authorization": f"Bearer {cron_secret}"}, timeout=TIMEOUT)
+            assert again.status_code == 200
+            after = conn.execute(
+                "SELECT empresa_id, lida, created_at FROM notificacoes WHERE os_id = %s AND tipo = 'orcamento_lembrete'",
+                (os_id,),
+            ).fetchall()
+            assert after == reminders, f"Reminder repeated within the interval ({after})"
+        finally:
+            conn.execute(
+                "DELETE FROM notificacoes WHERE os_id = %s AND (mensagem = 'bench reminder' "
+                "OR (tipo = 'orcamento_lembrete' AND created_at >= %s))",
+                (os_id, started),
+            )
+
+
+test_notifications_reach_only_their_empresa_under_load()
+test_pending_quote_reminder_is_generated_by_the_server()
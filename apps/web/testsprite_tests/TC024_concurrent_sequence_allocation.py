@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+import uuid
+
+import aiohttp
+import psycopg
+
+from api_client import BASE_URL, TIMEOUT, empresa_id
+from loadtest import percentile
+from seed_data import database_url
+
+# Counter desk and stock intake at the same time: many creates for one empresa
+CONCURRENT_CREATES = int(os.environ.get("SEQUENCE_CONCURRENCY", "200"))
+CREATE_P95_MS = float(os.environ.get("SEQUENCE_CREATE_P95_MS", "1500"))
+
+
+async def concurrent_creates(path, payloads):
+    """POST every payload at once; returns (status, latency_ms, body) per request."""
+    async def one(http, payload):
+        started = time.perf_counter()
+        async with http.post(f"{BASE_URL}{path}", json=payload) as resp:
+            body = await resp.json(content_type=None)
+            return resp.status, (time.perf_counter() - started) * 1000, body
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=TIMEOUT * 2)) as http:
+        return await asyncio.gather(*(one(http, p) for p in payloads))
+
+
+def check_unique_and_fast(label, results, numbers):
+    failed = [(status, body) for status, _, body in results if status != 201]
+    assert not failed, f"{len(failed)}/{len(results)} {label} creates failed: {failed[:3]}"
+    duplicated = len(numbers) - len(set(numbers))
+    assert duplicated == 0, f"{duplicated} duplicated {label} numbers under {len(results)} concurrent creates"
+    assert all(str(n).isdigit() for n in numbers), f"Non-numeric {label} numbers allocated: {numbers[:5]}"
+
+    latencies = sorted(ms for _, ms, _ in results)
+    p50, p95 = percentile(latencies, 50), percentile(latencies, 95)
+    print(f"{len(results)} concurrent {label} creates: p50 {p50:.0f}ms, p95 {p95:.0f}ms, "
+          f"numbers {min(map(int, numbers))}..{max(map(int, numbers))}")
+    assert p95 < CREATE_P95_MS, f"{label} create p95 {p95:.0f}ms exceeds {CREATE_P95_MS:.0f}ms"
+
+
+def test_concurrent_creates_get_unique_numbers():
+    empresa = empresa_id()
+    marker = f"bench-seq-{uuid.uuid4().hex[:12]}"
+    clientes, produtos = [], []
+
+    try:
+        results = asyncio.run(concurrent_creates("/api/clientes", [
+            {"empresaId": empresa, "nome": f"{marker} cliente {n}", "celular": f"5511{n:09d}"}
+            for n in range(CONCURRENT_CREATES)
+        ]))
+        clientes = [body["cliente"]["id"] for status, _, body in results if status == 201]
+        check_unique_and_fast("cliente", results,
+                              [body["cliente"]["numero_cliente"] for status, _, body in results if status == 201])
+
+        results = asyncio.run(concurrent_creates("/api/produtos/criar", [
+            {"empresa_id": empresa, "nome": f"{marker} produto {n}", "tipo": "produto", "preco": "10.00"}
+            for n in range(CONCURRENT_CREATES)
+        ]))
+        produtos = [body["data"]["id"] for status, _, body in results if status == 201]
+        check_unique_and_fast("produto", results,
+                              [body["data"]["codigo"] for status, _, body in results if status == 201])
+    finally:
+        dsn = database_url()
+        if dsn:
+            with psycopg.connect(dsn, autocommit=True) as conn:
+                conn.execute("DELETE FROM clientes WHERE id = ANY(%s::uuid[])", (clientes,))
+                conn.execute("DELETE FROM produtos_servicos WHERE id = ANY(%s::uuid[])", (produtos,))
+        elif clientes or produtos:
+            print(f"TESTSPRITE_DATABASE_URL not set: remove clientes/produtos named '{marker} ...' by hand")
+
+
+def test_explicit_numbers_advance_the_counter():
+    """An imported/hand-typed number moves the counter, so the next automatic one does not collide."""
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL: the test inserts rows inside a rolled-back transaction"
+    empresa = empresa_id()
+
+    with psycopg.connect(dsn) as conn, conn.transaction(force_rollback=True):
+        automatic = conn.execute(
+            "INSERT INTO produtos_servicos (empresa_id, nome, tipo, preco, ativo) "
+            "VALUES (%s, 'bench-seq automático', 'produto', 10, true) RETURNING codigo", (empresa,)
+        ).fetchone()[0]
+        explicit = int(automatic) + 50
+        conn.execute(
+            "INSERT INTO produtos_servicos (empresa_id, nome, codigo, tipo, preco, ativo) "
+            "VALUES (%s, 'bench-seq importado', %s, 'produto', 10, true)", (empresa, str(explicit))
+        )
+        following = conn.execute(
+            "INSERT INTO produtos_servicos (empresa_id, nome, tipo, preco, ativo) "
+            "VALUES (%s, 'bench-seq seguinte', 'produto', 10, true) RETURNING codigo", (empresa,)
+        ).fetchone()[0]
+        assert int(following) == explicit + 1, f"Counter ignored the explicit codigo {explicit}: next was {following}"
+
+        # A lower explicit number (in the gap the counter skipped) never moves it back
+        conn.execute(
+            "INSERT INTO produtos_servicos (empresa_id, nome, codigo, tipo, preco, ativo) "
+            "VALUES (%s, 'bench-seq antigo', %s, 'produto', 10, true)", (empresa, str(explicit - 25))
+        )
+        last = conn.execute(
+            "INSERT INTO produtos_servicos (empresa_id, nome, tipo, preco, ativo) "
+            "VALUES (%s, 'bench-seq último', 'produto', 10, true) RETURNING codigo", (empresa,)
+        ).fetchone()[0]
+        assert int(last) == explicit + 2, f"Counter moved back after a lower explicit codigo: next was {last}"
+
+
+test_concurrent_creates_get_unique_numbers()
+test_explicit_numbers_advance_the_counter()
@@ -0,0 +1,115 @@
+import os
+import re
+import time
+from pathlib import Path
+
+import psycopg
+
+from seed_data import SEED_PREFIX, database_url
+
+# Delivered OS of the seeded dataset (python seed_data.py --empresas 2000 --clientes 300000)
+ORDERS = int(os.environ.get("COMMISSION_BENCH_OS", "100000"))
+LEGACY_TRIGGER_SQL = Path(__file__).resolve().parents[3] / "02_criar_trigger_comissoes.sql"
+COMPARED = ("tecnico_id", "empresa_id", "valor_servico", "valor_peca", "valor_total", "percentual_comissao",
+            "valor_comissao", "tipo_ordem", "status", "observacoes")
+
+
+def legacy_function_sql():
+    """CREATE FUNCTION calcular_comissao_entrega() exactly as 02_criar_trigger_comissoes.sql defines it."""
+    match = re.search(r"CREATE OR REPLACE FUNCTION calcular_comissao_entrega\(\).*?\$\$ LANGUAGE plpgsql;",
+                      LEGACY_TRIGGER_SQL.read_text(), re.S)
+    assert match, f"calcular_comissao_entrega() not found in {LEGACY_TRIGGER_SQL}"
+    return match.group(0)
+
+
+def deliver(conn):
+    """Move the target orders back to CONCLUIDO and then to ENTREGUE in one UPDATE; returns seconds."""
+    conn.execute("DELETE FROM comissoes_historico WHERE ordem_servico_id IN (SELECT id FROM alvo)")
+    conn.execute("UPDATE ordens_servico SET status = 'CONCLUIDO' WHERE id IN (SELECT id FROM alvo)")
+    started = time.perf_counter()
+    conn.execute("UPDATE ordens_servico SET status = 'ENTREGUE' WHERE id IN (SELECT id FROM alvo)")
+    return time.perf_counter() - started
+
+
+def snapshot(conn, table):
+    conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.execute(f"""
+        CREATE TEMP TABLE {table} AS
+        SELECT ordem_servico_id, data_entrega, {', '.join(COMPARED)}
+        FROM comissoes_historico WHERE ordem_servico_id IN (SELECT id FROM alvo)
+    """)
+    return conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+
+
+def differences(conn, left, right, columns):
+    cols = ", ".join(columns)
+    return conn.execute(f"""
+        SELECT count(*) FROM (
+            (SELECT ordem_servico_id, {cols} FROM {left} EXCEPT ALL SELECT ordem_servico_id, {cols} FROM {right})
+            UNION ALL
+            (SELECT ordem_servico_id, {cols} FROM {right} EXCEPT ALL SELECT ordem_servico_id, {cols} FROM {left})
+        ) d
+    """).fetchone()[0]
+
+
+def test_batch_commissions_match_legacy_trigger():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL (owner role: the test swaps triggers inside a rolled-back transaction)"
+
+    with psycopg.connect(dsn) as conn, conn.transaction(force_rollback=True):
+        conn.execute("""
+            CREATE TEMP TABLE alvo AS
+            SELECT os.id FROM ordens_servico os JOIN empresas e ON e.id = os.empresa_id
+            WHERE e.nome LIKE %s AND os.status = 'ENTREGUE' AND os.tecnico_id IS NOT NULL
+            LIMIT %s
+        """, (SEED_PREFIX + "%", ORDERS))
+        orders = conn.execute("SELECT count(*) FROM alvo").fetchone()[0]
+        assert orders >= ORDERS, f"Only {orders} delivered seeded OS with técnico: seed at least {ORDERS} first"
+
+        # Cover every rule: empresas without config, service-only, billed value, returns paid or not
+        conn.execute("""
+            CREATE TEMP TABLE empresas_alvo AS
+            SELECT empresa_id, row_number() OVER (ORDER BY empresa_id) AS n
+            FROM (SELECT DISTINCT empresa_id FROM ordens_servico WHERE id IN (SELECT id FROM alvo)) e
+        """)
+        conn.execute("DELETE FROM configuracoes_comissao WHERE empresa_id IN (SELECT empresa_id FROM empresas_alvo)")
+        conn.execute("""
+            INSERT INTO configuracoes_comissao (empresa_id, comissao_apenas_servico, comissao_retorno_ativo)
+            SELECT empresa_id, n % 3 <> 1, n % 2 = 0 FROM empresas_alvo WHERE n % 4 <> 0
+        """)
+        conn.execute("UPDATE ordens_servico SET tipo = (ARRAY['normal', 'normal', 'retorno', 'garantia'])[1 + (abs(hashtext(id::text)) % 4)] "
+                     "WHERE id IN (SELECT id FROM alvo)")
+
+        # Legacy: row-level trigger, three lookups per delivered OS
+        conn.execute("ALTER TABLE ordens_servico DISABLE TRIGGER trg_ordens_servico_comissoes")
+        conn.execute(legacy_function_sql())
+        conn.execute("CREATE TRIGGER trigger_calcular_comissao AFTER UPDATE ON ordens_servico "
+                     "FOR EACH ROW EXECUTE FUNCTION calcular_comissao_entrega()")
+        legacy_s = deliver(conn)
+        legacy_rows = snapshot(conn, "comissoes_legado")
+
+        # Batch: statement-level trigger from database/comissoes_lote.sql
+        conn.execute("DROP TRIGGER trigger_calcular_comissao ON ordens_servico")
+        conn.execute("ALTER TABLE ordens_servico ENABLE TRIGGER trg_ordens_servico_comissoes")
+        batch_s = deliver(conn)
+        batch_rows = snapshot(conn, "comissoes_lote")
+
+        # Bulk (re)compute of the same orders, as comissoes_recalcular() does: dated by the OS delivery
+        conn.execute("DELETE FROM comissoes_historico WHERE ordem_servico_id IN (SELECT id FROM alvo)")
+        started = time.perf_counter()
+        conn.execute("SELECT comissoes_calcular(ARRAY(SELECT id FROM alvo))")
+        recompute_s = time.perf_counter() - started
+        snapshot(conn, "comissoes_recalculo")
+
+        print(f"{orders} delivered OS -> {legacy_rows} commissions: row trigger {legacy_s:.2f}s, "
+              f"statement trigger {batch_s:.2f}s ({legacy_s / batch_s:.1f}x), bulk recompute {recompute_s:.2f}s")
+
+        assert batch_rows == legacy_rows, f"Batch engine created {batch_rows} commissions, legacy trigger {legacy_rows}"
+        mismatched = differences(conn, "comissoes_legado", "comissoes_lote", COMPARED + ("data_entrega",))
+        assert mismatched == 0, f"{mismatched} commissions differ between the legacy trigger and the batch trigger"
+        mismatched = differences(conn, "comissoes_legado", "comissoes_recalculo", COMPARED)
+        assert mismatched == 0, f"{mismatched} commissions differ between the legacy trigger and the bulk recompute"
+        assert batch_s < legacy_s, f"Statement trigger ({batch_s:.2f}s) is not faster than the row trigger ({legacy_s:.2f}s)"
+
+
+test_batch_commissions_match_legacy_trigger()
@@ -0,0 +1,96 @@
+import os
+from decimal import Decimal
+
+import psycopg
+
+from api_client import BASE_URL, get_session, login
+from loadtest import percentile
+from seed_data import database_url
+
+# A busy PDV shift: open, many sangrias/suprimentos, read the summary, close
+MOVEMENTS = int(os.environ.get("CAIXA_MOVEMENTS", "500"))
+MOVEMENT_P95_MS = float(os.environ.get("CAIXA_MOVEMENT_P95_MS", "300"))
+SUMMARY_MS = float(os.environ.get("CAIXA_SUMMARY_MS", "500"))
+OPENING = Decimal("150.00")
+TURNO_URL = f"{BASE_URL}/api/caixa/turno"
+
+
+def close_open_turno(session, headers):
+    """Close a turno left open by the test user so the benchmark starts clean."""
+    estado = session.get(TURNO_URL, headers=headers).json()
+    if estado.get("turno"):
+        resp = session.post(TURNO_URL, json={"acao": "fechar", "valor_fechamento": estado["turno"]["saldo_atual"] or 0,
+                                             "observacoes": "Fechado pelo TC026 antes do teste"}, headers=headers)
+        assert resp.status_code == 200, f"Could not close the open turno: {resp.status_code} {resp.text}"
+
+
+def test_turno_summary_in_one_round_trip():
+    session = get_session()
+    # /api/caixa/turno resolves empresa and operator from the Supabase access token
+    headers = {"Authorization": f"Bearer {login()['session']['access_token']}"}
+    close_open_turno(session, headers)
+    turno_id = None
+
+    try:
+        resp = session.post(TURNO_URL, json={"acao": "abrir", "valor_abertura": str(OPENING)}, headers=headers)
+        assert resp.status_code == 201, f"Open failed: {resp.status_code} {resp.text}"
+        turno_id = resp.json()["turno"]["id"]
+        assert Decimal(str(resp.json()["turno"]["saldo_atual"])) == OPENING
+
+        resp = session.post(TURNO_URL, json={"acao": "abrir", "valor_abertura": "10"}, headers=headers)
+        assert resp.status_code == 409, f"Second open should conflict, got {resp.status_code}"
+
+        expected = OPENING
+        latencies = []
+        for n in range(MOVEMENTS):
+            tipo = "sangria" if n % 3 == 0 else "suprimento"
+            valor = Decimal(f"{1 + n % 17}.{n % 100:02d}")
+            resp = session.post(TURNO_URL, json={"acao": "movimentar", "tipo": tipo, "valor": str(valor),
+                                                 "descricao": f"TC026 {tipo} {n}"}, headers=headers)
+            latencies.append(resp.timing.total_ms)
+            assert resp.status_code == 201, f"Movement {n} failed: {resp.status_code} {resp.text}"
+            expected += -valor if tipo == "sangria" else valor
+            body = resp.json()
+            assert Decimal(str(body["movimentacao"]["saldo_apos"])) == expected, f"Wrong running balance at {n}"
+            assert Decimal(str(body["turno"]["saldo_atual"])) == expected
+
+        resp = session.get(TURNO_URL, headers=headers)
+        summary_ms = resp.timing.total_ms
+        assert resp.status_code == 200, f"Summary failed: {resp.status_code} {resp.text}"
+        estado = resp.json()
+        assert estado["turno"]["id"] == turno_id
+        assert Decimal(str(estado["turno"]["saldo_atual"])) == expected
+        assert len(estado["movimentacoes"]) == MOVEMENTS
+        assert all(m["usuario"]["nome"] for m in estado["movimentacoes"]), "Movements without operator name"
+        assert estado["turno"]["usuario"]["nome"], "Turno without operator name"
+
+        resp = session.post(TURNO_URL, json={"acao": "fechar", "valor_fechamento": str(expected + 5),
+                                             "valor_troco": "100"}, headers=headers)
+        assert resp.status_code == 200, f"Close failed: {resp.status_code} {resp.text}"
+        fechado = resp.json()["turno"]
+        assert fechado["status"] == "fechado"
+        assert Decimal(str(fechado["valor_diferenca"])) == Decimal("5")
+        assert Decimal(str(resp.json()["ultimo_fechamento"]["valor_troco"])) == Decimal("100")
+
+        resp = session.post(TURNO_URL, json={"acao": "movimentar", "tipo": "sangria", "valor": "1"},
+                            headers=headers)
+        assert resp.status_code == 409, f"Movement on closed caixa should conflict, got {resp.status_code}"
+
+        p50, p95 = percentile(sorted(latencies), 50), percentile(sorted(latencies), 95)
+        print(f"{MOVEMENTS} movements: p50 {p50:.0f}ms, p95 {p95:.0f}ms; summary {summary_ms:.0f}ms; "
+              f"final balance {expected}")
+        assert p95 < MOVEMENT_P95_MS, f"Movement p95 {p95:.0f}ms exceeds {MOVEMENT_P95_MS:.0f}ms"
+        assert summary_ms < SUMMARY_MS, f"Summary took {summary_ms:.0f}ms (limit {SUMMARY_MS:.0f}ms)"
+    finally:
+        dsn = database_url()
+        if dsn and turno_id:
+            with psycopg.connect(dsn, autocommit=True) as conn:
+                conn.execute("UPDATE turnos_caixa SET status = 'fechado', data_fechamento = COALESCE(data_fechamento, NOW()) "
+                             "WHERE id = %s", (turno_id,))
+                conn.execute("DELETE FROM movimentacoes_caixa WHERE turno_id = %s", (turno_id,))
+                conn.execute("DELETE FROM turnos_caixa WHERE id = %s", (turno_id,))
+        elif turno_id:
+            print(f"TESTSPRITE_DATABASE_URL not set: remove turno {turno_id} and its movements by hand")
+
+
+test_turno_summary_in_one_round_trip()
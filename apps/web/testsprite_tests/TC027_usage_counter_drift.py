@@ -0,0 +1,140 @@
+import os
+import time
+import uuid
+
+import psycopg
+
+from api_client import BASE_URL, empresa_id, get_session, login
+from seed_data import SEED_PREFIX, database_url
+
+# Bulk volumes per step; counters must match count(*) exactly after every step
+BULK_ROWS = int(os.environ.get("USAGE_BULK_ROWS", "20000"))
+USAGE_ENDPOINT_MS = float(os.environ.get("USAGE_ENDPOINT_MS", "300"))
+COUNTERS = ("usuarios", "produtos", "servicos", "clientes", "ordens", "fornecedores")
+EXACT_COUNTS = """
+    SELECT
+        (SELECT count(*) FROM usuarios WHERE empresa_id = %(e)s),
+        (SELECT count(*) FROM produtos_servicos WHERE empresa_id = %(e)s AND tipo = 'produto'),
+        (SELECT count(*) FROM produtos_servicos WHERE empresa_id = %(e)s AND tipo = 'servico'),
+        (SELECT count(*) FROM clientes WHERE empresa_id = %(e)s),
+        (SELECT count(*) FROM ordens_servico WHERE empresa_id = %(e)s),
+        (SELECT count(*) FROM fornecedores WHERE empresa_id = %(e)s)
+"""
+
+
+def exact(conn, empresa):
+    return dict(zip(COUNTERS, conn.execute(EXACT_COUNTS, {"e": empresa}).fetchone()))
+
+
+def counters(conn, empresa):
+    row = conn.execute(f"SELECT {', '.join(COUNTERS)} FROM empresa_uso WHERE empresa_id = %s", (empresa,)).fetchone()
+    return dict(zip(COUNTERS, row or (0,) * len(COUNTERS)))
+
+
+def assert_no_drift(conn, step, *empresas):
+    for empresa in empresas:
+        expected, actual = exact(conn, empresa), counters(conn, empresa)
+        drift = {k: actual[k] - expected[k] for k in COUNTERS if actual[k] != expected[k]}
+        assert not drift, f"Counter drift after {step} for empresa {empresa}: {drift} (exact {expected})"
+
+
+def test_counters_survive_bulk_changes():
+    dsn = database_url()
+    assert dsn, "Set TESTSPRITE_DATABASE_URL: the test bulk-loads rows inside a rolled-back transaction"
+
+    with psycopg.connect(dsn) as conn, conn.transaction(force_rollback=True):
+        a, b = uuid.uuid4(), uuid.uuid4()
+        conn.execute("INSERT INTO empresas (id, nome) VALUES (%s, %s), (%s, %s)",
+                      (a, f"{SEED_PREFIX}uso A", b, f"{SEED_PREFIX}uso B"))
+        assert_no_drift(conn, "creating the empresas", a, b)
+
+        started = time.perf_counter()
+        conn.execute("""
+            INSERT INTO usuarios (id, nome, email, nivel, empresa_id)
+            SELECT gen_random_uuid(), 'Uso ' || n, 'uso' || n || '-' || %(e)s || '@example.com', 'tecnico', %(e)s
+            FROM generate_series(1, 50) n
+        """, {"e": a})
+        conn.execute("""
+            INSERT INTO clientes (empresa_id, nome, celular, tipo, status)
+            SELECT %(e)s, 'Cliente uso ' || n, '5511' || lpad(n::text, 9, '0'), 'pf', 'ativo'
+            FROM generate_series(1, %(n)s) n
+        """, {"e": a, "n": BULK_ROWS})
+        conn.execute("""
+            INSERT INTO produtos_servicos (empresa_id, nome, tipo, preco, ativo)
+            SELECT %(e)s, 'Item uso ' || n, CASE WHEN n %% 3 = 0 THEN 'servico' ELSE 'produto' END, 10, true
+            FROM generate_series(1, %(n)s) n
+        """, {"e": a, "n": BULK_ROWS // 4})
+        conn.execute("""
+            INSERT INTO ordens_servico (empresa_id, cliente_id, categoria, marca, modelo, problema_relatado, status, tipo)
+            SELECT empresa_id, id, 'CELULAR', 'SAMSUNG', 'GALAXY A32', 'NÃO LIGA', 'ABERTA', 'normal'
+            FROM clientes WHERE empresa_id = %s
+            LIMIT %s
+        """, (a, BULK_ROWS // 2))
+        conn.execute("""
+            INSERT INTO fornecedores (empresa_id, nome)
+            SELECT %(e)s, 'Fornecedor uso ' || n FROM generate_series(1, 300) n
+        """, {"e": a})
+        insert_s = time.perf_counter() - started
+        assert_no_drift(conn, "bulk inserts", a, b)
+
+        # COPY goes through the same statement triggers (seed_data.py loads with COPY)
+        with conn.cursor().copy("COPY clientes (empresa_id, nome, celular, tipo, status) FROM STDIN") as copy:
+            for n in range(BULK_ROWS // 4):
+                copy.write_row((b, f"Cliente copiado {n}", f"5521{n:09d}", "pf", "ativo"))
+        assert_no_drift(conn, "COPY", a, b)
+
+        # Deletes: OS first (they reference clientes), then clientes without OS and a slice of produtos
+        conn.execute("DELETE FROM ordens_servico WHERE empresa_id = %s AND ctid IN "
+                     "(SELECT ctid FROM ordens_servico WHERE empresa_id = %s LIMIT %s)", (a, a, BULK_ROWS // 5))
+        conn.execute("DELETE FROM clientes c WHERE c.empresa_id = %s AND NOT EXISTS "
+                     "(SELECT 1 FROM ordens_servico o WHERE o.cliente_id = c.id)", (a,))
+        conn.execute("DELETE FROM produtos_servicos WHERE empresa_id = %s AND nome LIKE 'Item uso %%5'", (a,))
+        conn.execute("DELETE FROM fornecedores WHERE empresa_id = %s", (a,))
+        assert_no_drift(conn, "bulk deletes", a, b)
+
+        # Rows moving between empresas or changing produto/serviço (clientes keep their
+        # per-empresa numero_cliente, so usuarios and produtos are the ones moved)
+        conn.execute("UPDATE usuarios SET empresa_id = %s WHERE id IN "
+                     "(SELECT id FROM usuarios WHERE empresa_id = %s LIMIT 20)", (b, a))
+        conn.execute("UPDATE produtos_servicos SET tipo = CASE tipo WHEN 'produto' THEN 'servico' ELSE 'produto' END "
+                     "WHERE empresa_id = %s AND nome LIKE 'Item uso %%7'", (a,))
+        conn.execute("UPDATE produtos_servicos SET empresa_id = %s WHERE empresa_id = %s AND nome LIKE 'Item uso %%1'", (b, a))
+        assert_no_drift(conn, "moves between empresas", a, b)
+
+        # Deleting the empresa cascades without failing on its counters
+        conn.execute("DELETE FROM empresas WHERE id = %s", (b,))
+        assert conn.execute("SELECT count(*) FROM empresa_uso WHERE empresa_id = %s", (b,)).fetchone()[0] == 0
+        assert_no_drift(conn, "deleting an empresa", a)
+
+        print(f"Bulk inserts with counters: {insert_s:.2f}s for ~{BULK_ROWS * 2} rows; final {counters(conn, a)}")
+
+
+def test_usage_endpoint_matches_exact_counts():
+    session = get_session()
+    # /api/assinatura/uso resolves the empresa from the Supabase access token
+    headers = {"Authorization": f"Bearer {login()['session']['access_token']}"}
+    empresa = empresa_id()
+
+    started = time.perf_counter()
+    resp = session.get(f"{BASE_URL}/api/assinatura/uso", params={"atualizar": "1"}, headers=headers)
+    fresh_ms = (time.perf_counter() - started) * 1000
+    assert resp.status_code == 200, f"Usage endpoint failed: {resp.status_code} {resp.text}"
+    uso = resp.json()["uso"]
+
+    started = time.perf_counter()
+    resp = session.get(f"{BASE_URL}/api/assinatura/uso", headers=headers)
+    cached_ms = (time.perf_counter() - started) * 1000
+    assert resp.status_code == 200 and resp.json()["uso"] == uso, "Cached usage differs from the fresh read"
+
+    print(f"/api/assinatura/uso: fresh {fresh_ms:.0f}ms, cached {cached_ms:.0f}ms")
+    assert fresh_ms < USAGE_ENDPOINT_MS, f"Usage endpoint took {fresh_ms:.0f}ms (limit {USAGE_ENDPOINT_MS:.0f}ms)"
+
+    dsn = database_url()
+    if dsn:
+        with psycopg.connect(dsn) as conn:
+            expected = exact(conn, empresa)
+        assert {k: uso[k] for k in COUNTERS} == expected, f"Endpoint usage {uso} differs from exact counts {expected}"
+
+
+test_counters_survive_bulk_changes()
+test_usage_endpoint_matches_exact_counts()
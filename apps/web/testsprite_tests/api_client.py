@@ -0,0 +1,94 @@
+import os
+import threading
+
+import requests
+from urllib3.util.retry import Retry
+
+import timing
+
+BASE_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:3000")
+USERNAME = os.environ.get("TESTSPRITE_USERNAME", "wdglp")
+PASSWORD = os.environ.get("TESTSPRITE_PASSWORD", "123123")
+TIMEOUT = 30
+HEADERS = {"Content-Type": "application/json"}
+
+POOL_SIZE = int(os.environ.get("TESTSPRITE_POOL_SIZE", "20"))
+RETRIES = int(os.environ.get("TESTSPRITE_RETRIES", "3"))
+
+_lock = threading.Lock()
+_session = None
+_login = None
+
+
+class PooledSession(requests.Session):
+    """requests.Session with keep-alive pooling, retries with exponential backoff
+    and a default timeout, so callers don't have to pass `timeout=` everywhere.
+
+    Every call is timed (DNS/connect/TLS/TTFB/total) and checked against
+    latency_budgets.json; see timing.py.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, retries=RETRIES, timeout=TIMEOUT):
+        super().__init__()
+        self.default_timeout = timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            # Only idempotent verbs are retried on a bad status; POSTs retry on connect errors only
+            allowed_methods=frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}),
+            raise_on_status=False,
+        )
+        adapter = timing.TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        # No session-level auth: it would overwrite the Bearer header set by login()
+        self.headers.update(HEADERS)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.default_timeout)
+        started, started_at = timing.start_request()
+        response = super().request(method, url, **kwargs)
+        response.timing = timing.finish_request(method, response, started, started_at)
+        return response
+
+
+def get_session():
+    """Process-wide pooled session shared by every API test."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = PooledSession()
+        return _session
+
+
+def login(username=USERNAME, password=PASSWORD, force=False):
+    """Log in once through /api/login and reuse the Supabase access token on the shared session.
+
+    Returns the login payload ({token, role, user, session}); later calls return
+    the cached payload unless `force` is set. The API routes authenticate with
+    session.access_token (getUsuarioEmpresa), not the app's own `token`.
+    """
+    global _login
+    session = get_session()
+    with _lock:
+        if _login is not None and not force:
+            return _login
+        resp = session.post(f"{BASE_URL}/api/login", json={"username": username, "password": password})
+        assert resp.status_code == 200, f"Login failed with status {resp.status_code}: {resp.text}"
+        _login = resp.json()
+        session.headers["Authorization"] = f"Bearer {_login['session']['access_token']}"
+        return _login
+
+
+def authenticated_session():
+    """Shared session carrying the cached Supabase access token."""
+    login()
+    return get_session()
+
+
+def empresa_id():
+    """empresa_id of the logged-in test user."""
+    return (login().get("user") or {}).get("empresa_id")
@@ -0,0 +1,116 @@
+import fcntl
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+BASE_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:3000")
+STATE_DIR = Path(os.environ.get("TESTSPRITE_AUTH_DIR", Path(__file__).resolve().parent / ".auth"))
+# Re-login this long before the Supabase access token actually expires
+EXPIRY_MARGIN_S = 300
+LOGIN_TIMEOUT_MS = 15000
+
+ROLES = {
+    "admin": (
+        os.environ.get("TESTSPRITE_ADMIN_USERNAME", "wdglp"),
+        os.environ.get("TESTSPRITE_ADMIN_PASSWORD", "123123"),
+    ),
+    "tecnico": (
+        os.environ.get("TESTSPRITE_TECNICO_USERNAME", ""),
+        os.environ.get("TESTSPRITE_TECNICO_PASSWORD", ""),
+    ),
+    "atendente": (
+        os.environ.get("TESTSPRITE_ATENDENTE_USERNAME", ""),
+        os.environ.get("TESTSPRITE_ATENDENTE_PASSWORD", ""),
+    ),
+}
+
+SUPABASE_TOKEN_KEY = re.compile(r"^sb-.+-auth-token(\.\d+)?$")
+
+
+def state_path(role):
+    return STATE_DIR / f"{role}.json"
+
+
+def session_expires_at(state):
+    """Earliest expiry (epoch seconds) of the Supabase session saved in a storage state.
+
+    supabase-js keeps the session as JSON under `sb-<ref>-auth-token` in
+    localStorage; @supabase/ssr mirrors it into cookies of the same name.
+    """
+    expiries = []
+    for origin in state.get("origins", []):
+        for item in origin.get("localStorage", []):
+            if not SUPABASE_TOKEN_KEY.match(item.get("name", "")):
+                continue
+            try:
+                expires_at = json.loads(item["value"]).get("expires_at")
+            except (ValueError, AttributeError):
+                continue
+            if expires_at:
+                expiries.append(float(expires_at))
+    for cookie in state.get("cookies", []):
+        if SUPABASE_TOKEN_KEY.match(cookie.get("name", "")) and cookie.get("expires", -1) > 0:
+            expiries.append(float(cookie["expires"]))
+    return min(expiries) if expiries else None
+
+
+def is_fresh(path):
+    try:
+        with open(path) as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return False
+    expires_at = session_expires_at(state)
+    return expires_at is not None and expires_at - EXPIRY_MARGIN_S > time.time()
+
+
+def invalidate(role):
+    """Drop the cached state, e.g. after a test saw the app bounce back to /login."""
+    try:
+        state_path(role).unlink()
+    except FileNotFoundError:
+        pass
+
+
+async def _login_and_save(browser, role, path):
+    username, password = ROLES[role]
+    if not username:
+        raise RuntimeError(f"No credentials configured for role '{role}' (set TESTSPRITE_{role.upper()}_USERNAME/_PASSWORD)")
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        await page.goto(f"{BASE_URL}/login", timeout=LOGIN_TIMEOUT_MS)
+        await page.locator("form input[type=text]").first.fill(username)
+        await page.locator("form input[type=password]").first.fill(password)
+        await page.locator("form button[type=submit]").first.click()
+        await page.wait_for_url(re.compile(r"/dashboard"), timeout=LOGIN_TIMEOUT_MS)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        await context.storage_state(path=str(tmp))
+        os.replace(tmp, path)
+    finally:
+        await context.close()
+
+
+async def storage_state(browser, role):
+    """Path of a storage state authenticated as `role`, logging in only when the
+    cached one is missing or its Supabase session is about to expire.
+
+    A file lock makes parallel workers wait for the one doing the login instead
+    of all logging in at once.
+    """
+    if role not in ROLES:
+        raise ValueError(f"Unknown role '{role}', expected one of {sorted(ROLES)}")
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    path = state_path(role)
+    if is_fresh(path):
+        return str(path)
+    with open(STATE_DIR / f"{role}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not is_fresh(path):
+                await _login_and_save(browser, role, path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return str(path)
@@ -0,0 +1,272 @@
+"""Historical benchmark store for testsprite runs.
+
+Latency samples (from results/timings/*.jsonl, written by timing.py) and load
+reports (from loadtest.py) are kept in a local SQLite file keyed by git commit.
+`report` diffs the current commit against a baseline and flags slowdowns that
+are statistically significant (one-sided Mann-Whitney U) and large enough to matter.
+
+    python bench_store.py record --label nightly
+    python bench_store.py report --baseline <commit>
+"""
+import argparse
+import json
+import math
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = Path(os.environ.get("TESTSPRITE_RESULTS_DIR", TESTS_DIR / "results"))
+DB_PATH = Path(os.environ.get("TESTSPRITE_BENCH_DB", RESULTS_DIR / "benchmarks.sqlite"))
+
+MIN_SAMPLES = 5
+ALPHA = 0.01
+# Ignore significant-but-tiny shifts in the median
+MIN_SLOWDOWN = 0.10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    git_commit TEXT NOT NULL,
+    git_branch TEXT,
+    dirty INTEGER NOT NULL DEFAULT 0,
+    source TEXT NOT NULL,
+    label TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_commit ON runs(git_commit, created_at);
+CREATE TABLE IF NOT EXISTS latency_samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    total_ms REAL NOT NULL,
+    ttfb_ms REAL,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_latency_run_endpoint ON latency_samples(run_id, endpoint);
+CREATE TABLE IF NOT EXISTS throughput (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    throughput_rps REAL NOT NULL,
+    error_rate REAL NOT NULL
+);
+"""
+
+
+def connect(path=DB_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=TESTS_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def git_state():
+    commit = os.environ.get("GIT_COMMIT") or _git("rev-parse", "HEAD") or "unknown"
+    branch = _git("rev-parse", "--abbrev-ref", "HEAD")
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    return commit, branch, dirty
+
+
+def _new_run(conn, source, label):
+    commit, branch, dirty = git_state()
+    cur = conn.execute(
+        "INSERT INTO runs (git_commit, git_branch, dirty, source, label, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (commit, branch, int(dirty), source, label, time.time()),
+    )
+    return cur.lastrowid
+
+
+def record_timings(timings_dir=RESULTS_DIR / "timings", label=None, db_path=DB_PATH):
+    """Store every TimingRecord dumped by the API tests as one run. Returns the run id (None if empty)."""
+    rows = []
+    for path in sorted(Path(timings_dir).glob("*.jsonl")):
+        with open(path) as fh:
+            for line in fh:
+                if line.strip():
+                    r = json.loads(line)
+                    rows.append((r["endpoint"], r["total_ms"], r.get("ttfb_ms"), str(r.get("status"))))
+    if not rows:
+        return None
+    with connect(db_path) as conn:
+        run_id = _new_run(conn, "suite", label)
+        conn.executemany(
+            "INSERT INTO latency_samples (run_id, endpoint, total_ms, ttfb_ms, status) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, *row) for row in rows],
+        )
+    return run_id
+
+
+def record_load_report(report, label=None, db_path=DB_PATH):
+    """Store a loadtest.LoadReport: raw latencies plus per-endpoint throughput and error rate."""
+    with connect(db_path) as conn:
+        run_id = _new_run(conn, "load", label)
+        for stats in report.endpoints.values():
+            conn.executemany(
+                "INSERT INTO latency_samples (run_id, endpoint, total_ms, ttfb_ms, status) VALUES (?, ?, ?, NULL, NULL)",
+                [(run_id, stats.name, ms) for ms in stats.latencies_ms],
+            )
+            s = stats.summary(report.wall_time_s)
+            conn.execute(
+                "INSERT INTO throughput (run_id, endpoint, requests, throughput_rps, error_rate) VALUES (?, ?, ?, ?, ?)",
+                (run_id, stats.name, s["requests"], s["throughput_rps"], s["error_rate"]),
+            )
+    return run_id
+
+
+def _samples(conn, commit, source):
+    """Latency samples per endpoint over all runs of `commit` for `source`."""
+    out = {}
+    for endpoint, ms in conn.execute(
+        "SELECT s.endpoint, s.total_ms FROM latency_samples s JOIN runs r ON r.id = s.run_id "
+        "WHERE r.git_commit = ? AND r.source = ?",
+        (commit, source),
+    ):
+        out.setdefault(endpoint, []).append(ms)
+    return out
+
+
+def _throughput(conn, commit):
+    return {
+        endpoint: (rps, err)
+        for endpoint, rps, err in conn.execute(
+            "SELECT t.endpoint, AVG(t.throughput_rps), AVG(t.error_rate) FROM throughput t JOIN runs r ON r.id = t.run_id "
+            "WHERE r.git_commit = ? GROUP BY t.endpoint",
+            (commit,),
+        )
+    }
+
+
+def latest_commit(conn, exclude=None):
+    row = conn.execute(
+        "SELECT git_commit FROM runs WHERE git_commit != ? ORDER BY created_at DESC LIMIT 1", (exclude or "",)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def median(values):
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def mann_whitney_greater(current, baseline):
+    """One-sided p-value that `current` is stochastically larger (slower) than `baseline`.
+
+    Normal approximation with tie and continuity correction; fine for the
+    sample sizes the suite produces (>= MIN_SAMPLES per side).
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = avg_rank
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(baseline_commit, current_commit, source="suite", db_path=DB_PATH):
+    with connect(db_path) as conn:
+        base, cur = _samples(conn, baseline_commit, source), _samples(conn, current_commit, source)
+        base_tp, cur_tp = _throughput(conn, baseline_commit), _throughput(conn, current_commit)
+    rows = []
+    for endpoint in sorted(set(base) & set(cur)):
+        b, c = base[endpoint], cur[endpoint]
+        row = {
+            "endpoint": endpoint,
+            "baseline_median_ms": median(b),
+            "current_median_ms": median(c),
+            "baseline_n": len(b),
+            "current_n": len(c),
+        }
+        row["change"] = (row["current_median_ms"] - row["baseline_median_ms"]) / row["baseline_median_ms"] if row["baseline_median_ms"] else 0.0
+        if len(b) < MIN_SAMPLES or len(c) < MIN_SAMPLES:
+            row["p_value"], row["verdict"] = None, "insufficient"
+        else:
+            row["p_value"] = mann_whitney_greater(c, b)
+            if row["p_value"] < ALPHA and row["change"] >= MIN_SLOWDOWN:
+                row["verdict"] = "REGRESSION"
+            elif row["change"] <= -MIN_SLOWDOWN and mann_whitney_greater(b, c) < ALPHA:
+                row["verdict"] = "improved"
+            else:
+                row["verdict"] = "ok"
+        if endpoint in base_tp and endpoint in cur_tp:
+            row["baseline_rps"], row["baseline_error_rate"] = base_tp[endpoint]
+            row["current_rps"], row["current_error_rate"] = cur_tp[endpoint]
+        rows.append(row)
+    return rows
+
+
+def format_report(rows, baseline_commit, current_commit):
+    lines = [
+        f"baseline {baseline_commit[:10]}  ->  current {current_commit[:10]}",
+        f"{'endpoint':<34}{'base p50':>10}{'cur p50':>10}{'change':>9}{'p':>9}{'rps':>14}  verdict",
+    ]
+    for r in rows:
+        p = f"{r['p_value']:.4f}" if r["p_value"] is not None else "-"
+        rps = f"{r['baseline_rps']:.1f}->{r['current_rps']:.1f}" if "current_rps" in r else "-"
+        lines.append(
+            f"{r['endpoint']:<34}{r['baseline_median_ms']:>10.0f}{r['current_median_ms']:>10.0f}"
+            f"{r['change'] * 100:>+8.1f}%{p:>9}{rps:>14}  {r['verdict']}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="store results/timings/*.jsonl as a run for the current commit")
+    rec.add_argument("--timings-dir", type=Path, default=RESULTS_DIR / "timings")
+    rec.add_argument("--label")
+    rep = sub.add_parser("report", help="diff the current commit against a baseline")
+    rep.add_argument("--baseline", help="baseline commit (default: most recent other commit in the store)")
+    rep.add_argument("--current", help="current commit (default: HEAD)")
+    rep.add_argument("--source", choices=("suite", "load"), default="suite")
+    rep.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        run_id = record_timings(args.timings_dir, args.label, args.db)
+        print(f"Stored run {run_id}" if run_id else f"No timings found in {args.timings_dir}")
+        return 0
+
+    current = args.current or git_state()[0]
+    with connect(args.db) as conn:
+        baseline = args.baseline or latest_commit(conn, exclude=current)
+    if not baseline:
+        print("No baseline run in the store", file=sys.stderr)
+        return 2
+    rows = compare(baseline, current, args.source, args.db)
+    print(json.dumps(rows, indent=2) if args.json else format_report(rows, baseline, current))
+    return 1 if any(r["verdict"] == "REGRESSION" for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
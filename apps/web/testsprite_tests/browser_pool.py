@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import urllib.request
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from playwright import async_api
+
+import auth_state
+
+CDP_ENDPOINT_ENV = "TESTSPRITE_CDP_ENDPOINT"
+DEFAULT_TIMEOUT_MS = 5000
+
+LAUNCH_ARGS = [
+    "--window-size=1280,720",         # Set the browser window size
+    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+    "--ipc=host",                     # Use host-level IPC for better stability
+]
+
+
+@dataclass
+class Lease:
+    """A fresh browser context borrowed from the worker's browser."""
+    pw: object
+    browser: object
+    context: object
+    owns_browser: bool
+    role: str = None
+
+    async def release(self):
+        try:
+            # The app bounced a cached session back to /login (revoked or rotated
+            # server-side): drop it so the next lease logs in again
+            if self.role and any(urlparse(page.url).path.startswith("/login") for page in self.context.pages):
+                auth_state.invalidate(self.role)
+            await self.context.close()
+        finally:
+            # Only a browser this lease launched is closed; stopping Playwright just
+            # drops the CDP connection to the worker's shared one
+            if self.owns_browser:
+                await self.browser.close()
+            await self.pw.stop()
+
+
+async def acquire(role=None, **context_options):
+    """Return a Lease with an isolated context.
+
+    When the runner exported TESTSPRITE_CDP_ENDPOINT the context lives in the
+    worker's long-lived Chromium, so no cold start is paid. Otherwise (script run
+    on its own) a private browser is launched exactly as before.
+
+    With `role` ("admin", "tecnico", "atendente") the context starts from the
+    cached storage state of that user, already logged in.
+    """
+    pw = await async_api.async_playwright().start()
+    endpoint = os.environ.get(CDP_ENDPOINT_ENV)
+    try:
+        if endpoint:
+            browser = await pw.chromium.connect_over_cdp(endpoint)
+        else:
+            browser = await pw.chromium.launch(headless=True, args=LAUNCH_ARGS + ["--single-process"])
+        if role:
+            context_options.setdefault("storage_state", await auth_state.storage_state(browser, role))
+        context = await browser.new_context(**context_options)
+    except Exception:
+        await pw.stop()
+        raise
+    context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+    return Lease(pw=pw, browser=browser, context=context, owns_browser=not endpoint, role=role)
+
+
+def chromium_executable():
+    if os.environ.get("CHROMIUM_PATH"):
+        return os.environ["CHROMIUM_PATH"]
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as pw:
+        return pw.chromium.executable_path
+
+
+class BrowserServer:
+    """Long-lived headless Chromium exposing a CDP endpoint, one per runner worker."""
+
+    def __init__(self, port, executable=None):
+        self.port = port
+        self.executable = executable or chromium_executable()
+        self.endpoint = f"http://127.0.0.1:{port}"
+        self._proc = None
+        self._profile_dir = None
+
+    def start(self, timeout=15):
+        self._profile_dir = tempfile.mkdtemp(prefix="testsprite-chromium-")
+        self._proc = subprocess.Popen(
+            [
+                self.executable,
+                "--headless=new",
+                f"--remote-debugging-port={self.port}",
+                f"--user-data-dir={self._profile_dir}",
+                "--no-first-run",
+                "--no-default-browser-check",
+                *LAUNCH_ARGS,
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"Chromium exited with code {self._proc.returncode} on port {self.port}")
+            try:
+                with urllib.request.urlopen(f"{self.endpoint}/json/version", timeout=1) as resp:
+                    json.load(resp)
+                return self
+            except OSError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f"Chromium did not expose CDP on port {self.port} within {timeout}s")
+
+    def stop(self):
+        if self._proc and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+        self._proc = None
+        self._profile_dir = None
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass, field
+
+import aiohttp
+
+BASE_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:3000")
+USERNAME = os.environ.get("TESTSPRITE_USERNAME", "wdglp")
+PASSWORD = os.environ.get("TESTSPRITE_PASSWORD", "123123")
+TIMEOUT = 30
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list (pct in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (pct / 100) * (len(sorted_values) - 1)
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+@dataclass
+class EndpointStats:
+    name: str
+    latencies_ms: list = field(default_factory=list)
+    errors: int = 0
+    status_codes: dict = field(default_factory=dict)
+
+    @property
+    def count(self):
+        return len(self.latencies_ms)
+
+    def record(self, latency_ms, status, ok):
+        self.latencies_ms.append(latency_ms)
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, wall_time_s):
+        ordered = sorted(self.latencies_ms)
+        return {
+            "endpoint": self.name,
+            "requests": self.count,
+            "errors": self.errors,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "throughput_rps": self.count / wall_time_s if wall_time_s > 0 else 0.0,
+            "p50_ms": percentile(ordered, 50),
+            "p95_ms": percentile(ordered, 95),
+            "p99_ms": percentile(ordered, 99),
+            "max_ms": ordered[-1] if ordered else 0.0,
+            "status_codes": dict(self.status_codes),
+        }
+
+
+@dataclass
+class LoadReport:
+    virtual_users: int
+    arrival_rate: float
+    wall_time_s: float
+    endpoints: dict
+
+    def summaries(self):
+        return [stats.summary(self.wall_time_s) for stats in self.endpoints.values()]
+
+    def to_dict(self):
+        return {
+            "virtual_users": self.virtual_users,
+            "arrival_rate": self.arrival_rate,
+            "wall_time_s": self.wall_time_s,
+            "endpoints": self.summaries(),
+        }
+
+    def format_table(self):
+        header = f"{'endpoint':<28}{'reqs':>7}{'err%':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+        lines = [
+            f"{self.virtual_users} virtual users @ {self.arrival_rate}/s in {self.wall_time_s:.1f}s",
+            header,
+            "-" * len(header),
+        ]
+        for s in self.summaries():
+            lines.append(
+                f"{s['endpoint']:<28}{s['requests']:>7}{s['error_rate'] * 100:>7.1f}%"
+                f"{s['throughput_rps']:>9.1f}{s['p50_ms']:>9.0f}{s['p95_ms']:>9.0f}{s['p99_ms']:>9.0f}"
+            )
+        return "\n".join(lines)
+
+
+class LoadEngine:
+    """Open-model load generator: virtual users arrive at `arrival_rate` per second
+    (Poisson arrivals) until `virtual_users` have started, each one running the
+    scenario `iterations` times over a shared keep-alive connection pool."""
+
+    def __init__(self, scenario, virtual_users=50, arrival_rate=10.0, iterations=1,
+                 base_url=BASE_URL, max_connections=100, seed=None):
+        self.scenario = scenario
+        self.virtual_users = virtual_users
+        self.arrival_rate = arrival_rate
+        self.iterations = iterations
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.random = random.Random(seed)
+        self.stats = {}
+
+    def _stats_for(self, name):
+        if name not in self.stats:
+            self.stats[name] = EndpointStats(name)
+        return self.stats[name]
+
+    async def request(self, session, name, method, path, **kwargs):
+        """Issue one request, record its latency under `name` and return (status, json_or_None)."""
+        stats = self._stats_for(name)
+        started = time.perf_counter()
+        try:
+            async with session.request(method, f"{self.base_url}{path}", **kwargs) as resp:
+                try:
+                    body = await resp.json(content_type=None)
+                except ValueError:
+                    body = None
+                stats.record((time.perf_counter() - started) * 1000, resp.status, resp.status < 400)
+                return resp.status, body
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            stats.record((time.perf_counter() - started) * 1000, "exception", False)
+            return None, None
+
+    async def _virtual_user(self, session, user_index):
+        for iteration in range(self.iterations):
+            await self.scenario(self, session, user_index, iteration)
+
+    async def run(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+        started = time.perf_counter()
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            tasks = []
+            for user_index in range(self.virtual_users):
+                tasks.append(asyncio.create_task(self._virtual_user(session, user_index)))
+                if self.arrival_rate > 0 and user_index < self.virtual_users - 1:
+                    await asyncio.sleep(self.random.expovariate(self.arrival_rate))
+            await asyncio.gather(*tasks)
+        return LoadReport(
+            virtual_users=self.virtual_users,
+            arrival_rate=self.arrival_rate,
+            wall_time_s=time.perf_counter() - started,
+            endpoints=self.stats,
+        )
+
+
+async def service_order_scenario(engine, session, user_index, iteration):
+    """Login -> create OS -> update OS -> search clients, as a técnico would at the counter."""
+    status, login = await engine.request(
+        session, "POST /api/login", "POST", "/api/login",
+        json={"username": USERNAME, "password": PASSWORD},
+    )
+    if status != 200 or not login:
+        return
+    empresa_id = (login.get("user") or {}).get("empresa_id")
+    # The routes accept the Supabase access_token, not the app's own JWT in login["token"]
+    access_token = (login.get("session") or {}).get("access_token")
+    if not access_token:
+        return
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    status, created = await engine.request(
+        session, "POST /api/ordens/criar", "POST", "/api/ordens/criar",
+        json={
+            "empresa_id": empresa_id,
+            "status": "ORÇAMENTO",
+            "equipamento": "SMARTPHONE",
+            "problema_relatado": f"Carga VU {user_index} iteração {iteration}",
+        },
+        headers=headers,
+    )
+    os_id = ((created or {}).get("data") or {}).get("id") if status and status < 400 else None
+    if os_id:
+        await engine.request(
+            session, "PUT /api/ordens/[id]", "PUT", f"/api/ordens/{os_id}",
+            json={"status": "EM ANÁLISE", "qtd_servico": 0, "qtd_peca": 0, "valor_servico": 0, "valor_peca": 0},
+            headers=headers,
+        )
+
+    await engine.request(
+        session, "GET /api/clientes", "GET", "/api/clientes",
+        params={"empresaId": empresa_id or "", "search": engine.random.choice(["a", "Silva", "11", ""])},
+        headers=headers,
+    )
+
+
+def run_from_env(scenario=service_order_scenario):
+    """Run a scenario with the size taken from LOAD_USERS / LOAD_ARRIVAL_RATE / LOAD_ITERATIONS."""
+    engine = LoadEngine(
+        scenario,
+        virtual_users=int(os.environ.get("LOAD_USERS", "50")),
+        arrival_rate=float(os.environ.get("LOAD_ARRIVAL_RATE", "10")),
+        iterations=int(os.environ.get("LOAD_ITERATIONS", "3")),
+    )
+    return asyncio.run(engine.run())
+
+
+if __name__ == "__main__":
+    print(run_from_env().format_table())
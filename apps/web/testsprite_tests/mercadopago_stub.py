@@ -0,0 +1,100 @@
+"""Local stand-in for the Mercado Pago payments API.
+
+Serves GET /v1/payments/<id> for payments registered by the test, with a fixed
+artificial latency, and records how often each payment was fetched and the peak
+number of requests in flight. With `throttle_every=N` every Nth request is
+answered 429 with Retry-After, like the real API under a rate limit. Start the app with
+
+    MERCADOPAGO_API_BASE_URL=http://127.0.0.1:8787 npm run dev
+
+so the webhook worker and the reconciliation query this stub instead of
+api.mercadopago.com.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PORT = int(os.environ.get("MP_STUB_PORT", "8787"))
+DELAY_MS = float(os.environ.get("MP_STUB_DELAY_MS", "150"))
+
+
+class MercadoPagoStub:
+    def __init__(self, port=PORT, delay_ms=DELAY_MS, throttle_every=0):
+        self.port = port
+        self.delay_ms = delay_ms
+        self.throttle_every = throttle_every
+        self.payments = {}
+        self.calls = Counter()
+        self.served = Counter()
+        self.throttled = 0
+        self._requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def register(self, payment_id, status="approved", status_detail="accredited", external_reference=None):
+        self.payments[str(payment_id)] = {
+            "id": str(payment_id),
+            "status": status,
+            "status_detail": status_detail,
+            "external_reference": external_reference,
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                prefix = "/v1/payments/"
+                if not self.path.startswith(prefix):
+                    return self._reply(404, {"message": "not found"})
+                payment_id = self.path[len(prefix):].split("?")[0]
+                with stub._lock:
+                    stub.calls[payment_id] += 1
+                    stub._requests += 1
+                    throttle = stub.throttle_every and stub._requests % stub.throttle_every == 0
+                    stub.throttled += bool(throttle)
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                try:
+                    if throttle:
+                        return self._reply(429, {"message": "too many requests"}, {"Retry-After": "1"})
+                    time.sleep(stub.delay_ms / 1000)
+                    payment = stub.payments.get(payment_id)
+                    if payment:
+                        with stub._lock:
+                            stub.served[payment_id] += 1
+                    self._reply(200 if payment else 404, payment or {"message": "payment not found"})
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _reply(self, status, body, headers=None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
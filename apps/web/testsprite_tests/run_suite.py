@@ -0,0 +1,228 @@
+"""Run the testsprite TCxxx scripts in parallel.
+
+Each script executes its test at import time, so every test runs in its own
+interpreter process (isolating module globals, event loops and browsers) with
+its own temp dir. A pool of `--workers` slots keeps that many processes busy.
+Results are written as JSON and JUnit XML.
+
+When a selected test drives a browser (imports browser_pool) and
+--no-browser-pool is not given, one long-lived Chromium is started per worker
+slot and its CDP endpoint is handed to whichever test runs in that slot, so
+Playwright tests only open a fresh context instead of cold-starting a browser.
+
+The database benchmarks (BENCHMARKS: seeded datasets, 1M-row inserts) only run
+with --benchmarks.
+
+With --record the per-request timings of the run are stored in the benchmark
+history (bench_store.py) under the current git commit.
+
+    python run_suite.py --workers 8 --timeout 180 -k TC00
+    python run_suite.py --benchmarks -k TC02 --timeout 1800
+    python run_suite.py --record nightly && python bench_store.py report
+"""
+import argparse
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import bench_store
+
+TESTS_DIR = Path(__file__).resolve().parent
+TEST_FILE_RE = re.compile(r"^TC\d{3}_.+\.py$")
+# Heavy database benchmarks against the seeded dataset (see seed_data.py)
+BENCHMARKS = {"TC019", "TC020", "TC021", "TC022", "TC023", "TC024", "TC025", "TC026", "TC027"}
+DEFAULT_JSON = TESTS_DIR / "results" / "testsprite-results.json"
+DEFAULT_JUNIT = TESTS_DIR / "results" / "testsprite-junit.xml"
+OUTPUT_TAIL_CHARS = 4000
+
+
+def discover(pattern=None, benchmarks=False):
+    files = sorted(p for p in TESTS_DIR.iterdir() if TEST_FILE_RE.match(p.name))
+    if not benchmarks:
+        files = [p for p in files if p.name[:5] not in BENCHMARKS]
+    if pattern:
+        files = [p for p in files if re.search(pattern, p.name)]
+    return files
+
+
+def needs_browser(path):
+    return "browser_pool" in path.read_text(encoding="utf-8")
+
+
+def previous_durations(json_path):
+    """Durations from the last run, used to start the slowest tests first."""
+    try:
+        with open(json_path) as fh:
+            return {r["name"]: r["duration_s"] for r in json.load(fh)["results"]}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def failure_message(stderr):
+    lines = [l for l in stderr.strip().splitlines() if l.strip()]
+    return lines[-1] if lines else ""
+
+
+def start_browsers(workers, base_port):
+    from browser_pool import BrowserServer, chromium_executable
+
+    executable = chromium_executable()
+    servers = []
+    try:
+        for slot in range(workers):
+            servers.append(BrowserServer(base_port + slot, executable).start())
+    except Exception:
+        for server in servers:
+            server.stop()
+        raise
+    return servers
+
+
+def run_one(path, timeout, endpoints=None):
+    started = time.perf_counter()
+    # Only browser tests take a slot's Chromium (there may be fewer browsers than workers)
+    endpoint = endpoints.get() if endpoints and needs_browser(path) else None
+    with tempfile.TemporaryDirectory(prefix=f"{path.stem}-") as tmp:
+        env = dict(os.environ, TMPDIR=tmp, TESTSPRITE_WORKDIR=tmp, PYTHONUNBUFFERED="1")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(TESTS_DIR), env.get("PYTHONPATH")]))
+        if endpoint:
+            env["TESTSPRITE_CDP_ENDPOINT"] = endpoint
+        try:
+            proc = subprocess.run(
+                [sys.executable, str(path)],
+                cwd=tmp,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+            status = "passed" if proc.returncode == 0 else "failed"
+            stdout, stderr = proc.stdout, proc.stderr
+            message = "" if status == "passed" else failure_message(stderr)
+        except subprocess.TimeoutExpired as exc:
+            status = "timeout"
+            stdout = exc.stdout.decode(errors="replace") if isinstance(exc.stdout, bytes) else (exc.stdout or "")
+            stderr = exc.stderr.decode(errors="replace") if isinstance(exc.stderr, bytes) else (exc.stderr or "")
+            message = f"Timed out after {timeout}s"
+        finally:
+            if endpoint:
+                endpoints.put(endpoint)
+    return {
+        "name": path.stem,
+        "file": path.name,
+        "status": status,
+        "duration_s": round(time.perf_counter() - started, 3),
+        "message": message,
+        "stdout": stdout[-OUTPUT_TAIL_CHARS:],
+        "stderr": stderr[-OUTPUT_TAIL_CHARS:],
+    }
+
+
+def write_json(results, wall_time_s, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    summary = {
+        "total": len(results),
+        "passed": sum(r["status"] == "passed" for r in results),
+        "failed": sum(r["status"] == "failed" for r in results),
+        "timeout": sum(r["status"] == "timeout" for r in results),
+        "wall_time_s": round(wall_time_s, 3),
+        "serial_time_s": round(sum(r["duration_s"] for r in results), 3),
+    }
+    with open(path, "w") as fh:
+        json.dump({"summary": summary, "results": results}, fh, indent=2, ensure_ascii=False)
+    return summary
+
+
+def write_junit(results, wall_time_s, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    suite = ET.Element(
+        "testsuite",
+        name="testsprite",
+        tests=str(len(results)),
+        failures=str(sum(r["status"] == "failed" for r in results)),
+        errors=str(sum(r["status"] == "timeout" for r in results)),
+        time=f"{wall_time_s:.3f}",
+    )
+    for r in results:
+        case = ET.SubElement(suite, "testcase", classname="testsprite_tests", name=r["name"], time=f"{r['duration_s']:.3f}")
+        if r["status"] == "failed":
+            ET.SubElement(case, "failure", message=r["message"]).text = r["stderr"]
+        elif r["status"] == "timeout":
+            ET.SubElement(case, "error", message=r["message"]).text = r["stderr"]
+        ET.SubElement(case, "system-out").text = r["stdout"]
+    ET.ElementTree(suite).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def run_suite(files, workers, timeout, json_path=DEFAULT_JSON, junit_path=DEFAULT_JUNIT, browsers=None):
+    durations = previous_durations(json_path)
+    endpoints = None
+    if browsers:
+        endpoints = queue.Queue()
+        for server in browsers:
+            endpoints.put(server.endpoint)
+    # Longest-first scheduling keeps the wall time close to the slowest single test
+    files = sorted(files, key=lambda p: durations.get(p.stem, float("inf")), reverse=True)
+    results = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_one, path, timeout, endpoints): path for path in files}
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"[{result['status']:>7}] {result['name']} ({result['duration_s']:.1f}s) {result['message']}", flush=True)
+    wall_time_s = time.perf_counter() - started
+    results.sort(key=lambda r: r["name"])
+    summary = write_json(results, wall_time_s, json_path)
+    write_junit(results, wall_time_s, junit_path)
+    return summary, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--timeout", type=float, default=300, help="per-test timeout in seconds")
+    parser.add_argument("-k", dest="pattern", help="regex filter on the file name")
+    parser.add_argument("--json", type=Path, default=DEFAULT_JSON)
+    parser.add_argument("--junit", type=Path, default=DEFAULT_JUNIT)
+    parser.add_argument("--no-browser-pool", action="store_true", help="let each UI test launch its own Chromium")
+    parser.add_argument("--benchmarks", action="store_true", help="also run the heavy database benchmarks (BENCHMARKS)")
+    parser.add_argument("--cdp-base-port", type=int, default=9300)
+    parser.add_argument("--record", nargs="?", const="", metavar="LABEL", help="store the run's timings in the benchmark history")
+    args = parser.parse_args(argv)
+
+    files = discover(args.pattern, args.benchmarks)
+    if not files:
+        print("No TCxxx tests matched", file=sys.stderr)
+        return 2
+    timings_dir = bench_store.RESULTS_DIR / "timings"
+    if args.record is not None:
+        # Timings left over from an earlier run would be stored under this commit
+        shutil.rmtree(timings_dir, ignore_errors=True)
+    browser_tests = 0 if args.no_browser_pool else sum(needs_browser(p) for p in files)
+    browsers = start_browsers(min(args.workers, browser_tests), args.cdp_base_port) if browser_tests else []
+    try:
+        summary, _ = run_suite(files, args.workers, args.timeout, args.json, args.junit, browsers)
+    finally:
+        for server in browsers:
+            server.stop()
+    if args.record is not None:
+        run_id = bench_store.record_timings(timings_dir, args.record or None)
+        print(f"Benchmark run {run_id} stored in {bench_store.DB_PATH}" if run_id else "No timings to store")
+    print(
+        f"\n{summary['passed']}/{summary['total']} passed, {summary['failed']} failed, {summary['timeout']} timed out "
+        f"in {summary['wall_time_s']:.1f}s (serial {summary['serial_time_s']:.1f}s)"
+    )
+    return 0 if summary["passed"] == summary["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,409 @@
+"""Bulk data generator for scale testing.
+
+Seeds thousands of empresas with clientes, usuarios, produtos_servicos,
+ordens_servico, pagamentos and comissoes_historico. Tenant sizes follow a
+Pareto distribution (a few big shops, a long tail of small ones), and every
+other table is sized relative to its empresa.
+
+Rows are streamed with PostgreSQL COPY (psycopg 3), or written as CSV files
+for `psql \\copy` when no direct database connection is available. Seeded
+empresas are named "[SEED] ..." so --purge can remove them (the other tables
+cascade on empresa_id).
+
+    TESTSPRITE_DATABASE_URL=postgresql://... python seed_data.py --empresas 2000 --clientes 300000
+    python seed_data.py --csv-dir /tmp/seed --empresas 50 --clientes 5000
+    python seed_data.py --purge
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = Path(os.environ.get("TESTSPRITE_RESULTS_DIR", TESTS_DIR / "results"))
+SEED_PREFIX = "[SEED] "
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+               "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vitória", "Wesley"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Rodrigues", "Almeida", "Nascimento",
+              "Ferreira", "Carvalho", "Gomes", "Martins", "Rocha", "Ribeiro", "Barbosa", "Teixeira", "Mendes", "Araújo"]
+CITIES = ["São Paulo", "Rio de Janeiro", "Belo Horizonte", "Curitiba", "Porto Alegre", "Salvador", "Recife",
+          "Fortaleza", "Goiânia", "Campinas"]
+EQUIPMENT = {
+    "CELULAR": [("APPLE", "IPHONE 11"), ("APPLE", "IPHONE 13"), ("SAMSUNG", "GALAXY A32"), ("SAMSUNG", "GALAXY S21"),
+                ("MOTOROLA", "MOTO G20"), ("XIAOMI", "REDMI NOTE 10")],
+    "NOTEBOOK": [("DELL", "INSPIRON 15"), ("LENOVO", "IDEAPAD 3"), ("ACER", "ASPIRE 5"), ("APPLE", "MACBOOK AIR")],
+    "TABLET": [("APPLE", "IPAD 9"), ("SAMSUNG", "GALAXY TAB A7")],
+    "VIDEOGAME": [("SONY", "PLAYSTATION 5"), ("MICROSOFT", "XBOX SERIES S"), ("NINTENDO", "SWITCH")],
+}
+PROBLEMS = ["TELA QUEBRADA", "NÃO LIGA", "BATERIA VICIADA", "NÃO CARREGA", "SEM SINAL", "SUPERAQUECENDO",
+            "CONECTOR DANIFICADO", "CAIU NA ÁGUA", "SEM ÁUDIO", "LENTO"]
+PRODUCTS = [("Tela", "produto", 180), ("Bateria", "produto", 90), ("Conector de carga", "produto", 45),
+            ("Película", "produto", 25), ("Capinha", "produto", 35), ("Troca de tela", "servico", 120),
+            ("Limpeza interna", "servico", 80), ("Formatação", "servico", 100), ("Reparo de placa", "servico", 250)]
+# (status, weight); ENTREGUE orders get a pagamento and, with a técnico, a comissão
+OS_STATUSES = [("ABERTA", 8), ("ORÇAMENTO", 6), ("AGUARDANDO APROVAÇÃO", 4), ("APROVADO", 5),
+               ("AGUARDANDO PEÇA", 3), ("CONCLUIDO", 6), ("ENTREGUE", 60), ("CANCELADO", 8)]
+PAYMENT_METHODS = [("pix", 55), ("credit_card", 30), ("debit_card", 10), ("boleto", 5)]
+PAYMENT_STATUSES = [("approved", 88), ("pending", 6), ("rejected", 4), ("refunded", 2)]
+
+COLUMNS = {
+    "empresas": ["id", "nome", "cnpj", "email", "telefone", "endereco", "created_at"],
+    "usuarios": ["id", "nome", "email", "nivel", "empresa_id", "comissao_percentual", "comissao_ativa", "created_at"],
+    "clientes": ["id", "empresa_id", "nome", "telefone", "celular", "email", "documento", "tipo", "cidade",
+                 "numero_cliente", "status", "cadastrado_por", "data_cadastro", "created_at"],
+    "produtos_servicos": ["id", "empresa_id", "nome", "tipo", "preco", "unidade", "ativo", "codigo", "created_at"],
+    "ordens_servico": ["id", "numero_os", "cliente_id", "usuario_id", "tecnico_id", "empresa_id", "categoria", "marca",
+                       "modelo", "problema_relatado", "status", "tipo", "valor_servico", "valor_peca",
+                       "valor_faturado", "data_cadastro", "created_at"],
+    "pagamentos": ["id", "empresa_id", "usuario_id", "ordem_servico_id", "mercadopago_payment_id", "valor",
+                   "metodo_pagamento", "status", "created_at", "paid_at"],
+    "comissoes_historico": ["id", "tecnico_id", "ordem_servico_id", "empresa_id", "valor_servico", "valor_peca",
+                            "valor_total", "percentual_comissao", "valor_comissao", "tipo_ordem", "status",
+                            "data_entrega", "created_at"],
+}
+# Parents before children so foreign keys hold while loading
+TABLE_ORDER = list(COLUMNS)
+
+
+class Generator:
+    """Deterministic (per seed) generator of rows for every table in COLUMNS."""
+
+    def __init__(self, empresas, clientes, ordens_per_cliente=1.5, pareto_alpha=1.16, history_days=730, seed=42):
+        self.rng = random.Random(seed)
+        self.empresas = empresas
+        self.clientes = clientes
+        self.ordens_per_cliente = ordens_per_cliente
+        self.pareto_alpha = pareto_alpha
+        self.history_days = history_days
+        self.now = datetime.now(timezone.utc)
+        self.tenants = []
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _when(self, not_before=None):
+        start = not_before or self.now - timedelta(days=self.history_days)
+        return start + (self.now - start) * self.rng.random()
+
+    def _pick(self, weighted):
+        return self.rng.choices([v for v, _ in weighted], weights=[w for _, w in weighted])[0]
+
+    def _person(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _phone(self):
+        return f"({self.rng.randint(11, 99)}) 9{self.rng.randint(1000, 9999)}-{self.rng.randint(1000, 9999)}"
+
+    def _split(self, total, weights):
+        """Integer split of `total` proportional to `weights`, at least 1 each."""
+        scale = total / sum(weights)
+        return [max(1, round(w * scale)) for w in weights]
+
+    def plan(self):
+        """Decide each tenant's size; 80/20-ish with the default alpha."""
+        weights = [self.rng.paretovariate(self.pareto_alpha) for _ in range(self.empresas)]
+        for index, n_clientes in enumerate(self._split(self.clientes, weights)):
+            staff = min(40, 1 + n_clientes // 400)
+            self.tenants.append({
+                "index": index,
+                "id": self._uuid(),
+                "clientes": n_clientes,
+                "usuarios": staff + 1,
+                "tecnicos": max(1, staff // 2),
+                "produtos": min(2000, 10 + n_clientes // 20),
+                "ordens": max(1, round(n_clientes * self.ordens_per_cliente)),
+            })
+        return self.tenants
+
+    def rows(self):
+        """Yield (table, row) in TABLE_ORDER per tenant."""
+        if not self.tenants:
+            self.plan()
+        for t in self.tenants:
+            yield from self._tenant_rows(t)
+
+    def _tenant_rows(self, t):
+        rng = self.rng
+        empresa_id = t["id"]
+        created = self._when()
+        city = rng.choice(CITIES)
+        yield "empresas", {
+            "id": empresa_id,
+            "nome": f"{SEED_PREFIX}Assistência {rng.choice(LAST_NAMES)} {t['index']:05d}",
+            "cnpj": f"{t['index'] + 1:08d}/0001-{t['index'] % 97:02d}",
+            "email": f"contato{t['index']}@seed.gestaoconsert.test",
+            "telefone": self._phone(),
+            "endereco": f"Rua {rng.choice(LAST_NAMES)}, {rng.randint(1, 2000)} - {city}",
+            "created_at": created,
+        }
+
+        usuarios, tecnicos = [], []
+        for n in range(t["usuarios"]):
+            nivel = "admin" if n == 0 else ("tecnico" if n <= t["tecnicos"] else "atendente")
+            usuario_id = self._uuid()
+            comissao = round(rng.choice([5, 8, 10, 12, 15]), 2) if nivel == "tecnico" else 0
+            usuarios.append(usuario_id)
+            if nivel == "tecnico":
+                tecnicos.append((usuario_id, comissao))
+            yield "usuarios", {
+                "id": usuario_id,
+                "nome": self._person(),
+                "email": f"{nivel}{n}.e{t['index']}@seed.gestaoconsert.test",
+                "nivel": nivel,
+                "empresa_id": empresa_id,
+                "comissao_percentual": comissao,
+                "comissao_ativa": nivel == "tecnico",
+                "created_at": created,
+            }
+
+        for codigo in range(1, t["produtos"] + 1):
+            nome, tipo, preco = PRODUCTS[(codigo - 1) % len(PRODUCTS)]
+            yield "produtos_servicos", {
+                "id": self._uuid(),
+                "empresa_id": empresa_id,
+                "nome": f"{nome} {codigo}",
+                "tipo": tipo,
+                "preco": round(preco * rng.uniform(0.6, 1.8), 2),
+                "unidade": "un",
+                "ativo": rng.random() > 0.05,
+                "codigo": str(codigo),
+                "created_at": self._when(created),
+            }
+
+        clientes = []
+        for numero in range(1, t["clientes"] + 1):
+            cliente_id = self._uuid()
+            cliente_created = self._when(created)
+            clientes.append((cliente_id, cliente_created))
+            nome = self._person()
+            yield "clientes", {
+                "id": cliente_id,
+                "empresa_id": empresa_id,
+                "nome": nome,
+                "telefone": self._phone() if rng.random() < 0.3 else "",
+                "celular": self._phone(),
+                "email": f"{nome.split()[0].lower()}.{numero}.e{t['index']}@seed.gestaoconsert.test",
+                "documento": f"{rng.randint(0, 999):03d}.{rng.randint(0, 999):03d}.{rng.randint(0, 999):03d}-{rng.randint(0, 99):02d}",
+                "tipo": "pf" if rng.random() < 0.9 else "pj",
+                "cidade": city,
+                "numero_cliente": numero,
+                "status": "ativo",
+                "cadastrado_por": "SEED",
+                "data_cadastro": cliente_created,
+                "created_at": cliente_created,
+            }
+
+        for numero_os in range(1, t["ordens"] + 1):
+            cliente_id, cliente_created = rng.choice(clientes)
+            os_created = self._when(cliente_created)
+            categoria = rng.choice(list(EQUIPMENT))
+            marca, modelo = rng.choice(EQUIPMENT[categoria])
+            status = self._pick(OS_STATUSES)
+            tipo = "Retorno" if rng.random() < 0.04 else "Normal"
+            tecnico_id, comissao = rng.choice(tecnicos)
+            valor_servico = round(rng.lognormvariate(4.6, 0.6), 2)
+            valor_peca = round(rng.lognormvariate(4.2, 0.9), 2) if rng.random() < 0.6 else 0.0
+            valor_faturado = round(valor_servico + valor_peca, 2) if tipo == "Normal" else 0.0
+            os_id = self._uuid()
+            yield "ordens_servico", {
+                "id": os_id,
+                "numero_os": numero_os,
+                "cliente_id": cliente_id,
+                "usuario_id": rng.choice(usuarios),
+                "tecnico_id": tecnico_id,
+                "empresa_id": empresa_id,
+                "categoria": categoria,
+                "marca": marca,
+                "modelo": modelo,
+                "problema_relatado": rng.choice(PROBLEMS),
+                "status": status,
+                "tipo": tipo,
+                "valor_servico": valor_servico,
+                "valor_peca": valor_peca,
+                "valor_faturado": valor_faturado,
+                "data_cadastro": os_created,
+                "created_at": os_created,
+            }
+            if status != "ENTREGUE" or valor_faturado <= 0:
+                continue
+            entregue = min(self.now, os_created + timedelta(days=rng.expovariate(1 / 5)))
+            pagamento_status = self._pick(PAYMENT_STATUSES)
+            yield "pagamentos", {
+                "id": self._uuid(),
+                "empresa_id": empresa_id,
+                "usuario_id": usuarios[0],
+                "ordem_servico_id": os_id,
+                "mercadopago_payment_id": f"seed-{os_id}",
+                "valor": valor_faturado,
+                "metodo_pagamento": self._pick(PAYMENT_METHODS),
+                "status": pagamento_status,
+                "created_at": entregue,
+                "paid_at": entregue if pagamento_status == "approved" else None,
+            }
+            yield "comissoes_historico", {
+                "id": self._uuid(),
+                "tecnico_id": tecnico_id,
+                "ordem_servico_id": os_id,
+                "empresa_id": empresa_id,
+                "valor_servico": valor_servico,
+                "valor_peca": valor_peca,
+                "valor_total": valor_faturado,
+                "percentual_comissao": comissao,
+                "valor_comissao": round(valor_servico * comissao / 100, 2),
+                "tipo_ordem": "normal",
+                "status": "pago" if entregue < self.now - timedelta(days=30) else "pendente",
+                "data_entrega": entregue,
+                "created_at": entregue,
+            }
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return value
+
+
+class CsvSink:
+    """One CSV per table plus a load.sql of `\\copy` commands (run psql from that directory)."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._files = {}
+        self._writers = {}
+
+    def write(self, table, row):
+        if table not in self._writers:
+            fh = open(self.directory / f"{table}.csv", "w", newline="")
+            self._files[table] = fh
+            self._writers[table] = csv.writer(fh)
+            self._writers[table].writerow(COLUMNS[table])
+        self._writers[table].writerow([_csv_value(row[c]) for c in COLUMNS[table]])
+
+    def close(self):
+        for fh in self._files.values():
+            fh.close()
+        with open(self.directory / "load.sql", "w") as fh:
+            for table in TABLE_ORDER:
+                if table in self._files:
+                    fh.write(f"\\copy {table} ({', '.join(COLUMNS[table])}) FROM '{table}.csv' CSV HEADER NULL ''\n")
+
+
+class CopySink:
+    """Streams rows with COPY, one COPY per table per batch.
+
+    Rows are buffered per table and flushed in TABLE_ORDER so a child table
+    never reaches the server before its parents.
+    """
+
+    def __init__(self, dsn, batch_rows=50000):
+        import psycopg  # optional: only needed when loading straight into Postgres
+
+        self.conn = psycopg.connect(dsn)
+        self.batch_rows = batch_rows
+        self._buffer = {table: [] for table in TABLE_ORDER}
+        self._pending = 0
+
+    def write(self, table, row):
+        self._buffer[table].append([row[c] for c in COLUMNS[table]])
+        self._pending += 1
+        if self._pending >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        with self.conn.cursor() as cur:
+            for table in TABLE_ORDER:
+                rows = self._buffer[table]
+                if not rows:
+                    continue
+                with cur.copy(f"COPY {table} ({', '.join(COLUMNS[table])}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                rows.clear()
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def database_url():
+    return os.environ.get("TESTSPRITE_DATABASE_URL") or os.environ.get("DATABASE_URL")
+
+
+def purge(dsn):
+    import psycopg
+
+    with psycopg.connect(dsn) as conn:
+        deleted = conn.execute("DELETE FROM empresas WHERE nome LIKE %s", (SEED_PREFIX + "%",)).rowcount
+    return deleted
+
+
+def seed(generator, sink):
+    counts = {table: 0 for table in TABLE_ORDER}
+    started = time.perf_counter()
+    try:
+        for table, row in generator.rows():
+            sink.write(table, row)
+            counts[table] += 1
+    finally:
+        sink.close()
+    return counts, time.perf_counter() - started
+
+
+def write_manifest(generator, counts, path=RESULTS_DIR / "seed-manifest.json"):
+    """Largest tenants first, so load tests can target a big or a small shop."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tenants = sorted(generator.tenants, key=lambda t: t["clientes"], reverse=True)
+    with open(path, "w") as fh:
+        json.dump({"counts": counts, "tenants": tenants}, fh, indent=2)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--empresas", type=int, default=2000)
+    parser.add_argument("--clientes", type=int, default=300000, help="total across all empresas")
+    parser.add_argument("--ordens-per-cliente", type=float, default=1.5)
+    parser.add_argument("--pareto-alpha", type=float, default=1.16, help="lower = more skew towards big shops")
+    parser.add_argument("--history-days", type=int, default=730)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-rows", type=int, default=50000)
+    parser.add_argument("--csv-dir", type=Path, help="write CSV files instead of loading into the database")
+    parser.add_argument("--purge", action="store_true", help="delete previously seeded empresas and exit")
+    args = parser.parse_args(argv)
+
+    dsn = database_url()
+    if (args.purge or not args.csv_dir) and not dsn:
+        print("Set TESTSPRITE_DATABASE_URL (or DATABASE_URL), or use --csv-dir", file=sys.stderr)
+        return 2
+    if args.purge:
+        print(f"Deleted {purge(dsn)} seeded empresas (dependent rows cascade)")
+        return 0
+
+    generator = Generator(args.empresas, args.clientes, args.ordens_per_cliente, args.pareto_alpha,
+                          args.history_days, args.seed)
+    sink = CsvSink(args.csv_dir) if args.csv_dir else CopySink(dsn, args.batch_rows)
+    counts, elapsed = seed(generator, sink)
+    total = sum(counts.values())
+    for table in TABLE_ORDER:
+        print(f"{table:<22}{counts[table]:>10}")
+    print(f"{total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    print(f"Manifest: {write_manifest(generator, counts)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
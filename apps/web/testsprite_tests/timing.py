@@ -0,0 +1,193 @@
+import atexit
+import json
+import os
+import re
+import socket
+import sys
+import threading
+import time
+import warnings
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+TESTS_DIR = Path(__file__).resolve().parent
+BUDGET_FILE = Path(os.environ.get("LATENCY_BUDGET_FILE", TESTS_DIR / "latency_budgets.json"))
+RESULTS_DIR = Path(os.environ.get("TESTSPRITE_RESULTS_DIR", TESTS_DIR / "results"))
+# off: record only; warn: emit a warning per breach; fail: raise LatencyBudgetExceeded
+BUDGET_MODE = os.environ.get("LATENCY_BUDGET_MODE", "warn")
+
+ID_SEGMENT = re.compile(r"^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+|[0-9a-f]{24,})$", re.I)
+
+_local = threading.local()
+_records = []
+_records_lock = threading.Lock()
+_budgets = None
+
+
+class LatencyBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class TimingRecord:
+    endpoint: str
+    method: str
+    url: str
+    status: int
+    dns_ms: float
+    connect_ms: float
+    tls_ms: float
+    ttfb_ms: float
+    total_ms: float
+    reused_connection: bool
+    started_at: float
+
+
+def endpoint_name(method, url):
+    """'GET /api/ordens/[id]' for GET http://host/api/ordens/6f1c...?x=1."""
+    segments = ["[id]" if ID_SEGMENT.match(s) else s for s in urlsplit(url).path.split("/")]
+    return f"{method.upper()} {'/'.join(segments) or '/'}"
+
+
+def _phase():
+    if not hasattr(_local, "phase"):
+        _local.phase = {}
+    return _local.phase
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """Splits a new connection into DNS lookup and TCP connect for the current request."""
+
+    def _new_conn(self):
+        phase = _phase()
+        host = self._dns_host
+        started = time.perf_counter()
+        addresses = [info[4][0] for info in socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)]
+        resolved = time.perf_counter()
+        phase["dns_ms"] = (resolved - started) * 1000
+        error = None
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except Exception as exc:
+                    error = exc
+            else:
+                raise error
+        finally:
+            self._dns_host = host
+        phase["connect_ms"] = (time.perf_counter() - resolved) * 1000
+        return sock
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        phase = _phase()
+        elapsed = (time.perf_counter() - started) * 1000
+        phase["tls_ms"] = max(0.0, elapsed - phase.get("dns_ms", 0.0) - phase.get("connect_ms", 0.0))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+def load_budgets(path=BUDGET_FILE):
+    global _budgets
+    if _budgets is None:
+        try:
+            with open(path) as fh:
+                _budgets = json.load(fh)
+        except (OSError, ValueError):
+            _budgets = {}
+    return _budgets
+
+
+def budget_for(method, path):
+    """Budget dict ({"total_ms": .., "ttfb_ms": ..}) for an endpoint, falling back to "default"."""
+    budgets = load_budgets()
+    return budgets.get(endpoint_name(method, path), budgets.get("default", {}))
+
+
+def start_request():
+    _local.phase = {}
+    return time.perf_counter(), time.time()
+
+
+def finish_request(method, response, started, started_at):
+    """Build the TimingRecord for a finished request and check it against its budget."""
+    total_ms = (time.perf_counter() - started) * 1000
+    phase = _phase()
+    setup_ms = phase.get("dns_ms", 0.0) + phase.get("connect_ms", 0.0) + phase.get("tls_ms", 0.0)
+    record = TimingRecord(
+        endpoint=endpoint_name(method, response.url),
+        method=method.upper(),
+        url=response.url,
+        status=response.status_code,
+        dns_ms=round(phase.get("dns_ms", 0.0), 3),
+        connect_ms=round(phase.get("connect_ms", 0.0), 3),
+        tls_ms=round(phase.get("tls_ms", 0.0), 3),
+        # requests' elapsed stops once the headers are parsed
+        ttfb_ms=round(max(0.0, response.elapsed.total_seconds() * 1000 - setup_ms), 3),
+        total_ms=round(total_ms, 3),
+        reused_connection="connect_ms" not in phase,
+        started_at=started_at,
+    )
+    with _records_lock:
+        _records.append(record)
+    check_budget(record)
+    return record
+
+
+def check_budget(record):
+    if BUDGET_MODE == "off":
+        return
+    budget = budget_for(record.method, record.url)
+    breaches = [
+        f"{metric} {getattr(record, metric):.0f}ms > {limit}ms"
+        for metric, limit in budget.items()
+        if metric.endswith("_ms") and getattr(record, metric, 0) > limit
+    ]
+    if not breaches:
+        return
+    message = f"Latency budget exceeded for {record.endpoint}: {', '.join(breaches)}"
+    if BUDGET_MODE == "fail":
+        raise LatencyBudgetExceeded(message)
+    warnings.warn(message, stacklevel=4)
+
+
+def records():
+    with _records_lock:
+        return list(_records)
+
+
+def _dump_records():
+    if not _records:
+        return
+    RESULTS_DIR.joinpath("timings").mkdir(parents=True, exist_ok=True)
+    script = Path(sys.argv[0]).stem or "interactive"
+    path = RESULTS_DIR / "timings" / f"{script}-{os.getpid()}.jsonl"
+    with open(path, "w") as fh:
+        for record in records():
+            fh.write(json.dumps(asdict(record)) + "\n")
+
+
+atexit.register(_dump_records)
@@ -0,0 +1,58 @@
+import re
+
+from playwright import async_api
+
+DEFAULT_TIMEOUT_MS = 5000
+
+# Responses a UI step can block on instead of sleeping
+API_RESPONSES = {
+    # LoginClient signs in straight against Supabase Auth; /api/login is the API route
+    "login": re.compile(r"/auth/v1/token|/api/login"),
+    "usuarios": re.compile(r"/rest/v1/usuarios"),
+    "ordens": re.compile(r"/rest/v1/ordens_servico|/api/ordens"),
+    "clientes": re.compile(r"/rest/v1/clientes|/api/clientes"),
+}
+
+
+def _response_pattern(wait_for):
+    if isinstance(wait_for, re.Pattern):
+        return wait_for
+    return API_RESPONSES.get(wait_for) or re.compile(re.escape(wait_for))
+
+
+async def settle(page, state="domcontentloaded", timeout=DEFAULT_TIMEOUT_MS):
+    """Wait for a load state, tolerating pages that never reach it (e.g. open realtime sockets)."""
+    try:
+        await page.wait_for_load_state(state, timeout=timeout)
+    except async_api.Error:
+        pass
+
+
+async def click(elem, wait_for=None, timeout=DEFAULT_TIMEOUT_MS):
+    """Click as soon as the element is visible.
+
+    `wait_for` names an entry of API_RESPONSES (or is a URL fragment / compiled
+    regex); the call then returns the matching response instead of None.
+    """
+    await elem.wait_for(state="visible", timeout=timeout)
+    if wait_for is None:
+        await elem.click(timeout=timeout)
+        await settle(elem.page)
+        return None
+    pattern = _response_pattern(wait_for)
+    async with elem.page.expect_response(lambda r: pattern.search(r.url) is not None, timeout=timeout) as info:
+        await elem.click(timeout=timeout)
+    response = await info.value
+    await settle(elem.page)
+    return response
+
+
+async def fill(elem, value, timeout=DEFAULT_TIMEOUT_MS):
+    await elem.wait_for(state="visible", timeout=timeout)
+    await elem.fill(value, timeout=timeout)
+
+
+async def wait_for_api(page, wait_for, timeout=DEFAULT_TIMEOUT_MS):
+    """Block until the next response matching `wait_for` arrives."""
+    pattern = _response_pattern(wait_for)
+    return await page.wait_for_event("response", lambda r: pattern.search(r.url) is not None, timeout=timeout)
@@ -0,0 +1,81 @@
+"""Local stand-in for the WhatsApp Web transport.
+
+Accepts POST /messages ({"empresa_id", "chat_id", "mensagem"}) with a fixed
+artificial latency, like whatsapp-web.js waiting for the phone to ack, and records
+when each message arrived and the peak number of sends in flight per empresa.
+Start the app with
+
+    WHATSAPP_TRANSPORTE_URL=http://127.0.0.1:8788 WHATSAPP_MSGS_POR_MINUTO=600 npm run dev
+
+so the outbound queue delivers here instead of through a real WhatsApp session.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PORT = int(os.environ.get("WHATSAPP_STUB_PORT", "8788"))
+DELAY_MS = float(os.environ.get("WHATSAPP_STUB_DELAY_MS", "50"))
+
+
+class WhatsAppStub:
+    def __init__(self, port=PORT, delay_ms=DELAY_MS):
+        self.port = port
+        self.delay_ms = delay_ms
+        self.messages = []
+        self.in_flight = Counter()
+        self.peak_in_flight = Counter()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def received(self, marker):
+        """(arrived_at, message) for every message whose text starts with marker."""
+        with self._lock:
+            return [(t, m) for t, m in self.messages if m["mensagem"].startswith(marker)]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != "/messages":
+                    return self._reply(404, {"message": "not found"})
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                empresa = body.get("empresa_id")
+                with stub._lock:
+                    stub.in_flight[empresa] += 1
+                    stub.peak_in_flight[empresa] = max(stub.peak_in_flight[empresa], stub.in_flight[empresa])
+                try:
+                    time.sleep(stub.delay_ms / 1000)
+                    with stub._lock:
+                        stub.messages.append((time.perf_counter(), body))
+                    self._reply(200, {"id": f"{len(stub.messages)}@stub"})
+                finally:
+                    with stub._lock:
+                        stub.in_flight[empresa] -= 1
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()